@@ -1,7 +1,11 @@
 from pathlib import Path
 from datetime import datetime
 from User import Users, User
-from Exchange import Exchange
+from Exchange import Exchange, HISTORY_WINDOWS
+from history_fetch import HistoryWindowFetcher, split_windows
+from executions_backfill import EXECUTIONS_EXCHANGES, compress_raw_json, decompress_raw_json
+import db_changelog
+import history_partitions
 from pbgui_purefunc import PBGDIR
 from logging_helpers import human_log as _human_log
 
@@ -107,14 +111,28 @@ class Database():
         local.trades_conn = conn
         return conn
     
-    # Simple full DB backup: copies the SQLite file to backup/db with timestamp name
+    # Full DB backup to backup/db with timestamp name. Once income history has
+    # archive partitions, the backup is incremental: pbgui-<ts>.db holds
+    # everything except archive rows, and each archive partition is stored once
+    # per content version under backup/db/partitions (unchanged months are not
+    # copied again). restore_db_from reassembles both layouts.
     def backup_full_db(self, keep_last: int = 10):
         try:
             backups_dir = Path(f'{PBGDIR}/data/backup/db')
             backups_dir.mkdir(parents=True, exist_ok=True)
+            partitions_dir = backups_dir / 'partitions'
             ts = datetime.now().strftime('%Y%m%d-%H%M%S')
             backup_path = backups_dir / f'pbgui-{ts}.db'
-            shutil.copy2(self.db, backup_path)
+            incremental = None
+            try:
+                partitioned = bool(history_partitions.list_partitions(self._connect()))
+            except sqlite3.Error:
+                partitioned = False
+            if partitioned:
+                backup_path.unlink(missing_ok=True)
+                incremental = history_partitions.backup(self._connect(), backup_path, partitions_dir)
+            else:
+                shutil.copy2(self.db, backup_path)
             # Rotate: keep only the last N backups by modified time
             try:
                 backups = sorted(
@@ -128,13 +146,29 @@ class Database():
                             old.unlink()
                         except Exception:
                             pass
+                    backups = backups[:keep_last]
+                # Drop partition files no remaining backup refers to
+                if partitions_dir.exists():
+                    referenced = set()
+                    for p in backups:
+                        referenced.update(history_partitions.manifest_files(p))
+                    for part in partitions_dir.glob('*.db'):
+                        if part.name not in referenced:
+                            part.unlink()
             except Exception:
                 pass
-            _human_log(
-                SERVICE,
-                f"Created full database backup {backup_path.name}",
-                meta={"operation": "backup_full_db"},
-            )
+            if incremental is not None:
+                _human_log(
+                    SERVICE,
+                    f"Created incremental database backup {backup_path.name} (partitions copied={len(incremental['copied'])} reused={len(incremental['reused'])})",
+                    meta={"operation": "backup_full_db"},
+                )
+            else:
+                _human_log(
+                    SERVICE,
+                    f"Created full database backup {backup_path.name}",
+                    meta={"operation": "backup_full_db"},
+                )
             return str(backup_path)
         except Exception as e:
             try:
@@ -149,8 +183,20 @@ class Database():
             src = Path(backup_path)
             if not src.exists():
                 return False
-            # Replace current DB with backup
+            # Truncate the WAL first so stale frames are not replayed onto the
+            # restored file, and drop this thread's cached connection.
+            try:
+                conn = self._connect()
+                conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+                conn.close()
+                self._local.conn = None
+            except sqlite3.Error:
+                pass
+            # Replace current DB with backup, then reload archive partitions
+            # of an incremental backup set
             shutil.copy2(src, self.db)
+            if history_partitions.manifest_files(src):
+                history_partitions.restore_partitions(self.db, src.parent / 'partitions')
             _human_log(
                 SERVICE,
                 f"Restored database from {src.name}",
@@ -168,14 +214,6 @@ class Database():
 
     def create_tables(self):
         sql_statements = [ 
-            """CREATE TABLE IF NOT EXISTS history (
-                    id INTEGER PRIMARY KEY,
-                    symbol TEXT NOT NULL,
-                    timestamp INTEGER NOT NULL,
-                    income REAL NOT NULL,
-                    uniqueid text NOT NULL UNIQUE,
-                    user TEXT NOT NULL
-            );""",
             """CREATE TABLE IF NOT EXISTS position (
                     id INTEGER PRIMARY KEY,
                     symbol TEXT NOT NULL,
@@ -213,6 +251,15 @@ class Database():
                     exchange TEXT NOT NULL,
                     last_scan_ts INTEGER NOT NULL,
                     PRIMARY KEY (user, exchange)
+            );""",
+            """CREATE TABLE IF NOT EXISTS history_fetch_windows (
+                    user TEXT NOT NULL,
+                    exchange TEXT NOT NULL,
+                    plan_since INTEGER NOT NULL,
+                    window_start INTEGER NOT NULL,
+                    window_end INTEGER NOT NULL,
+                    rows INTEGER NOT NULL,
+                    PRIMARY KEY (user, exchange, window_start, window_end)
             );"""
             ]
         # create a database connection
@@ -222,6 +269,8 @@ class Database():
                 for statement in sql_statements:
                     cursor.execute(statement)
                 conn.commit()
+                # history is a view over history_live + monthly archive partitions
+                history_partitions.ensure_schema(conn)
                 # Bugfix old database
                 # Check if the 'side' column exists in the 'position' table
                 cursor.execute("PRAGMA table_info(position);")
@@ -246,10 +295,14 @@ class Database():
                     cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_user ON orders(user)")
                     cursor.execute("CREATE INDEX IF NOT EXISTS idx_prices_user ON prices(user)")
                     cursor.execute("CREATE INDEX IF NOT EXISTS idx_prices_symbol_user ON prices(symbol, user)")
-                    cursor.execute("CREATE INDEX IF NOT EXISTS idx_history_user_ts ON history(user, timestamp)")
+                    cursor.execute("CREATE INDEX IF NOT EXISTS idx_orders_user_symbol ON orders(user, symbol)")
                     conn.commit()
                 except Exception:
                     pass
+                self._create_live_state_version(cursor)
+                conn.commit()
+                # Change log for DB Tools sync jobs (state tables only)
+                db_changelog.ensure_changelog(conn)
         except sqlite3.Error as e:
             _human_log(SERVICE, f"DB create_tables error: {e}", level='ERROR')
 
@@ -271,12 +324,41 @@ class Database():
                     raw_json TEXT,
                     UNIQUE(user, exchange, trade_id)
             );""",
+            # Compressed raw_json payloads written by the executions backfill.
+            """CREATE TABLE IF NOT EXISTS execution_raw (
+                    user TEXT NOT NULL,
+                    exchange TEXT NOT NULL,
+                    trade_id TEXT NOT NULL,
+                    codec TEXT NOT NULL,
+                    data BLOB NOT NULL,
+                    timestamp INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (user, exchange, trade_id)
+            );""",
+            # Per-(user, exchange, symbol) backfill cursors; symbol '' = all symbols.
+            """CREATE TABLE IF NOT EXISTS execution_backfill_cursors (
+                    user TEXT NOT NULL,
+                    exchange TEXT NOT NULL,
+                    symbol TEXT NOT NULL,
+                    cursor_ts INTEGER NOT NULL,
+                    rows INTEGER NOT NULL DEFAULT 0,
+                    updated_ts INTEGER NOT NULL,
+                    PRIMARY KEY (user, exchange, symbol)
+            );""",
         ]
         try:
             with self._connect_trades() as conn:
                 cur = conn.cursor()
                 for statement in sql_statements:
                     cur.execute(statement)
+                # execution_raw rows carry the execution timestamp for DB Tools sync/cleanup.
+                cur.execute("PRAGMA table_info(execution_raw);")
+                if 'timestamp' not in [column[1] for column in cur.fetchall()]:
+                    cur.execute("ALTER TABLE execution_raw ADD COLUMN timestamp INTEGER NOT NULL DEFAULT 0;")
+                    cur.execute(
+                        'UPDATE execution_raw SET timestamp = COALESCE((SELECT e.timestamp FROM executions e '
+                        'WHERE e.user = execution_raw.user AND e.exchange = execution_raw.exchange '
+                        'AND e.trade_id = execution_raw.trade_id), 0)'
+                    )
                 try:
                     cur.execute('PRAGMA journal_mode=WAL')
                     cur.execute('PRAGMA synchronous=NORMAL')
@@ -325,10 +407,10 @@ class Database():
         except Exception:
             pass
 
-    def update_history(self, user: User):
+    def update_history(self, user: User, budget=None, budget_loop=None):
         _human_log(SERVICE, f"update_history called for user={getattr(user, 'name', user)}", level='INFO', user=getattr(user, 'name', user))
         try:
-            history = self.fetch_history(user)
+            history = self.fetch_history(user, budget=budget, budget_loop=budget_loop)
         except Exception as e:
             # Important: don't write partial history data. If the exchange fetch fails,
             # abort this update run so we can retry later without creating gaps.
@@ -419,61 +501,17 @@ class Database():
         except Exception:
             pass
 
-    def update_executions(
-        self,
-        user: User,
-        *,
-        since_override: int | None = None,
-        ignore_last_execution: bool = False,
-        initial_lookback_days: int | None = None,
-        symbol_lookback_days: int | None = None,
-    ):
-        """Fetch and store execution-level trades/fills into the trades DB.
-
-        By default, this is an incremental updater: it starts from the last stored
-        execution timestamp (with a small overlap), and applies exchange-specific
-        caps for initial backfill.
+    def execution_fetch_since(self, exchange_id: str, since: int | None, now_ms: int, initial_lookback_days: int | None = None):
+        """Apply the exchange-specific lookback caps to an executions fetch start.
 
-        Backfill controls:
-        - since_override: force fetching from this ms timestamp (UTC).
-        - ignore_last_execution: ignore existing executions and treat as initial run.
-        - initial_lookback_days: override initial backfill cap (days). Only used
-          when there is no last execution timestamp or when ignore_last_execution.
-        - symbol_lookback_days: override the income-symbol discovery window (days).
+        *since* is None for an initial backfill; the exchange default (or
+        *initial_lookback_days*) bounds how far back it goes.  Incremental
+        starts are clamped to what the endpoint can still serve.
         """
-        exchange = Exchange(user.exchange, user)
-
-        # Only fetch executions for exchanges where we have explicit support.
-        if exchange.id not in ('hyperliquid', 'binance', 'bitget', 'bybit', 'kucoinfutures', 'okx', 'gateio', 'bitunix', 'weex'):
-            return None
-
-        since = None
-        if since_override is not None:
-            try:
-                since = int(since_override)
-            except Exception:
-                since = None
-        elif not ignore_last_execution:
-            try:
-                since = self.find_last_execution_timestamp(user, exchange.id)
-            except Exception:
-                since = None
-        # If we have previous executions, back up slightly to avoid boundary misses.
-        try:
-            if since is not None:
-                since = max(0, int(since) - 5 * 60 * 1000)
-        except Exception:
-            since = None
-
+        day = 24 * 60 * 60 * 1000
         # Binance futures userTrades endpoints only allow querying recent history.
         # For initial backfill, cap to a recent window by default; subsequent runs use since=last_execution.
-        now_ms = None
-        day = 24 * 60 * 60 * 1000
-        try:
-            now_ms = int(datetime.now().timestamp() * 1000)
-        except Exception:
-            now_ms = None
-        if exchange.id == 'binance' and now_ms is not None:
+        if exchange_id == 'binance':
             try:
                 default_days = 240
                 cap_days = int(initial_lookback_days) if (since is None and initial_lookback_days is not None) else default_days
@@ -489,7 +527,7 @@ class Database():
         # Bitget: API enforces max 90-day interval per request, but you can page across
         # multiple windows to fetch older history.
         # For initial backfill, use a simple 365-day lookback by default.
-        if exchange.id == 'bitget' and now_ms is not None:
+        if exchange_id == 'bitget':
             try:
                 if since is None:
                     if initial_lookback_days is not None:
@@ -501,7 +539,7 @@ class Database():
 
         # KuCoin futures fills can be fetched without a symbol. For initial backfill,
         # keep the scan bounded to one year by default.
-        if exchange.id == 'kucoinfutures' and now_ms is not None:
+        if exchange_id == 'kucoinfutures':
             try:
                 if since is None:
                     if initial_lookback_days is not None:
@@ -513,7 +551,7 @@ class Database():
 
         # Bybit: generally supports longer history, but for initial backfill keep it bounded.
         # Use 365 days by default; caller can override.
-        if exchange.id == 'bybit' and now_ms is not None:
+        if exchange_id == 'bybit':
             try:
                 if since is None:
                     if initial_lookback_days is not None:
@@ -525,7 +563,7 @@ class Database():
 
         # OKX: CCXT fetchMyTrades uses fills-history (≈90-day lookback). For initial backfill,
         # default to 90 days; caller can override.
-        if exchange.id == 'okx' and now_ms is not None:
+        if exchange_id == 'okx':
             try:
                 if since is None:
                     if initial_lookback_days is not None:
@@ -542,7 +580,7 @@ class Database():
         # Note: Gate docs mention the non-time-range personal trades endpoint defaults to the past ~6 months
         # and recommends using the *_timerange endpoint for longer periods. PBGui defaults to 365 days here,
         # while allowing callers to override via initial_lookback_days.
-        if exchange.id == 'gateio' and now_ms is not None:
+        if exchange_id == 'gateio':
             try:
                 if since is None:
                     if initial_lookback_days is not None:
@@ -552,12 +590,113 @@ class Database():
             except Exception:
                 pass
 
-        if exchange.id in {'bitunix', 'weex'} and now_ms is not None and since is None:
+        if exchange_id in {'bitunix', 'weex'} and since is None:
             try:
                 days = int(initial_lookback_days) if initial_lookback_days is not None else 30
                 since = max(0, now_ms - days * day)
             except Exception:
                 since = max(0, now_ms - 30 * day)
+        return since
+
+    def get_execution_cursor(self, user_name: str, exchange: str, symbol: str = ''):
+        """Return the executions backfill cursor {cursor_ts, rows, updated_ts} or None."""
+        sql = 'SELECT cursor_ts, rows, updated_ts FROM execution_backfill_cursors WHERE user = ? AND exchange = ? AND symbol = ?'
+        try:
+            with self._connect_trades() as conn:
+                row = conn.execute(sql, (user_name, exchange, symbol or '')).fetchone()
+        except sqlite3.Error as e:
+            _human_log(SERVICE, f"DB get_execution_cursor error {e} user={user_name}", level='ERROR', user=user_name)
+            return None
+        if not row:
+            return None
+        return {'cursor_ts': int(row[0]), 'rows': int(row[1]), 'updated_ts': int(row[2])}
+
+    def set_execution_cursor(self, user_name: str, exchange: str, symbol: str, cursor_ts: int, rows: int = 0):
+        """Advance a backfill cursor; *rows* is added to the unit's running total."""
+        sql = '''INSERT INTO execution_backfill_cursors (user, exchange, symbol, cursor_ts, rows, updated_ts)
+                 VALUES (?, ?, ?, ?, ?, ?)
+                 ON CONFLICT(user, exchange, symbol) DO UPDATE SET
+                    cursor_ts = excluded.cursor_ts,
+                    rows = execution_backfill_cursors.rows + excluded.rows,
+                    updated_ts = excluded.updated_ts'''
+        with self._write_lock:
+            with self._connect_trades() as conn:
+                conn.execute(sql, (user_name, exchange, symbol or '', int(cursor_ts), int(rows), int(time.time() * 1000)))
+                conn.commit()
+
+    def fetch_execution_raw_json(self, user_name: str, exchange: str, trade_id: str):
+        """Return raw_json for one execution, inline or from the compressed side table."""
+        try:
+            with self._connect_trades() as conn:
+                row = conn.execute(
+                    'SELECT raw_json FROM executions WHERE user = ? AND exchange = ? AND trade_id = ?',
+                    (user_name, exchange, str(trade_id)),
+                ).fetchone()
+                if row and row[0]:
+                    return row[0]
+                row = conn.execute(
+                    'SELECT codec, data FROM execution_raw WHERE user = ? AND exchange = ? AND trade_id = ?',
+                    (user_name, exchange, str(trade_id)),
+                ).fetchone()
+        except sqlite3.Error as e:
+            _human_log(SERVICE, f"DB fetch_execution_raw_json error {e} user={user_name}", level='ERROR', user=user_name)
+            return None
+        return decompress_raw_json(row[0], row[1]) if row else None
+
+    def update_executions(
+        self,
+        user: User,
+        *,
+        since_override: int | None = None,
+        ignore_last_execution: bool = False,
+        initial_lookback_days: int | None = None,
+        symbol_lookback_days: int | None = None,
+    ):
+        """Fetch and store execution-level trades/fills into the trades DB.
+
+        By default, this is an incremental updater: it starts from the last stored
+        execution timestamp (with a small overlap), and applies exchange-specific
+        caps for initial backfill.
+
+        Backfill controls:
+        - since_override: force fetching from this ms timestamp (UTC).
+        - ignore_last_execution: ignore existing executions and treat as initial run.
+        - initial_lookback_days: override initial backfill cap (days). Only used
+          when there is no last execution timestamp or when ignore_last_execution.
+        - symbol_lookback_days: override the income-symbol discovery window (days).
+        """
+        exchange = Exchange(user.exchange, user)
+
+        # Only fetch executions for exchanges where we have explicit support.
+        if exchange.id not in EXECUTIONS_EXCHANGES:
+            return None
+
+        since = None
+        if since_override is not None:
+            try:
+                since = int(since_override)
+            except Exception:
+                since = None
+        elif not ignore_last_execution:
+            try:
+                since = self.find_last_execution_timestamp(user, exchange.id)
+            except Exception:
+                since = None
+        # If we have previous executions, back up slightly to avoid boundary misses.
+        try:
+            if since is not None:
+                since = max(0, int(since) - 5 * 60 * 1000)
+        except Exception:
+            since = None
+
+        now_ms = None
+        day = 24 * 60 * 60 * 1000
+        try:
+            now_ms = int(datetime.now().timestamp() * 1000)
+        except Exception:
+            now_ms = None
+        if now_ms is not None:
+            since = self.execution_fetch_since(exchange.id, since, now_ms, initial_lookback_days)
 
         _human_log(SERVICE, f"fetch_executions: user={user.name} exchange={exchange.id} since={since}", level='INFO', user=user.name)
         start_ts = time.time()
@@ -600,15 +739,54 @@ class Database():
         if not executions:
             return {'fetched': n, 'prepared': 0, 'inserted': 0}
 
+        stored = self.store_executions(user.name, exchange.id, executions)
+        if not stored['prepared']:
+            return {'fetched': n, 'prepared': 0, 'inserted': 0}
+        _human_log(SERVICE,
+            f"store_executions DONE: user={user.name} exchange={exchange.id} fetched={n} prepared={stored['prepared']} inserted={stored['inserted']} ts_min={stored['ts_min']} ts_max={stored['ts_max']}",
+            level='INFO',
+            user=user.name,
+        )
+
+        # Bitget: existing rows may have side semantics that need normalization.
+        if exchange.id == 'bitget':
+            self._repair_bitget_execution_sides(user.name)
+
+        return {'fetched': n, 'prepared': stored['prepared'], 'inserted': stored['inserted']}
+    
+    def store_executions(
+        self,
+        user_name: str,
+        exchange_id: str,
+        executions: list,
+        *,
+        batch_size: int = 0,
+        compress_raw: bool = False,
+        on_batch=None,
+    ) -> dict:
+        """Insert normalized executions (see Exchange.fetch_executions) with executemany.
+
+        Rows without a trade_id are skipped and existing (user, exchange,
+        trade_id) rows are ignored.  *batch_size* > 0 commits every that many
+        rows and calls *on_batch(prepared, inserted)* after each commit.  With
+        *compress_raw* the raw_json payload goes compressed into the
+        execution_raw side table instead of the executions row (see
+        executions_backfill.compress_raw).
+        """
         rows = []
-        for ex in executions:
+        raws = []
+        for ex in executions or ():
             try:
                 trade_id = ex.get('trade_id')
                 if not trade_id:
                     continue
+                raw_json = ex.get('raw_json')
+                if compress_raw and raw_json:
+                    raws.append((user_name, exchange_id, str(trade_id), *compress_raw_json(raw_json), int(ex.get('timestamp') or 0)))
+                    raw_json = None
                 rows.append(
                     (
-                        exchange.id,
+                        exchange_id,
                         ex.get('symbol') or '',
                         int(ex.get('timestamp') or 0),
                         ex.get('side'),
@@ -618,48 +796,47 @@ class Database():
                         ex.get('realized_pnl'),
                         ex.get('order_id'),
                         str(trade_id),
-                        user.name,
-                        ex.get('raw_json'),
+                        user_name,
+                        raw_json,
                     )
                 )
             except Exception:
                 continue
 
+        result = {'prepared': len(rows), 'inserted': 0, 'ts_min': None, 'ts_max': None}
         if not rows:
-            return {'fetched': n, 'prepared': 0, 'inserted': 0}
-
+            return result
         sql = (
             'INSERT OR IGNORE INTO executions '
             '(exchange, symbol, timestamp, side, price, qty, fee, realized_pnl, order_id, trade_id, user, raw_json) '
             'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'
         )
-        inserted = 0
-        with self._write_lock:
-            with self._connect_trades() as conn:
-                before = conn.total_changes
-                cur = conn.cursor()
-                cur.executemany(sql, rows)
-                conn.commit()
-                inserted = max(0, conn.total_changes - before)
+        sql_raw = 'INSERT OR IGNORE INTO execution_raw (user, exchange, trade_id, codec, data, timestamp) VALUES (?, ?, ?, ?, ?, ?)'
+        size = int(batch_size) if batch_size and batch_size > 0 else len(rows)
+        raw_by_trade = {raw[2]: raw for raw in raws}
+        for offset in range(0, len(rows), size):
+            batch = rows[offset:offset + size]
+            with self._write_lock:
+                with self._connect_trades() as conn:
+                    before = conn.total_changes
+                    cur = conn.cursor()
+                    cur.executemany(sql, batch)
+                    inserted = max(0, conn.total_changes - before)
+                    if raw_by_trade:
+                        cur.executemany(sql_raw, [raw_by_trade[row[9]] for row in batch if row[9] in raw_by_trade])
+                    conn.commit()
+            result['inserted'] += inserted
+            if on_batch is not None:
+                on_batch(len(batch), inserted)
 
         try:
             ts_vals = [r[2] for r in rows if r and r[2]]
-            ts_min = min(ts_vals) if ts_vals else None
-            ts_max = max(ts_vals) if ts_vals else None
+            result['ts_min'] = min(ts_vals) if ts_vals else None
+            result['ts_max'] = max(ts_vals) if ts_vals else None
         except Exception:
-            ts_min, ts_max = None, None
-        _human_log(SERVICE,
-            f"store_executions DONE: user={user.name} exchange={exchange.id} fetched={n} prepared={len(rows)} inserted={inserted} ts_min={ts_min} ts_max={ts_max}",
-            level='INFO',
-            user=user.name,
-        )
-
-        # Bitget: existing rows may have side semantics that need normalization.
-        if exchange.id == 'bitget':
-            self._repair_bitget_execution_sides(user.name)
+            pass
+        return result
 
-        return {'fetched': n, 'prepared': len(rows), 'inserted': inserted}
-    
     def update_positions(self, user: User, _exchange=None):
         positions_db = self.fetch_positions(user)
         _owns_exchange = _exchange is None
@@ -908,7 +1085,7 @@ class Database():
         except sqlite3.Error as e:
             # Ignore duplicate uniqueid (already stored), log others
             msg = str(e).lower()
-            if 'unique constraint failed' in msg and 'history.uniqueid' in msg:
+            if 'unique constraint failed' in msg and 'uniqueid' in msg:
                 return
             _human_log(SERVICE, f"DB add_history error {e} data={history}", level='ERROR')
     
@@ -1160,12 +1337,87 @@ class Database():
         except sqlite3.Error as e:
             _human_log(SERVICE, f"DB set_last_scan_ts error {e} user={user_name}", level='ERROR', user=user_name)
 
-    def fetch_history(self, user: User):
+    def get_history_fetch_progress(self, user_name: str, exchange: str):
+        """Return (plan_since, {(window_start, window_end), ...}) of an unfinished windowed fetch."""
+        sql = 'SELECT plan_since, window_start, window_end FROM history_fetch_windows WHERE user = ? AND exchange = ?'
+        try:
+            with self._connect() as conn:
+                rows = conn.execute(sql, (user_name, exchange)).fetchall()
+        except sqlite3.Error as e:
+            _human_log(SERVICE, f"DB get_history_fetch_progress error {e} user={user_name}", level='ERROR', user=user_name)
+            return None, set()
+        if not rows:
+            return None, set()
+        return min(int(row[0]) for row in rows), {(int(row[1]), int(row[2])) for row in rows}
+
+    def store_history_window(self, user: User, plan_since: int, start: int, end: int, history: list):
+        """Persist one fetched history window and its checkpoint in a single transaction."""
+        rows = [
+            (line['symbol'], line['timestamp'], line['income'], line['uniqueid'], user.name)
+            for line in history
+        ]
+        sql_history = 'INSERT OR IGNORE INTO history(symbol,timestamp,income,uniqueid,user) VALUES(?,?,?,?,?)'
+        sql_window = '''INSERT OR REPLACE INTO history_fetch_windows
+                        (user, exchange, plan_since, window_start, window_end, rows)
+                        VALUES (?, ?, ?, ?, ?, ?)'''
+        with self._write_lock:
+            with self._connect() as conn:
+                conn.executemany(sql_history, rows)
+                conn.execute(sql_window, (user.name, user.exchange, int(plan_since), int(start), int(end), len(rows)))
+                conn.commit()
+
+    def clear_history_fetch_progress(self, user_name: str, exchange: str):
+        """Drop window checkpoints once a windowed fetch completed."""
+        try:
+            with self._write_lock:
+                with self._connect() as conn:
+                    conn.execute('DELETE FROM history_fetch_windows WHERE user = ? AND exchange = ?', (user_name, exchange))
+                    conn.commit()
+        except sqlite3.Error as e:
+            _human_log(SERVICE, f"DB clear_history_fetch_progress error {e} user={user_name}", level='ERROR', user=user_name)
+
+    def _fetch_history_windowed(self, user: User, exchange: Exchange, since: int, budget=None, budget_loop=None):
+        """Fetch history in parallel time windows, checkpointing each finished window.
+
+        Long lookbacks (first import, long downtime) are split into windows
+        that are fetched concurrently.  Each finished window is written to the
+        history table together with its checkpoint row, so a crashed or failed
+        run resumes from the same plan and only fetches the missing windows.
+        """
+        plan_since, done = self.get_history_fetch_progress(user.name, user.exchange)
+        if plan_since is not None:
+            # Keep the stored plan as-is: clamping it to the lookback again would
+            # shift the window grid and no checkpoint would match any more.
+            _, until = exchange.history_lookback(plan_since)
+            since = plan_since
+        else:
+            since, until = exchange.history_lookback(since)
+        window_ms = HISTORY_WINDOWS[exchange.id][1]
+        on_window = None
+        if plan_since is not None or len(split_windows(since, until, window_ms)) > 1:
+            if done:
+                _human_log(SERVICE, f"fetch_history: resuming windowed fetch for user={user.name} windows_done={len(done)}", level='INFO', user=user.name)
+            on_window = lambda start, end, rows: self.store_history_window(user, since, start, end, rows)
+        fetcher = HistoryWindowFetcher(
+            exchange,
+            window_ms=window_ms,
+            budget=budget,
+            budget_loop=budget_loop,
+            on_window=on_window,
+            skip=done,
+        )
+        history = fetcher.run(since, until)
+        if on_window is not None:
+            self.clear_history_fetch_progress(user.name, user.exchange)
+        return history
+
+    def fetch_history(self, user: User, budget=None, budget_loop=None):
         """Fetch history from the exchange.
 
         Uses history_scan_meta to avoid re-scanning months of empty history
         for inactive bots.  On first run (no meta entry) falls back to the
-        last DB entry so the initial import is complete.
+        last DB entry so the initial import is complete.  Exchanges listed in
+        HISTORY_WINDOWS are fetched in parallel windows under *budget*.
         """
         exchange = Exchange(user.exchange, user)
         try:
@@ -1188,7 +1440,10 @@ class Database():
         # Time the exchange.fetch_history call to help diagnose slow history polls.
         try:
             start_ts = time.time()
-            history = exchange.fetch_history(int(since))
+            if exchange.supports_windowed_history():
+                history = self._fetch_history_windowed(user, exchange, int(since), budget, budget_loop)
+            else:
+                history = exchange.fetch_history(int(since))
             dur = time.time() - start_ts
             try:
                 length = len(history) if history is not None else 0
@@ -1208,6 +1463,65 @@ class Database():
         finally:
             exchange.close()  # Release aiohttp resources
 
+    LIVE_STATE_TABLES = ("position", "orders", "prices")
+
+    @classmethod
+    def _create_live_state_version(cls, cursor: sqlite3.Cursor):
+        """Maintain a per-user change counter for the live position/order/price tables.
+
+        Triggers bump ``live_state_version`` on every write from any process, so
+        readers can reuse snapshots until a user's counter moves.
+        """
+        cursor.execute(
+            """CREATE TABLE IF NOT EXISTS live_state_version (
+                    user TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL
+            )"""
+        )
+        bump = (
+            "INSERT INTO live_state_version (user, version) VALUES ({row}.user, 1) "
+            "ON CONFLICT(user) DO UPDATE SET version = version + 1;"
+        )
+        for table in cls.LIVE_STATE_TABLES:
+            for event, row in (("INSERT", "NEW"), ("UPDATE", "NEW"), ("DELETE", "OLD")):
+                cursor.execute(
+                    f'CREATE TRIGGER IF NOT EXISTS trg_live_state_{table}_{event.lower()} '
+                    f'AFTER {event} ON "{table}" BEGIN {bump.format(row=row)} END'
+                )
+
+    def fetch_live_state_version(self, user_name: str):
+        """Return the change counter of a user's positions, orders and prices."""
+        sql = 'SELECT version FROM live_state_version WHERE user = ?'
+        try:
+            with self._connect() as conn:
+                row = conn.execute(sql, [user_name]).fetchone()
+                return int(row[0]) if row else 0
+        except sqlite3.Error as e:
+            _human_log(SERVICE, f"DB fetch_live_state_version error {e} user={user_name}", level='ERROR', user=user_name)
+
+    def fetch_position_snapshot_rows(self, user_name: str):
+        """Return positions joined with their latest price and open orders in one pass.
+
+        One row per (position, order); positions without orders have NULL order
+        columns. Columns: position id, symbol, psize, upnl, entry, side, price,
+        then the full order row (id, symbol, timestamp, amount, price, side,
+        uniqueid, user).
+        """
+        sql = '''SELECT p.id, p.symbol, p.psize, p.upnl, p.entry, p.side,
+                       (SELECT pr.price FROM prices pr
+                         WHERE pr.symbol = p.symbol AND pr.user = p.user
+                         ORDER BY pr.id DESC LIMIT 1),
+                       o.id, o.symbol, o.timestamp, o.amount, o.price, o.side, o.uniqueid, o.user
+                FROM "position" p
+                LEFT JOIN "orders" o ON o.user = p.user AND o.symbol = p.symbol
+                WHERE p.user = ?
+                ORDER BY p.id, o.id'''
+        try:
+            with self._connect() as conn:
+                return conn.execute(sql, [user_name]).fetchall()
+        except sqlite3.Error as e:
+            _human_log(SERVICE, f"DB fetch_position_snapshot_rows error {e} user={user_name}", level='ERROR', user=user_name)
+
     def fetch_positions(self, user: User):
         sql = '''SELECT * FROM "position"
                 WHERE "position"."user" = ? '''
@@ -1729,54 +2043,75 @@ class Database():
         except sqlite3.Error as e:
             _human_log(SERVICE, f"DB select_income_by_symbol_with_id error {e}", level='ERROR')
 
-    # Delete specific income rows by primary key ids
+    # Delete specific income rows by primary key ids (ids are unique across partitions)
     def delete_income_by_ids(self, ids: list):
         if not ids:
             return 0
-        placeholders = ','.join('?' * len(ids))
-        sql = f'''DELETE FROM history WHERE id IN ({placeholders})'''
         try:
-            with self._connect() as conn:
-                cur = conn.cursor()
-                cur.execute(sql, ids)
-                conn.commit()
-                return cur.rowcount
+            with self._write_lock:
+                with self._connect() as conn:
+                    return history_partitions.delete_ids(conn, ids)
         except sqlite3.Error as e:
             _human_log(SERVICE, f"DB delete_income_by_ids error {e}", level='ERROR')
             return 0
 
     # Delete all income rows for a user older than or equal to a timestamp (ms)
     def delete_income_older_than_user(self, user: str, timestamp_ms: int):
-        sql = '''DELETE FROM history WHERE user = ? AND timestamp <= ?'''
         try:
-            with self._connect() as conn:
-                cur = conn.cursor()
-                cur.execute(sql, (user, int(timestamp_ms)))
-                conn.commit()
-                return cur.rowcount
+            return history_partitions.delete_older_than(self._connect(), [user], timestamp_ms, lock=self._write_lock)
         except sqlite3.Error as e:
             _human_log(SERVICE, f"DB delete_income_older_than_user error {e}", level='ERROR')
             return 0
 
     # Delete all income rows older than or equal to a timestamp for given users list.
-    # If users contains 'ALL', deletes across all users.
+    # If users contains 'ALL', deletes across all users. Archive months entirely
+    # before the cutoff are dropped as whole partitions.
     def delete_income_older_than(self, users: list, timestamp_ms: int):
         try:
-            with self._connect() as conn:
-                cur = conn.cursor()
-                if not users or 'ALL' in users:
-                    sql = 'DELETE FROM history WHERE timestamp <= ?'
-                    cur.execute(sql, (int(timestamp_ms),))
-                else:
-                    placeholders = ','.join('?' * len(users))
-                    sql = f'DELETE FROM history WHERE user IN ({placeholders}) AND timestamp <= ?'
-                    cur.execute(sql, tuple(users) + (int(timestamp_ms),))
-                conn.commit()
-                return cur.rowcount
+            scope = None if not users or 'ALL' in users else users
+            return history_partitions.delete_older_than(self._connect(), scope, timestamp_ms, lock=self._write_lock)
         except sqlite3.Error as e:
             _human_log(SERVICE, f"DB delete_income_older_than error {e}", level='ERROR')
             return 0
 
+    def rotate_history_partitions(self, now_ms: int | None = None):
+        """Move closed months from history_live into monthly archive partitions.
+
+        Returns ``{partition: rows_moved}``; runs in short batches so it can be
+        called periodically from PBData.
+        """
+        now_ms = int(time.time() * 1000) if now_ms is None else int(now_ms)
+        try:
+            moved = history_partitions.rotate(self._connect(), now_ms, lock=self._write_lock)
+        except sqlite3.Error as e:
+            _human_log(SERVICE, f"DB rotate_history_partitions error {e}", level='ERROR')
+            return {}
+        if moved:
+            _human_log(
+                SERVICE,
+                f"Archived {sum(moved.values())} income rows into {len(moved)} monthly partitions",
+                meta={"operation": "rotate_history_partitions", "partitions": moved},
+            )
+        return moved
+
+    def prune_change_log(self):
+        """Drop week-old delete tombstones from the DB Tools change log."""
+        try:
+            with self._write_lock:
+                return db_changelog.prune(self._connect())
+        except sqlite3.Error as e:
+            _human_log(SERVICE, f"DB prune_change_log error {e}", level='ERROR')
+            return 0
+
+    def list_history_partitions(self):
+        """Return archive partitions as dicts (name, month_start, month_end)."""
+        try:
+            rows = history_partitions.list_partitions(self._connect())
+        except sqlite3.Error as e:
+            _human_log(SERVICE, f"DB list_history_partitions error {e}", level='ERROR')
+            return []
+        return [{"name": name, "month_start": start, "month_end": end} for name, start, end in rows]
+
     def find_last_timestamp(self, user: User):
         sql = '''SELECT MAX("history"."timestamp") FROM "history"
                 WHERE "history"."user" = ? '''
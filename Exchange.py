@@ -50,6 +50,19 @@ from ccxt.base.errors import (
 # configurable via `pbgui.ini` later.
 DEFAULT_CCXT_TIMEOUT_MS = 120000
 
+_DAY_MS = 24 * 60 * 60 * 1000
+_WEEK_MS = 7 * _DAY_MS
+
+# Exchanges whose income history endpoint accepts an explicit [start, end]
+# range, so the lookback can be split into independent time windows (see
+# `Exchange.fetch_history_window` and `history_fetch.HistoryWindowFetcher`).
+# Values: (maximum lookback in ms, window length in ms).
+HISTORY_WINDOWS = {
+    'bybit': (2 * 365 * _DAY_MS - _DAY_MS, _WEEK_MS),
+    'binance': (240 * _DAY_MS, _WEEK_MS),
+    'okx': (120 * _DAY_MS, _WEEK_MS),
+}
+
 
 def _extract_ccxt_error_payload(exchange_instance, exc: Exception) -> dict | None:
     """Best-effort extraction of the exchange JSON error payload.
@@ -1084,79 +1097,15 @@ class Exchange:
         if not self.instance: self.connect()
         if self.id in {"bitunix", "weex"}:
             return self.instance.fetch_income(since=since)
-        if self.id == "bybit":
-            day = 24 * 60 * 60 * 1000
-            week = 7 * day
-            max = 2 * 365 * day - day
-            now = self.instance.milliseconds()
-            if not since:
-                since = now - max
-            limit = 50
-            end = since + week
-            if self.instance.is_unified_enabled()[1]:
-                UTA = True
-            else:
-                UTA = False
-            cursor = None
-            while True:
-                for i in range(5):
-                            try:
-                                if UTA:
-                                    transactions = self.instance.privateGetV5AccountTransactionLog(params = {"limit": limit, "startTime": since, "endTime": end, "cursor": cursor})
-                                else:
-                                    transactions = self.instance.privateGetV5AccountContractTransactionLog(params = {"limit": limit, "startTime": since, "endTime": end, "cursor": cursor})
-                            except Exception as e:
-                                _log(SERVICE,
-                                    f"{e}",
-                                    level='WARNING',
-                                    user=self.user,
-                                )
-                                _log(SERVICE,
-                                    f'Fetching transactions failed. Retry in 5 seconds',
-                                    level='WARNING',
-                                    user=self.user,
-                                )
-                                sleep(5)
-                                continue
-                cursor = transactions["result"]["nextPageCursor"]
-                positions = transactions["result"]["list"]
-                # print(positions)
-                if positions:
-                    first_position = positions[0]
-                    last_position = positions[-1]
-                    all_histories = positions + all_histories
-                if cursor:
-                    _log(SERVICE,
-                        f"Fetched {len(positions)} transactions from "
-                        f"{self.instance.iso8601(int(first_position['transactionTime']))} till "
-                        f"{self.instance.iso8601(int(last_position['transactionTime']))}",
-                        level='INFO',
-                        user=self.user,
-                    )
-                else:
-                    _log(SERVICE,
-                        f"Fetched {len(positions)} transactions from "
-                        f"{self.instance.iso8601(since)} till {self.instance.iso8601(end)}",
-                        level='INFO',
-                        user=self.user,
-                    )
-                    since = since + week
-                    end = since + week
-                if since > now:
-                    _log(SERVICE, 'Done', level='INFO', user=self.user)
-                    break
-            # print(all_histories)
-            for history in all_histories:
-                if history["type"] in ["TRADE","SETTLEMENT"]:
-                    income = {}
-                    income["symbol"] = history["symbol"]
-                    income["timestamp"] = history["transactionTime"]
-                    income["income"] = history["change"]
-                    income["uniqueid"] = history["id"]
-                    all.append(income)
-                else: 
-                    self.save_income_other(history, self.user.name)
-        elif self.id == "hyperliquid":
+        if self.id in HISTORY_WINDOWS:
+            since, now = self.history_lookback(since)
+            window = HISTORY_WINDOWS[self.id][1]
+            while since <= now:
+                all.extend(self.fetch_history_window(since, since + window))
+                since += window
+            _log(SERVICE, 'Done', level='INFO', user=self.user)
+            return all
+        if self.id == "hyperliquid":
             hour = 60 * 60 * 1000
             day = 24 * 60 * 60 * 1000
             week = 7 * day
@@ -1349,54 +1298,6 @@ class Exchange:
                     all.append(income)
                 else: 
                     self.save_income_other(history, self.user.name)
-        elif self.id == "okx":
-            day = 24 * 60 * 60 * 1000
-            week = 7 * day
-            max = 120 * day
-            now = self.instance.milliseconds()
-            if not since:
-                since = now - max
-            limit = 100
-            end = since + week
-            while True:
-                ledgers = self.instance.fetch_ledger(since=since, limit=limit, params = {"method": "privateGetAccountBillsArchive", "instType": "SWAP", "end": end})
-                if ledgers:
-                    first_ledger = ledgers[0]
-                    last_ledger = ledgers[-1]
-                    all_histories = ledgers + all_histories
-                if len(ledgers) == limit:
-                    _log(SERVICE,
-                        f"Fetched {len(ledgers)} ledgers from "
-                        f"{self.instance.iso8601(first_ledger['timestamp'])} till "
-                        f"{self.instance.iso8601(last_ledger['timestamp'])}",
-                        level='INFO',
-                        user=self.user,
-                    )
-                    end = ledgers[0]['timestamp']
-                else:
-                    _log(SERVICE,
-                        f"Fetched {len(ledgers)} ledgers from "
-                        f"{self.instance.iso8601(since)} till {self.instance.iso8601(end)}",
-                        level='INFO',
-                        user=self.user,
-                    )
-                    since = since + week
-                    end = since + week
-                if since > now:
-                    _log(SERVICE, 'Done', level='INFO', user=self.user)
-                    break
-                sleep(0.5)
-            for history in all_histories:
-                if history["type"] in ["trade","fee"]:
-                    income = {}
-                    # income["symbol"] = history["symbol"][0:-5].replace("/", "").replace("-", "")
-                    income["symbol"] = history["info"]["instId"][0:-5].replace("/", "").replace("-", "")
-                    income["timestamp"] = history["timestamp"]
-                    income["income"] = history["amount"]
-                    income["uniqueid"] = history["id"]
-                    all.append(income)
-                else: 
-                    self.save_income_other(history, self.user.name)
         elif self.id == "bitget":
             day = 24 * 60 * 60 * 1000
             week = 7 * day
@@ -1514,70 +1415,175 @@ class Exchange:
                         all.append(income)
                     else: 
                         self.save_income_other(history, self.user.name)
-        elif self.id == "binance":
-            day = 24 * 60 * 60 * 1000
-            week = 7 * day
-            max = 240 * day
-            now = self.instance.milliseconds()
-            if not since:
-                since = now - max
-            # Clamp to exchange's maximum lookback window to avoid "since too old" errors.
-            try:
-                since = max(int(since), int(now - max))
-            except Exception:
-                pass
-            limit = 1000
-            end = since + week
-            while True:
-                imcomes = None
-                last_err = None
-                for attempt in range(3):
-                    try:
-                        imcomes = self.instance.fapiPrivateGetIncome({                        
-                                                                "pageSize": "100",
-                                                                "startTime": since,
-                                                                "limit": limit,
-                                                                "endTime": end,
-                                                                "timestamp": self.instance.milliseconds()
-                                                                })
-                        last_err = None
-                        break
-                    except Exception as e:
-                        if not _ccxt_should_retry(self.instance, e):
-                            raise
-                        last_err = e
-                        _log(SERVICE,
-                            f"binance fapiPrivateGetIncome error user={self.user.name} since={since} end={end} attempt={attempt+1}/3: {e}",
-                            level='WARNING',
-                            user=self.user,
-                        )
-                        sleep(min(2 ** attempt, 5))
-                if last_err is not None:
-                    raise last_err
-                if imcomes:
-                    first_imcome = imcomes[0]
-                    last_imcome = imcomes[-1]
-                    all_histories = imcomes + all_histories
-                if len(imcomes) == limit:
+        return all
+
+    def supports_windowed_history(self) -> bool:
+        """Return True when income history can be fetched per time window."""
+        return self.id in HISTORY_WINDOWS and bool(self.user) and self.user.key != 'key'
+
+    def history_lookback(self, since: int = None):
+        """Clamp *since* to the exchange's maximum lookback; return (since, now) in ms."""
+        if not self.instance: self.connect()
+        max_lookback = HISTORY_WINDOWS[self.id][0]
+        now = self.instance.milliseconds()
+        if not since:
+            since = now - max_lookback
+        # Clamp to exchange's maximum lookback window to avoid "since too old" errors.
+        return max(int(since), int(now - max_lookback)), now
+
+    def fetch_history_window(self, start: int, end: int, pace=None):
+        """Fetch income history for one [start, end] window, following pagination.
+
+        Windows are independent of each other, so several can be fetched
+        concurrently (see `history_fetch.HistoryWindowFetcher`).  *pace* is an
+        optional callable invoked before every REST request (rate budget).
+        Returns income dicts (symbol, timestamp, income, uniqueid); other
+        ledger rows are passed to `save_income_other`.
+        """
+        if not self.instance: self.connect()
+        if self.id == "bybit":
+            return self._fetch_history_window_bybit(start, end, pace)
+        if self.id == "okx":
+            return self._fetch_history_window_okx(start, end, pace)
+        if self.id == "binance":
+            return self._fetch_history_window_binance(start, end, pace)
+        raise ValueError(f"windowed history fetch not supported for {self.id}")
+
+    def _bybit_unified(self) -> bool:
+        # One lookup per Exchange instance; parallel windows share the answer.
+        uta = getattr(self, '_history_uta', None)
+        if uta is None:
+            uta = bool(self.instance.is_unified_enabled()[1])
+            self._history_uta = uta
+        return uta
+
+    def _fetch_history_window_bybit(self, start: int, end: int, pace=None):
+        all = []
+        limit = 50
+        UTA = self._bybit_unified()
+        cursor = None
+        while True:
+            transactions = None
+            last_err = None
+            for attempt in range(5):
+                if pace: pace()
+                try:
+                    if UTA:
+                        transactions = self.instance.privateGetV5AccountTransactionLog(params = {"limit": limit, "startTime": start, "endTime": end, "cursor": cursor})
+                    else:
+                        transactions = self.instance.privateGetV5AccountContractTransactionLog(params = {"limit": limit, "startTime": start, "endTime": end, "cursor": cursor})
+                    last_err = None
+                    break
+                except Exception as e:
+                    last_err = e
                     _log(SERVICE,
-                        f"Fetched {len(imcomes)} incomes from "
-                        f"{self.instance.iso8601(int(first_imcome['time']))} till "
-                        f"{self.instance.iso8601(int(last_imcome['time']))}",
+                        f"{e}",
+                        level='WARNING',
                         user=self.user,
                     )
-                    since = int(imcomes[-1]['time'])
-                else:
                     _log(SERVICE,
-                        f"Fetched {len(imcomes)} incomes from "
-                        f"{self.instance.iso8601(since)} till {self.instance.iso8601(end)}",
+                        f'Fetching transactions failed. Retry in 5 seconds',
+                        level='WARNING',
                         user=self.user,
                     )
-                    since = end
-                    end = since + week
-                if since > now:
-                    _log(SERVICE, 'Done', level='INFO', user=self.user)
+                    sleep(5)
+            if last_err is not None:
+                raise last_err
+            cursor = transactions["result"]["nextPageCursor"]
+            positions = transactions["result"]["list"]
+            for history in positions:
+                if history["type"] in ["TRADE","SETTLEMENT"]:
+                    income = {}
+                    income["symbol"] = history["symbol"]
+                    income["timestamp"] = history["transactionTime"]
+                    income["income"] = history["change"]
+                    income["uniqueid"] = history["id"]
+                    all.append(income)
+                else:
+                    self.save_income_other(history, self.user.name)
+            if cursor:
+                _log(SERVICE,
+                    f"Fetched {len(positions)} transactions from "
+                    f"{self.instance.iso8601(int(positions[0]['transactionTime']))} till "
+                    f"{self.instance.iso8601(int(positions[-1]['transactionTime']))}",
+                    level='INFO',
+                    user=self.user,
+                )
+            else:
+                _log(SERVICE,
+                    f"Fetched {len(positions)} transactions from "
+                    f"{self.instance.iso8601(start)} till {self.instance.iso8601(end)}",
+                    level='INFO',
+                    user=self.user,
+                )
+                return all
+
+    def _fetch_history_window_okx(self, start: int, end: int, pace=None):
+        all = []
+        limit = 100
+        while True:
+            if pace: pace()
+            ledgers = self.instance.fetch_ledger(since=start, limit=limit, params = {"method": "privateGetAccountBillsArchive", "instType": "SWAP", "end": end})
+            for history in ledgers:
+                if history["type"] in ["trade","fee"]:
+                    income = {}
+                    income["symbol"] = history["info"]["instId"][0:-5].replace("/", "").replace("-", "")
+                    income["timestamp"] = history["timestamp"]
+                    income["income"] = history["amount"]
+                    income["uniqueid"] = history["id"]
+                    all.append(income)
+                else:
+                    self.save_income_other(history, self.user.name)
+            if len(ledgers) == limit:
+                _log(SERVICE,
+                    f"Fetched {len(ledgers)} ledgers from "
+                    f"{self.instance.iso8601(ledgers[0]['timestamp'])} till "
+                    f"{self.instance.iso8601(ledgers[-1]['timestamp'])}",
+                    level='INFO',
+                    user=self.user,
+                )
+                end = ledgers[0]['timestamp']
+                sleep(0.5)
+            else:
+                _log(SERVICE,
+                    f"Fetched {len(ledgers)} ledgers from "
+                    f"{self.instance.iso8601(start)} till {self.instance.iso8601(end)}",
+                    level='INFO',
+                    user=self.user,
+                )
+                return all
+
+    def _fetch_history_window_binance(self, start: int, end: int, pace=None):
+        all = []
+        limit = 1000
+        while True:
+            imcomes = None
+            last_err = None
+            for attempt in range(3):
+                if pace: pace()
+                try:
+                    imcomes = self.instance.fapiPrivateGetIncome({
+                                                            "pageSize": "100",
+                                                            "startTime": start,
+                                                            "limit": limit,
+                                                            "endTime": end,
+                                                            "timestamp": self.instance.milliseconds()
+                                                            })
+                    last_err = None
                     break
-            for history in all_histories:
+                except Exception as e:
+                    if not _ccxt_should_retry(self.instance, e):
+                        raise
+                    last_err = e
+                    _log(SERVICE,
+                        f"binance fapiPrivateGetIncome error user={self.user.name} since={start} end={end} attempt={attempt+1}/3: {e}",
+                        level='WARNING',
+                        user=self.user,
+                    )
+                    sleep(min(2 ** attempt, 5))
+            if last_err is not None:
+                raise last_err
+            for history in imcomes:
                 if history["incomeType"] in ["REALIZED_PNL", "COMMISSION", "FUNDING_FEE"]:
                     income = {}
                     income["symbol"] = history["symbol"]
@@ -1588,9 +1594,23 @@ class Exchange:
                     else:
                         income["uniqueid"] = history["tranId"]
                     all.append(income)
-                else: 
+                else:
                     self.save_income_other(history, self.user.name)
-        return all
+            if len(imcomes) == limit:
+                _log(SERVICE,
+                    f"Fetched {len(imcomes)} incomes from "
+                    f"{self.instance.iso8601(int(imcomes[0]['time']))} till "
+                    f"{self.instance.iso8601(int(imcomes[-1]['time']))}",
+                    user=self.user,
+                )
+                start = int(imcomes[-1]['time'])
+            else:
+                _log(SERVICE,
+                    f"Fetched {len(imcomes)} incomes from "
+                    f"{self.instance.iso8601(start)} till {self.instance.iso8601(end)}",
+                    user=self.user,
+                )
+                return all
 
     def fetch_executions(self, since: int = None, symbols: list[str] | None = None):
         """Fetch execution-level trades/fills.
@@ -28,7 +28,7 @@ import warnings
 from contextlib import asynccontextmanager
 from pathlib import Path, PurePath
 import re
-from time import sleep, time_ns
+from time import perf_counter, sleep, time_ns
 from uuid import uuid4
 
 _PBGUI_ROOT = Path(__file__).resolve().parent
@@ -44,8 +44,18 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import FileResponse, JSONResponse, RedirectResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 
+import pb8_helper_pool
 from secure_files import harden_sensitive_paths
 
+from api.lazy_routers import (
+    LazyRouterMiddleware,
+    lazy_routers_enabled,
+    loaded_heavy_modules,
+    registry as _lazy_routers,
+)
+
+_EAGER_IMPORTS_STARTED = perf_counter()
+_HEAVY_BEFORE_EAGER_IMPORTS = loaded_heavy_modules()
 from api.auth import (
     SessionToken,
     auth_runtime_status,
@@ -82,23 +92,8 @@ from api.coin_data import (
     shutdown as coin_data_shutdown,
     startup as coin_data_startup,
 )
-from api.backtest_v7 import router as backtest_v7_router
-from api.backtest_v7 import startup as bt7_startup, shutdown as bt7_shutdown
-from api.backtest_v8 import router as backtest_v8_router
-from api.backtest_v8 import startup as bt8_startup, shutdown as bt8_shutdown
 from api.cluster import router as cluster_router, shutdown as cluster_shutdown
-from api.optimize_v7 import router as optimize_v7_router
-from api.optimize_v7 import startup as opt7_startup, shutdown as opt7_shutdown
-from api.optimize_v8 import router as optimize_v8_router
-from api.optimize_v8 import startup as opt8_startup, shutdown as opt8_shutdown
-from api.pareto_explorer import router as pareto_explorer_router, shutdown as pareto_explorer_shutdown
 from api.pb7_ohlcv_tools import startup as ohlcv_preload_startup
-from api.strategy_explorer import router as strategy_explorer_router
-from api.strategy_explorer_v8 import (
-    router as strategy_explorer_v8_router,
-    shutdown as strategy_explorer_v8_shutdown,
-    startup as strategy_explorer_v8_startup,
-)
 from logging_helpers import (
     get_rotate_settings,
     human_log as _log,
@@ -118,6 +113,25 @@ from credential_reconciler import reconcile_pending_credentials
 from pb7_config import PB7ConfigurationError
 from pbgui_purefunc import PBGDIR, load_ini, save_ini, PBGUI_SERIAL, PBGUI_VERSION
 
+_lazy_routers.record_eager_imports(perf_counter() - _EAGER_IMPORTS_STARTED, _HEAVY_BEFORE_EAGER_IMPORTS)
+
+# Heavy routers (pandas/plotly/passivbot_rust/PB8 glue) are imported on the
+# first request to their prefix; queue owners are warmed right after startup.
+_lazy_routers.register("backtest-v7", "api.backtest_v7", "/api/backtest-v7", warm=True)
+_lazy_routers.register("backtest-v8", "api.backtest_v8", "/api/backtest-v8", warm=True)
+_lazy_routers.register("optimize-v7", "api.optimize_v7", "/api/optimize-v7", warm=True)
+_lazy_routers.register("optimize-v8", "api.optimize_v8", "/api/optimize-v8", warm=True)
+_lazy_routers.register("strategy-explorer-v8", "api.strategy_explorer_v8", "/api/strategy-explorer-v8", warm=True)
+_lazy_routers.register("pareto-explorer", "api.pareto_explorer", "/api/pareto-explorer")
+_lazy_routers.register("strategy-explorer", "api.strategy_explorer", "/api/strategy-explorer")
+bt7_startup, bt7_shutdown = _lazy_routers.startup_hook("backtest-v7"), _lazy_routers.shutdown_hook("backtest-v7")
+bt8_startup, bt8_shutdown = _lazy_routers.startup_hook("backtest-v8"), _lazy_routers.shutdown_hook("backtest-v8")
+opt7_startup, opt7_shutdown = _lazy_routers.startup_hook("optimize-v7"), _lazy_routers.shutdown_hook("optimize-v7")
+opt8_startup, opt8_shutdown = _lazy_routers.startup_hook("optimize-v8"), _lazy_routers.shutdown_hook("optimize-v8")
+strategy_explorer_v8_startup = _lazy_routers.startup_hook("strategy-explorer-v8")
+strategy_explorer_v8_shutdown = _lazy_routers.shutdown_hook("strategy-explorer-v8")
+pareto_explorer_shutdown = _lazy_routers.shutdown_hook("pareto-explorer")
+
 SERVICE = "PBApiServer"
 _REQUEST_ID_RE = re.compile(r"^[A-Za-z0-9._-]{1,128}$")
 
@@ -263,8 +277,9 @@ async def _restart_block_state() -> tuple[bool, str]:
     from api.cluster import restart_block_reason as cluster_restart_block_reason
     from api.coin_data import restart_block_reason as coin_data_restart_block_reason
     from api.db_tools import restart_block_reason as db_tools_restart_block_reason
-    from api.pareto_explorer import restart_block_reason as pareto_restart_block_reason
 
+    pareto_explorer = _lazy_routers.loaded_module("pareto-explorer")
+    pareto_restart_block_reason = pareto_explorer.restart_block_reason if pareto_explorer else (lambda: "")
     local_reasons = [
         reason
         for reason in (
@@ -789,6 +804,8 @@ async def _lifespan(app: FastAPI):
             await monitor.start()
             _log(SERVICE, "[lifespan] deferred startup complete", level="INFO")
 
+        if not lazy_routers_enabled():
+            await _lazy_routers.load_all()
         bt7_startup()
         bt8_startup()
         opt7_startup()
@@ -803,7 +820,12 @@ async def _lifespan(app: FastAPI):
             asyncio.create_task(_deferred_startup(), name="deferred-startup"),
             asyncio.create_task(_worker_watchdog_loop(), name="worker-watchdog"),
             asyncio.create_task(_serial_watcher_loop(), name="serial-watcher"),
+            asyncio.create_task(_lazy_routers.warm(), name="lazy-router-warmup"),
         ]
+        try:
+            _lazy_routers.record_startup(time_ns() / 1_000_000_000 - psutil.Process().create_time())
+        except psutil.Error:
+            pass
         yield  # app runs here
     finally:
         for task in lifecycle_tasks:
@@ -844,6 +866,8 @@ async def _lifespan(app: FastAPI):
             *(_run_shutdown(name, shutdown_step) for name, shutdown_step in shutdown_steps),
             return_exceptions=True,
         )
+        # Warm PB8 helper workers are shared by several routers; stop them last.
+        await _run_shutdown("pb8-helper-pool", lambda: asyncio.to_thread(pb8_helper_pool.shutdown))
         if _vps_monitor:
             try:
                 await _vps_monitor.stop()
@@ -915,6 +939,7 @@ app = FastAPI(
 )
 
 _cors_origins, _cors_allow_credentials = _configured_cors()
+app.add_middleware(LazyRouterMiddleware, registry=_lazy_routers)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=_cors_origins,
@@ -937,6 +962,7 @@ async def redirect_unauthenticated_page(request: Request, call_next):
         response.headers["X-Request-ID"] = request_id
         return response
 
+_lazy_routers.bind(app)
 app.include_router(auth_router, prefix="/api/auth", tags=["auth"])
 app.include_router(api_keys_router, prefix="/api/api-keys", tags=["api-keys"])
 app.include_router(dashboard_router, prefix="/api/dashboard", tags=["dashboard"])
@@ -954,14 +980,7 @@ app.include_router(v7_router, prefix="/api/v7", tags=["v7"])
 app.include_router(v8_router, prefix="/api/v8", tags=["v8"])
 app.include_router(balance_calc_router, prefix="/api/balance-calc", tags=["balance-calc"])
 app.include_router(coin_data_router, prefix="/api/coin-data", tags=["coin-data"])
-app.include_router(backtest_v7_router, prefix="/api/backtest-v7", tags=["backtest-v7"])
-app.include_router(backtest_v8_router, prefix="/api/backtest-v8", tags=["backtest-v8"])
 app.include_router(cluster_router, prefix="/api/cluster", tags=["cluster"])
-app.include_router(optimize_v7_router, prefix="/api/optimize-v7", tags=["optimize-v7"])
-app.include_router(optimize_v8_router, prefix="/api/optimize-v8", tags=["optimize-v8"])
-app.include_router(pareto_explorer_router, prefix="/api/pareto-explorer", tags=["pareto-explorer"])
-app.include_router(strategy_explorer_router, prefix="/api/strategy-explorer", tags=["strategy-explorer"])
-app.include_router(strategy_explorer_v8_router, prefix="/api/strategy-explorer-v8", tags=["strategy-explorer-v8"])
 
 
 @app.exception_handler(PB7ConfigurationError)
@@ -12,18 +12,25 @@ import sys
 import os
 import re
 import traceback
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from dataclasses import dataclass
 from urllib.parse import urlparse
 from Exchange import Exchange, Exchanges, V7
-from cmc_pool import CmcPoolClient, CmcPoolExhaustedError
+from cmc_coalescing import INFO_REUSE_SECONDS, CmcInfoStore, CmcRequestCoalescer
+from cmc_pool import CmcPoolClient, CmcPoolExhaustedError, estimate_endpoint_credits
 from cmc_runtime import build_cmc_pool_client
 from file_lock import advisory_file_lock
 from logging_helpers import human_log as _log
+import market_index
 from market_symbol_mapping import disambiguate_multiplier_market_coins
 from pbgui_purefunc import IniSnapshot, load_ini_snapshot, save_ini, update_ini
 from ini_watcher import IniWatcher
 
 SERVICE = "PBCoinData"
+# Exchanges refresh concurrently; a slow one is abandoned after its deadline.
+MAPPING_REFRESH_WORKERS = 8
+MAPPING_REFRESH_DEADLINE = 900.0
+MAPPING_REFRESH_STATUS = "mapping_refresh.json"
 
 
 @dataclass(frozen=True)
@@ -375,7 +382,8 @@ def get_symbol_for_coin(coin: str, exchange: str, use_cache=True) -> str:
     market_type = market_type or "swap"
     coin_key = str(coin or "").upper()
 
-    mapping_path = Path.cwd() / "data" / "coindata" / exchange_id / "mapping.json"
+    exchange_dir = Path.cwd() / "data" / "coindata" / exchange_id
+    mapping_path = exchange_dir / "mapping.json"
     mapping_sig = None
     if mapping_path.exists():
         stat = mapping_path.stat()
@@ -391,27 +399,21 @@ def get_symbol_for_coin(coin: str, exchange: str, use_cache=True) -> str:
         if coin_key in coin_map:
             return coin_map[coin_key]
 
+    # Shared market index written by PBCoinData; valid only for the current files.
+    index = market_index.open_index(exchange_dir / market_index.INDEX_FILENAME) if use_cache and mapping_sig else None
+    if index is not None and index.matches(_market_index_signature(exchange_dir)):
+        symbol = index.symbol_for_coin(coin_key)
+        if symbol:
+            return symbol
+        return _fallback_symbol_for_coin(coin_key, exchange_key)
+
     coin_map = {}
     if mapping_path.exists():
         mapping = _read_json_with_retry(mapping_path, retries=1, delay_s=0.1)
         if not isinstance(mapping, list):
             mapping = []
+        coin_map = _build_coin_symbol_map(mapping)
 
-        for record in disambiguate_multiplier_market_coins(mapping):
-            symbol = str(record.get("symbol") or "").strip().upper()
-            if not symbol:
-                continue
-
-            if not bool(record.get("swap", False)):
-                continue
-
-            quote = str(record.get("quote") or "").strip().upper()
-            normalized = str(record.get("coin") or "").strip().upper()
-            if not normalized:
-                normalized = compute_coin_name(symbol, quote)
-            if normalized and normalized not in coin_map:
-                coin_map[normalized] = symbol
-    
     # Cache the mapping
     if use_cache:
         _COIN_TO_SYMBOL_CACHE[exchange_key] = coin_map
@@ -420,19 +422,50 @@ def get_symbol_for_coin(coin: str, exchange: str, use_cache=True) -> str:
     # Return symbol or fallback
     if coin_key in coin_map:
         return coin_map[coin_key]
-    else:
-        # Fallback: guess quote currency
-        quote = "USDC" if "hyperliquid" in exchange_key else "USDT"
-        # Special handling for Hyperliquid k-prefix coins
-        if "hyperliquid" in exchange_key and coin_key in _HYPERLIQUID_K_PREFIX_COINS:
-            return f"K{coin_key}{quote}"
-        return f"{coin_key}{quote}"
+    return _fallback_symbol_for_coin(coin_key, exchange_key)
+
+
+def _fallback_symbol_for_coin(coin_key: str, exchange_key: str) -> str:
+    """Guess the swap symbol of a coin missing from the mapping."""
+    quote = "USDC" if "hyperliquid" in exchange_key else "USDT"
+    # Special handling for Hyperliquid k-prefix coins
+    if "hyperliquid" in exchange_key and coin_key in _HYPERLIQUID_K_PREFIX_COINS:
+        return f"K{coin_key}{quote}"
+    return f"{coin_key}{quote}"
+
+
+def _build_coin_symbol_map(mapping: list) -> dict:
+    """Map normalized coins to their swap symbol; the first mapping row wins."""
+    coin_map = {}
+    for record in disambiguate_multiplier_market_coins(mapping):
+        symbol = str(record.get("symbol") or "").strip().upper()
+        if not symbol:
+            continue
+
+        if not bool(record.get("swap", False)):
+            continue
+
+        quote = str(record.get("quote") or "").strip().upper()
+        normalized = str(record.get("coin") or "").strip().upper()
+        if not normalized:
+            normalized = compute_coin_name(symbol, quote)
+        if normalized and normalized not in coin_map:
+            coin_map[normalized] = symbol
+    return coin_map
+
+
+def _market_index_signature(exchange_dir: Path) -> bytes:
+    """Source signature of an exchange's markets.idx: its mapping and ccxt markets."""
+    return market_index.source_signature(exchange_dir / "mapping.json", exchange_dir / "ccxt_markets.json")
 
 
 class CoinData:
     def __init__(self, defer_config: bool = False, cmc_pool: CmcPoolClient | None = None):
         pbgdir = Path.cwd()
         self.cmc_pool = cmc_pool or build_cmc_pool_client(pbgdir)
+        # Shared across processes: identical CMC requests are single-flight.
+        self.cmc_coalescer = CmcRequestCoalescer(pbgdir / "data" / "coindata" / "cmc_cache")
+        self.cmc_info = CmcInfoStore(pbgdir / "data" / "coindata" / "cmc_info.db")
         self.piddir = Path(f'{pbgdir}/data/pid')
         if not self.piddir.exists():
             self.piddir.mkdir(parents=True)
@@ -473,11 +506,14 @@ class CoinData:
         self._symbol_mappings = {}
         # HIP-3: Exchange-specific data caches
         self._ccxt_markets = {}  # {exchange: markets_dict}
+        self._ccxt_markets_ts = {}  # {exchange: (mtime_ns, size)} of the file behind _ccxt_markets
         self._exchange_mappings = {}  # {exchange: [mapping_records]}
         self._exchange_mapping_ts = {}  # {exchange: (mtime_ns, size)}
         self._copy_trading_cache = {}  # {exchange: [symbol_ids]}
         self._mapping_self_heal_state = {}  # {exchange: {fails:int, next_retry_ts:float}}
         self._last_build_mapping_stats = {}  # {exchange: {unmatched_* counters}}
+        self._mapping_executor: ThreadPoolExecutor | None = None
+        self._mapping_inflight = {}  # {exchange: (Future, started_ts)} incl. abandoned runs
         self._tradfi_symbol_map: list = []
         self._tradfi_symbol_map_ts: tuple | None = None
         self._cmc_metrics = {
@@ -519,6 +555,14 @@ class CoinData:
             exchange_dir.mkdir(parents=True, exist_ok=True)
         return exchange_dir
     
+    @staticmethod
+    def _file_sig(path: Path):
+        try:
+            stat = path.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
     def load_ccxt_markets(self, exchange: str) -> dict:
         """Load CCXT markets from cache for a specific exchange."""
         if exchange in self._ccxt_markets:
@@ -532,6 +576,7 @@ class CoinData:
             markets = _read_json_with_retry(markets_file, retries=1, delay_s=0.2)
             if isinstance(markets, dict):
                 self._ccxt_markets[exchange] = markets
+                self._ccxt_markets_ts[exchange] = self._file_sig(markets_file)
                 return markets
             _log(SERVICE, f'CCXT markets for {exchange} are not a dict, ignoring cache', level='WARNING')
         except Exception as e:
@@ -555,7 +600,9 @@ class CoinData:
                 json.dump(markets, f, indent=4)
             temp_file.replace(markets_file)
             self._ccxt_markets[exchange] = markets
+            self._ccxt_markets_ts[exchange] = self._file_sig(markets_file)
             _log(SERVICE, f'Saved CCXT markets for {exchange}', level='DEBUG')
+            self.write_market_index(exchange)
         except Exception as e:
             _log(SERVICE, f'Error saving CCXT markets for {exchange}: {e}', level='ERROR')
             if temp_file.exists():
@@ -612,11 +659,46 @@ class CoinData:
             stat = mapping_file.stat()
             self._exchange_mapping_ts[exchange] = (stat.st_mtime_ns, stat.st_size)
             _log(SERVICE, f'Saved mapping for {exchange}', level='DEBUG')
+            self.write_market_index(exchange)
         except Exception as e:
             _log(SERVICE, f'Error saving mapping for {exchange}: {e}', level='ERROR')
             if temp_file.exists():
                 temp_file.unlink()
 
+    def write_market_index(self, exchange: str) -> bool:
+        """Regenerate markets.idx, the shared memory-mapped market metadata index.
+
+        Other services (get_symbol_for_coin, Strategy Explorer) query it
+        instead of parsing ccxt_markets.json / mapping.json themselves.
+        """
+        exchange_dir = self._get_exchange_dir(exchange)
+        try:
+            with advisory_file_lock(exchange_dir / market_index.INDEX_FILENAME):
+                # Signature first: a concurrent rewrite then leaves the index stale, never wrong.
+                signature = _market_index_signature(exchange_dir)
+                if self._ccxt_markets_ts.get(exchange) != self._file_sig(exchange_dir / "ccxt_markets.json"):
+                    self._ccxt_markets.pop(exchange, None)  # rewritten by another process
+                mapping = self.load_mapping(exchange)
+                markets = self.load_ccxt_markets(exchange)
+                if not mapping and not markets:
+                    return False
+                coins = {
+                    str(record.get("symbol")): str(record.get("coin") or "")
+                    for record in mapping
+                    if isinstance(record, dict) and record.get("symbol")
+                }
+                count = market_index.write_index(
+                    exchange_dir / market_index.INDEX_FILENAME,
+                    market_index.entries_from_ccxt_markets(markets, coins),
+                    coin_symbols=_build_coin_symbol_map(mapping),
+                    signature=signature,
+                )
+            _log(SERVICE, f'Wrote market index for {exchange} ({count} markets)', level='DEBUG')
+            return True
+        except Exception as e:
+            _log(SERVICE, f'Error writing market index for {exchange}: {e}', level='WARNING')
+            return False
+
     # ------------------------------------------------------------------
     # TradFi symbol map (Hyperliquid XYZ stock-perps)
     # ------------------------------------------------------------------
@@ -1180,6 +1262,10 @@ class CoinData:
             }
         safe_status = dict(status) if isinstance(status, dict) else {}
         safe_status["ready"] = int(safe_status.get("active_credentials") or 0) > 0
+        try:
+            safe_status["coalescing"] = self.cmc_coalescer.stats()
+        except Exception as exc:
+            _log(SERVICE, f"CMC coalescing stats unavailable: {exc}", level="DEBUG")
         return safe_status
 
     @property
@@ -2248,20 +2334,40 @@ class CoinData:
                     symbols_ids.append(coin["id"])
         # filter out duplicate ids
         symbols_ids = list(set(symbols_ids))
-        # Fetch notice from coinmarketcap
+        # Only ids without a recent stored /info record are requested upstream.
         url = 'https://pro-api.coinmarketcap.com//v2/cryptocurrency/info'
-        parameters = {
-            'id': ','.join(map(str, symbols_ids))
-        }
-        headers = {'Accepts': 'application/json'}
-        data, status_code, attempts, error = self._cmc_get_json(
-            endpoint=endpoint,
-            url=url,
-            headers=headers,
-            params=parameters,
-            max_retries=3,
-            timeout=30,
-        )
+        try:
+            stored, missing_ids = self.cmc_info.info_records(symbols_ids, max_age=INFO_REUSE_SECONDS)
+        except Exception as e:
+            _log(SERVICE, f'CoinMarketCap info store unavailable: {e}', level='WARNING')
+            stored, missing_ids = {}, sorted(symbols_ids)
+        if stored and symbols_ids:
+            saved = estimate_endpoint_credits("/v2/cryptocurrency/info", {"id": symbols_ids})
+            if missing_ids:
+                saved -= estimate_endpoint_credits("/v2/cryptocurrency/info", {"id": missing_ids})
+            self.cmc_coalescer.record(endpoint, coalesced=True, credits=max(saved, 0.0), calls=0 if missing_ids else 1)
+        if stored and not missing_ids:
+            data, status_code, attempts, error = {"status": {"error_code": 0, "credit_count": 0}, "data": stored}, 200, 0, None
+        else:
+            parameters = {
+                'id': ','.join(map(str, missing_ids))
+            }
+            headers = {'Accepts': 'application/json'}
+            data, status_code, attempts, error = self._cmc_get_json(
+                endpoint=endpoint,
+                url=url,
+                headers=headers,
+                params=parameters,
+                max_retries=3,
+                timeout=30,
+            )
+            if data and stored:
+                data = {**data, "data": {**stored, **(data.get("data") or {})}}
+            if data:
+                try:
+                    self.cmc_info.record_info({k: v for k, v in (data.get("data") or {}).items() if k not in stored})
+                except Exception as e:
+                    _log(SERVICE, f'Failed to store CoinMarketCap metadata: {e}', level='WARNING')
         if data:
             self.metadata = data
             self.fetch_api_status()
@@ -2355,6 +2461,25 @@ class CoinData:
         params: dict | None,
         max_retries: int = 3,
         timeout: int = 30,
+    ) -> tuple[dict | None, int | None, int, str | None]:
+        """Fetch one CMC endpoint, sharing identical in-flight or just-fetched requests."""
+        estimated = 0.0 if endpoint == "status" else estimate_endpoint_credits(urlparse(url).path or endpoint, params)
+        return self.cmc_coalescer.fetch(
+            endpoint,
+            params,
+            lambda: self._cmc_get_json_upstream(endpoint, url, headers, params, max_retries, timeout),
+            estimated_credits=estimated,
+            is_valid=lambda payload: self._validate_cmc_payload(endpoint, payload)[0],
+        )
+
+    def _cmc_get_json_upstream(
+        self,
+        endpoint: str,
+        url: str,
+        headers: dict,
+        params: dict | None,
+        max_retries: int = 3,
+        timeout: int = 30,
     ) -> tuple[dict | None, int | None, int, str | None]:
         retryable_statuses = {401, 402, 403, 429, 500, 502, 503, 504}
         attempts = 0
@@ -2647,6 +2772,7 @@ class CoinData:
 
         # Self-heal pass: if mapping is missing/stale, rebuild immediately
         # independent of interval, with exponential backoff up to 24h.
+        heal_exchanges = []
         for exchange in V7.list():
             needs_heal, reason = self._source_is_newer_than_mapping(exchange)
             if not needs_heal:
@@ -2657,10 +2783,15 @@ class CoinData:
                 continue
 
             _log(SERVICE, f'Self-heal mapping trigger for {exchange}: {reason}', level='WARNING')
+            heal_exchanges.append(exchange)
+
+        for result in self.refresh_exchange_mappings(heal_exchanges):
+            exchange = result["exchange"]
+            state = self._mapping_self_heal_state.get(exchange, {"fails": 0, "next_retry_ts": 0.0})
             try:
-                result = self.refresh_exchange_mapping(exchange)
                 if not bool(result.get("ok")):
                     raise RuntimeError(
+                        result.get("error") or
                         f'refresh result not ok '
                         f'(markets_ok={result.get("markets_ok")}, '
                         f'mapping_ok={result.get("mapping_ok")}, '
@@ -2688,25 +2819,9 @@ class CoinData:
             cycle_started_ts = datetime.now().timestamp()
             cycle_results = []
             _log(SERVICE, 'Starting mapping update for all exchanges', level='INFO')
-            for exchange in V7.list():
-                try:
-                    if exchange in refreshed_in_self_heal:
-                        continue
-                    cycle_results.append(self.refresh_exchange_mapping(exchange))
-                except Exception as e:
-                    cycle_results.append({
-                        "exchange": exchange,
-                        "markets_ok": False,
-                        "mapping_ok": False,
-                        "prices_ok": False,
-                        "active": 0,
-                        "priced": 0,
-                        "unmatched_relevant": 0,
-                        "unmatched_relevant_unique": 0,
-                        "elapsed": 0.0,
-                        "ok": False,
-                    })
-                    _log(SERVICE, f'Failed to update mapping for {exchange}: {e}', level='ERROR')
+            cycle_results = self.refresh_exchange_mappings(
+                [exchange for exchange in V7.list() if exchange not in refreshed_in_self_heal]
+            )
             self.update_mappings_ts = now_ts
 
             if not cycle_results:
@@ -2723,7 +2838,7 @@ class CoinData:
             ok_count = sum(1 for r in cycle_results if r.get("ok"))
             total_count = len(cycle_results)
             per_exchange = ", ".join(
-                f'{r.get("exchange")}: {"ok" if r.get("ok") else "fail"} '
+                f'{r.get("exchange")}: {"timeout" if r.get("timed_out") else "ok" if r.get("ok") else "fail"} '
                 f'({r.get("elapsed", 0.0):.1f}s, {r.get("priced", 0)}/{r.get("active", 0)} priced)'
                 for r in cycle_results
             )
@@ -2775,6 +2890,113 @@ class CoinData:
             return True, "ccxt_markets.json newer than mapping"
         return False, ""
 
+    @staticmethod
+    def _failed_refresh_result(exchange: str, elapsed: float = 0.0, **extra) -> dict:
+        return {
+            "exchange": exchange,
+            "markets_ok": False,
+            "mapping_ok": False,
+            "prices_ok": False,
+            "active": 0,
+            "priced": 0,
+            "unmatched_relevant": 0,
+            "unmatched_relevant_unique": 0,
+            "elapsed": elapsed,
+            "ok": False,
+            **extra,
+        }
+
+    def _run_exchange_refresh(self, exchange: str) -> dict:
+        try:
+            return self.refresh_exchange_mapping(exchange)
+        except Exception as e:
+            _log(SERVICE, f'Failed to update mapping for {exchange}: {e}', level='ERROR')
+            return self._failed_refresh_result(exchange, error=str(e))
+
+    def refresh_exchange_mappings(self, exchanges: list, deadline: float | None = None) -> list:
+        """Refresh several exchanges concurrently; returns results in input order.
+
+        Each exchange gets ``deadline`` seconds from the moment its refresh
+        starts. A refresh that overruns is reported as timed out and left to
+        finish in the background; the exchange is skipped by later cycles
+        until that run returns, so a hung exchange never runs twice.
+        """
+        exchanges = list(dict.fromkeys(exchanges))
+        if not exchanges:
+            return []
+        deadline = float(MAPPING_REFRESH_DEADLINE if deadline is None else deadline)
+        # Load shared CMC datasets once instead of racing in every worker.
+        if not self.data:
+            self.load_data()
+        if not self.metadata:
+            self.load_metadata()
+        if self._mapping_executor is None:
+            self._mapping_executor = ThreadPoolExecutor(
+                max_workers=MAPPING_REFRESH_WORKERS, thread_name_prefix="pbcoindata-mapping"
+            )
+        results = {}
+        pending = {}
+        for exchange in exchanges:
+            previous = self._mapping_inflight.get(exchange)
+            if previous is not None and not previous[0].done():
+                results[exchange] = self._failed_refresh_result(
+                    exchange, datetime.now().timestamp() - previous[1], timed_out=True,
+                    error="previous refresh still running",
+                )
+                continue
+            started = {}
+
+            def run(exchange=exchange, started=started):
+                started["ts"] = datetime.now().timestamp()
+                return self._run_exchange_refresh(exchange)
+
+            future = self._mapping_executor.submit(run)
+            self._mapping_inflight[exchange] = (future, datetime.now().timestamp())
+            pending[future] = (exchange, started)
+
+        while pending:
+            done, _ = wait(list(pending), timeout=min(1.0, deadline), return_when=FIRST_COMPLETED)
+            for future in done:
+                exchange, _started = pending.pop(future)
+                results[exchange] = future.result()
+            now = datetime.now().timestamp()
+            for future, (exchange, started) in list(pending.items()):
+                started_ts = started.get("ts")
+                if started_ts is not None and now - started_ts > deadline:
+                    pending.pop(future)
+                    self._mapping_inflight[exchange] = (future, started_ts)
+                    results[exchange] = self._failed_refresh_result(
+                        exchange, now - started_ts, timed_out=True,
+                        error=f"refresh exceeded {deadline:.0f}s deadline",
+                    )
+                    _log(SERVICE, f'Mapping refresh for {exchange} exceeded {deadline:.0f}s, continuing without it', level='WARNING')
+
+        ordered = [results[exchange] for exchange in exchanges]
+        self._save_mapping_refresh_status(ordered)
+        return ordered
+
+    def _save_mapping_refresh_status(self, results: list) -> None:
+        """Merge per-exchange refresh durations into data/coindata/mapping_refresh.json."""
+        status_file = Path.cwd() / "data" / "coindata" / MAPPING_REFRESH_STATUS
+        finished_ts = datetime.now().timestamp()
+        try:
+            status = load_mapping_refresh_status(status_file)
+            for result in results:
+                status[result["exchange"]] = {
+                    "elapsed": round(float(result.get("elapsed") or 0.0), 3),
+                    "ok": bool(result.get("ok")),
+                    "timed_out": bool(result.get("timed_out")),
+                    "error": result.get("error"),
+                    "finished_ts": finished_ts,
+                }
+            status_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = status_file.with_suffix('.json.tmp')
+            with temp_file.open('w') as f:
+                json.dump(status, f, indent=4, sort_keys=True)
+            temp_file.replace(status_file)
+        except Exception as e:
+            _log(SERVICE, f'Failed to save mapping refresh status: {e}', level='WARNING')
+
     def refresh_exchange_mapping(self, exchange: str) -> dict:
         """Refresh CCXT markets, mapping and prices for one exchange."""
         started_ts = datetime.now().timestamp()
@@ -3026,6 +3248,16 @@ class CoinData:
         ignored_coins -= approved_coins
         return sorted(approved_coins), sorted(ignored_coins)
 
+def load_mapping_refresh_status(path: Path | None = None) -> dict:
+    """Return ``{exchange: {elapsed, ok, timed_out, error, finished_ts}}`` of the last refreshes."""
+    path = path or Path.cwd() / "data" / "coindata" / MAPPING_REFRESH_STATUS
+    try:
+        status = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    return status if isinstance(status, dict) else {}
+
+
 def main():
     from credential_process_registry import ProcessCapabilityHeartbeat
 
@@ -26,7 +26,7 @@ SERVICE = "PBData"
 from Exchange import MAX_PRIVATE_WS_GLOBAL, set_ws_limits, Exchange as _Exchange
 from ini_watcher import IniWatcher
 from market_data import get_daily_hour_coverage_for_dataset, get_effective_enabled_coins, load_market_data_config, set_enabled_coins
-from rate_limit_budget import RateLimitBudget, EXCHANGE_RATE_LIMITS, get_weight
+from rate_limit_budget import AdaptiveRateController, SharedRateLimitBudget, EXCHANGE_RATE_LIMITS, get_weight
 from hyperliquid_best_1m import update_latest_hyperliquid_1m_api_for_coin
 from binance_best_1m import update_latest_binance_1m_for_coin
 from okx_best_1m import update_latest_okx_1m_for_coin
@@ -595,13 +595,18 @@ class PBData():
             'rest_slot_timeouts': 0,      # cumulative REST slot timeout count
         })
         # ── Rate-limit budgets (token bucket per exchange) ───────
-        self._rate_budgets: dict[str, RateLimitBudget] = {}
+        # Shared with every other PBGui process on this host (same IP).
+        self._rate_budgets: dict[str, SharedRateLimitBudget] = {}
         # Per-exchange lock: ensures only ONE poller (combined/history/executions)
         # draws from the budget at a time, preventing concurrent token starvation.
         self._budget_poller_locks: dict[str, asyncio.Lock] = {}
+        # Per-exchange adaptive controllers fed by response headers and 429s;
+        # exchanges without a budget only report usage/headroom in metrics.
+        self._rate_controllers: dict[str, AdaptiveRateController] = {}
         for _exch_name, _cfg in EXCHANGE_RATE_LIMITS.items():
-            self._rate_budgets[_exch_name] = RateLimitBudget(**_cfg)
+            self._rate_budgets[_exch_name] = SharedRateLimitBudget(_exch_name, **_cfg)
             self._budget_poller_locks[_exch_name] = asyncio.Lock()
+            self._rate_controllers[_exch_name] = AdaptiveRateController(_exch_name, self._rate_budgets[_exch_name])
         # (IO debugging disabled) -- per-metrics-cycle DB/process IO logging removed
         # Latest 1m candles (API) auto-refresh settings
         self._latest_1m_enabled = True
@@ -646,6 +651,9 @@ class PBData():
         self._bitget_latest_1m_min_lookback_days = 2
         self._bitget_latest_1m_max_lookback_days = 7
         self._bitget_latest_1m_task = None
+        # Income history: move closed months into archive partitions
+        self._history_partition_interval_seconds = 6 * 3600
+        self._history_partition_task = None
         self._market_data_status: dict = {}
         self._market_data_status_lock = asyncio.Lock()
         self._market_data_status_generation = 0
@@ -1779,6 +1787,19 @@ class PBData():
                 except Exception:
                     pass
 
+    async def _history_partition_loop(self):
+        """Periodically archive closed months of income history and prune the sync change log."""
+        await asyncio.sleep(120)
+        while True:
+            try:
+                await asyncio.to_thread(self.db.rotate_history_partitions)
+                await asyncio.to_thread(self.db.prune_change_log)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                _human_log(SERVICE, f"[history] partition rotation failed: {e}", level="WARNING")
+            await asyncio.sleep(self._history_partition_interval_seconds)
+
     async def _bitget_latest_1m_loop(self):
         """Background loop: refresh Bitget USDT-FUTURES 1m candles for enabled coins."""
         await asyncio.sleep(30)  # Offset from HL/Binance/Bybit/OKX loops
@@ -2425,6 +2446,29 @@ class PBData():
                 pass
         return acquired
 
+    def _rate_controller(self, exchange: str) -> AdaptiveRateController:
+        """Return the adaptive controller for *exchange*, creating a metrics-only one on demand."""
+        controller = self._rate_controllers.get(exchange)
+        if controller is None:
+            controller = self._rate_controllers[exchange] = AdaptiveRateController(exchange, self._rate_budgets.get(exchange))
+        return controller
+
+    def _observe_rate_headers(self, exchange: str, exchange_obj) -> None:
+        """Feed the last CCXT response headers of *exchange_obj* to the adaptive controller."""
+        try:
+            headers = getattr(getattr(exchange_obj, 'instance', None), 'last_response_headers', None)
+            # Empty headers still let a throttled budget recover over time.
+            self._rate_controller(exchange).observe_headers(headers or None)
+        except Exception:
+            pass
+
+    def _note_rate_limited(self, exchange: str) -> None:
+        """Tell the adaptive controller that *exchange* answered 429."""
+        try:
+            self._rate_controller(exchange).on_rate_limited()
+        except Exception:
+            pass
+
     def _set_exchange_backoff(self, exchange: str, reason: str = None, duration: int = None, user=None):
         try:
             now = datetime.now().timestamp()
@@ -3053,7 +3097,12 @@ class PBData():
                                                 pass  # budget timeout — skip but don't set backoff
                                             try:
                                                 if _budget_ok:
-                                                    await asyncio.to_thread(self.db.update_history, user)
+                                                    await asyncio.to_thread(
+                                                        self.db.update_history,
+                                                        user,
+                                                        self._rate_budgets.get(exchange_for_slot),
+                                                        asyncio.get_running_loop(),
+                                                    )
                                                     asyncio.create_task(_notify_api_income(getattr(user, 'name', '')))
                                                     # Mark balance + positions + orders as stale so the next combined
                                                     # cycle refreshes them (fills/funding change both).
@@ -3257,6 +3306,7 @@ class PBData():
                                     self._poller_metrics[_err_exch2]['rate_limit_429'] += 1
                                 except Exception:
                                     pass
+                                self._note_rate_limited(_err_exch2)
                         else:
                             _serial_users_polled += 1
                         # Small stagger between per-user REST requests to avoid bursts
@@ -3427,6 +3477,7 @@ class PBData():
                                         if not await self._acquire_rate_budget(exchange_for_slot, 'fetch_balance'):
                                             continue
                                         await asyncio.to_thread(self.db.update_balances, user, _shared_exch)
+                                        self._observe_rate_headers(exchange_for_slot, _shared_exch)
                                         asyncio.create_task(_notify_api_balance())
                                         try:
                                             self._last_fetch_ts[(user.name, 'balances')] = datetime.now().timestamp()
@@ -3440,6 +3491,7 @@ class PBData():
                                         if not await self._acquire_rate_budget(exchange_for_slot, 'fetch_positions'):
                                             continue
                                         await asyncio.to_thread(self.db.update_positions, user, _shared_exch)
+                                        self._observe_rate_headers(exchange_for_slot, _shared_exch)
                                         try:
                                             self._last_fetch_ts[(user.name, 'positions')] = datetime.now().timestamp()
                                         except Exception:
@@ -3472,6 +3524,7 @@ class PBData():
                                     if not await self._acquire_rate_budget(exchange_for_slot, 'fetch_open_orders', weight_override=_orders_weight):
                                         continue
                                     await asyncio.to_thread(self.db.update_orders, user, _shared_exch)
+                                    self._observe_rate_headers(exchange_for_slot, _shared_exch)
                                     try:
                                         self._last_fetch_ts[(user.name, 'orders')] = datetime.now().timestamp()
                                     except Exception:
@@ -3509,6 +3562,7 @@ class PBData():
                                     self._poller_metrics[_err_exch]['rate_limit_429'] += 1
                                 except Exception:
                                     pass
+                                self._note_rate_limited(_err_exch)
                                 # Skip backoff for exchanges with budget tracking (budget handles pacing)
                                 if _err_exch not in self._rate_budgets:
                                     try:
@@ -4103,6 +4157,8 @@ class PBData():
                     self._okx_latest_1m_task = asyncio.create_task(self._okx_latest_1m_loop())
                 if not hasattr(self, "_bitget_latest_1m_task") or self._bitget_latest_1m_task is None or self._bitget_latest_1m_task.done():
                     self._bitget_latest_1m_task = asyncio.create_task(self._bitget_latest_1m_loop())
+                if not hasattr(self, "_history_partition_task") or self._history_partition_task is None or self._history_partition_task.done():
+                    self._history_partition_task = asyncio.create_task(self._history_partition_loop())
             except Exception as e:
                 _human_log(SERVICE, f"Error starting shared pollers: {e}", level='DEBUG')
         else:
@@ -4293,6 +4349,14 @@ class PBData():
                 hbo_until = self._exchange_history_backoff_until.get(exch, 0)
                 exchanges[exch]['backoff_remaining_s'] = max(0, int(bo_until - now)) if bo_until > now else 0
                 exchanges[exch]['history_backoff_remaining_s'] = max(0, int(hbo_until - now)) if hbo_until > now else 0
+            # Adaptive rate control: reported usage/headroom and effective budget
+            for exch, controller in dict(self._rate_controllers).items():
+                if exch not in exchanges and not controller.samples and not controller.rate_limited:
+                    continue
+                try:
+                    exchanges.setdefault(exch, {})['rate_control'] = controller.metrics()
+                except Exception:
+                    pass
 
             # REST semaphore stats
             semaphores = {}
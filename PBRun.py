@@ -13,10 +13,12 @@ from datetime import datetime
 import platform
 import os
 import traceback
+from contextlib import contextmanager
 from PBCoinData import CoinData
 import pbgui_purefunc
 from logging_helpers import human_log as _log, get_rotate_settings, rotate_logfile_if_oversize
 from master_update_lock import MasterUpdateBusyError, acquire_master_runtime_lock
+from run_watcher import RunStateWatcher
 
 SERVICE = "PBRun"
 from master.cluster_state import (
@@ -45,6 +47,8 @@ CLUSTER_PRE_LOAD_BLOCK_STATES = frozenset({
 CLUSTER_QUIET_BLOCK_STATES = CLUSTER_PRE_LOAD_BLOCK_STATES
 
 PB8_STABLE_SECONDS = 60
+# Full config/desired-state rescan interval while inotify drives the loop.
+RUN_STATE_RESYNC_SECONDS = 60
 PB8_BACKOFF_INITIAL_SECONDS = 5
 PB8_BACKOFF_MAX_SECONDS = 300
 PB8_RUST_PROBE_CODE = """
@@ -102,6 +106,50 @@ def _atomic_write_text(path: Path, content: str):
         raise
 
 
+_snapshot_active = False
+_snapshot_processes: list | None = None
+
+
+def _walk_processes():
+    """Yield ``(process, cmdline)`` for every readable process."""
+    for process in psutil.process_iter():
+        try:
+            cmdline = [str(arg) for arg in process.cmdline()]
+        except (psutil.NoSuchProcess, psutil.ZombieProcess, psutil.AccessDenied, OSError):
+            continue
+        yield process, cmdline
+
+
+def _process_cmdlines():
+    """Return ``(process, cmdline)`` pairs, from the tick's shared snapshot when active."""
+    global _snapshot_processes
+    if not _snapshot_active:
+        return _walk_processes()
+    if _snapshot_processes is None:
+        _snapshot_processes = list(_walk_processes())
+    return _snapshot_processes
+
+
+def _invalidate_process_snapshot() -> None:
+    """Serve live process lookups for the rest of the tick after a start or stop."""
+    global _snapshot_active, _snapshot_processes
+    _snapshot_active = False
+    _snapshot_processes = None
+
+
+@contextmanager
+def shared_process_snapshot():
+    """Share one process-table walk between all runner lookups of a PBRun tick."""
+    global _snapshot_active, _snapshot_processes
+    _snapshot_active = True
+    _snapshot_processes = None
+    try:
+        yield
+    finally:
+        _snapshot_active = False
+        _snapshot_processes = None
+
+
 def _attach_process_stats(process: psutil.Process, run_v7: "RunV7"):
     run_v7.start_time = process.create_time()
     try:
@@ -739,11 +787,7 @@ class RunV7():
 
     def pid(self):
         expected_config = Path(self.path) / "config_run.json"
-        for process in psutil.process_iter():
-            try:
-                cmdline = process.cmdline()
-            except (psutil.NoSuchProcess, psutil.ZombieProcess, psutil.AccessDenied):
-                continue
+        for process, cmdline in _process_cmdlines():
             if (
                 any("main.py" in sub for sub in cmdline)
                 and any(_arg_matches_path(sub, expected_config) for sub in cmdline)
@@ -760,6 +804,7 @@ class RunV7():
                 meta={"operation": "stop_passivbot_v7", "instance": self.user},
             )
             _kill_process(process, f"v7 {self.path}")
+            _invalidate_process_snapshot()
         # Always write 0 — even if bot already crashed and no process found.
         # This ensures running_version.txt reflects "stopped" for inotify → UI.
         version_file = Path(f'{self.path}/running_version.txt')
@@ -796,6 +841,7 @@ class RunV7():
                     proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, cwd=self.pb7dir, text=True, creationflags=creationflags)
                 else:
                     proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, cwd=self.pb7dir, text=True, start_new_session=True)
+                _invalidate_process_snapshot()
                 threading.Thread(target=_ts_wrap_stderr, args=(proc.stderr, err_log), daemon=True).start()
             finally:
                 os.environ['PATH'] = old_os_path
@@ -1126,11 +1172,12 @@ class RunV8:
             return False
         return True
 
-    def _matches_process(self, process: psutil.Process) -> bool:
+    def _matches_process(self, process: psutil.Process, cmdline: list[str] | None = None) -> bool:
         """Match only the exact command and working directory launched by RunV8."""
 
         try:
-            cmdline = [str(arg) for arg in process.cmdline()]
+            if cmdline is None:
+                cmdline = [str(arg) for arg in process.cmdline()]
             expected = self.command
             configured_python = str(Path(self.pb8venv).expanduser().absolute())
             resolved_python = str(Path(configured_python).resolve())
@@ -1158,11 +1205,13 @@ class RunV8:
         pb8venv: str,
         pbgdir: Path,
         name: str,
+        cmdline: list[str] | None = None,
     ) -> "RunV8 | None":
         """Reconstruct an exact managed runner whose config disappeared."""
 
         try:
-            cmdline = [str(arg) for arg in process.cmdline()]
+            if cmdline is None:
+                cmdline = [str(arg) for arg in process.cmdline()]
             python = str(Path(pb8venv).expanduser().absolute())
             resolved_python = str(Path(python).resolve())
             passivbot = str(Path(python).parent / "passivbot")
@@ -1194,15 +1243,15 @@ class RunV8:
             runner.pb8dir = pb8dir
             runner.pb8venv = pb8venv
             runner.pbgdir = pbgdir
-            return runner if runner._matches_process(process) else None
+            return runner if runner._matches_process(process, cmdline) else None
         except (ValueError, OSError, psutil.NoSuchProcess, psutil.ZombieProcess, psutil.AccessDenied):
             return None
 
     def pid(self):
         """Return the exact PB8 process for this config, with current stats."""
 
-        for process in psutil.process_iter():
-            if not self._matches_process(process):
+        for process, cmdline in _process_cmdlines():
+            if not self._matches_process(process, cmdline):
                 continue
             self.start_time = process.create_time()
             try:
@@ -1273,6 +1322,7 @@ class RunV8:
             return
         if not self._same_process(process, create_time):
             return
+        _invalidate_process_snapshot()
         _log(
             SERVICE,
             f"Stop: passivbot v8 {self.config_path}",
@@ -1343,6 +1393,7 @@ class RunV8:
         finally:
             if runtime_lease is not None:
                 runtime_lease.release()
+        _invalidate_process_snapshot()
         threading.Thread(target=_ts_wrap_stderr, args=(proc.stdout, err_log), daemon=True).start()
         self._last_started_at = time()
         self._running_version = self.version
@@ -1902,7 +1953,7 @@ class PBRun():
                 runner.stop()
                 handled_missing_paths.add(missing_path)
 
-        for process in psutil.process_iter():
+        for process, cmdline in list(_process_cmdlines()):
             orphan = RunV8.from_missing_config_process(
                 process,
                 run_root=run_root,
@@ -1910,6 +1961,7 @@ class PBRun():
                 pb8venv=self.pb8venv,
                 pbgdir=Path(self.pbgdir),
                 name=self.name,
+                cmdline=cmdline,
             )
             if orphan is None or orphan.path in handled_missing_paths:
                 continue
@@ -2035,56 +2087,85 @@ def main():
     capability = ProcessCapabilityHeartbeat(Path(run.pbgdir), "PBRun")
     capability.__enter__()
     stop_requested = threading.Event()
+    watcher = RunStateWatcher(
+        dirs={
+            "v7": Path(run.pbgdir) / "data" / "run_v7",
+            "v8": Path(run.pbgdir) / "data" / "run_v8",
+            "cluster": default_cluster_root(Path(run.pbgdir)),
+        },
+        files={"ini": Path(run.pbgdir) / "pbgui.ini"},
+    )
 
     def request_stop(_signum, _frame):
         stop_requested.set()
+        watcher.changed.set()
 
     previous_handlers = {}
     for stop_signal in (signal.SIGTERM, signal.SIGINT):
         previous_handlers[stop_signal] = signal.signal(stop_signal, request_stop)
     try:
         _wait_for_cluster_boot_sync(Path(run.pbgdir), timeout=20)
-        if run.pb7_ready:
-            run.watch_v7()
-        if run.pb8_ready:
-            run.watch_v8()
+        event_driven = not stop_requested.is_set() and watcher.start()
+        if event_driven:
+            _log(SERVICE, f"Reconciler is event-driven ({watcher.watch_count} inotify watches)")
+        with shared_process_snapshot():
+            if run.pb7_ready:
+                run.watch_v7()
+            if run.pb8_ready:
+                run.watch_v8()
         maintenance_count = 0
         next_maintenance = 0.0
+        next_resync = time() + RUN_STATE_RESYNC_SECONDS
         while not stop_requested.is_set():
             try:
                 now = time()
-                v7_changed, v8_changed = run.refresh_runtime_config()
-                if run.pb7_ready:
-                    if v7_changed:
-                        run.watch_v7()
-                    else:
-                        # Keep Cluster Sync start/stop reactions fast without running the
-                        # expensive per-bot process scan every second.
-                        run.has_v7_runtime_changed()
-                v8_reconciled = False
-                if run.pb8_ready:
-                    if v8_changed:
-                        run.watch_v8()
-                        v8_reconciled = True
+                # None means "check everything": the polling fallback and the
+                # periodic resync that covers missed inotify events.
+                changes = watcher.consume() if event_driven else None
+                if event_driven and now >= next_resync:
+                    changes = None
+                    next_resync = now + RUN_STATE_RESYNC_SECONDS
+                with shared_process_snapshot():
+                    if changes is None or "ini" in changes:
+                        v7_changed, v8_changed = run.refresh_runtime_config()
                     else:
-                        v8_reconciled = run.has_v8_runtime_changed()
-                if now >= next_maintenance:
-                    run.watch_memory()
-                    next_maintenance = now + 5
-                    for run_v7 in run.run_v7:
-                        run_v7.watch()
-                        run_v7.watch_dynamic()
-                    if run.pb8_ready and not v8_reconciled:
-                        run.watch_v8()
-                    if maintenance_count % 2 == 0:
+                        v7_changed = v8_changed = False
+                    if run.pb7_ready:
+                        if v7_changed:
+                            run.watch_v7()
+                        elif changes is None or changes & {"v7", "cluster"}:
+                            # Keep Cluster Sync start/stop reactions fast without running the
+                            # expensive per-bot process scan on every change.
+                            run.has_v7_runtime_changed()
+                    v8_reconciled = False
+                    if run.pb8_ready:
+                        if v8_changed:
+                            run.watch_v8()
+                            v8_reconciled = True
+                        elif changes is None or changes & {"v8", "cluster"}:
+                            v8_reconciled = run.has_v8_runtime_changed()
+                    if now >= next_maintenance:
+                        run.watch_memory()
+                        next_maintenance = now + 5
                         for run_v7 in run.run_v7:
-                            run_v7.clean_log()
-                    maintenance_count += 1
-                stop_requested.wait(1)
+                            run_v7.watch()
+                            run_v7.watch_dynamic()
+                        if run.pb8_ready and not v8_reconciled:
+                            run.watch_v8()
+                        if maintenance_count % 2 == 0:
+                            for run_v7 in run.run_v7:
+                                run_v7.clean_log()
+                        maintenance_count += 1
+                if event_driven:
+                    watcher.changed.wait(max(0.05, next_maintenance - time()))
+                else:
+                    stop_requested.wait(1)
             except Exception as e:
                 _log(SERVICE, f"Something went wrong, but continue {e}", level="ERROR")
                 _log(SERVICE, "PBRun.main loop traceback", level="DEBUG", meta={"traceback": traceback.format_exc()})
+                stop_requested.wait(1)
     finally:
+        watcher.stop()
         capability.__exit__(None, None, None)
         if run.pidfile.exists() and run.pidfile.read_text(encoding="utf-8").strip() == str(os.getpid()):
             run.pidfile.unlink(missing_ok=True)
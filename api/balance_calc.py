@@ -5,6 +5,7 @@ Endpoints:
     GET  /main_page         → serve the standalone HTML page
     GET  /instances          → list v7 instance names
     POST /calculate          → run balance calculation
+    POST /calculate-instances → run it for many instances at once
     POST /draft              → store config temporarily, returns draft_id
     GET  /draft/{draft_id}   → retrieve stored draft config
 """
@@ -14,10 +15,13 @@ from __future__ import annotations
 import json
 import math
 import secrets as _secrets
+import threading
 import time
 import traceback
+from dataclasses import dataclass
 from pathlib import Path
 
+import numpy as np
 from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import HTMLResponse
 
@@ -106,13 +110,27 @@ def _norm_coin(c: str) -> str:
     return u
 
 
+_MAPPING_CACHE: dict[str, tuple[tuple[int, int], list]] = {}
+_MAPPING_LOCK = threading.Lock()
+
+
 def _load_mapping(exchange: str) -> list[dict]:
-    """Load mapping.json for an exchange."""
+    """Load mapping.json for an exchange, reusing the parsed list until the file changes."""
     path = COINDATA_DIR / exchange / "mapping.json"
-    if not path.exists():
+    try:
+        stat = path.stat()
+    except OSError:
         return []
+    sig = (stat.st_mtime_ns, stat.st_size)
+    with _MAPPING_LOCK:
+        cached = _MAPPING_CACHE.get(exchange)
+        if cached is not None and cached[0] == sig:
+            return cached[1]
     data = _read_json(path)
-    return data if isinstance(data, list) else []
+    mapping = data if isinstance(data, list) else []
+    with _MAPPING_LOCK:
+        _MAPPING_CACHE[exchange] = (sig, mapping)
+    return mapping
 
 
 def _extract_coins(config: dict, available_coins: set[str] | None = None) -> tuple[set[str], set[str], set[str]]:
@@ -213,13 +231,31 @@ def _apply_dynamic_ignore(config: dict, exchange: str, available_coins: set[str]
     return coins, coins_long, coins_short
 
 
-def _calculate(config: dict, exchange: str) -> dict:
-    """Run the balance calculation and return results."""
-    from PBCoinData import compute_coin_name
+@dataclass(frozen=True)
+class MinCostTable:
+    """Best usable market per coin of one exchange, as sorted columns."""
+
+    coins: tuple[str, ...]
+    price: np.ndarray
+    contract_size: np.ndarray
+    min_amount: np.ndarray
+    min_cost: np.ndarray
+    min_order_price: np.ndarray
+    max_lev: tuple
+
+    def mask(self, coins: set[str]) -> np.ndarray:
+        """Return a boolean column mask selecting ``coins``."""
+        return np.fromiter((coin in coins for coin in self.coins), dtype=bool, count=len(self.coins))
+
+
+# {exchange: (mapping list the table was built from, table)}
+_MIN_COST_TABLES: dict[str, tuple[list, MinCostTable]] = {}
+_MIN_COST_LOCK = threading.Lock()
 
-    mapping = _load_mapping(exchange)
-    if not mapping:
-        return {"error": f"No mapping data for exchange '{exchange}'. Check Coin Data configuration."}
+
+def _build_min_cost_table(mapping: list, exchange: str) -> MinCostTable:
+    """Pick the best eligible mapping row per coin and derive its minimum order cost."""
+    from PBCoinData import compute_coin_name
 
     preferred_quote = "USDC" if exchange == "hyperliquid" else "USDT"
 
@@ -270,44 +306,110 @@ def _calculate(config: dict, exchange: str) -> dict:
         if prev is None or score < prev[0]:
             best_rows_by_coin[coin] = (score, record, min_order_price, price, contract_size, min_amount, min_cost)
 
-    available_coins = set(best_rows_by_coin)
-    coins, coins_long, coins_short = _apply_dynamic_ignore(config, exchange, available_coins)
-    if not coins:
-        return {"error": "No eligible approved coins with usable minimum-order data were found."}
+    coins = tuple(sorted(best_rows_by_coin))
+    rows = [best_rows_by_coin[coin] for coin in coins]
+
+    def column(position: int) -> np.ndarray:
+        return np.array([row[position] for row in rows], dtype=np.float64)
+
+    return MinCostTable(
+        coins=coins,
+        price=column(3),
+        contract_size=column(4),
+        min_amount=column(5),
+        min_cost=column(6),
+        min_order_price=column(2),
+        max_lev=tuple(row[1].get("max_leverage") for row in rows),
+    )
+
+
+def _min_cost_table(exchange: str, mapping: list | None = None) -> MinCostTable:
+    """Return the exchange's min-order-cost table, rebuilt only when its mapping changes.
+
+    ``_load_mapping`` returns the same list object until mapping.json changes,
+    so the table is keyed on that object.
+    """
+    if mapping is None:
+        mapping = _load_mapping(exchange)
+    with _MIN_COST_LOCK:
+        cached = _MIN_COST_TABLES.get(exchange)
+        if cached is not None and cached[0] is mapping:
+            return cached[1]
+    table = _build_min_cost_table(mapping, exchange)
+    with _MIN_COST_LOCK:
+        _MIN_COST_TABLES[exchange] = (mapping, table)
+    return table
+
+
+def _side_divisor(params: dict) -> float:
+    """Return ``wallet exposure per position * initial qty pct``, or 0 when the side is off."""
+    if params["n_positions"] > 0 and params["total_wallet_exposure_limit"] > 0 and params["entry_initial_qty_pct"] > 0:
+        return (params["total_wallet_exposure_limit"] / params["n_positions"]) * params["entry_initial_qty_pct"]
+    return 0.0
+
+
+def _calculate(config: dict, exchange: str) -> dict:
+    """Run the balance calculation and return results."""
+    return _calculate_many([config], exchange)[0]
 
-    bot_params = _extract_bot_params(config)
 
-    coin_infos = []
-    balance_long = []
-    balance_short = []
+def _calculate_many(configs: list[dict], exchange: str) -> list[dict]:
+    """Run the balance calculation for several configs on one exchange.
 
-    for coin in sorted(coins):
-        best = best_rows_by_coin.get(coin)
-        if best is None:
+    The min-cost table is shared and the required balance of every coin is
+    computed for all configs and both sides in one array division.
+    """
+    mapping = _load_mapping(exchange)
+    if not mapping:
+        return [{"error": f"No mapping data for exchange '{exchange}'. Check Coin Data configuration."} for _ in configs]
+    table = _min_cost_table(exchange, mapping)
+    available_coins = set(table.coins)
+
+    results: list[dict | None] = [None] * len(configs)
+    pending = []  # (position, bot_params, coins mask, long mask, short mask)
+    for position, config in enumerate(configs):
+        coins, coins_long, coins_short = _apply_dynamic_ignore(config, exchange, available_coins)
+        if not coins:
+            results[position] = {"error": "No eligible approved coins with usable minimum-order data were found."}
             continue
-        _, record, min_order_price, price, contract_size, min_amount, min_cost = best
-        lev = record.get("max_leverage")
-        coin_infos.append({
-            "coin": coin,
-            "currentPrice": price,
-            "contractSize": contract_size,
-            "min_amount": min_amount,
-            "min_cost": min_cost,
-            "min_order_price": round(min_order_price, 6),
-            "max_lev": lev,
-        })
-        lp = bot_params["long"]
-        if coin in coins_long and lp["n_positions"] > 0 and lp["total_wallet_exposure_limit"] > 0 and lp["entry_initial_qty_pct"] > 0:
-            we = lp["total_wallet_exposure_limit"] / lp["n_positions"]
-            balance = min_order_price / (we * lp["entry_initial_qty_pct"])
-            balance_long.append({"coin": coin, "balance": round(balance, 2)})
-
-        sp = bot_params["short"]
-        if coin in coins_short and sp["n_positions"] > 0 and sp["total_wallet_exposure_limit"] > 0 and sp["entry_initial_qty_pct"] > 0:
-            we = sp["total_wallet_exposure_limit"] / sp["n_positions"]
-            balance = min_order_price / (we * sp["entry_initial_qty_pct"])
-            balance_short.append({"coin": coin, "balance": round(balance, 2)})
+        pending.append((position, _extract_bot_params(config), table.mask(coins), table.mask(coins_long), table.mask(coins_short)))
+
+    if pending:
+        divisors = np.array([[_side_divisor(params[side]) for side in ("long", "short")] for _, params, *_ in pending])
+        with np.errstate(divide="ignore"):
+            # [config, side, coin]
+            balances = table.min_order_price[None, None, :] / divisors[:, :, None]
+
+    for row, (position, bot_params, coin_mask, long_mask, short_mask) in enumerate(pending):
+        indices = np.flatnonzero(coin_mask)
+        coin_infos = [
+            {
+                "coin": table.coins[i],
+                "currentPrice": float(table.price[i]),
+                "contractSize": float(table.contract_size[i]),
+                "min_amount": float(table.min_amount[i]),
+                "min_cost": float(table.min_cost[i]),
+                "min_order_price": round(float(table.min_order_price[i]), 6),
+                "max_lev": table.max_lev[i],
+            }
+            for i in indices
+        ]
+        sides = {}
+        for column, (side, mask) in enumerate((("long", long_mask), ("short", short_mask))):
+            if divisors[row, column] <= 0:
+                sides[side] = []
+                continue
+            values = balances[row, column]
+            sides[side] = [
+                {"coin": table.coins[i], "balance": round(float(values[i]), 2)}
+                for i in np.flatnonzero(coin_mask & mask)
+            ]
+        results[position] = _balance_result(exchange, bot_params, coin_infos, sides["long"], sides["short"])
+    return results
+
 
+def _balance_result(exchange: str, bot_params: dict, coin_infos: list, balance_long: list, balance_short: list) -> dict:
+    """Sort per-coin rows and add the recommendation for the dominating side."""
     # Sort
     coin_infos.sort(key=lambda x: x["min_order_price"], reverse=True)
     balance_long.sort(key=lambda x: x["balance"], reverse=True)
@@ -360,8 +462,13 @@ def load_config(
     session: SessionToken = Depends(require_auth),
 ):
     """Load one named PB7 or PB8 instance config."""
-    version = str(request_body.get("version") or "").strip().lower()
-    name = request_body.get("name")
+    config, exchange = _load_instance_config(request_body.get("version"), request_body.get("name"))
+    return {"config": config, "exchange": exchange}
+
+
+def _load_instance_config(version: object, name: object, users: Users | None = None) -> tuple[dict, str]:
+    """Return (config, exchange) of one named instance; raises HTTPException."""
+    version = str(version or "").strip().lower()
     path = _instance_config_path(version, name)
     try:
         config = load_pb7_config(path, neutralize_added=False) if version == "v7" else load_pb8_config(path)
@@ -377,10 +484,10 @@ def load_config(
     user = config.get("live", {}).get("user", "") if isinstance(config.get("live"), dict) else ""
     if user:
         try:
-            exchange = str(Users().find_exchange(user) or "").lower()
+            exchange = str((users or Users()).find_exchange(user) or "").lower()
         except Exception as exc:
             _log(SERVICE, f"Failed to resolve exchange for user '{user}': {exc}", level="WARNING")
-    return {"config": config, "exchange": exchange}
+    return config, exchange
 
 
 @router.get("/instances")
@@ -439,6 +546,53 @@ def calculate_balance(
         return {"error": f"Calculation failed: {e}"}
 
 
+@router.post("/calculate-instances")
+def calculate_instances(
+    request_body: dict,
+    session: SessionToken = Depends(require_auth),
+):
+    """Run the balance calculation for many named instances at once.
+
+    Body: { "instances": [{"name": ..., "version": "v7"|"v8"}, ...] }
+    (omitted: every listed instance).  Instances are grouped per exchange so
+    each exchange's min-cost table is used once for all of its configs.
+    """
+    instances = request_body.get("instances")
+    if instances is None:
+        instances = get_instances(session)
+    if not isinstance(instances, list):
+        return {"error": "instances must be a list"}
+
+    users = Users()
+    results: list[dict] = []
+    by_exchange: dict[str, list[tuple[int, dict]]] = {}
+    for item in instances:
+        item = item if isinstance(item, dict) else {}
+        entry = {"name": str(item.get("name") or ""), "version": str(item.get("version") or "").strip().lower()}
+        results.append(entry)
+        try:
+            config, exchange = _load_instance_config(entry["version"], entry["name"], users)
+        except HTTPException as exc:
+            entry["error"] = str(exc.detail)
+            continue
+        exchange = str(item.get("exchange") or exchange).strip().lower()
+        if exchange not in EXCHANGES:
+            entry["error"] = f"Unknown exchange for instance '{entry['name']}'"
+            continue
+        by_exchange.setdefault(exchange, []).append((len(results) - 1, config))
+
+    for exchange, group in by_exchange.items():
+        try:
+            outputs = _calculate_many([config for _, config in group], exchange)
+        except Exception as e:
+            _log(SERVICE, f"Calculation error for {exchange}: {e}", level="ERROR",
+                 meta={"traceback": traceback.format_exc()})
+            outputs = [{"error": f"Calculation failed: {e}"}] * len(group)
+        for (position, _config), output in zip(group, outputs):
+            results[position].update(output)
+    return {"results": results}
+
+
 @router.post("/draft")
 def create_draft(body: dict, session: SessionToken = Depends(require_auth)):
     """Store a config dict temporarily and return a draft_id (TTL 10 min)."""
@@ -27,6 +27,7 @@ from fastapi.responses import HTMLResponse
 from pydantic import BaseModel, ConfigDict, Field
 
 from api.auth import SessionToken, require_auth
+from api.response_cache import CachedResponder, ConditionalCache, path_stamp, respond
 from api.vps import get_monitor, get_monitor_state_snapshot
 import pbgui_purefunc
 from cluster_credential_publisher import ClusterCredentialPublisher, CredentialPublicationError
@@ -50,6 +51,7 @@ from master.cluster_state import (
     generate_node_id,
     load_operations,
     normalize_node_sync_mode,
+    operation_exists,
     read_local_identity,
     rebuild_materialized_state,
     stage_membership_operations,
@@ -65,6 +67,7 @@ from master.cluster_ssh_keys import (
 )
 from master.cluster_sync_worker import SshClusterPeerClient
 from master.cluster_checkpoint import (
+    CHECKPOINT_DIR_NAME,
     ClusterCheckpointError,
     active_checkpoint_bundle,
     build_shadow_checkpoint,
@@ -2733,8 +2736,7 @@ async def _pull_missing_operations_from_host(
                     membership_trust=staged_trust,
                     network_input=True,
                 )
-                op_path = root / "oplog" / str(operation["actor"]) / f"{int(operation['seq']):08d}.json"
-                existed = op_path.exists()
+                existed = operation_exists(root, str(operation["actor"]), int(operation["seq"]))
                 write_operation(root, operation, network_input=True, membership_trust=staged_trust)
                 if not existed:
                     pulled += 1
@@ -2747,8 +2749,7 @@ async def _pull_missing_operations_from_host(
             cluster_root=root,
             network_input=True,
         )
-        op_path = root / "oplog" / str(operation["actor"]) / f"{int(operation['seq']):08d}.json"
-        existed = op_path.exists()
+        existed = operation_exists(root, str(operation["actor"]), int(operation["seq"]))
         write_operation(root, operation, network_input=True)
         if not existed:
             pulled += 1
@@ -4848,48 +4849,68 @@ def _apply_bootstrap_plan(plan: dict[str, Any]) -> dict[str, Any]:
     }
 
 
+def _status_version() -> tuple:
+    """Change key for the status page: stats of the cluster root, oplog and checkpoints."""
+
+    root = _cluster_root()
+    return (
+        path_stamp(root, children=True),
+        path_stamp(root / "oplog", children=True),
+        path_stamp(root / CHECKPOINT_DIR_NAME, children=True),
+    )
+
+
+_status_cache = ConditionalCache("cluster.get_status", version=_status_version, max_age=15.0)
+
+
 @router.get("/status")
-def get_status(session: SessionToken = Depends(require_auth)) -> dict[str, Any]:
+def get_status(
+    session: SessionToken = Depends(require_auth),
+    cache: CachedResponder = Depends(_status_cache),
+) -> dict[str, Any]:
     """Return a compact read-only Cluster Sync status summary."""
 
-    snapshot = _load_cluster_snapshot()
-    root = _cluster_root()
-    cluster_nodes = snapshot["cluster_nodes"]
-    desired_state = snapshot["desired_state"]
-    nodes = _node_list(cluster_nodes)
-    instances = _instance_list(desired_state)
-    tombstones = _tombstone_list(desired_state)
-    credentials = _credential_status(snapshot)
-    conflict_count = sum(1 for item in instances if item.get("conflicted") is True)
-    warnings: list[str] = []
-    if not nodes:
-        warnings.append("No cluster node membership operation has been recorded yet.")
-    if conflict_count:
-        warnings.append(f"{conflict_count} V7 instance conflict(s) need review.")
+    def build() -> dict[str, Any]:
+        snapshot = _load_cluster_snapshot()
+        root = _cluster_root()
+        cluster_nodes = snapshot["cluster_nodes"]
+        desired_state = snapshot["desired_state"]
+        nodes = _node_list(cluster_nodes)
+        instances = _instance_list(desired_state)
+        tombstones = _tombstone_list(desired_state)
+        credentials = _credential_status(snapshot)
+        conflict_count = sum(1 for item in instances if item.get("conflicted") is True)
+        warnings: list[str] = []
+        if not nodes:
+            warnings.append("No cluster node membership operation has been recorded yet.")
+        if conflict_count:
+            warnings.append(f"{conflict_count} V7 instance conflict(s) need review.")
 
-    return {
-        "read_only": True,
-        "cluster_root": snapshot["cluster_root"],
-        "identity": snapshot["identity"],
-        "local_node": _public_cluster_node(
-            (cluster_nodes.get("nodes") or {}).get(snapshot["identity"].get("node_id")) or {}
-        ),
-        "generation": int(cluster_nodes.get("generation") or 0),
-        "generated_at": int(desired_state.get("generated_at") or 0),
-        "counts": {
-            "nodes": len(nodes),
-            "instances": len(instances),
-            "conflicts": conflict_count,
-            "tombstones": len(tombstones),
-            "oplog": int(cluster_nodes.get("generation") or 0),
-        },
-        "api_keys": desired_state.get("api_keys"),
-        "credentials": credentials,
-        "retention_policy": retention_policy(snapshot),
-        "checkpoint": checkpoint_status(root),
-        "sync_status": _load_sync_status_summary(root),
-        "warnings": warnings,
-    }
+        return {
+            "read_only": True,
+            "cluster_root": snapshot["cluster_root"],
+            "identity": snapshot["identity"],
+            "local_node": _public_cluster_node(
+                (cluster_nodes.get("nodes") or {}).get(snapshot["identity"].get("node_id")) or {}
+            ),
+            "generation": int(cluster_nodes.get("generation") or 0),
+            "generated_at": int(desired_state.get("generated_at") or 0),
+            "counts": {
+                "nodes": len(nodes),
+                "instances": len(instances),
+                "conflicts": conflict_count,
+                "tombstones": len(tombstones),
+                "oplog": int(cluster_nodes.get("generation") or 0),
+            },
+            "api_keys": desired_state.get("api_keys"),
+            "credentials": credentials,
+            "retention_policy": retention_policy(snapshot),
+            "checkpoint": checkpoint_status(root),
+            "sync_status": _load_sync_status_summary(root),
+            "warnings": warnings,
+        }
+
+    return respond(cache, build)
 
 
 @router.post("/retention/settings")
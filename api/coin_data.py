@@ -296,6 +296,31 @@ def _format_ts(ts: float | None) -> str:
     return f"{dt.strftime('%Y-%m-%d %H:%M:%S')} ({_format_age(age)})"
 
 
+def _exchange_refresh_rows() -> list[dict[str, Any]]:
+    """Return the last mapping refresh duration per exchange, slowest first."""
+    try:
+        status = json.loads((COINDATA_DIR / "mapping_refresh.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+    rows = []
+    for exchange, entry in (status.items() if isinstance(status, dict) else ()):
+        if not isinstance(entry, dict):
+            continue
+        elapsed = float(entry.get("elapsed") or 0.0)
+        state = "timeout" if entry.get("timed_out") else ("ok" if entry.get("ok") else "fail")
+        finished_ts = entry.get("finished_ts")
+        rows.append({
+            "exchange": exchange,
+            "elapsed": elapsed,
+            "state": state,
+            "error": entry.get("error"),
+            "finished_ts": finished_ts,
+            "label": f"{exchange}: {elapsed:.1f}s {state} ({_format_ts(finished_ts)})",
+        })
+    rows.sort(key=lambda row: row["elapsed"], reverse=True)
+    return rows
+
+
 def _load_cmc_link_map() -> dict[str, str]:
     global _CMC_METADATA_CACHE_SIG, _CMC_LINK_BY_ID_CACHE
 
@@ -648,6 +673,7 @@ def _build_state(
                 if exchange_refresh_ts is not None
                 else f"{coindata.exchange} refresh status unavailable"
             ),
+            "exchange_refresh": _exchange_refresh_rows(),
             "exchange_line_detail": (
                 f"{coindata.exchange} - Markets: {_format_ts(ccxt_markets_ts)} - "
                 f"Mapping: {_format_ts(mapping_ts)} - Prices: {_format_ts(prices_ts)} - "
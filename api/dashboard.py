@@ -23,6 +23,8 @@ from fastapi.responses import HTMLResponse
 from pydantic import BaseModel
 
 from api.auth import SessionToken, require_auth
+from api.msgpack_transport import negotiate
+from api.positions_snapshot import classify_position_orders, positions_snapshots
 from logging_helpers import human_log as _log
 from pbgui_purefunc import PBGDIR
 
@@ -54,33 +56,7 @@ _GRACEFUL_STOP_MODE = "graceful_stop"
 _TP_ONLY_MODE = "tp_only"
 
 
-def _classify_position_orders(orders: list, side: str) -> tuple[int, float, float]:
-    """Return DCA count, next DCA price, and next TP price for a position side."""
-    side = str(side).lower()
-    dca_side = "buy"
-    tp_side = "sell"
-    prefer_higher_dca = True
-    prefer_lower_tp = True
-    if side == "short":
-        dca_side = "sell"
-        tp_side = "buy"
-        prefer_higher_dca = False
-        prefer_lower_tp = False
-
-    dca = 0
-    next_dca = 0.0
-    next_tp = 0.0
-    for order in orders:
-        order_side = str(order[5]).lower()
-        order_price = order[4]
-        if order_side == dca_side:
-            dca += 1
-            if next_dca == 0 or (prefer_higher_dca and next_dca < order_price) or (not prefer_higher_dca and next_dca > order_price):
-                next_dca = order_price
-        elif order_side == tp_side:
-            if next_tp == 0 or (prefer_lower_tp and next_tp > order_price) or (not prefer_lower_tp and next_tp < order_price):
-                next_tp = order_price
-    return dca, next_dca, next_tp
+_classify_position_orders = classify_position_orders
 
 
 def _normalize_position_side(value: Any) -> str:
@@ -1293,17 +1269,15 @@ def refresh_positions_for_user(user_name: str):
         if not user_obj:
             return
         db = _get_db()
-        positions = db.fetch_positions(user_obj) or []
         # Build a dict: (symbol, side) -> position_data (only open positions)
         open_pos: dict[tuple[str, str], dict] = {}
-        for pos in positions:
-            sym = pos[1]
-            if pos[3]:  # size != 0 means open
-                side = str(pos[7] if len(pos) > 7 else "long").lower()
-                open_pos[(sym, side)] = {
-                    "entry": pos[5],
-                    "size":  pos[3],
-                    "upnl":  pos[4],
+        for pos in positions_snapshots.get(db, user_obj.name).positions:
+            if pos["size"]:  # size != 0 means open
+                side = str(pos["side"]).lower()
+                open_pos[(pos["symbol"], side)] = {
+                    "entry": pos["entry"],
+                    "size":  pos["size"],
+                    "upnl":  pos["upnl"],
                     "side":  side,
                 }
         # Notify all chart subscribers for this user
@@ -2144,6 +2118,7 @@ def get_top_data(
 
 @router.get("/income_data")
 def get_income_data(
+    request:   Request,
     users:     str   = Query(default="ALL"),
     period:    str   = Query(default="THIS_MONTH"),
     last_n:    int   = Query(default=0, ge=0),
@@ -2154,7 +2129,12 @@ def get_income_data(
 
     When *last_n* > 0  → table mode  (latest N rows, sorted desc, with ids).
     When *last_n* == 0 → chart mode  (cumsum, per-symbol traces).
+    Sends columnar msgpack when the client accepts ``application/msgpack``.
     """
+    return negotiate(request, _income_data_payload(users, period, last_n, filter_val))
+
+
+def _income_data_payload(users: str, period: str, last_n: int, filter_val: float) -> dict[str, Any]:
     start_ms, end_ms, from_date, to_date = _period_to_range(period)
     user_list = [u.strip() for u in users.split(",") if u.strip()] or ["ALL"]
     db = _get_db()
@@ -2502,11 +2482,19 @@ def _pbdata_start():
 
 @router.get("/positions_data")
 def get_positions_data(
+    request: Request,
     users:   str = Query(default="ALL"),
     live:    bool = Query(default=False),
     session: SessionToken = Depends(require_auth),
 ):
-    """Return enriched positions data (with prices, DCA count, next DCA/TP)."""
+    """Return enriched positions data (with prices, DCA count, next DCA/TP).
+
+    Sends columnar msgpack when the client accepts ``application/msgpack``.
+    """
+    return negotiate(request, _positions_data_payload(users, live))
+
+
+def _positions_data_payload(users: str, live: bool) -> dict[str, Any]:
     db = _get_db()
     all_users = _get_users()
 
@@ -2535,34 +2523,10 @@ def get_positions_data(
             except Exception as exc:
                 used_db = True
                 _log(SERVICE, f"Live positions fetch failed for '{user_name}', falling back to DB: {exc}", level="WARNING", user=user_name)
-        positions = db.fetch_positions(user_obj) or []
-        prices = db.fetch_prices(user_obj) or []
         used_db = True
-        for pos in positions:
-            symbol = pos[1]
-            uname = pos[6]
-            side = pos[7] if len(pos) > 7 else "long"
-            orders = db.fetch_orders_by_symbol(uname, symbol) or []
-            dca, next_dca, next_tp = _classify_position_orders(orders, side)
-            price = 0.0
-            for p in prices:
-                if p[1] == symbol:
-                    price = p[3]
-            pos_value = pos[3] * price
-            all_positions.append({
-                "user":     uname,
-                "exchange": user_obj.exchange,
-                "symbol":   symbol,
-                "side":     side,
-                "size":     pos[3],
-                "upnl":     round(pos[4], 8),
-                "entry":    pos[5],
-                "price":    price,
-                "dca":      dca,
-                "next_dca": next_dca,
-                "next_tp":  next_tp,
-                "pos_value": round(pos_value, 2),
-            })
+        for row in positions_snapshots.get(db, user_name).rows():
+            row["exchange"] = user_obj.exchange
+            all_positions.append(row)
 
     all_positions.sort(key=lambda x: (x["user"], x["symbol"]))
     for row in all_positions:
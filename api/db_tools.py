@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import asyncio
+import base64
 import json
 import os
 import shlex
@@ -23,6 +24,7 @@ from fastapi.responses import HTMLResponse
 from pydantic import BaseModel, Field
 
 from api.auth import SessionToken, require_auth
+import db_changelog
 from logging_helpers import human_log as _log
 from master.async_pool import remote_path_join
 import pbgui_purefunc
@@ -131,10 +133,18 @@ MAIN_TABLES: tuple[TableSpec, ...] = (
 )
 TRADES_TABLES: tuple[TableSpec, ...] = (
     TableSpec(TRADES_DB_NAME, "executions", key_cols=("user", "exchange", "trade_id")),
+    # Compressed raw_json of backfilled executions (see executions_backfill).
+    TableSpec(TRADES_DB_NAME, "execution_raw", key_cols=("user", "exchange", "trade_id")),
 )
 TABLE_SPECS: tuple[TableSpec, ...] = MAIN_TABLES + TRADES_TABLES
-APPEND_SYNC_TABLES = {(MAIN_DB_NAME, "history"), (TRADES_DB_NAME, "executions")}
+APPEND_SYNC_TABLES = {(MAIN_DB_NAME, "history"), (TRADES_DB_NAME, "executions"), (TRADES_DB_NAME, "execution_raw")}
+# pbgui.db "history" is a view over monthly partitions (history_partitions.py)
+# with INSTEAD OF triggers: table checks accept views and row counts use
+# conn.total_changes, because cursor.rowcount is 0 for trigger-routed writes.
 SYNC_OVERLAP_MS = 5 * 60 * 1000
+# State tables streamed from the pbgui.db change log (db_changelog.py) once a
+# target has acknowledged a sequence; everything else keeps the row sync.
+CDC_SYNC_TABLES = {(MAIN_DB_NAME, table) for table in db_changelog.CHANGE_KEYS}
 
 
 MAIN_SCHEMA: tuple[str, ...] = (
@@ -203,6 +213,15 @@ TRADES_SCHEMA: tuple[str, ...] = (
             raw_json TEXT,
             UNIQUE(user, exchange, trade_id)
     );""",
+    """CREATE TABLE IF NOT EXISTS execution_raw (
+            user TEXT NOT NULL,
+            exchange TEXT NOT NULL,
+            trade_id TEXT NOT NULL,
+            codec TEXT NOT NULL,
+            data BLOB NOT NULL,
+            timestamp INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (user, exchange, trade_id)
+    );""",
 )
 
 
@@ -606,7 +625,7 @@ cutoff = None if cutoff_raw == '' else int(cutoff_raw)
 conn = sqlite3.connect(db_path, timeout=30)
 try:
     conn.execute('PRAGMA busy_timeout=30000')
-    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name=?", (table,)).fetchone()
     if not exists:
         print(json.dumps({'deleted': 0, 'missing': True}))
         sys.exit(0)
@@ -616,9 +635,10 @@ try:
     if cutoff is not None and ts_col:
         sql += f' AND "{ts_col}" <= ?'
         params.append(cutoff)
-    cur = conn.execute(sql, params)
+    before = conn.total_changes
+    conn.execute(sql, params)
     conn.commit()
-    print(json.dumps({'deleted': int(cur.rowcount if cur.rowcount is not None else 0)}))
+    print(json.dumps({'deleted': conn.total_changes - before}))
 finally:
     conn.close()
 """.strip()
@@ -633,8 +653,8 @@ conn = sqlite3.connect(dst_db, timeout=30)
 try:
     conn.execute('PRAGMA busy_timeout=30000')
     conn.execute('ATTACH DATABASE ? AS srcdb', (src_db,))
-    dst_exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()
-    src_exists = conn.execute("SELECT 1 FROM srcdb.sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()
+    dst_exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name=?", (table,)).fetchone()
+    src_exists = conn.execute("SELECT 1 FROM srcdb.sqlite_master WHERE type IN ('table', 'view') AND name=?", (table,)).fetchone()
     if not dst_exists or not src_exists:
         print(json.dumps({'source': 0, 'inserted': 0, 'skipped': 0}))
         sys.exit(0)
@@ -661,8 +681,9 @@ try:
             if found:
                 skipped += 1
                 continue
-        cur = conn.execute(insert_sql, [values.get(col) for col in cols])
-        if cur.rowcount and cur.rowcount > 0:
+        before = conn.total_changes
+        conn.execute(insert_sql, [values.get(col) for col in cols])
+        if conn.total_changes > before:
             inserted += 1
         else:
             skipped += 1
@@ -686,7 +707,7 @@ for spec in specs:
         conn.execute('PRAGMA busy_timeout=30000')
         table = spec['table']
         user_col = spec['user_col']
-        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name=?", (table,)).fetchone()
         if not exists:
             continue
         table_key = f"{spec['db_name']}:{table}"
@@ -724,7 +745,7 @@ if users:
             table = spec['table']
             user_col = spec['user_col']
             ts_col = spec.get('timestamp_col') or ''
-            exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()
+            exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name=?", (table,)).fetchone()
             if not exists:
                 tables[table_key] = 0
                 continue
@@ -744,8 +765,10 @@ print(json.dumps({'total': total, 'tables': tables}))
 
 
 _REMOTE_SYNC_FETCH_SCRIPT = r"""
-import json, pathlib, sqlite3, sys
+import base64, json, pathlib, sqlite3, sys
 db_name, table, user_col, timestamp_col, mode, users_raw, cutoffs_raw = sys.argv[1:8]
+def encode(row):
+    return [{'b64': base64.b64encode(value).decode('ascii')} if isinstance(value, bytes) else value for value in row]
 users = json.loads(users_raw)
 cutoffs = json.loads(cutoffs_raw or '{}')
 db_path = pathlib.Path('data') / db_name
@@ -755,7 +778,7 @@ if not users or not db_path.exists():
 conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True, timeout=30)
 try:
     conn.execute('PRAGMA busy_timeout=30000')
-    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name=?", (table,)).fetchone()
     if not exists:
         print(json.dumps({'columns': [], 'rows': []}))
         sys.exit(0)
@@ -774,11 +797,11 @@ try:
         for user in users:
             cutoff = int(cutoffs.get(str(user), 0) or 0)
             sql = f'SELECT {col_expr} FROM "{table}" WHERE "{user_col}" = ? AND "{timestamp_col}" >= ? ORDER BY {order_expr}'
-            rows.extend([list(row) for row in conn.execute(sql, (user, cutoff))])
+            rows.extend([encode(row) for row in conn.execute(sql, (user, cutoff))])
     else:
         placeholders = ','.join('?' for _ in users)
         sql = f'SELECT {col_expr} FROM "{table}" WHERE "{user_col}" IN ({placeholders}) ORDER BY "{user_col}"'
-        rows = [list(row) for row in conn.execute(sql, users)]
+        rows = [encode(row) for row in conn.execute(sql, users)]
     print(json.dumps({'columns': columns, 'rows': rows}))
 finally:
     conn.close()
@@ -786,8 +809,10 @@ finally:
 
 
 _REMOTE_SYNC_APPLY_SCRIPT = r"""
-import json, pathlib, sqlite3, sys
+import base64, json, pathlib, sqlite3, sys
 db_name, table, user_col, mode, users_raw, payload_path = sys.argv[1:7]
+def decode(value):
+    return base64.b64decode(value['b64']) if isinstance(value, dict) and 'b64' in value else value
 users = json.loads(users_raw)
 payload = json.loads(pathlib.Path(payload_path).read_text(encoding='utf-8'))
 source_columns = [str(col) for col in payload.get('columns') or []]
@@ -796,7 +821,7 @@ db_path = pathlib.Path('data') / db_name
 conn = sqlite3.connect(db_path, timeout=30)
 try:
     conn.execute('PRAGMA busy_timeout=30000')
-    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name=?", (table,)).fetchone()
     if not exists:
         print(json.dumps({'fetched': len(source_rows), 'inserted': 0, 'skipped': len(source_rows), 'deleted': 0}))
         sys.exit(0)
@@ -808,16 +833,18 @@ try:
     deleted = 0
     if mode == 'state' and users:
         placeholders = ','.join('?' for _ in users)
-        cur = conn.execute(f'DELETE FROM "{table}" WHERE "{user_col}" IN ({placeholders})', users)
-        deleted = int(cur.rowcount if cur.rowcount is not None else 0)
+        before = conn.total_changes
+        conn.execute(f'DELETE FROM "{table}" WHERE "{user_col}" IN ({placeholders})', users)
+        deleted = conn.total_changes - before
     quoted_cols = ', '.join('"' + col + '"' for col in columns)
     insert_sql = f'INSERT OR IGNORE INTO "{table}" ({quoted_cols}) VALUES ({", ".join("?" for _ in columns)})'
     inserted = 0
     skipped = 0
     for row in source_rows:
         values = dict(zip(source_columns, row))
-        cur = conn.execute(insert_sql, [values.get(col) for col in columns])
-        if cur.rowcount and cur.rowcount > 0:
+        before = conn.total_changes
+        conn.execute(insert_sql, [decode(values.get(col)) for col in columns])
+        if conn.total_changes > before:
             inserted += 1
         else:
             skipped += 1
@@ -848,7 +875,7 @@ if users:
             table = spec['table']
             user_col = spec['user_col']
             ts_col = spec.get('timestamp_col') or ''
-            exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()
+            exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name=?", (table,)).fetchone()
             if not exists:
                 tables[table_key] = entry
                 continue
@@ -875,6 +902,68 @@ print(json.dumps({'tables': tables}))
 """.strip()
 
 
+_REMOTE_CDC_READ_SCRIPT = r"""
+import base64, json, pathlib, sqlite3, sys
+after, users_raw, limit = int(sys.argv[1]), sys.argv[2], int(sys.argv[3])
+try:
+    import db_changelog
+except ImportError:
+    print(json.dumps({'supported': False}))
+    sys.exit(0)
+db_path = pathlib.Path('data') / 'pbgui.db'
+if not db_path.exists():
+    print(json.dumps({'supported': False}))
+    sys.exit(0)
+conn = sqlite3.connect(f'file:{db_path}?mode=ro', uri=True, timeout=30)
+try:
+    conn.execute('PRAGMA busy_timeout=30000')
+    if not db_changelog.has_changelog(conn):
+        print(json.dumps({'supported': False}))
+        sys.exit(0)
+    state = db_changelog.log_state(conn)
+    batch = None
+    if after >= 0:
+        batch = base64.b64encode(db_changelog.encode_batch(db_changelog.read_changes(conn, json.loads(users_raw), after, limit))).decode('ascii')
+    print(json.dumps({'supported': True, 'state': state, 'batch': batch}))
+finally:
+    conn.close()
+""".strip()
+
+
+_REMOTE_CDC_CURSOR_SCRIPT = r"""
+import json, pathlib, sqlite3, sys
+source_log, scope = sys.argv[1:3]
+try:
+    import db_changelog
+except ImportError:
+    print(json.dumps({'supported': False}))
+    sys.exit(0)
+db_path = pathlib.Path('data') / 'pbgui.db'
+if not db_path.exists():
+    print(json.dumps({'supported': True, 'seq': None}))
+    sys.exit(0)
+conn = sqlite3.connect(db_path, timeout=30)
+try:
+    conn.execute('PRAGMA busy_timeout=30000')
+    print(json.dumps({'supported': True, 'seq': db_changelog.get_cursor(conn, source_log, scope)}))
+finally:
+    conn.close()
+""".strip()
+
+
+_REMOTE_CDC_APPLY_SCRIPT = r"""
+import json, pathlib, sqlite3, sys
+import db_changelog
+scope, payload_path = sys.argv[1:3]
+batch = db_changelog.decode_batch(pathlib.Path(payload_path).read_bytes())
+conn = sqlite3.connect(pathlib.Path('data') / 'pbgui.db', timeout=30)
+try:
+    conn.execute('PRAGMA busy_timeout=30000')
+    print(json.dumps({'tables': db_changelog.apply_batch(conn, batch, scope)}))
+finally:
+    conn.close()
+""".strip()
+
 async def _read_remote_text(target: str, remote_path: str) -> str:
     data = await _pool().read_remote_file(target, remote_path)
     if data is None:
@@ -1560,7 +1649,7 @@ def _ensure_schema(db_path: Path, db_name: str) -> None:
 
 
 def _table_exists(conn: sqlite3.Connection, table: str) -> bool:
-    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)).fetchone()
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type IN ('table', 'view') AND name=?", (table,)).fetchone()
     return row is not None
 
 
@@ -1699,6 +1788,15 @@ def _sync_table_mode(spec: TableSpec) -> Literal["append", "state"]:
     return "append" if (spec.db_name, spec.table) in APPEND_SYNC_TABLES else "state"
 
 
+def _encode_sync_row(row: Any) -> list[Any]:
+    """Return a JSON-safe sync row; BLOB values travel as ``{"b64": ...}``."""
+    return [{"b64": base64.b64encode(value).decode("ascii")} if isinstance(value, bytes) else value for value in row]
+
+
+def _decode_sync_value(value: Any) -> Any:
+    return base64.b64decode(value["b64"]) if isinstance(value, dict) and "b64" in value else value
+
+
 def _sync_select_columns(conn: sqlite3.Connection, spec: TableSpec) -> list[str]:
     if not _table_exists(conn, spec.table):
         return []
@@ -1734,7 +1832,7 @@ def _fetch_sync_rows_from_paths(
                 cutoff = int((cutoffs or {}).get(user, 0) or 0)
                 rows.extend(
                     [
-                        list(row)
+                        _encode_sync_row(row)
                         for row in conn.execute(
                             f'SELECT {col_expr} FROM "{spec.table}" '
                             f'WHERE "{spec.user_col}" = ? AND "{spec.timestamp_col}" >= ? '
@@ -1745,7 +1843,7 @@ def _fetch_sync_rows_from_paths(
                 )
         else:
             rows = [
-                list(row)
+                _encode_sync_row(row)
                 for row in conn.execute(
                     f'SELECT {col_expr} FROM "{spec.table}" '
                     f'WHERE "{spec.user_col}" IN ({_placeholders(users)}) ORDER BY "{spec.user_col}"',
@@ -1777,19 +1875,21 @@ def _apply_sync_rows_to_paths(
             return {"fetched": fetched, "inserted": 0, "skipped": fetched, "deleted": 0}
         deleted = 0
         if mode == "state":
-            cur = conn.execute(
+            before = conn.total_changes
+            conn.execute(
                 f'DELETE FROM "{spec.table}" WHERE "{spec.user_col}" IN ({_placeholders(users)})',
                 users,
             )
-            deleted = int(cur.rowcount if cur.rowcount is not None else 0)
+            deleted = conn.total_changes - before
         quoted_cols = ", ".join(f'"{col}"' for col in columns)
         insert_sql = f'INSERT OR IGNORE INTO "{spec.table}" ({quoted_cols}) VALUES ({", ".join("?" for _ in columns)})'
         inserted = 0
         skipped = 0
         for row in source_rows:
             values = dict(zip(source_columns, row))
-            cur = conn.execute(insert_sql, [values.get(col) for col in columns])
-            if cur.rowcount and cur.rowcount > 0:
+            before = conn.total_changes
+            conn.execute(insert_sql, [_decode_sync_value(values.get(col)) for col in columns])
+            if conn.total_changes > before:
                 inserted += 1
             else:
                 skipped += 1
@@ -1929,6 +2029,147 @@ async def _apply_sync_rows_for_target(
         local_payload.unlink(missing_ok=True)
 
 
+def _cdc_read_from_paths(db_paths: dict[str, Path], users: list[str], after: int, limit: int = db_changelog.BATCH_SIZE) -> dict[str, Any] | None:
+    path = db_paths[MAIN_DB_NAME]
+    if not path.exists():
+        return None
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30)
+    try:
+        conn.execute("PRAGMA busy_timeout=30000")
+        if not db_changelog.has_changelog(conn):
+            return None
+        state = db_changelog.log_state(conn)
+        batch = db_changelog.read_changes(conn, users, after, limit) if after >= 0 else None
+        return {"state": state, "batch": batch}
+    finally:
+        conn.close()
+
+
+def _cdc_cursor_from_paths(db_paths: dict[str, Path], source_log: str, scope: str) -> int | None:
+    path = db_paths[MAIN_DB_NAME]
+    if not path.exists():
+        return None
+    conn = sqlite3.connect(str(path), timeout=30)
+    try:
+        conn.execute("PRAGMA busy_timeout=30000")
+        return db_changelog.get_cursor(conn, source_log, scope)
+    finally:
+        conn.close()
+
+
+def _cdc_apply_to_paths(db_paths: dict[str, Path], batch: dict[str, Any], scope: str) -> dict[str, Any]:
+    path = db_paths[MAIN_DB_NAME]
+    _ensure_schema(path, MAIN_DB_NAME)
+    conn = sqlite3.connect(str(path), timeout=30)
+    try:
+        conn.execute("PRAGMA busy_timeout=30000")
+        return db_changelog.apply_batch(conn, batch, scope)
+    finally:
+        conn.close()
+
+
+async def _cdc_read_for_target(target: str, users: list[str], after: int) -> dict[str, Any] | None:
+    """Read the change-log state (``after < 0``) or the next batch; None if unsupported."""
+    if target == "local":
+        return _cdc_read_from_paths(_target_db_paths_local(), users, after)
+    data = await _run_remote_python(
+        target,
+        _REMOTE_CDC_READ_SCRIPT,
+        [str(int(after)), json.dumps(users), str(db_changelog.BATCH_SIZE)],
+        timeout=120,
+    )
+    if not isinstance(data, dict) or not data.get("supported"):
+        return None
+    batch = data.get("batch")
+    return {
+        "state": data.get("state") or {},
+        "batch": db_changelog.decode_batch(base64.b64decode(batch)) if batch else None,
+    }
+
+
+async def _cdc_cursor_for_target(target: str, source_log: str, scope: str) -> tuple[bool, int | None]:
+    """Return (target supports the change log, acknowledged source sequence)."""
+    if target == "local":
+        return True, _cdc_cursor_from_paths(_target_db_paths_local(), source_log, scope)
+    data = await _run_remote_python(target, _REMOTE_CDC_CURSOR_SCRIPT, [source_log, scope], timeout=60)
+    if not isinstance(data, dict) or not data.get("supported"):
+        return False, None
+    seq = data.get("seq")
+    return True, int(seq) if seq is not None else None
+
+
+async def _cdc_apply_for_target(target: str, batch: dict[str, Any], scope: str, temp_dir: Path) -> dict[str, Any]:
+    if target == "local":
+        return _cdc_apply_to_paths(_target_db_paths_local(), batch, scope)
+    payload_key = uuid.uuid4().hex
+    remote_dir = _remote_path(target, "data", "tmp", "db-tools", payload_key)
+    created = await _pool().run(target, f"mkdir -p {shlex.quote(remote_dir)}", timeout=15)
+    if not created or created.returncode != 0:
+        raise HTTPException(status_code=500, detail=f"Failed to create remote temp directory on {target}")
+    local_payload = temp_dir / f"cdc-{payload_key}.json.z"
+    local_payload.write_bytes(db_changelog.encode_batch(batch))
+    try:
+        ok = await _pool().push_file(target, local_payload, f"{remote_dir}/batch.json.z")
+        if not ok:
+            raise HTTPException(status_code=500, detail=f"Failed to upload change batch to {target}")
+        data = await _run_remote_python(
+            target,
+            _REMOTE_CDC_APPLY_SCRIPT,
+            [scope, f"data/tmp/db-tools/{payload_key}/batch.json.z"],
+            timeout=120,
+        )
+        tables = data.get("tables") if isinstance(data, dict) else {}
+        return tables if isinstance(tables, dict) else {}
+    finally:
+        await _pool().run(target, f"rm -rf {shlex.quote(remote_dir)}", timeout=15)
+        local_payload.unlink(missing_ok=True)
+
+
+async def _replicate_state_changes(
+    source: str,
+    target: str,
+    users: list[str],
+    temp_dir: Path,
+    operation: OperationProgress | None = None,
+) -> dict[str, Any] | None:
+    """Stream change-log batches for the state tables since the target's cursor.
+
+    Returns None when either side has no change log, ``mode="full"`` when the
+    target has no usable cursor yet (the caller runs the row sync and then
+    acknowledges ``through``), and ``mode="cdc"`` with per-table stats after
+    streaming.
+    """
+    source_info = await _cdc_read_for_target(source, users, -1)
+    if not source_info:
+        return None
+    state = source_info["state"]
+    log_id = str(state.get("log_id") or "")
+    scope = db_changelog.scope_key(users)
+    supported, seq = await _cdc_cursor_for_target(target, log_id, scope)
+    if not supported or not log_id:
+        return None
+    source_seq = int(state.get("seq") or 0)
+    if seq is None or seq < int(state.get("pruned_seq") or 0) or seq > source_seq:
+        return {"mode": "full", "log_id": log_id, "scope": scope, "through": source_seq, "batches": 0}
+    tables: dict[str, dict[str, int]] = {}
+    batches = 0
+    while True:
+        if operation:
+            operation.set_current(f"Stream changes after #{seq} to {target}")
+        info = await _cdc_read_for_target(source, users, seq)
+        batch = (info or {}).get("batch")
+        if not batch:
+            raise HTTPException(status_code=500, detail=f"Change log of {source} became unavailable during sync")
+        for table, stats in (await _cdc_apply_for_target(target, batch, scope, temp_dir)).items():
+            totals = tables.setdefault(table, {"changes": 0, "fetched": 0, "inserted": 0, "skipped": 0, "deleted": 0})
+            for name in totals:
+                totals[name] += int(stats.get(name) or 0)
+        seq = int(batch["through"])
+        batches += 1
+        if not batch.get("more"):
+            break
+    return {"mode": "cdc", "log_id": log_id, "scope": scope, "through": seq, "batches": batches, "tables": tables}
+
 async def _verify_sync_target(source: str, target: str, users: list[str]) -> dict[str, Any]:
     source_stats = await _sync_table_stats_for_target(source, users)
     target_stats = await _sync_table_stats_for_target(target, users)
@@ -1963,7 +2204,11 @@ async def sync_user_rows_incremental(
     temp_dir: Path,
     operation: OperationProgress | None = None,
 ) -> dict[str, Any]:
-    """Synchronize selected users without backups using incremental SQL for append tables."""
+    """Synchronize selected users without backups.
+
+    State tables stream change-log batches once the target holds a cursor for
+    this source and user set; append tables copy rows newer than the target.
+    """
 
     source = _target_id(source)
     target = _target_id(target)
@@ -1972,12 +2217,21 @@ async def sync_user_rows_incremental(
     users = _clean_users(users)
     if not users:
         raise HTTPException(status_code=422, detail="Select at least one user")
+    replication = await _replicate_state_changes(source, target, users, temp_dir, operation)
+    streamed = replication is not None and replication["mode"] == "cdc"
     target_stats = await _sync_table_stats_for_target(target, users)
     target_tables = target_stats.get("tables") if isinstance(target_stats, dict) else {}
     tables: dict[str, Any] = {}
     for spec in TABLE_SPECS:
         key = _sync_table_key(spec)
         mode = _sync_table_mode(spec)
+        if streamed and (spec.db_name, spec.table) in CDC_SYNC_TABLES:
+            stats = dict(replication["tables"].get(spec.table) or {"changes": 0, "fetched": 0, "inserted": 0, "skipped": 0, "deleted": 0})
+            stats["mode"] = "cdc"
+            tables[key] = stats
+            if operation:
+                operation.advance(f"Streamed {key} changes to {target}", stats)
+            continue
         if operation:
             operation.set_current(f"Sync {key} to {target}")
         cutoffs: dict[str, int] = {}
@@ -1993,6 +2247,14 @@ async def sync_user_rows_incremental(
         tables[key] = stats
         if operation:
             operation.advance(f"Synced {key} to {target}", stats)
+    if replication is not None and replication["mode"] == "full":
+        # Rows are in place: later runs stream changes after the sequence read before the copy.
+        await _cdc_apply_for_target(
+            target,
+            {"log_id": replication["log_id"], "through": replication["through"], "tables": {}},
+            replication["scope"],
+            temp_dir,
+        )
     verify = await _verify_sync_target(source, target, users)
     if operation:
         operation.advance(f"Verified sync target {target}", {"ok": verify.get("ok")})
@@ -2003,6 +2265,9 @@ async def sync_user_rows_incremental(
         "skipped": sum(int(item.get("skipped") or 0) for item in tables.values()),
         "deleted": sum(int(item.get("deleted") or 0) for item in tables.values()),
         "tables": tables,
+        "replication": (
+            {key: replication[key] for key in ("mode", "through", "batches")} if replication is not None else {"mode": "rows"}
+        ),
         "verify": verify,
     }
 
@@ -2041,9 +2306,10 @@ def delete_user_rows(
                     continue
                 sql += f' AND "{spec.timestamp_col}" <= ?'
                 params.append(int(cutoff_ms))
-            cur = conn.execute(sql, params)
+            before = conn.total_changes
+            conn.execute(sql, params)
             conn.commit()
-            deleted_count = int(cur.rowcount if cur.rowcount is not None else 0)
+            deleted_count = conn.total_changes - before
             deleted[table_key] = deleted_count
             if operation:
                 operation.advance(f"Deleted rows from {table_key}", {"deleted": deleted_count})
@@ -2095,8 +2361,9 @@ def _copy_spec_rows(
         if mode == "add_missing" and _row_exists(dst, spec.table, key_cols, values):
             skipped += 1
             continue
-        cur = dst.execute(insert_sql, [values.get(col) for col in cols])
-        if cur.rowcount and cur.rowcount > 0:
+        before = dst.total_changes
+        dst.execute(insert_sql, [values.get(col) for col in cols])
+        if dst.total_changes > before:
             inserted += 1
         else:
             skipped += 1
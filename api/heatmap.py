@@ -15,12 +15,13 @@ from datetime import date as _date, datetime as _datetime, timedelta as _timedel
 from pathlib import Path
 from typing import Any
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request
 from fastapi.responses import StreamingResponse
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 
 from api.auth import SessionToken, require_auth
+from api.msgpack_transport import accepts_msgpack, negotiate
 from hyperliquid_api import normalize_hyperliquid_coin
 
 router = APIRouter()
@@ -678,6 +679,7 @@ async def get_heatmap_overview_stream(
 
 @router.get("/minutes")
 def get_heatmap_minutes(
+    request: Request,
     exchange: str = Query(...),
     dataset: str = Query(...),
     coin: str = Query(...),
@@ -688,7 +690,8 @@ def get_heatmap_minutes(
 ) -> dict[str, Any]:
     """
     Build the per-minute heatmap for a specific month.
-    Returns Plotly figure JSON and an HTML legend string.
+    Returns Plotly figure JSON and an HTML legend string.  msgpack clients
+    receive the figure as a packed object instead of a JSON string.
     """
     from market_data_tradfi import (
         is_hyperliquid_stock_perp_1m,
@@ -868,6 +871,12 @@ def get_heatmap_minutes(
             + _l2_span
         )
 
+    if accepts_msgpack(request):
+        return negotiate(request, {
+            "figure": fig.to_plotly_json(),
+            "legend_html": legend_html,
+            "error": None,
+        })
     return {
         "figure": fig.to_json(),
         "legend_html": legend_html,
@@ -875,6 +884,167 @@ def get_heatmap_minutes(
     }
 
 
+# --------------------------------------------------------------------------- /minutes-tiles
+
+MAX_TILE_MONTHS = 36
+
+
+def _minute_day_gaps(ex: str, ds: str, cn: str, show_holiday: bool, show_oos: bool):
+    """Return the holiday/session callback for tile statuses, or ``None``."""
+    from market_data_tradfi import (
+        is_hyperliquid_stock_perp_1m,
+        tradfi_canonical_type_for_coin,
+        is_tradfi_market_holiday,
+        tradfi_expected_indices_for_type,
+        tradfi_expected_minute_indices,
+    )
+
+    if not is_hyperliquid_stock_perp_1m(exchange=ex, dataset=ds, coin=cn) or not (show_holiday or show_oos):
+        return None
+    tradfi_type = tradfi_canonical_type_for_coin(cn)
+
+    def day_gaps(d: _date) -> tuple[set[int], set[int] | None]:
+        is_hday = is_tradfi_market_holiday(d, tradfi_type)
+        holiday: set[int] = set()
+        if show_holiday and is_hday:
+            holiday = tradfi_expected_minute_indices(d) if str(tradfi_type or "").strip().lower() != "fx" else set(range(1440))
+        expected = None
+        if show_oos:
+            expected = set() if is_hday else tradfi_expected_indices_for_type(d, tradfi_type)
+        return holiday, expected
+
+    return day_gaps
+
+
+def _tile_days(start: str, end: str | None) -> tuple[list[_date], str, str]:
+    """Return the days of the inclusive month range ``start..end`` (YYYY-MM)."""
+    first = _datetime.strptime(str(start)[:7], "%Y-%m").date()
+    last_month = _datetime.strptime(str(end or start)[:7], "%Y-%m").date()
+    if last_month < first:
+        raise ValueError("end month is before start month")
+    if (last_month.year - first.year) * 12 + last_month.month - first.month >= MAX_TILE_MONTHS:
+        raise ValueError(f"range is limited to {MAX_TILE_MONTHS} months")
+    last = last_month.replace(day=calendar.monthrange(last_month.year, last_month.month)[1])
+    days = [first + _timedelta(days=offset) for offset in range((last - first).days + 1)]
+    return days, first.strftime("%Y%m%d"), last.strftime("%Y%m%d")
+
+
+@router.get("/minutes-tiles")
+def get_heatmap_minute_tiles(
+    request: Request,
+    exchange: str = Query(...),
+    dataset: str = Query(...),
+    coin: str = Query(...),
+    start: str = Query(..., description="YYYY-MM"),
+    end: str | None = Query(None, description="YYYY-MM (default: start)"),
+    zoom: int = Query(0, ge=0, le=3, description="0=1m, 1=5m, 2=15m, 3=1h per cell"),
+    encoding: str = Query("png", pattern="^(png|raw)$"),
+    show_holiday: bool = Query(True),
+    show_oos: bool = Query(True),
+    session: SessionToken = Depends(require_auth),
+) -> dict[str, Any]:
+    """
+    Minute heatmap for a month range as one uint8 status per cell.
+
+    Rows are days (``days``), columns ``1440 / bucket_minutes`` cells of the
+    day.  ``data`` is an 8-bit palette PNG or the raw row-major matrix;
+    base64 for JSON clients, bytes for msgpack clients.  Status codes index
+    ``statuses``.  Hover details come from ``/minutes-detail``.
+    """
+    import base64
+    from api.heatmap_tiles import (
+        ZOOM_BUCKET_MINUTES,
+        build_status_matrix,
+        downsample,
+        encode_png,
+        status_palette,
+    )
+    from market_data import get_minute_presence_for_dataset
+
+    ex = str(exchange).lower().strip()
+    ds = str(dataset).strip()
+    cn = str(coin).strip()
+    if ds.lower() in ("l2book", "l2book_mid"):
+        return {"data": None, "error": "l2Book minute detail uses streaming — please use /minutes-stream endpoint"}
+    try:
+        days, start_day, end_day = _tile_days(start, end)
+    except ValueError as exc:
+        return {"data": None, "error": f"Invalid range: {exc}"}
+    try:
+        hp = get_minute_presence_for_dataset(_storage_ex(ex), ds, cn, start_day=start_day, end_day=end_day)
+    except Exception as e:
+        return {"data": None, "error": str(e)}
+    present = hp.get("days") if isinstance(hp, dict) else {}
+    if not isinstance(present, dict) or not present:
+        return {"data": None, "error": "No minute data for this range"}
+
+    # Trim to the days that have data, like the month chart does.
+    known = sorted(day for day in present if start_day <= day <= end_day)
+    days = [d for d in days if known[0] <= d.strftime("%Y%m%d") <= known[-1]]
+    matrix = downsample(
+        build_status_matrix(present, days, _minute_day_gaps(ex, ds, cn, show_holiday, show_oos)),
+        zoom,
+    )
+    payload = encode_png(matrix) if encoding == "png" else matrix.tobytes()
+    palette = status_palette()
+    used = {int(code) for code in set(matrix.ravel().tolist())}
+    result = {
+        "days": [d.strftime("%Y%m%d") for d in days],
+        "zoom": zoom,
+        "bucket_minutes": ZOOM_BUCKET_MINUTES[zoom],
+        "columns": int(matrix.shape[1]),
+        "encoding": encoding,
+        "statuses": palette,
+        "legend_html": "".join(_LEGEND_SPAN(item["label"], item["color"]) for item in palette if item["code"] in used),
+        "error": None,
+    }
+    if accepts_msgpack(request):
+        return negotiate(request, {**result, "data": payload})
+    return {**result, "data": base64.b64encode(payload).decode("ascii")}
+
+
+@router.get("/minutes-detail")
+def get_heatmap_minute_detail(
+    exchange: str = Query(...),
+    dataset: str = Query(...),
+    coin: str = Query(...),
+    day: str = Query(..., description="YYYYMMDD"),
+    start_minute: int = Query(0, ge=0, le=1439),
+    minutes: int = Query(1, ge=1, le=60),
+    show_holiday: bool = Query(True),
+    show_oos: bool = Query(True),
+    session: SessionToken = Depends(require_auth),
+) -> dict[str, Any]:
+    """Per-minute status and source for one tile cell (hover details)."""
+    from api.heatmap_tiles import minute_details
+    from market_data import get_minute_presence_for_dataset
+
+    ex = str(exchange).lower().strip()
+    ds = str(dataset).strip()
+    cn = str(coin).strip()
+    try:
+        d = _datetime.strptime(str(day), "%Y%m%d").date()
+    except ValueError:
+        return {"minutes": [], "counts": {}, "error": "Invalid day"}
+    try:
+        hp = get_minute_presence_for_dataset(_storage_ex(ex), ds, cn, start_day=str(day), end_day=str(day))
+    except Exception as e:
+        return {"minutes": [], "counts": {}, "error": str(e)}
+    present = hp.get("days") if isinstance(hp, dict) else {}
+    rows = minute_details(
+        present if isinstance(present, dict) else {},
+        d,
+        start_minute,
+        start_minute + minutes,
+        _minute_day_gaps(ex, ds, cn, show_holiday, show_oos),
+    )
+    counts: dict[str, int] = {}
+    for row in rows:
+        label = row["source"] or row["status"]
+        counts[label] = counts.get(label, 0) + 1
+    return {"day": str(day), "minutes": rows, "counts": counts, "error": None}
+
+
 # --------------------------------------------------------------------------- /minutes-stream (SSE)
 
 def _parse_l2book_minutes(
@@ -0,0 +1,168 @@
+"""Compact status tiles for the minute-level gap heatmap.
+
+The Plotly minute chart carries one hover string per minute, which grows to
+hundreds of thousands of strings for long ranges.  Tiles instead hold one
+``uint8`` status per cell — one row per day, ``1440 / bucket`` columns per
+zoom level — sent either raw or as an 8-bit palette PNG that the browser can
+draw directly.  Coarser zoom levels keep the most severe status of each
+bucket, so a single missing minute stays visible.  Hover details are
+fetched per cell on demand (see ``/heatmap/minutes-detail``).
+"""
+from __future__ import annotations
+
+import struct
+import zlib
+from datetime import date
+from typing import Any, Callable, Iterable
+
+import numpy as np
+
+MINUTES_PER_DAY = 1440
+
+# (label, color) per status code; the code is the index.  Colors follow the
+# legend of the Plotly minute chart.
+MINUTE_STATUSES: tuple[tuple[str, str], ...] = (
+    ("missing", "#b23b3b"),
+    ("api", "#7e57c2"),
+    ("best", "#00897b"),
+    ("other_exchange", "#ef6c00"),
+    ("l2Book_mid", "#1e88e5"),
+    ("market holiday", "#6a1b9a"),
+    ("expected out-of-session gap", "#4e4e4e"),
+)
+STATUS_MISSING = 0
+STATUS_HOLIDAY = 5
+STATUS_OUT_OF_SESSION = 6
+
+# Source labels from the minute presence scan; anything else counts as missing.
+SOURCE_STATUS: dict[str, int] = {
+    "api": 1,
+    "best": 2,
+    "other_exchange": 3,
+    "binance_perp_usdt": 3,
+    "l2Book_mid": 4,
+    "l2Book": 4,
+}
+
+# Which status wins when several minutes share one cell: real gaps first,
+# then the weakest source, expected gaps last.
+_SEVERITY = np.array([6, 4, 2, 5, 3, 0, 1], dtype=np.uint8)
+
+# Minutes per cell for each zoom level.
+ZOOM_BUCKET_MINUTES: tuple[int, ...] = (1, 5, 15, 60)
+
+_PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+DayGaps = Callable[[date], "tuple[set[int], set[int] | None]"]
+
+
+def status_palette() -> list[dict[str, Any]]:
+    """Return ``[{code, label, color}]`` for the legend and the renderer."""
+    return [{"code": code, "label": label, "color": color} for code, (label, color) in enumerate(MINUTE_STATUSES)]
+
+
+def build_status_matrix(
+    presence_days: dict[str, Any],
+    days: list[date],
+    day_gaps: DayGaps | None = None,
+) -> np.ndarray:
+    """Return a ``len(days) x 1440`` uint8 status matrix.
+
+    *presence_days* is the ``days`` mapping of the minute presence scan
+    (``{YYYYMMDD: {HH: {minute: source}}}``).  *day_gaps(day)* returns the
+    minute indices shown as market holiday and the expected session minutes
+    (``None`` when every minute is expected) for missing minutes.
+    """
+    matrix = np.zeros((len(days), MINUTES_PER_DAY), dtype=np.uint8)
+    for row, day in enumerate(days):
+        hours_map = presence_days.get(day.strftime("%Y%m%d"))
+        if isinstance(hours_map, dict):
+            for hour, minutes in hours_map.items():
+                if not isinstance(minutes, dict):
+                    continue
+                try:
+                    base = int(hour) * 60
+                except (TypeError, ValueError):
+                    continue
+                for minute, source in minutes.items():
+                    code = SOURCE_STATUS.get(str(source), STATUS_MISSING)
+                    try:
+                        index = base + int(minute)
+                    except (TypeError, ValueError):
+                        continue
+                    if code and 0 <= index < MINUTES_PER_DAY:
+                        matrix[row, index] = code
+        if day_gaps is None:
+            continue
+        holiday, expected = day_gaps(day)
+        values = matrix[row]
+        missing = values == STATUS_MISSING
+        if holiday:
+            mask = _index_mask(holiday)
+            values[missing & mask] = STATUS_HOLIDAY
+            missing &= ~mask
+        if expected is not None:
+            values[missing & ~_index_mask(expected)] = STATUS_OUT_OF_SESSION
+    return matrix
+
+
+def downsample(matrix: np.ndarray, zoom: int) -> np.ndarray:
+    """Merge minutes into ``ZOOM_BUCKET_MINUTES[zoom]`` cells keeping the most severe status."""
+    bucket = ZOOM_BUCKET_MINUTES[zoom]
+    if bucket == 1:
+        return matrix
+    cells = matrix.reshape(matrix.shape[0], MINUTES_PER_DAY // bucket, bucket)
+    winner = _SEVERITY[cells].argmax(axis=2)
+    return np.take_along_axis(cells, winner[..., None], axis=2)[..., 0]
+
+
+def encode_png(matrix: np.ndarray, palette: Iterable[str] | None = None) -> bytes:
+    """Encode a uint8 status matrix as an 8-bit palette PNG (one pixel per cell)."""
+    colors = list(palette) if palette is not None else [color for _label, color in MINUTE_STATUSES]
+    height, width = matrix.shape
+    plte = b"".join(bytes.fromhex(color.lstrip("#")) for color in colors)
+    rows = np.zeros((height, width + 1), dtype=np.uint8)
+    rows[:, 1:] = matrix  # filter type 0 per scanline
+    return b"".join((
+        _PNG_SIGNATURE,
+        _png_chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 3, 0, 0, 0)),
+        _png_chunk(b"PLTE", plte),
+        _png_chunk(b"IDAT", zlib.compress(rows.tobytes(), 6)),
+        _png_chunk(b"IEND", b""),
+    ))
+
+
+def minute_details(
+    presence_days: dict[str, Any],
+    day: date,
+    start_minute: int,
+    end_minute: int,
+    day_gaps: DayGaps | None = None,
+) -> list[dict[str, Any]]:
+    """Return ``{time, status, source}`` per minute in ``[start_minute, end_minute)`` of one day."""
+    statuses = build_status_matrix(presence_days, [day], day_gaps)[0]
+    hours_map = presence_days.get(day.strftime("%Y%m%d"))
+    hours_map = hours_map if isinstance(hours_map, dict) else {}
+    result = []
+    for index in range(max(0, start_minute), min(MINUTES_PER_DAY, end_minute)):
+        hour, minute = divmod(index, 60)
+        minutes = hours_map.get(f"{hour:02d}") or {}
+        source = minutes.get(minute) if isinstance(minutes, dict) else None
+        result.append({
+            "time": f"{hour:02d}:{minute:02d}",
+            "status": MINUTE_STATUSES[int(statuses[index])][0],
+            "source": None if source is None else str(source),
+        })
+    return result
+
+
+def _index_mask(indices: Iterable[int]) -> np.ndarray:
+    mask = np.zeros(MINUTES_PER_DAY, dtype=bool)
+    values = [int(index) for index in indices if 0 <= int(index) < MINUTES_PER_DAY]
+    if values:
+        mask[values] = True
+    return mask
+
+
+def _png_chunk(kind: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
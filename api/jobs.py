@@ -16,12 +16,30 @@ from task_queue import (
     requeue_done_job,
     read_worker_pid,
     is_pid_running,
+    get_task_state_dir,
+    enqueue_unique_job,
 )
 from api.auth import require_auth, SessionToken, get_token_from_request
+from api.response_cache import CachedResponder, ConditionalCache, path_stamp, respond
 from task_worker import start_pending_job
 
 router = APIRouter()
 
+_JOB_STATES = ("pending", "running", "done", "failed")
+
+
+def _jobs_version() -> tuple:
+    """Cheap change key: job files are replaced atomically, so dir mtimes move."""
+    worker_pid = read_worker_pid()
+    return (
+        path_stamp(*(get_task_state_dir(state) for state in _JOB_STATES)),
+        worker_pid,
+        bool(worker_pid and is_pid_running(int(worker_pid))),
+    )
+
+
+_jobs_cache = ConditionalCache("jobs.get_jobs", version=_jobs_version)
+
 
 class CancelJobRequest(BaseModel):
     """Request payload for canceling a job."""
@@ -34,7 +52,8 @@ def get_jobs(
     states: str = "pending,running",
     limit: int = 50,
     job_type: str = "",
-    session: SessionToken = Depends(require_auth)
+    session: SessionToken = Depends(require_auth),
+    cache: CachedResponder = Depends(_jobs_cache),
 ):
     """List jobs by state.
     
@@ -47,19 +66,22 @@ def get_jobs(
     Returns:
         {"jobs": [...], "worker_running": bool}
     """
-    state_list = [s.strip() for s in states.split(",") if s.strip()]
-    job_types = [value.strip() for value in job_type.split(",") if value.strip()]
-    jobs = list_jobs(states=state_list, limit=limit, job_types=job_types)
-    
-    # Include worker status
-    worker_pid = read_worker_pid()
-    worker_running = bool(worker_pid and is_pid_running(int(worker_pid)))
-    
-    return {
-        "jobs": jobs,
-        "worker_running": worker_running,
-        "worker_pid": worker_pid
-    }
+    def build() -> dict:
+        state_list = [s.strip() for s in states.split(",") if s.strip()]
+        job_types = [value.strip() for value in job_type.split(",") if value.strip()]
+        jobs = list_jobs(states=state_list, limit=limit, job_types=job_types)
+
+        # Include worker status
+        worker_pid = read_worker_pid()
+        worker_running = bool(worker_pid and is_pid_running(int(worker_pid)))
+
+        return {
+            "jobs": jobs,
+            "worker_running": worker_running,
+            "worker_pid": worker_pid
+        }
+
+    return respond(cache, build)
 
 
 @router.get("/{job_id}")
@@ -88,6 +110,30 @@ def cancel_job(req: CancelJobRequest, session: SessionToken = Depends(require_au
     return {"success": True, "job_id": req.job_id}
 
 
+class ExecutionsBackfillRequest(BaseModel):
+    """Request payload for an executions backfill job."""
+    users: list[str] = []
+    initial_lookback_days: Optional[int] = None
+    compress_raw: bool = False
+    batch_size: int = 500
+
+
+@router.post("/executions-backfill")
+def enqueue_executions_backfill(req: ExecutionsBackfillRequest, session: SessionToken = Depends(require_auth)):
+    """Queue a checkpointed executions backfill (one active job at a time)."""
+    result = enqueue_unique_job(
+        job_type="executions_backfill",
+        payload={
+            "users": [str(name) for name in req.users if str(name or "").strip()],
+            "initial_lookback_days": req.initial_lookback_days,
+            "compress_raw": bool(req.compress_raw),
+            "batch_size": max(1, min(int(req.batch_size or 500), 10000)),
+        },
+        dedupe_key="executions_backfill",
+    )
+    return {"success": True, "job_id": result.job_id, "created": result.created}
+
+
 @router.post("/{job_id}/run")
 def run_job(job_id: str, session: SessionToken = Depends(require_auth)):
     """Start one pending job immediately as a manual same-type parallel runner."""
@@ -0,0 +1,374 @@
+"""
+Lazy router mounting and import-time reporting for PBApiServer.
+
+Importing every ``api/*`` module before Uvicorn accepts connections pulls in
+pandas, plotly, passivbot_rust and PB7/PB8 glue for pages nobody has opened
+yet, and every page is down while that happens after an update restart.
+
+:class:`LazyRouterRegistry` keeps heavy routers out of the startup path:
+
+- ``register()`` declares a router by module name and URL prefix.  The module
+  is imported in a worker thread on the first HTTP/WebSocket request below
+  that prefix (:class:`LazyRouterMiddleware`), then its ``router`` is included
+  into the app and the request continues as if it had been mounted eagerly.
+- Routers flagged ``warm=True`` own queue workers; :meth:`LazyRouterRegistry.warm`
+  loads them in the background right after the server starts serving.
+- :meth:`LazyRouterRegistry.startup_hook` / :meth:`LazyRouterRegistry.shutdown_hook`
+  stand in for module lifecycle functions in the lifespan: startups run as soon
+  as the module is loaded, shutdowns are skipped for modules never loaded.
+
+Per-router load time, trigger and newly imported heavy libraries are kept for
+the Services → PBAPIServer status tab, together with :func:`profile_imports`,
+a ``python -X importtime`` run of the startup import graph.
+
+Set ``PBGUI_API_LAZY_ROUTERS=0`` to mount every registered router at startup.
+"""
+import asyncio
+import importlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+from logging_helpers import human_log as _log
+
+SERVICE = "PBApiServer"
+HEAVY_MODULES = ("pandas", "numpy", "plotly", "passivbot_rust", "ccxt", "polars", "scipy")
+STARTUP_IMPORT_BUDGET_SECONDS = 8.0
+PROFILE_TIMEOUT_SECONDS = 180
+PROFILE_HISTORY = 10
+_PROFILE_TOP = 25
+
+
+def lazy_routers_enabled() -> bool:
+    """Return False when ``PBGUI_API_LAZY_ROUTERS`` disables lazy mounting."""
+    return os.environ.get("PBGUI_API_LAZY_ROUTERS", "1").strip().lower() not in {"0", "false", "no", "off"}
+
+
+def loaded_heavy_modules() -> set[str]:
+    """Return the heavy third-party modules already imported in this process."""
+    return {name for name in HEAVY_MODULES if name in sys.modules}
+
+
+@dataclass
+class LazyRouter:
+    """One router mounted on first use."""
+
+    name: str
+    module: str
+    prefix: str
+    tags: list[str]
+    warm: bool = False
+    status: str = "pending"
+    trigger: str = ""
+    seconds: float = 0.0
+    loaded_at: float = 0.0
+    heavy_modules: list[str] = field(default_factory=list)
+    error: str = ""
+
+    def matches(self, path: str) -> bool:
+        return path == self.prefix or path.startswith(self.prefix + "/")
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "module": self.module,
+            "prefix": self.prefix,
+            "warm": self.warm,
+            "status": self.status,
+            "trigger": self.trigger,
+            "seconds": round(self.seconds, 3),
+            "loaded_at": self.loaded_at,
+            "heavy_modules": list(self.heavy_modules),
+            "error": self.error,
+        }
+
+
+class LazyRouterRegistry:
+    """Routers of one FastAPI app that are imported and included on demand."""
+
+    def __init__(self) -> None:
+        self._app: FastAPI | None = None
+        self._entries: dict[str, LazyRouter] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._modules: dict[str, Any] = {}
+        self._on_load: dict[str, list[Callable[[Any], None]]] = {}
+        self._eager_import_seconds = 0.0
+        self._eager_heavy_modules: list[str] = []
+        self._startup_seconds = 0.0
+
+    def bind(self, app: FastAPI) -> None:
+        """Attach the app that loaded routers are included into."""
+        self._app = app
+
+    def register(self, name: str, module: str, prefix: str, *, tags: list[str] | None = None, warm: bool = False) -> None:
+        """Declare ``module.router`` to be mounted below ``prefix`` on first use."""
+        self._entries[name] = LazyRouter(name, module, prefix.rstrip("/"), list(tags or [name]), warm=warm)
+
+    def match(self, path: str) -> LazyRouter | None:
+        """Return the not yet loaded router that serves ``path``."""
+        for entry in self._entries.values():
+            if entry.status != "loaded" and entry.matches(path):
+                return entry
+        return None
+
+    def loaded_module(self, name: str) -> Any | None:
+        """Return the module of a loaded router, or None."""
+        return self._modules.get(name)
+
+    def _lock(self, name: str) -> asyncio.Lock:
+        lock = self._locks.get(name)
+        if lock is None:
+            lock = self._locks[name] = asyncio.Lock()
+        return lock
+
+    async def ensure(self, name: str, *, trigger: str = "request") -> Any:
+        """Import, mount and start ``name`` once; concurrent callers wait for the same load."""
+        entry = self._entries[name]
+        if entry.status == "loaded":
+            return self._modules[name]
+        async with self._lock(name):
+            if entry.status == "loaded":
+                return self._modules[name]
+            entry.status, entry.trigger, entry.error = "loading", trigger, ""
+            before = loaded_heavy_modules()
+            started = time.perf_counter()
+            try:
+                module = await asyncio.to_thread(importlib.import_module, entry.module)
+            except Exception as exc:
+                entry.status, entry.error = "failed", f"{type(exc).__name__}: {exc}"
+                entry.seconds = time.perf_counter() - started
+                _log(SERVICE, f"[lazy-routers] {name} import failed: {entry.error}", level="ERROR")
+                raise
+            entry.seconds = time.perf_counter() - started
+            entry.heavy_modules = sorted(loaded_heavy_modules() - before)
+            if self._app is not None:
+                self._app.include_router(module.router, prefix=entry.prefix, tags=entry.tags)
+                self._app.openapi_schema = None
+            self._modules[name] = module
+            entry.status, entry.loaded_at = "loaded", time.time()
+            heavy = f" (+{', '.join(entry.heavy_modules)})" if entry.heavy_modules else ""
+            _log(SERVICE, f"[lazy-routers] mounted {entry.prefix} in {entry.seconds:.2f}s on {trigger}{heavy}", level="INFO")
+        for hook in self._on_load.pop(name, []):
+            try:
+                hook(module)
+            except Exception as exc:
+                _log(SERVICE, f"[lazy-routers] {name} startup failed: {exc}", level="ERROR", meta={"traceback": traceback.format_exc()})
+        return module
+
+    async def load_all(self, *, trigger: str = "startup") -> None:
+        """Mount every registered router now (lazy loading disabled)."""
+        for name in self._entries:
+            await self.ensure(name, trigger=trigger)
+
+    async def warm(self, *, delay: float = 1.0) -> None:
+        """Load the ``warm=True`` routers one by one once the server is serving."""
+        await asyncio.sleep(delay)
+        for name, entry in self._entries.items():
+            if not entry.warm or entry.status == "loaded":
+                continue
+            try:
+                await self.ensure(name, trigger="warmup")
+            except Exception:
+                continue
+
+    def startup_hook(self, name: str, attr: str = "startup") -> Callable[[], None]:
+        """Return a lifespan startup stand-in that runs ``module.<attr>()`` once ``name`` is loaded."""
+
+        def run_when_loaded() -> None:
+            module = self._modules.get(name)
+            if module is not None:
+                getattr(module, attr)()
+            else:
+                self._on_load.setdefault(name, []).append(lambda loaded: getattr(loaded, attr)())
+
+        return run_when_loaded
+
+    def shutdown_hook(self, name: str, attr: str = "shutdown") -> Callable[[], Any]:
+        """Return a lifespan shutdown stand-in that is a no-op for routers never loaded."""
+
+        async def shutdown_if_loaded() -> None:
+            self._on_load.pop(name, None)
+            module = self._modules.get(name)
+            if module is not None:
+                await getattr(module, attr)()
+
+        return shutdown_if_loaded
+
+    def record_eager_imports(self, seconds: float, heavy_before: set[str]) -> None:
+        """Remember how long the eager ``api.*`` imports of PBApiServer took."""
+        self._eager_import_seconds = float(seconds)
+        self._eager_heavy_modules = sorted(loaded_heavy_modules() - set(heavy_before))
+
+    def record_startup(self, seconds: float) -> None:
+        """Remember process start → lifespan ready."""
+        self._startup_seconds = float(seconds)
+
+    def report(self) -> dict[str, Any]:
+        """Return the per-router load state and startup import timings."""
+        return {
+            "lazy_enabled": lazy_routers_enabled(),
+            "eager_import_seconds": round(self._eager_import_seconds, 3),
+            "eager_heavy_modules": list(self._eager_heavy_modules),
+            "startup_seconds": round(self._startup_seconds, 3),
+            "budget_seconds": STARTUP_IMPORT_BUDGET_SECONDS,
+            "over_budget": self._eager_import_seconds > STARTUP_IMPORT_BUDGET_SECONDS,
+            "routers": [entry.as_dict() for entry in self._entries.values()],
+        }
+
+
+class LazyRouterMiddleware:
+    """ASGI middleware that loads the lazy router owning a request path before routing."""
+
+    def __init__(self, app, registry: LazyRouterRegistry) -> None:
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] in ("http", "websocket"):
+            entry = self.registry.match(scope.get("path", ""))
+            if entry is not None:
+                try:
+                    await self.registry.ensure(entry.name, trigger="request")
+                except Exception:
+                    if scope["type"] == "http":
+                        response = JSONResponse(
+                            status_code=503,
+                            content={"error": "router_unavailable", "detail": f"{entry.prefix} failed to load: {entry.error}"},
+                        )
+                        await response(scope, receive, send)
+                        return
+        await self.app(scope, receive, send)
+
+
+# ── -X importtime profile ─────────────────────────────────────
+
+def parse_importtime(text: str) -> list[dict[str, Any]]:
+    """Parse ``python -X importtime`` stderr into rows with parent chains."""
+    rows: list[dict[str, Any]] = []
+    stack: list[tuple[int, int]] = []  # (depth, row index) of open ancestors
+    raw_lines = [line for line in text.splitlines() if line.startswith("import time:") and "|" in line]
+    # importtime prints children before their parent; walk bottom-up so parents come first.
+    for line in reversed(raw_lines):
+        try:
+            self_us, cumulative_us, name = line.split("|", 2)
+            self_value, cumulative_value = int(self_us.split(":")[-1]), int(cumulative_us)
+        except ValueError:
+            continue
+        # One space follows the separator, then two per nesting level.
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        while stack and stack[-1][0] >= depth:
+            stack.pop()
+        parent = rows[stack[-1][1]]["module"] if stack else ""
+        rows.append({
+            "module": name.strip(),
+            "self_us": self_value,
+            "cumulative_us": cumulative_value,
+            "depth": depth,
+            "parent": parent,
+            "chain": (rows[stack[-1][1]]["chain"] + [name.strip()]) if stack else [name.strip()],
+        })
+        stack.append((depth, len(rows) - 1))
+    return rows
+
+
+def summarize_importtime(rows: list[dict[str, Any]], roots: list[str], *, top: int = _PROFILE_TOP) -> dict[str, Any]:
+    """Return per-root cumulative time, heaviest modules and where heavy libraries come from."""
+    by_root = {row["module"]: row for row in rows if row["depth"] <= 1 and row["module"] in roots}
+    startup = by_root.get(roots[0]) if roots else None
+    startup_rows = [row for row in rows if startup is not None and row["chain"][0] == startup["module"]]
+    heavy = {}
+    for row in rows:
+        if row["module"] in HEAVY_MODULES and row["module"] not in heavy:
+            heavy[row["module"]] = {"cumulative_ms": round(row["cumulative_us"] / 1000, 1), "via": " > ".join(row["chain"])}
+    return {
+        "roots": [
+            {"module": name, "cumulative_ms": round(by_root[name]["cumulative_us"] / 1000, 1)}
+            for name in roots
+            if name in by_root
+        ],
+        "startup_ms": round(startup["cumulative_us"] / 1000, 1) if startup else 0.0,
+        "top_direct": [
+            {"module": row["module"], "cumulative_ms": round(row["cumulative_us"] / 1000, 1)}
+            for row in sorted((r for r in startup_rows if r["depth"] == 1), key=lambda r: -r["cumulative_us"])[:top]
+        ],
+        "top_self": [
+            {"module": row["module"], "self_ms": round(row["self_us"] / 1000, 1), "via": " > ".join(row["chain"][:-1])}
+            for row in sorted(rows, key=lambda r: -r["self_us"])[:top]
+        ],
+        "heavy_modules": heavy,
+    }
+
+
+def _profile_history_path(pbgdir: str | Path) -> Path:
+    return Path(pbgdir) / "data" / "logs" / "api_import_profile.json"
+
+
+def load_profile_history(pbgdir: str | Path) -> list[dict[str, Any]]:
+    """Return stored profiles, newest last."""
+    try:
+        data = json.loads(_profile_history_path(pbgdir).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return []
+    return data if isinstance(data, list) else []
+
+
+_profile_lock = threading.Lock()
+
+
+def profile_imports(pbgdir: str | Path, lazy_modules: list[str], *, version: str = "") -> dict[str, Any]:
+    """Run ``-X importtime`` for the startup imports, then each lazy router, and store the summary.
+
+    Runs in a fresh interpreter, so the numbers match a cold API restart
+    (minus disk cache effects) without touching the running server.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        raise RuntimeError("An import profile is already running")
+    try:
+        roots = ["PBApiServer", *lazy_modules]
+        # Plain import statements: -X importtime only times the C import path.
+        code = "".join(f"import {name}\n" for name in roots if name.replace(".", "").replace("_", "").isalnum())
+        started = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            cwd=str(pbgdir),
+            env={**os.environ, "PBGUI_SKIP_STARTUP_MIGRATIONS": "1"},
+            capture_output=True,
+            text=True,
+            timeout=PROFILE_TIMEOUT_SECONDS,
+        )
+        if proc.returncode != 0:
+            tail = (proc.stderr or "").strip().splitlines()[-1:] or ["unknown error"]
+            raise RuntimeError(f"import profile failed: {tail[0][:300]}")
+        summary = summarize_importtime(parse_importtime(proc.stderr), roots)
+        summary.update({
+            "timestamp": time.time(),
+            "version": version,
+            "wall_seconds": round(time.perf_counter() - started, 2),
+            "budget_seconds": STARTUP_IMPORT_BUDGET_SECONDS,
+            "over_budget": summary["startup_ms"] / 1000 > STARTUP_IMPORT_BUDGET_SECONDS,
+        })
+        history = load_profile_history(pbgdir)[-(PROFILE_HISTORY - 1):] + [summary]
+        path = _profile_history_path(pbgdir)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(history), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as exc:
+            _log(SERVICE, f"[lazy-routers] could not store import profile: {exc}", level="WARNING")
+        return summary
+    finally:
+        _profile_lock.release()
+
+
+registry = LazyRouterRegistry()
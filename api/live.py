@@ -30,6 +30,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
 
 from api.auth import require_auth, validate_token, SessionToken
+from api.positions_snapshot import classify_position_orders, positions_snapshots
 from logging_helpers import human_log as _log
 
 router = APIRouter()
@@ -67,33 +68,7 @@ def _broadcast(key: str, msg: str) -> None:
             pass
 
 
-def _classify_position_orders(orders: list, side: str) -> tuple[int, float, float]:
-    """Return DCA count, next DCA price, and next TP price for a position side."""
-    side = str(side).lower()
-    dca_side = "buy"
-    tp_side = "sell"
-    prefer_higher_dca = True
-    prefer_lower_tp = True
-    if side == "short":
-        dca_side = "sell"
-        tp_side = "buy"
-        prefer_higher_dca = False
-        prefer_lower_tp = False
-
-    dca = 0
-    next_dca = 0.0
-    next_tp = 0.0
-    for order in orders:
-        order_side = str(order[5]).lower()
-        order_price = order[4]
-        if order_side == dca_side:
-            dca += 1
-            if next_dca == 0 or (prefer_higher_dca and next_dca < order_price) or (not prefer_higher_dca and next_dca > order_price):
-                next_dca = order_price
-        elif order_side == tp_side:
-            if next_tp == 0 or (prefer_lower_tp and next_tp > order_price) or (not prefer_lower_tp and next_tp < order_price):
-                next_tp = order_price
-    return dca, next_dca, next_tp
+_classify_position_orders = classify_position_orders
 
 
 # ── Watcher lifecycle ──────────────────────────────────────────────────────────
@@ -226,25 +201,8 @@ async def _db_poll_loop(user: Any, kind: str, db: Any) -> None:
                         "data": snap,
                     }))
             else:  # positions
-                positions_rows = await asyncio.to_thread(db.fetch_positions, user) or []
-                prices_rows    = await asyncio.to_thread(db.fetch_prices, user) or []
-                price_map = {p[1]: p[3] for p in prices_rows}
-                result = []
-                for pos in positions_rows:
-                    symbol = pos[1]
-                    price  = price_map.get(symbol, 0.0)
-                    side = pos[7] if len(pos) > 7 else "long"
-                    orders = await asyncio.to_thread(db.fetch_orders_by_symbol, user.name, symbol) or []
-                    dca, next_dca, next_tp = _classify_position_orders(orders, side)
-                    result.append({
-                        "user": user.name, "symbol": symbol,
-                        "side": side,
-                        "size": pos[3], "upnl": round(pos[4], 8),
-                        "entry": pos[5], "price": price,
-                        "dca": dca, "next_dca": next_dca, "next_tp": next_tp,
-                        "pos_value": round(pos[3] * price, 2),
-                    })
-                result.sort(key=lambda x: x["symbol"])
+                snapshot = await asyncio.to_thread(positions_snapshots.get, db, user.name)
+                result = snapshot.rows()
                 _broadcast(key, json.dumps({
                     "type": "position_update",
                     "user": user.name,
@@ -361,6 +319,16 @@ async def _watcher_loop(user: Any, kind: str) -> None:
 
 # ── Data normalization ────────────────────────────────────────────────────────
 
+def _raw_position_symbol(pos: dict) -> str:
+    """Normalise a ccxt position symbol: "BTC/USDT:USDT" → "BTCUSDT"."""
+    raw_sym = pos.get("symbol", "")
+    if "/" in raw_sym:
+        base  = raw_sym.split("/")[0]
+        quote = raw_sym.split("/")[-1].split(":")[0]
+        return base + quote
+    return raw_sym
+
+
 def _normalize_positions(user: Any, raw: list, db: Any) -> list:
     """Map ccxtpro watchPositions() output to positions_data REST format."""
     if not raw:
@@ -368,12 +336,18 @@ def _normalize_positions(user: Any, raw: list, db: Any) -> list:
 
     result = []
 
-    # Enrich with prices + orders from DB (fast SQLite reads, ≤60 s stale — acceptable)
+    # Enrich with prices + orders from the shared DB snapshot (≤60 s stale — acceptable)
     try:
-        prices_raw = db.fetch_prices(user) or []
-        price_map = {p[1]: p[3] for p in prices_raw}
+        snapshot = positions_snapshots.get(db, user.name)
+        price_map = dict(snapshot.prices)
     except Exception:
+        snapshot = None
         price_map = {}
+    if any(_raw_position_symbol(pos) not in price_map for pos in raw):
+        try:
+            price_map.update({p[1]: p[3] for p in db.fetch_prices(user) or []})
+        except Exception:
+            pass
 
     for pos in raw:
         try:
@@ -381,14 +355,7 @@ def _normalize_positions(user: Any, raw: list, db: Any) -> list:
             if contracts == 0:
                 continue
 
-            # Normalise symbol: "BTC/USDT:USDT" → "BTCUSDT"
-            raw_sym = pos.get("symbol", "")
-            if "/" in raw_sym:
-                base  = raw_sym.split("/")[0]
-                quote = raw_sym.split("/")[-1].split(":")[0]
-                symbol = base + quote
-            else:
-                symbol = raw_sym
+            symbol = _raw_position_symbol(pos)
 
             side  = pos.get("side", "long")
             entry = float(pos.get("entryPrice") or 0)
@@ -401,8 +368,10 @@ def _normalize_positions(user: Any, raw: list, db: Any) -> list:
             next_tp = 0.0
             next_dca = 0.0
             try:
-                orders = db.fetch_orders_by_symbol(user.name, symbol) or []
-                dca, next_dca, next_tp = _classify_position_orders(orders, side)
+                classified = snapshot.classify(symbol, side) if snapshot is not None else None
+                if classified is None:
+                    classified = _classify_position_orders(db.fetch_orders_by_symbol(user.name, symbol) or [], side)
+                dca, next_dca, next_tp = classified
             except Exception:
                 pass
 
@@ -23,6 +23,7 @@ from hyperliquid_best_1m import (
 )
 from credential_store import CredentialStore
 from market_data import (
+    get_market_data_config_path,
     _get_pb7_root_dir,
     _get_pb8_root_dir,
     get_effective_enabled_coins,
@@ -87,10 +88,12 @@ from market_data_integrity import (
 from task_queue import enqueue_unique_job, list_jobs
 
 from .auth import require_auth, SessionToken
+from .response_cache import CachedResponder, ConditionalCache, path_stamp, respond
 from .heatmap import _get_missing_lag_minutes
 
 router = APIRouter(prefix="/market-data", tags=["market-data"])
 _market_data_status_snapshot: dict[str, Any] = {}
+_market_data_status_revision = 0
 _copy_data_schedules: dict[str, dict[str, Any]] = {}
 _copy_data_scheduler_task: asyncio.Task | None = None
 _copy_data_scheduler_stop: asyncio.Event | None = None
@@ -1141,8 +1144,9 @@ async def update_market_data_status_snapshot(request: Request) -> dict[str, Any]
         body = {}
     if not isinstance(body, dict):
         raise HTTPException(status_code=400, detail="Invalid market data status payload")
-    global _market_data_status_snapshot
+    global _market_data_status_snapshot, _market_data_status_revision
     _market_data_status_snapshot = {**_market_data_status_snapshot, **body}
+    _market_data_status_revision += 1
     return {"ok": True}
 
 
@@ -1342,6 +1346,7 @@ COPY_DATA_EXCHANGES: dict[str, dict[str, str]] = {
 }
 
 COPY_DATA_MODE = "update"
+COPY_DATA_TRANSPORTS = ("rsync", "pack")
 COPY_DATA_TARGET_CHARS = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789._-@")
 COPY_DATA_REMOTE_PATH_CHARS = set("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789/._-")
 COPY_DATA_SCHEDULE_MIN_HOURS = 1
@@ -1548,11 +1553,21 @@ def _build_copy_data_queue_payload(request: dict[str, Any]) -> dict[str, Any]:
             "exchanges": exchanges,
             "exchange_storage": {ex: COPY_DATA_EXCHANGES[ex]["storage"] for ex in exchanges},
             "mode": COPY_DATA_MODE,
+            "transport": _normalize_copy_data_transport(request.get("transport")),
         }
     )
     return payload
 
 
+def _normalize_copy_data_transport(transport: Any) -> str:
+    """Validate the copy transport: per-file rsync or manifest-planned tar packs."""
+
+    text = str(transport or "").strip().lower() or COPY_DATA_TRANSPORTS[0]
+    if text not in COPY_DATA_TRANSPORTS:
+        raise ValueError("Copy transport must be rsync or pack.")
+    return text
+
+
 def _copy_data_schedules_file() -> Path:
     """Return the owner-only persistent Copy Data schedule file."""
 
@@ -1618,6 +1633,7 @@ def _normalize_copy_data_schedule(request: dict[str, Any]) -> dict[str, Any]:
         "ssh_command": payload["ssh_command"],
         "destination_root": payload["destination_root"],
         "exchanges": payload["exchanges"],
+        "transport": payload["transport"],
         "interval_hours": interval_hours,
         "enabled": enabled,
         "created_at": existing.get("created_at") or now,
@@ -1831,7 +1847,7 @@ def _queue_copy_data_job_response(
 
     append_exchange_download_log(
         "ohlcv",
-        f"[{job_type}] queued job_id={job.job_id} target={payload['target']} exchanges={','.join(exchanges)} mode={payload['mode']}",
+        f"[{job_type}] queued job_id={job.job_id} target={payload['target']} exchanges={','.join(exchanges)} mode={payload['mode']} transport={payload['transport']}",
     )
 
     worker_started = False
@@ -1864,6 +1880,7 @@ def _queue_copy_data_job_response(
         "destination_root": payload["destination_root"],
         "exchanges": exchanges,
         "mode": payload["mode"],
+        "transport": payload["transport"],
         "worker_started": worker_started,
         "runner_started": runner_started,
         "message": (
@@ -4257,8 +4274,23 @@ def clear_inventory_dataset(
         return {"success": False, "error": str(exc)}
 
 
+def _market_data_status_version() -> tuple:
+    """Change key: PBData snapshot revision, run-now flags and the enabled-coins config."""
+    return (
+        _market_data_status_revision,
+        path_stamp(PBGDIR / "data" / "logs", get_market_data_config_path()),
+    )
+
+
+_status_cache = ConditionalCache("market_data.get_market_data_status", version=_market_data_status_version, max_age=30.0)
+
+
 @router.get("/status/{exchange}")
-def get_market_data_status(exchange: str, session: SessionToken = Depends(require_auth)) -> dict[str, Any]:
+def get_market_data_status(
+    exchange: str,
+    session: SessionToken = Depends(require_auth),
+    cache: CachedResponder = Depends(_status_cache),
+) -> dict[str, Any]:
     """
     Get market data daemon status for a specific exchange.
     
@@ -4275,39 +4307,42 @@ def get_market_data_status(exchange: str, session: SessionToken = Depends(requir
             "coins": {...}  # Per-coin details
         }
     """
-    exchange_clean = exchange.lower().strip()
-    status_key = _get_exchange_status_key(exchange_clean)
-    flag_prefix = _get_exchange_flag_prefix(exchange_clean)
-    
-    if not status_key or not flag_prefix:
+    def build() -> dict[str, Any]:
+        exchange_clean = exchange.lower().strip()
+        status_key = _get_exchange_status_key(exchange_clean)
+        flag_prefix = _get_exchange_flag_prefix(exchange_clean)
+
+        if not status_key or not flag_prefix:
+            return {
+                "exchange": exchange_clean,
+                "error": "Unknown exchange",
+                "running": False,
+                "queued": False,
+            }
+
+        # Load status
+        all_status = _load_market_data_status()
+        exchange_status = _filter_status_coins_to_enabled(exchange_clean, all_status.get(status_key, {}))
+
+        # Check flags
+        flag_path = PBGDIR / "data" / "logs" / f"{flag_prefix}_run_now.flag"
+        queued = flag_path.exists()
+        running = bool(exchange_status.get("running", False))
+
         return {
             "exchange": exchange_clean,
-            "error": "Unknown exchange",
-            "running": False,
-            "queued": False,
+            "status_key": status_key,
+            "running": running,
+            "queued": queued,
+            "coins_done": int(exchange_status.get("coins_done", 0)),
+            "coins_total": int(exchange_status.get("coins_total", 0)),
+            "current_coin": exchange_status.get("current_coin", ""),
+            "interval_seconds": int(exchange_status.get("interval_seconds", 0)),
+            "coins": exchange_status.get("coins", {}),
+            "status": exchange_status,
         }
-    
-    # Load status
-    all_status = _load_market_data_status()
-    exchange_status = _filter_status_coins_to_enabled(exchange_clean, all_status.get(status_key, {}))
-    
-    # Check flags
-    flag_path = PBGDIR / "data" / "logs" / f"{flag_prefix}_run_now.flag"
-    queued = flag_path.exists()
-    running = bool(exchange_status.get("running", False))
-    
-    return {
-        "exchange": exchange_clean,
-        "status_key": status_key,
-        "running": running,
-        "queued": queued,
-        "coins_done": int(exchange_status.get("coins_done", 0)),
-        "coins_total": int(exchange_status.get("coins_total", 0)),
-        "current_coin": exchange_status.get("current_coin", ""),
-        "interval_seconds": int(exchange_status.get("interval_seconds", 0)),
-        "coins": exchange_status.get("coins", {}),
-        "status": exchange_status,
-    }
+
+    return respond(cache, build)
 
 
 @router.post("/refresh-now")
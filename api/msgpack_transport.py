@@ -0,0 +1,143 @@
+"""
+Binary MessagePack transport for high-volume API endpoints.
+
+Endpoints that return large lists of records (income rows, positions,
+Pareto result payloads, heatmap minute data) can opt into content
+negotiation: when the client sends ``Accept: application/msgpack`` the
+payload is packed with msgpack and every homogeneous list of dicts is
+rewritten into a columnar shape::
+
+    {"__columnar__": ["id", "symbol"], "values": [[1, 2], ["BTC", "ETH"]]}
+
+Column names are sent once and each column is one array of values, which
+cuts both serialization CPU and payload size over slow links.  Clients
+without the header keep receiving the unchanged JSON payload.
+
+The matching browser decoder lives in ``frontend/js/pbgui_msgpack.js``
+and restores the original list-of-objects shape, so page code does not
+need to know which transport was used.
+"""
+from __future__ import annotations
+
+from typing import Any
+
+import msgpack
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+_MSGPACK_MEDIA_TYPES = frozenset({"application/msgpack", "application/x-msgpack", "application/vnd.msgpack"})
+
+COLUMNAR_MARKER = "__columnar__"
+# Lists shorter than this stay row-oriented: the column header would not pay off.
+COLUMNAR_MIN_ROWS = 8
+
+
+def accepts_msgpack(request: Request | None) -> bool:
+    """Return True when the request's Accept header asks for msgpack (q > 0)."""
+    if request is None:
+        return False
+    try:
+        accept = str(request.headers.get("accept") or "")
+    except Exception:
+        return False
+    for part in accept.split(","):
+        media, _, params = part.strip().partition(";")
+        if media.strip().lower() not in _MSGPACK_MEDIA_TYPES:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        return quality > 0
+    return False
+
+
+def to_columnar(rows: list[Any]) -> dict[str, Any] | None:
+    """Convert a homogeneous list of dicts to the columnar shape.
+
+    Returns None when *rows* is too short, not a list of dicts, or the dicts
+    do not all share the same key set.
+    """
+    if len(rows) < COLUMNAR_MIN_ROWS:
+        return None
+    first = rows[0]
+    if not isinstance(first, dict) or not first or COLUMNAR_MARKER in first:
+        return None
+    columns = list(first.keys())
+    if not all(isinstance(name, str) for name in columns):
+        return None
+    key_set = first.keys()
+    for row in rows:
+        if not isinstance(row, dict) or len(row) != len(columns) or row.keys() != key_set:
+            return None
+    values = [[columnarize(row[name]) for row in rows] for name in columns]
+    return {COLUMNAR_MARKER: columns, "values": values}
+
+
+def from_columnar(block: dict[str, Any]) -> list[dict[str, Any]]:
+    """Inverse of :func:`to_columnar` (used by tests and Python clients)."""
+    columns = list(block.get(COLUMNAR_MARKER) or [])
+    values = list(block.get("values") or [])
+    if not columns:
+        return []
+    return [
+        {name: column[index] for name, column in zip(columns, values)}
+        for index in range(len(values[0]))
+    ]
+
+
+def columnarize(payload: Any) -> Any:
+    """Recursively rewrite lists of homogeneous dicts into columnar blocks."""
+    if isinstance(payload, dict):
+        return {key: columnarize(value) for key, value in payload.items()}
+    if isinstance(payload, (list, tuple)):
+        if not payload:
+            return list(payload)
+        first = payload[0]
+        if isinstance(first, dict):
+            block = to_columnar(list(payload))
+            if block is not None:
+                return block
+        elif not isinstance(first, (list, tuple)):
+            # Flat scalar arrays (chart x/y series) are already columnar.
+            return payload
+        return [columnarize(item) for item in payload]
+    return payload
+
+
+def _msgpack_default(value: Any) -> Any:
+    """Fallback encoder for numpy/pandas scalars and other non-native types."""
+    tolist = getattr(value, "tolist", None)
+    if callable(tolist):
+        return tolist()
+    item = getattr(value, "item", None)
+    if callable(item):
+        return item()
+    return jsonable_encoder(value)
+
+
+def pack_payload(payload: Any, *, columnar: bool = True) -> bytes:
+    """Serialize *payload* to msgpack bytes, optionally columnarized."""
+    body = columnarize(payload) if columnar else payload
+    return msgpack.packb(body, use_bin_type=True, default=_msgpack_default)
+
+
+def negotiate(request: Request | None, payload: Any, *, columnar: bool = True) -> Any:
+    """Return a msgpack Response when the client accepts it, else *payload*.
+
+    Returning the payload unchanged keeps FastAPI's default JSON encoding for
+    every existing client.
+    """
+    if not accepts_msgpack(request):
+        return payload
+    return Response(
+        content=pack_payload(payload, columnar=columnar),
+        media_type=MSGPACK_MEDIA_TYPE,
+        headers={"Vary": "Accept"},
+    )
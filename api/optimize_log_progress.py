@@ -0,0 +1,172 @@
+"""Incremental optimize-log progress tracking for the v7/v8 queue status pages.
+
+The queue status endpoints used to re-read a 32 KB head + 512 KB tail of the
+optimize log and run the progress regexes over every line on every poll.
+:class:`OptimizeLogProgressTracker` instead folds only the bytes appended
+since the previous poll into a structured summary and persists the summary
+together with the byte offset next to the log::
+
+    <log dir>/.progress/<log name>.json
+
+so polling cost is proportional to new output, not to log size, and a
+restarted API process resumes from the stored offset.  A replaced, rotated
+or truncated log (different inode, shorter than the offset, or a different
+first line) starts a fresh summary.  The first pass over an existing large
+log reads the same head + tail window as the old excerpt reader.
+
+The summary shape and the per-line parsing stay in the optimize modules: a
+tracker is built from a ``new_summary()`` factory and an
+``apply_line(summary, line)`` step.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import threading
+from pathlib import Path
+from typing import Any, Callable
+
+from secure_files import atomic_write_private_text
+
+PROGRESS_DIRNAME = ".progress"
+HEAD_BYTES = 32 * 1024
+TAIL_BYTES = 512 * 1024
+_READ_CHUNK = 256 * 1024
+_FINGERPRINT_BYTES = 256
+_RECORD_VERSION = 1
+
+
+def _progress_path(log_path: Path) -> Path:
+    return log_path.parent / PROGRESS_DIRNAME / f"{log_path.name}.json"
+
+
+def _fingerprint(handle) -> str:
+    handle.seek(0)
+    head = handle.read(_FINGERPRINT_BYTES)
+    return hashlib.sha256(head.split(b"\n", 1)[0]).hexdigest()[:16]
+
+
+class OptimizeLogProgressTracker:
+    """Fold appended optimize-log lines into a persisted progress summary."""
+
+    def __init__(
+        self,
+        new_summary: Callable[[], dict],
+        apply_line: Callable[[dict, str], None],
+        *,
+        head_bytes: int = HEAD_BYTES,
+        tail_bytes: int = TAIL_BYTES,
+    ) -> None:
+        self._new_summary = new_summary
+        self._apply_line = apply_line
+        self._head_bytes = head_bytes
+        self._tail_bytes = tail_bytes
+        self._lock = threading.Lock()
+        self._records: dict[str, dict[str, Any]] = {}
+
+    def summary(self, log_path: Path) -> dict:
+        """Return the progress summary of *log_path*, reading only new bytes."""
+        log_path = Path(log_path)
+        try:
+            if not log_path.is_file() or log_path.is_symlink():
+                return self._new_summary()
+            stat = log_path.stat()
+        except OSError:
+            return self._new_summary()
+        key = str(log_path)
+        with self._lock:
+            record = self._records.get(key)
+            if record is None:
+                record = self._load_record(log_path)
+            if record is not None and (record["inode"], record["size"], record["mtime_ns"]) == (stat.st_ino, stat.st_size, stat.st_mtime_ns):
+                return self._with_pending(record)
+            try:
+                record = self._advance(log_path, stat, record)
+            except OSError:
+                return self._new_summary()
+            self._records[key] = record
+            self._save_record(log_path, record)
+            return self._with_pending(record)
+
+    def forget(self, log_path: Path) -> None:
+        """Drop the cached and persisted progress of a removed log."""
+        log_path = Path(log_path)
+        with self._lock:
+            self._records.pop(str(log_path), None)
+        _progress_path(log_path).unlink(missing_ok=True)
+
+    # ── Internal ──
+
+    def _with_pending(self, record: dict[str, Any]) -> dict:
+        summary = copy.deepcopy(record["summary"])
+        # An unterminated last line is shown but not committed to the offset.
+        if record["pending"]:
+            self._apply_line(summary, record["pending"])
+        return summary
+
+    def _fold(self, summary: dict, data: bytes) -> None:
+        for raw_line in data.decode("utf-8", errors="ignore").splitlines():
+            self._apply_line(summary, raw_line)
+
+    def _advance(self, log_path: Path, stat, record: dict[str, Any] | None) -> dict[str, Any]:
+        with log_path.open("rb") as handle:
+            fingerprint = _fingerprint(handle)
+            if (
+                record is not None
+                and record["inode"] == stat.st_ino
+                and record["fingerprint"] == fingerprint
+                and stat.st_size >= record["offset"]
+            ):
+                summary = copy.deepcopy(record["summary"])
+                offset = record["offset"]
+            else:
+                summary = self._new_summary()
+                offset = 0
+                if stat.st_size > self._head_bytes + self._tail_bytes:
+                    handle.seek(0)
+                    head = handle.read(self._head_bytes)
+                    self._fold(summary, head[:head.rfind(b"\n") + 1])
+                    handle.seek(stat.st_size - self._tail_bytes)
+                    offset = stat.st_size - self._tail_bytes + len(handle.readline())
+            handle.seek(offset)
+            carry = b""
+            while True:
+                chunk = handle.read(_READ_CHUNK)
+                if not chunk:
+                    break
+                data = carry + chunk
+                cut = data.rfind(b"\n") + 1
+                self._fold(summary, data[:cut])
+                offset += cut
+                carry = data[cut:]
+            pending = carry.decode("utf-8", errors="ignore")
+        return {
+            "version": _RECORD_VERSION,
+            "inode": stat.st_ino,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "fingerprint": fingerprint,
+            "offset": offset,
+            "pending": pending,
+            "summary": summary,
+        }
+
+    def _load_record(self, log_path: Path) -> dict[str, Any] | None:
+        try:
+            record = json.loads(_progress_path(log_path).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if not isinstance(record, dict) or record.get("version") != _RECORD_VERSION:
+            return None
+        summary = record.get("summary")
+        if not isinstance(summary, dict) or set(summary) != set(self._new_summary()):
+            return None
+        return record
+
+    def _save_record(self, log_path: Path, record: dict[str, Any]) -> None:
+        try:
+            atomic_write_private_text(_progress_path(log_path), json.dumps(record, separators=(",", ":")))
+        except OSError:
+            pass
@@ -35,6 +35,7 @@ from fastapi.responses import HTMLResponse, Response
 
 from api.archive_helpers import ensure_config_version
 from api.auth import SessionToken, authenticate_websocket, require_auth
+from api.optimize_log_progress import OptimizeLogProgressTracker
 from api.pb7_bridge import (
     get_bot_param_keys,
     get_hsl_signal_modes,
@@ -577,29 +578,8 @@ def _parse_log_number(value) -> Optional[float]:
         return None
 
 
-def _read_optimize_log_excerpt(log_path: Path, *, head_kb: int = 32, tail_kb: int = 512) -> str:
-    if not log_path.exists():
-        return ""
-    try:
-        with open(log_path, "rb") as handle:
-            handle.seek(0, 2)
-            file_size = handle.tell()
-            head_bytes = max(0, head_kb * 1024)
-            tail_bytes = max(0, tail_kb * 1024)
-            if file_size <= head_bytes + tail_bytes + 1:
-                handle.seek(0)
-                return handle.read().decode("utf-8", errors="ignore")
-            handle.seek(0)
-            head = handle.read(head_bytes).decode("utf-8", errors="ignore")
-            handle.seek(max(file_size - tail_bytes, 0))
-            tail = handle.read().decode("utf-8", errors="ignore")
-            return head + "\n...\n" + tail
-    except Exception:
-        return ""
-
-
-def _parse_optimize_log_summary(log_text: str) -> dict:
-    summary = {
+def _new_optimize_log_summary() -> dict:
+    return {
         "phase": "queued",
         "backend": None,
         "algorithm": None,
@@ -623,86 +603,89 @@ def _parse_optimize_log_summary(log_text: str) -> dict:
         "last_line": "",
         "last_error": None,
     }
-    for raw_line in (log_text or "").splitlines():
-        line = raw_line.strip()
-        if not line or line == "...":
-            continue
-        message = line
-        match = _OPT_LOG_LINE_RE.match(line)
-        if match:
-            message = match.group("msg").strip()
-            summary["last_log_at"] = match.group("ts")
-            summary["last_line"] = message
-            if match.group("level") in {"ERROR", "CRITICAL"}:
-                summary["last_error"] = message
-                summary["phase"] = "error"
-
-        backend_match = _OPT_LOG_BACKEND_RE.search(message)
-        if backend_match:
-            summary["backend"] = backend_match.group("backend").lower()
-
-        loaded_match = _OPT_LOG_STARTING_CONFIGS_RE.search(message)
-        if loaded_match:
-            summary["starting_configs_loaded"] = int(loaded_match.group("loaded"))
-            summary["population_size"] = int(loaded_match.group("population"))
-            summary["phase"] = "initializing"
-
-        progress_match = _OPT_LOG_STARTING_PROGRESS_RE.search(message)
-        if progress_match:
-            summary["starting_configs_done"] = int(progress_match.group("done"))
-            summary["starting_configs_total"] = int(progress_match.group("total"))
-            summary["phase"] = "evaluating_starts"
-
-        done_match = _OPT_LOG_STARTING_DONE_RE.search(message)
-        if done_match and summary["starting_configs_done"] is None:
-            summary["starting_configs_done"] = int(done_match.group("done"))
-
-        pymoo_match = _OPT_LOG_PYMOO_RE.search(message)
-        if pymoo_match:
-            summary["algorithm"] = pymoo_match.group("algorithm").lower()
-            summary["objective_count"] = int(pymoo_match.group("n_obj"))
-            summary["ref_dirs"] = int(pymoo_match.group("ref_dirs"))
-            summary["n_partitions"] = int(pymoo_match.group("n_partitions"))
-            summary["n_partitions_mode"] = pymoo_match.group("mode").strip().lower()
-            summary["phase"] = "optimizing"
-
-        iter_match = _OPT_LOG_ITER_RE.search(message)
-        if iter_match:
-            summary["iter"] = int(iter_match.group("iter"))
-            summary["pareto_added"] = int(iter_match.group("added"))
-            summary["pareto_removed"] = int(iter_match.group("removed"))
-            summary["front"] = int(iter_match.group("size"))
-            ranges = {}
-            for range_match in _OPT_LOG_RANGE_RE.finditer(iter_match.group("ranges")):
-                name = range_match.group("name")
-                ranges[name] = {
-                    "min": _parse_log_number(range_match.group("min")),
-                    "max": _parse_log_number(range_match.group("max")),
-                }
-            if ranges:
-                summary["objective_ranges"] = ranges
-            summary["phase"] = "optimizing"
-
-        pareto_match = _OPT_LOG_PARETO_UPDATE_RE.search(message)
-        if pareto_match:
-            summary["eval"] = int(pareto_match.group("eval"))
-            summary["front"] = int(pareto_match.group("front"))
-            objectives = {}
-            for objective_match in _OPT_LOG_OBJECTIVE_RE.finditer(pareto_match.group("objectives")):
-                objectives[objective_match.group("name")] = _parse_log_number(objective_match.group("value"))
-            if objectives:
-                summary["objectives"] = objectives
-            summary["constraint"] = _parse_log_number(pareto_match.group("constraint"))
-            summary["phase"] = "optimizing"
-
-        if "Finished preparing hlcvs data" in message or "Finished initializing evaluator" in message:
-            summary["phase"] = "initializing"
-        elif message.startswith("Starting optimize"):
-            summary["phase"] = "optimizing"
-        elif "Optimization complete" in message or "successfully processed optimize_results" in message:
-            summary["phase"] = "complete"
 
-    return summary
+
+def _apply_optimize_log_summary_line(summary: dict, raw_line: str) -> None:
+    line = raw_line.strip()
+    if not line or line == "...":
+        return
+    message = line
+    match = _OPT_LOG_LINE_RE.match(line)
+    if match:
+        message = match.group("msg").strip()
+        summary["last_log_at"] = match.group("ts")
+        summary["last_line"] = message
+        if match.group("level") in {"ERROR", "CRITICAL"}:
+            summary["last_error"] = message
+            summary["phase"] = "error"
+
+    backend_match = _OPT_LOG_BACKEND_RE.search(message)
+    if backend_match:
+        summary["backend"] = backend_match.group("backend").lower()
+
+    loaded_match = _OPT_LOG_STARTING_CONFIGS_RE.search(message)
+    if loaded_match:
+        summary["starting_configs_loaded"] = int(loaded_match.group("loaded"))
+        summary["population_size"] = int(loaded_match.group("population"))
+        summary["phase"] = "initializing"
+
+    progress_match = _OPT_LOG_STARTING_PROGRESS_RE.search(message)
+    if progress_match:
+        summary["starting_configs_done"] = int(progress_match.group("done"))
+        summary["starting_configs_total"] = int(progress_match.group("total"))
+        summary["phase"] = "evaluating_starts"
+
+    done_match = _OPT_LOG_STARTING_DONE_RE.search(message)
+    if done_match and summary["starting_configs_done"] is None:
+        summary["starting_configs_done"] = int(done_match.group("done"))
+
+    pymoo_match = _OPT_LOG_PYMOO_RE.search(message)
+    if pymoo_match:
+        summary["algorithm"] = pymoo_match.group("algorithm").lower()
+        summary["objective_count"] = int(pymoo_match.group("n_obj"))
+        summary["ref_dirs"] = int(pymoo_match.group("ref_dirs"))
+        summary["n_partitions"] = int(pymoo_match.group("n_partitions"))
+        summary["n_partitions_mode"] = pymoo_match.group("mode").strip().lower()
+        summary["phase"] = "optimizing"
+
+    iter_match = _OPT_LOG_ITER_RE.search(message)
+    if iter_match:
+        summary["iter"] = int(iter_match.group("iter"))
+        summary["pareto_added"] = int(iter_match.group("added"))
+        summary["pareto_removed"] = int(iter_match.group("removed"))
+        summary["front"] = int(iter_match.group("size"))
+        ranges = {}
+        for range_match in _OPT_LOG_RANGE_RE.finditer(iter_match.group("ranges")):
+            name = range_match.group("name")
+            ranges[name] = {
+                "min": _parse_log_number(range_match.group("min")),
+                "max": _parse_log_number(range_match.group("max")),
+            }
+        if ranges:
+            summary["objective_ranges"] = ranges
+        summary["phase"] = "optimizing"
+
+    pareto_match = _OPT_LOG_PARETO_UPDATE_RE.search(message)
+    if pareto_match:
+        summary["eval"] = int(pareto_match.group("eval"))
+        summary["front"] = int(pareto_match.group("front"))
+        objectives = {}
+        for objective_match in _OPT_LOG_OBJECTIVE_RE.finditer(pareto_match.group("objectives")):
+            objectives[objective_match.group("name")] = _parse_log_number(objective_match.group("value"))
+        if objectives:
+            summary["objectives"] = objectives
+        summary["constraint"] = _parse_log_number(pareto_match.group("constraint"))
+        summary["phase"] = "optimizing"
+
+    if "Finished preparing hlcvs data" in message or "Finished initializing evaluator" in message:
+        summary["phase"] = "initializing"
+    elif message.startswith("Starting optimize"):
+        summary["phase"] = "optimizing"
+    elif "Optimization complete" in message or "successfully processed optimize_results" in message:
+        summary["phase"] = "complete"
+
+
+_log_progress = OptimizeLogProgressTracker(_new_optimize_log_summary, _apply_optimize_log_summary_line)
 
 
 def _collect_optimize_process_stats(pid: Optional[int]) -> dict:
@@ -943,8 +926,7 @@ def _collect_optimize_system_stats() -> dict:
 def _build_optimize_runtime_status(item: dict) -> dict:
     log_path = Path(str(item.get("log_path") or ""))
     _store._migrate_old_log(str(item.get("filename") or ""), log_path)
-    log_excerpt = _read_optimize_log_excerpt(log_path)
-    log_summary = _parse_optimize_log_summary(log_excerpt)
+    log_summary = _log_progress.summary(log_path)
 
     config_meta = {
         "backend": None,
@@ -2795,6 +2777,7 @@ def _unlink_queue_item_files(filename: str) -> None:
     (_opt_queue_dir() / f"{filename}.json").unlink(missing_ok=True)
     (_opt_queue_dir() / f"{filename}.pid").unlink(missing_ok=True)
     (_opt_log_dir() / f"{filename}.log").unlink(missing_ok=True)
+    _log_progress.forget(_opt_log_dir() / f"{filename}.log")
     (_opt_queue_dir() / f"{filename}.log").unlink(missing_ok=True)
     _store.items.pop(filename, None)
 
@@ -2941,6 +2924,7 @@ def requeue_queue_item(filename: str, session: SessionToken = Depends(require_au
     # Reset status by removing runtime artifacts.
     (_opt_queue_dir() / f"{filename}.pid").unlink(missing_ok=True)
     (_opt_log_dir() / f"{filename}.log").unlink(missing_ok=True)
+    _log_progress.forget(_opt_log_dir() / f"{filename}.log")
     (_opt_queue_dir() / f"{filename}.log").unlink(missing_ok=True)
 
     _store.notify()
@@ -3066,6 +3050,7 @@ def clear_finished(session: SessionToken = Depends(require_auth)):
             (_opt_queue_dir() / f"{filename}.json").unlink(missing_ok=True)
             (_opt_queue_dir() / f"{filename}.pid").unlink(missing_ok=True)
             (_opt_log_dir() / f"{filename}.log").unlink(missing_ok=True)
+            _log_progress.forget(_opt_log_dir() / f"{filename}.log")
             (_opt_queue_dir() / f"{filename}.log").unlink(missing_ok=True)
             removed += 1
     _store.notify()
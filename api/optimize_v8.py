@@ -30,6 +30,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Request, WebSocket
 from fastapi.responses import HTMLResponse, Response
 
 from api.auth import SessionToken, authenticate_websocket, require_auth
+from api.optimize_log_progress import OptimizeLogProgressTracker
 from api.pb8_ohlcv_tools import (
     PB8OhlcvUnavailableError,
     build_pb8_ohlcv_preflight,
@@ -3558,6 +3559,7 @@ def _remove_queue_item(filename: str, *, require_exists: bool = True) -> bool:
     _state_file(filename).unlink(missing_ok=True)
     _ready_file(filename).unlink(missing_ok=True)
     (_log_dir() / f"{filename}.log").unlink(missing_ok=True)
+    _log_progress.forget(_log_dir() / f"{filename}.log")
     rmtree(_snapshot_dir(filename), ignore_errors=True)
     rmtree(_launch_dir(filename), ignore_errors=True)
     return True
@@ -3608,24 +3610,6 @@ def get_queue_log(filename: str, lines: int = 100, session: SessionToken = Depen
         return {"log": handle.read().decode("utf-8", errors="ignore"), "exists": True}
 
 
-def _read_optimize_log_excerpt(path: Path, head_bytes: int = 32 * 1024, tail_bytes: int = 512 * 1024) -> str:
-    if not path.is_file() or path.is_symlink():
-        return ""
-    try:
-        with path.open("rb") as handle:
-            handle.seek(0, 2)
-            size = handle.tell()
-            if size <= head_bytes + tail_bytes:
-                handle.seek(0)
-                return handle.read().decode("utf-8", errors="ignore")
-            handle.seek(0)
-            head = handle.read(head_bytes)
-            handle.seek(size - tail_bytes)
-            return head.decode("utf-8", errors="ignore") + "\n...\n" + handle.read().decode("utf-8", errors="ignore")
-    except OSError:
-        return ""
-
-
 def _parse_log_number(value) -> float | None:
     try:
         return float(str(value).strip())
@@ -3633,8 +3617,8 @@ def _parse_log_number(value) -> float | None:
         return None
 
 
-def _parse_optimize_log_status(text: str) -> dict:
-    summary = {
+def _new_optimize_log_status() -> dict:
+    return {
         "phase": "queued",
         "backend": None,
         "algorithm": None,
@@ -3648,58 +3632,62 @@ def _parse_optimize_log_status(text: str) -> dict:
         "last_line": "",
         "last_error": None,
     }
-    for raw_line in text.splitlines():
-        line = raw_line.strip()
-        if not line or line == "...":
-            continue
-        message = line
-        match = _OPT_LOG_LINE_RE.match(line)
-        if match:
-            message = match.group("msg").strip()
-            summary["last_log_at"] = match.group("ts")
-            if str(match.group("level") or "").upper() in {"ERROR", "CRITICAL"}:
-                summary["last_error"] = message
-                summary["phase"] = "error"
-        summary["last_line"] = message
-        backend = _OPT_LOG_BACKEND_RE.search(message)
-        if backend:
-            summary["backend"] = backend.group("backend").lower()
-        pymoo = _OPT_LOG_PYMOO_RE.search(message)
-        if pymoo:
-            summary["algorithm"] = pymoo.group("algorithm").lower()
-            if pymoo.group("n_obj"):
-                summary["objective_count"] = int(pymoo.group("n_obj"))
-            summary["phase"] = "optimizing"
-        iteration = _OPT_LOG_ITER_RE.search(message)
-        if iteration:
-            summary["iter"] = int(iteration.group("iter"))
-            summary["front"] = int(iteration.group("size"))
-            ranges = iteration.group("ranges") or ""
-            for found in _OPT_LOG_RANGE_RE.finditer(ranges):
-                summary["ranges"][found.group("name")] = {
-                    "min": _parse_log_number(found.group("min")),
-                    "max": _parse_log_number(found.group("max")),
-                }
-            summary["phase"] = "optimizing"
-        evaluation = _OPT_LOG_EVAL_RE.search(message)
-        if evaluation:
-            summary["evaluations"] = int(evaluation.group("eval"))
-            summary["phase"] = "optimizing"
-        objective_block = re.search(r"objectives=\[([^\]]*)\]", message, re.IGNORECASE)
-        if objective_block:
-            for raw_objective in objective_block.group(1).split(","):
-                name, separator, value = raw_objective.partition("=")
-                numeric = _parse_log_number(value)
-                if separator and name.strip() and numeric is not None:
-                    summary["objectives"][name.strip()] = numeric
-        lower = message.lower()
-        if "optimization complete" in lower or "successfully processed optimize_results" in lower:
-            summary["phase"] = "complete"
-        elif "starting optimize" in lower and summary["phase"] == "queued":
-            summary["phase"] = "optimizing"
-        elif "initializ" in lower and summary["phase"] == "queued":
-            summary["phase"] = "initializing"
-    return summary
+
+
+def _apply_optimize_log_status_line(summary: dict, raw_line: str) -> None:
+    line = raw_line.strip()
+    if not line or line == "...":
+        return
+    message = line
+    match = _OPT_LOG_LINE_RE.match(line)
+    if match:
+        message = match.group("msg").strip()
+        summary["last_log_at"] = match.group("ts")
+        if str(match.group("level") or "").upper() in {"ERROR", "CRITICAL"}:
+            summary["last_error"] = message
+            summary["phase"] = "error"
+    summary["last_line"] = message
+    backend = _OPT_LOG_BACKEND_RE.search(message)
+    if backend:
+        summary["backend"] = backend.group("backend").lower()
+    pymoo = _OPT_LOG_PYMOO_RE.search(message)
+    if pymoo:
+        summary["algorithm"] = pymoo.group("algorithm").lower()
+        if pymoo.group("n_obj"):
+            summary["objective_count"] = int(pymoo.group("n_obj"))
+        summary["phase"] = "optimizing"
+    iteration = _OPT_LOG_ITER_RE.search(message)
+    if iteration:
+        summary["iter"] = int(iteration.group("iter"))
+        summary["front"] = int(iteration.group("size"))
+        ranges = iteration.group("ranges") or ""
+        for found in _OPT_LOG_RANGE_RE.finditer(ranges):
+            summary["ranges"][found.group("name")] = {
+                "min": _parse_log_number(found.group("min")),
+                "max": _parse_log_number(found.group("max")),
+            }
+        summary["phase"] = "optimizing"
+    evaluation = _OPT_LOG_EVAL_RE.search(message)
+    if evaluation:
+        summary["evaluations"] = int(evaluation.group("eval"))
+        summary["phase"] = "optimizing"
+    objective_block = re.search(r"objectives=\[([^\]]*)\]", message, re.IGNORECASE)
+    if objective_block:
+        for raw_objective in objective_block.group(1).split(","):
+            name, separator, value = raw_objective.partition("=")
+            numeric = _parse_log_number(value)
+            if separator and name.strip() and numeric is not None:
+                summary["objectives"][name.strip()] = numeric
+    lower = message.lower()
+    if "optimization complete" in lower or "successfully processed optimize_results" in lower:
+        summary["phase"] = "complete"
+    elif "starting optimize" in lower and summary["phase"] == "queued":
+        summary["phase"] = "optimizing"
+    elif "initializ" in lower and summary["phase"] == "queued":
+        summary["phase"] = "initializing"
+
+
+_log_progress = OptimizeLogProgressTracker(_new_optimize_log_status, _apply_optimize_log_status_line)
 
 
 def _verified_process_stats(filename: str) -> dict:
@@ -3781,7 +3769,7 @@ def get_queue_status(filename: str, session: SessionToken = Depends(require_auth
         raise HTTPException(status_code=404, detail="Queue item not found")
     state = _read_runner_state(filename) or {}
     log_path = _safe_path(_log_dir() / f"{filename}.log", _log_dir())
-    log_summary = _parse_optimize_log_status(_read_optimize_log_excerpt(log_path))
+    log_summary = _log_progress.summary(log_path)
     config = {}
     for path in (_launch_config_file(filename), _snapshot_file(filename)):
         try:
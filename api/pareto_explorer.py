@@ -23,6 +23,7 @@ import numpy as np
 import pandas as pd
 
 from api.auth import SessionToken, require_auth
+from api.msgpack_transport import negotiate
 from ParetoDataLoader import ParetoDataLoader
 from pareto_preset_generator import OPTIMIZE_PRESET_DIRECTIONS, build_optimize_preset
 from pbgui_purefunc import PBGUI_SERIAL, PBGUI_VERSION, load_ini, pb7dir, pb8_runtime_status, save_ini_section
@@ -3804,7 +3805,7 @@ def get_deep_intelligence_correlations(body: dict, session: SessionToken = Depen
 
 
 @router.post("/load")
-def load_result_data(body: dict, session: SessionToken = Depends(require_auth)):
+def load_result_data(request: Request, body: dict, session: SessionToken = Depends(require_auth)):
     result_path = str((body or {}).get("result_path") or "").strip()
     if not result_path:
         raise HTTPException(status_code=400, detail="Missing result_path")
@@ -3848,7 +3849,7 @@ def load_result_data(body: dict, session: SessionToken = Depends(require_auth)):
             payload["ok"] = True
             payload["status"] = "complete"
             payload["cache_hit"] = True
-            return payload
+            return negotiate(request, payload)
 
     if all_results_loaded:
         job = _start_full_load_job(
@@ -3882,11 +3883,11 @@ def load_result_data(body: dict, session: SessionToken = Depends(require_auth)):
     )
     payload["ok"] = True
     payload["status"] = "complete"
-    return payload
+    return negotiate(request, payload)
 
 
 @router.get("/load-status")
-def get_load_status(job_id: str = Query(default="", description="Background full-load job id"), session: SessionToken = Depends(require_auth)):
+def get_load_status(request: Request, job_id: str = Query(default="", description="Background full-load job id"), session: SessionToken = Depends(require_auth)):
     job = _get_load_job(str(job_id or "").strip())
     if job is None:
         raise HTTPException(status_code=404, detail="Load job not found")
@@ -3894,9 +3895,9 @@ def get_load_status(job_id: str = Query(default="", description="Background full
     status = str(job.get("status") or "loading")
     if status == "complete" and payload is None:
         status = "loading"
-    return {
+    return negotiate(request, {
         "ok": True,
         "status": status,
         "job": _serialize_load_job(job),
         "payload": payload if status == "complete" else None,
-    }
+    })
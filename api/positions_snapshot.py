@@ -0,0 +1,143 @@
+"""
+Shared per-user position snapshots for the live stream, dashboard and charts.
+
+A snapshot holds a user's DB positions with their latest price and the
+DCA/TP classification of their open orders, built from one joined query
+(``Database.fetch_position_snapshot_rows``).  Snapshots are cached per user
+and reused until the user's ``live_state_version`` counter — bumped by
+triggers on every position/order/price write — moves, so the 30 s SSE poll,
+the dashboard positions table and chart position pushes share one query
+instead of one query per position.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from typing import Any
+
+_MAX_USERS = 256
+
+
+def classify_position_orders(orders: list, side: str) -> tuple[int, float, float]:
+    """Return DCA count, next DCA price, and next TP price for a position side."""
+    side = str(side).lower()
+    dca_side = "buy"
+    tp_side = "sell"
+    prefer_higher_dca = True
+    prefer_lower_tp = True
+    if side == "short":
+        dca_side = "sell"
+        tp_side = "buy"
+        prefer_higher_dca = False
+        prefer_lower_tp = False
+
+    dca = 0
+    next_dca = 0.0
+    next_tp = 0.0
+    for order in orders:
+        order_side = str(order[5]).lower()
+        order_price = order[4]
+        if order_side == dca_side:
+            dca += 1
+            if next_dca == 0 or (prefer_higher_dca and next_dca < order_price) or (not prefer_higher_dca and next_dca > order_price):
+                next_dca = order_price
+        elif order_side == tp_side:
+            if next_tp == 0 or (prefer_lower_tp and next_tp > order_price) or (not prefer_lower_tp and next_tp < order_price):
+                next_tp = order_price
+    return dca, next_dca, next_tp
+
+
+@dataclass(frozen=True)
+class PositionsSnapshot:
+    """One user's positions, prices and order classification at a DB version."""
+
+    user: str
+    version: int | None
+    positions: tuple[dict[str, Any], ...] = ()
+    prices: dict[str, float] = field(default_factory=dict)
+    orders: dict[str, tuple] = field(default_factory=dict)
+
+    def rows(self) -> list[dict[str, Any]]:
+        """Return position rows in the positions_data format (copies, safe to mutate)."""
+        return [dict(row) for row in self.positions]
+
+    def classify(self, symbol: str, side: str) -> tuple[int, float, float] | None:
+        """Classify DCA/TP for a symbol held in this snapshot, else None."""
+        orders = self.orders.get(symbol)
+        if orders is None:
+            return None
+        return classify_position_orders(orders, side)
+
+
+def build_snapshot(user_name: str, version: int | None, rows: list) -> PositionsSnapshot:
+    """Assemble a snapshot from ``fetch_position_snapshot_rows`` output."""
+    positions: dict[int, dict[str, Any]] = {}
+    position_orders: dict[int, list] = {}
+    prices: dict[str, float] = {}
+    orders_by_symbol: dict[str, list] = {}
+    for row in rows or []:
+        pos_id, symbol, size, upnl, entry, side, price = row[:7]
+        order = tuple(row[7:15])
+        if pos_id not in positions:
+            price = float(price) if price is not None else 0.0
+            prices[symbol] = price
+            positions[pos_id] = {
+                "user": user_name, "symbol": symbol,
+                "side": side if side is not None else "long",
+                "size": size, "upnl": round(upnl, 8),
+                "entry": entry, "price": price,
+                "pos_value": round(size * price, 2),
+            }
+            position_orders[pos_id] = []
+            orders_by_symbol.setdefault(symbol, [])
+        if order[0] is not None:
+            position_orders[pos_id].append(order)
+    for pos_id, row in positions.items():
+        orders = position_orders[pos_id]
+        orders_by_symbol[row["symbol"]] = orders
+        dca, next_dca, next_tp = classify_position_orders(orders, row["side"])
+        row.update({"dca": dca, "next_dca": next_dca, "next_tp": next_tp})
+    ordered = sorted(positions.values(), key=lambda item: item["symbol"])
+    return PositionsSnapshot(
+        user=user_name,
+        version=version,
+        positions=tuple(ordered),
+        prices=prices,
+        orders={symbol: tuple(orders) for symbol, orders in orders_by_symbol.items()},
+    )
+
+
+class PositionsSnapshotService:
+    """Cache one snapshot per (database, user) and rebuild it when the user's version moves."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._cache: dict[tuple[str, str], PositionsSnapshot] = {}
+        self.queries = 0
+        self.hits = 0
+
+    def get(self, db: Any, user_name: str) -> PositionsSnapshot:
+        """Return the current snapshot of *user_name*, querying only after a change."""
+        key = (str(getattr(db, "db", "")), user_name)
+        version = db.fetch_live_state_version(user_name)
+        with self._lock:
+            cached = self._cache.get(key)
+            if version is not None and cached is not None and cached.version == version:
+                self.hits += 1
+                return cached
+        snapshot = build_snapshot(user_name, version, db.fetch_position_snapshot_rows(user_name) or [])
+        with self._lock:
+            self.queries += 1
+            if version is not None:
+                if len(self._cache) >= _MAX_USERS and key not in self._cache:
+                    self._cache.pop(next(iter(self._cache)))
+                self._cache[key] = snapshot
+        return snapshot
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+
+positions_snapshots = PositionsSnapshotService()
@@ -0,0 +1,260 @@
+"""
+ETag / If-None-Match response caching for polling endpoints.
+
+Pages poll status endpoints every few seconds and usually get back the exact
+same payload.  :class:`ConditionalCache` is a FastAPI dependency that
+
+1. computes a cheap *version key* for the route (revision counters, file
+   mtimes — see :func:`path_stamp`) plus the request path and query string,
+2. answers ``304 Not Modified`` straight from the dependency when the client
+   already holds the ETag for that version, skipping the endpoint body,
+3. otherwise lets the endpoint build the payload once per version and keeps
+   the serialized JSON body in memory for other clients/tabs.
+
+ETags are content hashes of the serialized body, so when the version key moves
+but the rebuilt payload is byte-identical the client still gets a 304.
+
+Usage::
+
+    _jobs_cache = ConditionalCache("jobs.get_jobs", version=_jobs_version)
+
+    @router.get("/")
+    def get_jobs(..., session=Depends(require_auth), cache: CachedResponder = Depends(_jobs_cache)):
+        return cache.respond(lambda: {...})
+
+Declare the cache dependency after ``require_auth`` so authentication still
+runs before any cached body or 304 is served.  Per-route hit ratios are
+available from :func:`cache_stats`.
+"""
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Hashable, Iterable
+
+from fastapi import HTTPException, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+
+_CACHE_CONTROL = "private, no-cache"
+
+_registry: dict[str, "ConditionalCache"] = {}
+_registry_lock = threading.Lock()
+
+
+def path_stamp(*paths: Path | str, children: bool = False) -> tuple:
+    """Return a cheap change stamp for *paths* (mtime_ns + size per path).
+
+    With ``children=True`` every direct child of a directory is stat'ed too,
+    which catches in-place rewrites that do not touch the directory mtime.
+    Missing paths contribute ``None`` so creation/deletion changes the stamp.
+    """
+    stamp: list[Any] = []
+    for raw in paths:
+        path = os.fspath(raw)
+        try:
+            st = os.stat(path)
+        except OSError:
+            stamp.append((path, None))
+            continue
+        stamp.append((path, st.st_mtime_ns, st.st_size))
+        if children and os.path.isdir(path):
+            try:
+                with os.scandir(path) as entries:
+                    for entry in sorted(entries, key=lambda item: item.name):
+                        try:
+                            est = entry.stat()
+                        except OSError:
+                            continue
+                        stamp.append((entry.name, est.st_mtime_ns, est.st_size))
+            except OSError:
+                continue
+    return tuple(stamp)
+
+
+def _etag_for(body: bytes) -> str:
+    return 'W/"' + hashlib.blake2b(body, digest_size=10).hexdigest() + '"'
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    weak = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == weak:
+            return True
+    return False
+
+
+@dataclass
+class _Entry:
+    etag: str
+    body: bytes
+    created: float
+
+
+@dataclass
+class RouteCacheStats:
+    """Counters for one cached route."""
+
+    requests: int = 0
+    not_modified: int = 0
+    body_hits: int = 0
+    misses: int = 0
+    build_seconds: float = 0.0
+
+    @property
+    def hit_ratio(self) -> float:
+        if not self.requests:
+            return 0.0
+        return (self.not_modified + self.body_hits) / self.requests
+
+
+class CachedResponder:
+    """Per-request handle returned by :class:`ConditionalCache`."""
+
+    def __init__(self, cache: "ConditionalCache", key: Hashable, entry: _Entry | None, if_none_match: str | None):
+        self._cache = cache
+        self._key = key
+        self._entry = entry
+        self._if_none_match = if_none_match
+
+    def respond(self, build: Callable[[], Any]) -> Response:
+        """Serve the cached body for this version or build, cache and serve it."""
+        if self._entry is not None:
+            self._cache._count("body_hits")
+            return self._cache._body_response(self._entry)
+        started = time.perf_counter()
+        payload = build()
+        if isinstance(payload, Response):
+            # Endpoint chose its own response (errors, streaming): do not cache.
+            self._cache._count("misses", time.perf_counter() - started)
+            return payload
+        body = JSONResponse(content=jsonable_encoder(payload)).body
+        entry = _Entry(etag=_etag_for(body), body=body, created=time.monotonic())
+        self._cache._store(self._key, entry)
+        if _etag_matches(self._if_none_match, entry.etag):
+            self._cache._count("not_modified", time.perf_counter() - started)
+            return Response(status_code=304, headers=self._cache._headers(entry))
+        self._cache._count("misses", time.perf_counter() - started)
+        return self._cache._body_response(entry)
+
+
+class ConditionalCache:
+    """FastAPI dependency implementing version-keyed ETag caching for one route.
+
+    *version* returns any hashable value that changes whenever the payload may
+    change; ``None`` means "no cheap signal" and relies on *max_age* alone.
+    *max_age* (seconds, 0 = unlimited) bounds how long a cached body is reused
+    for the same version key, as a safety net for inputs the key cannot see.
+    """
+
+    def __init__(
+        self,
+        route: str,
+        version: Callable[[], Hashable] | None = None,
+        *,
+        max_age: float = 0.0,
+        max_entries: int = 16,
+    ):
+        self.route = route
+        self._version = version
+        self._max_age = float(max_age)
+        self._max_entries = max(1, int(max_entries))
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = RouteCacheStats()
+        with _registry_lock:
+            _registry[route] = self
+
+    def __call__(self, request: Request) -> CachedResponder:
+        try:
+            version = self._version() if self._version is not None else None
+        except Exception:
+            version = object()  # unique → never matches, always rebuild
+        key = (request.url.path, str(request.url.query), version)
+        if_none_match = request.headers.get("if-none-match")
+        now = time.monotonic()
+        with self._lock:
+            self.stats.requests += 1
+            entry = self._entries.get(key)
+            if entry is not None and self._max_age and now - entry.created > self._max_age:
+                self._entries.pop(key, None)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is not None and _etag_matches(if_none_match, entry.etag):
+            self._count("not_modified")
+            raise HTTPException(status_code=304, headers=self._headers(entry))
+        return CachedResponder(self, key, entry, if_none_match)
+
+    def invalidate(self) -> None:
+        """Drop all cached bodies (e.g. after a write through another route)."""
+        with self._lock:
+            self._entries.clear()
+
+    def _store(self, key: Hashable, entry: _Entry) -> None:
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def _count(self, name: str, build_seconds: float = 0.0) -> None:
+        with self._lock:
+            setattr(self.stats, name, getattr(self.stats, name) + 1)
+            self.stats.build_seconds += build_seconds
+
+    @staticmethod
+    def _headers(entry: _Entry) -> dict[str, str]:
+        return {"ETag": entry.etag, "Cache-Control": _CACHE_CONTROL}
+
+    def _body_response(self, entry: _Entry) -> Response:
+        return Response(content=entry.body, media_type="application/json", headers=self._headers(entry))
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return JSON-safe counters for this route."""
+        with self._lock:
+            stats = self.stats
+            return {
+                "route": self.route,
+                "requests": stats.requests,
+                "not_modified": stats.not_modified,
+                "body_hits": stats.body_hits,
+                "misses": stats.misses,
+                "hit_ratio": round(stats.hit_ratio, 4),
+                "build_seconds": round(stats.build_seconds, 3),
+                "entries": len(self._entries),
+                "cached_bytes": sum(len(item.body) for item in self._entries.values()),
+            }
+
+
+def cache_stats(routes: Iterable[str] | None = None) -> list[dict[str, Any]]:
+    """Return per-route cache counters sorted by route name."""
+    with _registry_lock:
+        caches = dict(_registry)
+    wanted = set(routes) if routes is not None else None
+    return [
+        caches[name].snapshot()
+        for name in sorted(caches)
+        if wanted is None or name in wanted
+    ]
+
+
+def respond(cache: Any, build: Callable[[], Any]) -> Any:
+    """Serve through *cache* when injected by FastAPI, else return ``build()``.
+
+    Endpoints stay directly callable from Python (tests, other routers), where
+    the dependency default is not resolved and the plain payload is expected.
+    """
+    if isinstance(cache, CachedResponder):
+        return cache.respond(build)
+    return build()
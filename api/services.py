@@ -28,6 +28,8 @@ from fastapi.responses import HTMLResponse
 from pydantic import BaseModel, ConfigDict, Field
 
 from api.auth import require_auth, SessionToken
+from api.lazy_routers import load_profile_history, profile_imports, registry as lazy_routers
+from api.response_cache import CachedResponder, ConditionalCache, cache_stats, respond
 from api.vps import get_monitor
 from cluster_credential_publisher import ClusterCredentialPublisher, CredentialPublicationError
 from cmc_leases import CmcLeaseAuthority
@@ -361,6 +363,7 @@ def _service_status(name: str) -> dict[str, Any]:
 
 def _service_action(name: str, action: str) -> dict[str, Any]:
     """Start, stop, restart, enable, or disable a PBGui service."""
+    _status_cache.invalidate()
     if action in {"start", "restart", "enable"}:
         blocker = _optional_service_blocker(name)
         if blocker:
@@ -1430,25 +1433,75 @@ async def _stop_worker(worker_id: str) -> None:
 
 # ── Status ───────────────────────────────────────────────────
 
+# Process liveness has no cheap change signal, so the status body is shared
+# for a short window across tabs/pollers and ETags are content hashes.
+_status_cache = ConditionalCache("services.get_status", max_age=2.0)
+
+
 @router.get("/status")
-def get_status(session: SessionToken = Depends(require_auth)) -> Dict[str, Any]:
+def get_status(
+    session: SessionToken = Depends(require_auth),
+    cache: CachedResponder = Depends(_status_cache),
+) -> Dict[str, Any]:
     """Return running status for all services."""
-    try:
-        reconcile_pending_credentials(PBGDIR)
-    except Exception as exc:
-        _log(
-            SERVICE,
-            f"Credential reconciliation remains pending: {type(exc).__name__}",
-            level="WARNING",
-        )
-    result = {}
-    for svc in _SERVICES:
+    def build() -> Dict[str, Any]:
         try:
-            result[svc] = _service_status(svc)
-        except Exception as e:
-            _log(SERVICE, f"status check failed for {svc}: {e}", level="WARNING")
-            result[svc] = {"running": False, "error": str(e)}
-    return result
+            reconcile_pending_credentials(PBGDIR)
+        except Exception as exc:
+            _log(
+                SERVICE,
+                f"Credential reconciliation remains pending: {type(exc).__name__}",
+                level="WARNING",
+            )
+        result = {}
+        for svc in _SERVICES:
+            try:
+                result[svc] = _service_status(svc)
+            except Exception as e:
+                _log(SERVICE, f"status check failed for {svc}: {e}", level="WARNING")
+                result[svc] = {"running": False, "error": str(e)}
+        return result
+
+    return respond(cache, build)
+
+
+@router.get("/response-cache")
+def get_response_cache_stats(session: SessionToken = Depends(require_auth)) -> Dict[str, Any]:
+    """Return ETag cache hit ratios for the polled status endpoints."""
+    routes = cache_stats()
+    requests = sum(item["requests"] for item in routes)
+    hits = sum(item["not_modified"] + item["body_hits"] for item in routes)
+    return {
+        "routes": routes,
+        "totals": {
+            "requests": requests,
+            "hits": hits,
+            "hit_ratio": round(hits / requests, 4) if requests else 0.0,
+        },
+    }
+
+
+@router.get("/api-server/imports")
+def get_api_import_report(session: SessionToken = Depends(require_auth)) -> Dict[str, Any]:
+    """Return startup import timings, lazy router state and the last import profiles."""
+    history = load_profile_history(PBGDIR)
+    return {**lazy_routers.report(), "profile": history[-1] if history else None, "history": history}
+
+
+@router.post("/api-server/imports/profile")
+async def run_api_import_profile(session: SessionToken = Depends(require_auth)) -> Dict[str, Any]:
+    """Profile PBApiServer and lazy router imports with ``python -X importtime`` in a fresh interpreter."""
+    from pbgui_purefunc import PBGUI_VERSION
+
+    modules = [entry["module"] for entry in lazy_routers.report()["routers"]]
+    try:
+        profile = await asyncio.to_thread(profile_imports, PBGDIR, modules, version=PBGUI_VERSION)
+    except RuntimeError as exc:
+        raise HTTPException(status_code=409, detail=str(exc)) from exc
+    except subprocess.TimeoutExpired as exc:
+        raise HTTPException(status_code=504, detail="Import profile timed out") from exc
+    _log(SERVICE, f"[imports] startup imports took {profile['startup_ms']:.0f} ms", level="INFO")
+    return profile
 
 
 @router.get("/migration/status")
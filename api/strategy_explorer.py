@@ -13,6 +13,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from fastapi.responses import HTMLResponse, Response
 
 from api.auth import SessionToken, require_auth
+from api.strategy_explorer_candles import session_cache
 from api.strategy_explorer_movie import movie_builder_status
 from api.strategy_explorer_sim import simulation_modes
 from pbgui_purefunc import PBGUI_SERIAL, PBGUI_VERSION
@@ -224,6 +225,7 @@ def get_session(
         config = default_strategy_config()
     handoff = backtest_result_handoff_options(config, str(result_dir)) if result_dir else {"options": {"load_candles": True}, "messages": [], "meta": {}}
     options = dict(handoff.get("options") or {"load_candles": True})
+    options["_candle_cache"] = session_cache(session.token)
     snapshot = build_strategy_snapshot(config, source=source, options=options)
     messages.extend(list(handoff.get("messages") or []))
     messages.extend(list(snapshot.get("messages") or []))
@@ -308,7 +310,8 @@ def build_snapshot(body: dict[str, Any], session: SessionToken = Depends(require
     config = body.get("config") if isinstance(body, dict) else None
     if not isinstance(config, dict):
         raise HTTPException(400, "config must be an object")
-    options = body.get("options") if isinstance(body.get("options"), dict) else {}
+    options = dict(body.get("options")) if isinstance(body.get("options"), dict) else {}
+    options["_candle_cache"] = session_cache(session.token)
     return build_strategy_snapshot(config, source="posted", options=options)
 
 
@@ -334,6 +337,7 @@ def run_simulation(body: dict[str, Any], session: SessionToken = Depends(require
 
         options = dict(options)
         options["_progress_cb"] = _progress_cb
+    options = {**options, "_candle_cache": session_cache(session.token)}
     try:
         result = build_strategy_simulation(config, mode=mode, options=options)
         if progress_id:
@@ -380,6 +384,7 @@ def run_compare(body: dict[str, Any], session: SessionToken = Depends(require_au
 
         options = dict(options)
         options["_progress_cb"] = _progress_cb
+    options = {**options, "_candle_cache": session_cache(session.token)}
     try:
         result = build_strategy_compare(config, options=options)
         if progress_id:
@@ -430,6 +435,7 @@ def get_movie_frames(body: dict[str, Any], session: SessionToken = Depends(requi
         options = dict(options)
         options["_progress_cb"] = _progress_cb
         options["_cancel_cb"] = _cancel_cb
+    options = {**options, "_candle_cache": session_cache(session.token)}
     try:
         result = build_movie_frames(config, options=options)
         if progress_id:
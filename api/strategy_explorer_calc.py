@@ -416,6 +416,54 @@ def _state_row_payload(row: pd.Series, close_price: float) -> dict[str, float]:
     }
 
 
+def _load_full_candles(options: dict[str, Any], exchange: str, coin: str, source_dir: str | None, prefer_source_only: bool) -> pd.DataFrame:
+    """Return the full 1m history sorted by time, from the session candle cache when attached.
+
+    Cached frames are shared between requests; callers slice with ``.copy()``.
+    """
+    cache = options.get("_candle_cache")
+    if cache is not None:
+        return cache.frame(exchange, coin, source_dir=source_dir, prefer_source_only=prefer_source_only)
+    df = load_historical_ohlcv_v7(exchange, coin, source_dir=source_dir, prefer_source_only=prefer_source_only)
+    if df is not None and isinstance(df.index, pd.DatetimeIndex) and not df.index.is_monotonic_increasing:
+        df = df.sort_index(kind="stable")
+    return df
+
+
+def _indicator_row(
+    options: dict[str, Any],
+    df: pd.DataFrame,
+    grid_idx: int,
+    bp: BotParams,
+    *,
+    exchange: str,
+    coin: str,
+) -> pd.Series:
+    """Return indicator values at ``grid_idx`` computed over the history up to that row.
+
+    EMA and volatility columns are causal, so the session cache can reuse its
+    full-history columns instead of recomputing the prefix per request.
+    """
+    cache = options.get("_candle_cache")
+    if cache is not None:
+        indicators = cache.indicators(
+            exchange,
+            coin,
+            bp.ema_span_0,
+            bp.ema_span_1,
+            bp.entry_volatility_ema_span_hours,
+            source_dir=options.get("_source_dir"),
+            prefer_source_only=bool(options.get("_prefer_source_only")),
+        )
+        return indicators.iloc[grid_idx]
+    return calculate_v7_indicators(
+        df.iloc[: grid_idx + 1],
+        bp.ema_span_0,
+        bp.ema_span_1,
+        bp.entry_volatility_ema_span_hours,
+    ).iloc[-1]
+
+
 def _load_candles(
     exchange: str,
     coin: str,
@@ -428,11 +476,9 @@ def _load_candles(
     try:
         source_dir = options.get("_source_dir")
         prefer_source_only = bool(options.get("_prefer_source_only"))
-        df = load_historical_ohlcv_v7(exchange, coin, source_dir=source_dir, prefer_source_only=prefer_source_only)
+        df = _load_full_candles(options, exchange, coin, source_dir, prefer_source_only)
         if df is None or getattr(df, "empty", True):
             return None, {"loaded": False, "reason": "no candles found"}
-        if isinstance(df.index, pd.DatetimeIndex):
-            df = df.sort_index(kind="stable")
         full_rows = int(len(df))
         days = max(0.5, min(3650.0, _safe_float(options.get("context_days"), 5.0)))
         selected_ts = None
@@ -466,14 +512,8 @@ def _load_candles(
         state_rows: dict[str, dict[str, float]] = {}
         if len(df):
             close_price = _safe_float(df.iloc[grid_idx].get("close"), 100.0)
-            indicator_df = df.iloc[: grid_idx + 1].copy()
-            ind_long = calculate_v7_indicators(
-                indicator_df,
-                long_bp.ema_span_0,
-                long_bp.ema_span_1,
-                long_bp.entry_volatility_ema_span_hours,
-            )
-            state_rows["long"] = _state_row_payload(ind_long.iloc[-1], close_price)
+            ind_long = _indicator_row(options, df, grid_idx, long_bp, exchange=exchange, coin=coin)
+            state_rows["long"] = _state_row_payload(ind_long, close_price)
             if short_bp is not None:
                 same_indicators = (
                     _safe_float(short_bp.ema_span_0) == _safe_float(long_bp.ema_span_0)
@@ -483,13 +523,8 @@ def _load_candles(
                 if same_indicators:
                     state_rows["short"] = dict(state_rows["long"])
                 else:
-                    ind_short = calculate_v7_indicators(
-                        indicator_df,
-                        short_bp.ema_span_0,
-                        short_bp.ema_span_1,
-                        short_bp.entry_volatility_ema_span_hours,
-                    )
-                    state_rows["short"] = _state_row_payload(ind_short.iloc[-1], close_price)
+                    ind_short = _indicator_row(options, df, grid_idx, short_bp, exchange=exchange, coin=coin)
+                    state_rows["short"] = _state_row_payload(ind_short, close_price)
         return window, {
             "loaded": True,
             "rows": full_rows,
@@ -689,13 +724,11 @@ def _simulation_candles_with_warmup(
         warmup_minutes = 0
     source_dir, prefer_source_only = _source_settings(config, options)
     try:
-        full_df = load_historical_ohlcv_v7(exchange, coin, source_dir=source_dir, prefer_source_only=prefer_source_only)
+        full_df = _load_full_candles(options, exchange, coin, source_dir, prefer_source_only)
     except Exception:
         full_df = None
     if full_df is None or getattr(full_df, "empty", True):
         return fallback_df, trade_start, {"warmup_minutes": warmup_minutes, "used_warmup": False}
-    if isinstance(full_df.index, pd.DatetimeIndex):
-        full_df = full_df.sort_index(kind="stable")
     start_ts = trade_start - pd.Timedelta(minutes=warmup_minutes)
     end_ts = trade_start + pd.Timedelta(minutes=max(1, int(forward_candles)) - 1)
     try:
@@ -924,7 +957,7 @@ def build_strategy_snapshot(
         "sides": {"long": long_payload, "short": short_payload},
         "candles": _candles_payload(hist_df),
         "config": cfg,
-        "options": opts,
+        "options": {key: value for key, value in opts.items() if key != "_candle_cache"},
         "messages": messages,
     }
 
@@ -1451,11 +1484,9 @@ def _run_strategy_compare_b_c(
 
     source_dir, prefer_source_only = _source_settings(cfg, opts)
     _report(0.06, "Loading compare candles...")
-    hist_df_full = load_historical_ohlcv_v7(exchange, coin, source_dir=source_dir, prefer_source_only=prefer_source_only)
+    hist_df_full = _load_full_candles(opts, exchange, coin, source_dir, prefer_source_only)
     if hist_df_full is None or getattr(hist_df_full, "empty", True):
         return {"b": {"long": [], "short": []}, "c": {"long": [], "short": []}}, {"error": "No OHLCV candles available for compare.", "exchange": exchange, "coin": coin}
-    if isinstance(hist_df_full.index, pd.DatetimeIndex):
-        hist_df_full = hist_df_full.sort_index(kind="stable")
     _report(0.10, "Preparing simulation window...")
 
     try:
@@ -1975,19 +2006,23 @@ def build_movie_frames(config: dict[str, Any] | None, *, options: dict[str, Any]
 
     source_dir, prefer_source_only = _source_settings(cfg, opts)
     try:
-        full_df = load_historical_ohlcv_v7(exchange, coin, source_dir=source_dir, prefer_source_only=prefer_source_only)
+        full_df = _load_full_candles(opts, exchange, coin, source_dir, prefer_source_only)
     except Exception:
         full_df = hist_df
+    cached_frame = opts.get("_candle_cache") is not None and full_df is not hist_df
     if full_df is None or getattr(full_df, "empty", True):
         full_df = hist_df
+        cached_frame = False
     if full_df is None or full_df.empty:
         return {"ok": False, "frames": [], "message": "No OHLCV candles available for Movie Builder.", "metadata": metadata}
     if not isinstance(full_df.index, pd.DatetimeIndex):
         try:
+            full_df = full_df.copy()
             full_df.index = pd.to_datetime(full_df.index)
+            cached_frame = False
         except Exception:
             pass
-    if isinstance(full_df.index, pd.DatetimeIndex):
+    if isinstance(full_df.index, pd.DatetimeIndex) and not full_df.index.is_monotonic_increasing:
         full_df = full_df.sort_index(kind="stable")
 
     _progress(0.12, "Preparing movie window...")
@@ -2000,12 +2035,25 @@ def build_movie_frames(config: dict[str, Any] | None, *, options: dict[str, Any]
         return {"ok": False, "frames": [], "message": "No candles for the selected Movie Builder time window.", "metadata": metadata}
     bp_plot = data.normal_bot_params_short if side_key == "short" else data.normal_bot_params_long
     try:
-        work = calculate_v7_indicators(
-            work,
-            float(bp_plot.ema_span_0),
-            float(bp_plot.ema_span_1),
-            float(bp_plot.entry_volatility_ema_span_hours),
-        )
+        if cached_frame:
+            work = opts["_candle_cache"].indicators(
+                exchange,
+                coin,
+                float(bp_plot.ema_span_0),
+                float(bp_plot.ema_span_1),
+                float(bp_plot.entry_volatility_ema_span_hours),
+                source_dir=source_dir,
+                prefer_source_only=prefer_source_only,
+                start=warm_start,
+                end=end_time,
+            )
+        else:
+            work = calculate_v7_indicators(
+                work,
+                float(bp_plot.ema_span_0),
+                float(bp_plot.ema_span_1),
+                float(bp_plot.entry_volatility_ema_span_hours),
+            )
     except Exception:
         pass
     stride = max(1, int(step_mins))
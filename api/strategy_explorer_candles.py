@@ -0,0 +1,273 @@
+"""Per-session OHLCV and indicator cache for Strategy Explorer requests.
+
+Snapshot, simulation, compare and Movie Builder requests used to reload the
+full 1m history and recompute every indicator on each call, even when the
+user only nudged one bot parameter.  A :class:`CandleCache` keeps the loaded
+frame per (exchange, coin, source dir, prefer-source-only, data signature)
+and memoizes the volatility and EMA columns per span, so parameter tweaks
+only compute columns for spans that actually changed.
+
+The data signature is built from the mtimes of the candle directories and
+their newest shards, so new or rewritten shards invalidate the entry on the
+next request.  When the reloaded frame only appends candles, full-history
+columns are extended through ``strategy_explorer_indicators`` instead of
+being recomputed.  Cached frames are shared: callers must copy before mutating.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+
+import pandas as pd
+
+from pbgui_purefunc import pb7dir
+
+from api.strategy_explorer_core import (
+    _coin_from_symbol_code,
+    _resolve_safe_ohlcv_source_dir,
+    _safe_market_segment,
+    _v7_ema_series,
+    _v7_ema_spans,
+    _v7_volatility_series,
+    load_historical_ohlcv_v7,
+)
+from api.strategy_explorer_indicators import (
+    IncrementalEma,
+    IncrementalVolatility,
+    frame_extends,
+    frame_mark,
+)
+
+MAX_FRAMES_PER_SESSION = 2
+MAX_COLUMNS_PER_FRAME = 24
+MAX_SESSIONS = 8
+SESSION_IDLE_SECONDS = 1800
+_NEWEST_SHARDS = 2
+
+
+def _dir_signature(path: str, coin: str) -> list[tuple]:
+    """Return mtimes of the coin directories under ``path`` and of their newest shards."""
+    out: list[tuple] = []
+    try:
+        entries = sorted(os.listdir(path))
+    except OSError:
+        return out
+    for name in entries:
+        if not coin or not name.startswith(coin):
+            continue
+        coin_dir = os.path.join(path, name)
+        try:
+            shards = sorted(f for f in os.listdir(coin_dir) if f.endswith((".npy", ".npz")) and not f.startswith("."))
+            stats = [os.stat(coin_dir).st_mtime_ns, len(shards)]
+            for shard in shards[-_NEWEST_SHARDS:]:
+                stat = os.stat(os.path.join(coin_dir, shard))
+                stats.extend((shard, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            continue
+        out.append((coin_dir, *stats))
+    return out
+
+
+def ohlcv_data_signature(exchange: str, coin: str, source_dir: str | None) -> tuple:
+    """Return a cheap signature of every directory ``load_historical_ohlcv_v7`` may read."""
+    exchange_name = _safe_market_segment(exchange)
+    exchange_dir = exchange_name.lower()
+    coin_base = _coin_from_symbol_code(_safe_market_segment(coin)) or _safe_market_segment(coin)
+    exchange_dirs = [exchange_dir]
+    if exchange_dir == "binance":
+        exchange_dirs.append("binanceusdm")
+    elif exchange_dir == "binanceusdm":
+        exchange_dirs.append("binance")
+    roots: list[str] = []
+    source_root = _resolve_safe_ohlcv_source_dir(source_dir)
+    if source_root:
+        roots.extend(os.path.join(source_root, name, "1m") for name in exchange_dirs)
+    base = pb7dir()
+    if base:
+        roots.append(os.path.join(base, "caches", "ohlcv", exchange_name, "1m"))
+        roots.extend(
+            os.path.join(base, "historical_data", name)
+            for name in (f"ohlcvs_{exchange_name}", "ohlcvs_bybit", "ohlcvs_futures")
+        )
+    return tuple(entry for root in roots for entry in _dir_signature(root, coin_base))
+
+
+class _FrameEntry:
+    """One loaded frame and its memoized indicator columns."""
+
+    def __init__(self, frame: pd.DataFrame) -> None:
+        self.frame = frame
+        self.mark = frame_mark(frame)
+        self.columns: OrderedDict[tuple, pd.Series | float] = OrderedDict()
+        # Full-history columns keep their incremental state for appends.
+        self.engines: dict[tuple, IncrementalEma | IncrementalVolatility] = {}
+        self.lock = threading.Lock()
+
+    def carry_columns(self, old: _FrameEntry) -> int:
+        """Extend ``old``'s full-history columns over the candles appended in this frame."""
+        old_rows = old.mark.rows
+        appended = self.frame.iloc[old_rows:]
+        carried = 0
+        with old.lock:
+            items = [(key, engine, old.columns.get(key)) for key, engine in old.engines.items()]
+        for key, engine, series in items:
+            if not isinstance(series, pd.Series):
+                continue
+            if isinstance(engine, IncrementalVolatility):
+                tail = engine.extend(self.frame, old_rows)
+            else:
+                tail = pd.Series(engine.extend_values(appended["close"].to_numpy(dtype="float64")), index=appended.index)
+            self.columns[key] = pd.concat([series, tail]) if len(tail) else series
+            self.engines[key] = engine
+            carried += 1
+        return carried
+
+
+class CandleCache:
+    """Bounded cache of loaded candle frames and indicator columns for one session."""
+
+    def __init__(self, max_frames: int = MAX_FRAMES_PER_SESSION, max_columns: int = MAX_COLUMNS_PER_FRAME) -> None:
+        self.max_frames = max(1, int(max_frames))
+        self.max_columns = max(4, int(max_columns))
+        self._entries: OrderedDict[tuple, _FrameEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self.touched = time.time()
+        self.stats = {"frame_hits": 0, "frame_loads": 0, "column_hits": 0, "column_builds": 0, "column_extends": 0}
+
+    def _entry(self, exchange: str, coin: str, source_dir: str | None, prefer_source_only: bool) -> _FrameEntry:
+        key = (
+            _safe_market_segment(exchange),
+            _safe_market_segment(coin),
+            str(source_dir or ""),
+            bool(prefer_source_only),
+            ohlcv_data_signature(exchange, coin, source_dir),
+        )
+        with self._lock:
+            self.touched = time.time()
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats["frame_hits"] += 1
+                return entry
+        frame = load_historical_ohlcv_v7(exchange, coin, source_dir=source_dir, prefer_source_only=prefer_source_only)
+        if frame is None:
+            frame = pd.DataFrame()
+        if isinstance(frame.index, pd.DatetimeIndex):
+            frame = frame.sort_index(kind="stable")
+        for column in ("open", "high", "low", "close"):
+            if column in frame.columns:
+                frame[column] = pd.to_numeric(frame[column], errors="coerce")
+        entry = _FrameEntry(frame)
+        with self._lock:
+            previous = [k for k in self._entries if k[:4] == key[:4]]
+            old = self._entries.get(previous[-1]) if previous else None
+        if old is not None and frame_extends(old.mark, frame):
+            extended = entry.carry_columns(old)
+        else:
+            extended = 0
+        with self._lock:
+            # Drop older versions of the same market before the LRU bound.
+            for old_key in previous:
+                self._entries.pop(old_key, None)
+            self.stats["column_extends"] += extended
+            self._entries[key] = entry
+            while len(self._entries) > self.max_frames:
+                self._entries.popitem(last=False)
+            self.stats["frame_loads"] += 1
+        return entry
+
+    def frame(self, exchange: str, coin: str, *, source_dir: str | None = None, prefer_source_only: bool = False) -> pd.DataFrame:
+        """Return the full sorted 1m frame (shared; do not mutate)."""
+        return self._entry(exchange, coin, source_dir, prefer_source_only).frame
+
+    def _column(self, entry: _FrameEntry, key: tuple, window: pd.DataFrame, build, engine=None) -> pd.Series | float:
+        with entry.lock:
+            cached = entry.columns.get(key)
+            if cached is not None:
+                entry.columns.move_to_end(key)
+                self.stats["column_hits"] += 1
+                return cached
+        value = build(window)
+        with entry.lock:
+            entry.columns[key] = value
+            if engine is not None:
+                entry.engines[key] = engine
+            while len(entry.columns) > self.max_columns:
+                evicted, _value = entry.columns.popitem(last=False)
+                entry.engines.pop(evicted, None)
+            self.stats["column_builds"] += 1
+        return value
+
+    def indicators(
+        self,
+        exchange: str,
+        coin: str,
+        ema0: float,
+        ema1: float,
+        vol_span_hours: float,
+        *,
+        source_dir: str | None = None,
+        prefer_source_only: bool = False,
+        start: Any = None,
+        end: Any = None,
+    ) -> pd.DataFrame:
+        """Return ``calculate_v7_indicators`` output for the frame or its ``[start, end]`` window.
+
+        Columns are computed over the requested window, exactly like calling
+        ``calculate_v7_indicators`` on that slice, and memoized per window and span.
+        """
+        entry = self._entry(exchange, coin, source_dir, prefer_source_only)
+        window = entry.frame
+        if (start is not None or end is not None) and isinstance(window.index, pd.DatetimeIndex) and len(window):
+            lo = pd.Timestamp(start) if start is not None else window.index[0]
+            hi = pd.Timestamp(end) if end is not None else window.index[-1]
+            window = window.loc[(window.index >= lo) & (window.index <= hi)]
+        if window.empty:
+            return window.copy()
+        out = window.copy()
+        vol_span = float(vol_span_hours) if vol_span_hours is not None else None
+        spans = _v7_ema_spans(ema0, ema1)
+        if window is entry.frame and entry.mark is not None:
+            # Full history: columns carry incremental state across appended candles.
+            volatility = IncrementalVolatility(vol_span_hours)
+            out["volatility"] = self._column(entry, ("volatility", vol_span, None), window, volatility.compute, volatility)
+            for column, span in zip(("ema_0", "ema_1", "ema_2"), spans):
+                ema = IncrementalEma(span)
+                out[column] = self._column(entry, ("ema", float(span), None), window, lambda w, e=ema: e.compute(w["close"]), ema)
+            return out
+        bounds = (window.index[0], window.index[-1], len(window))
+        out["volatility"] = self._column(entry, ("volatility", vol_span, bounds), window, lambda w: _v7_volatility_series(w, vol_span_hours))
+        for column, span in zip(("ema_0", "ema_1", "ema_2"), spans):
+            out[column] = self._column(entry, ("ema", float(span), bounds), window, lambda w, s=span: _v7_ema_series(w["close"], s))
+        return out
+
+
+_SESSIONS: OrderedDict[str, CandleCache] = OrderedDict()
+_SESSIONS_LOCK = threading.Lock()
+
+
+def session_cache(session_key: str) -> CandleCache:
+    """Return the candle cache for one API session, evicting idle or excess sessions."""
+    key = str(session_key or "")
+    now = time.time()
+    with _SESSIONS_LOCK:
+        for stale in [k for k, cache in _SESSIONS.items() if now - cache.touched > SESSION_IDLE_SECONDS]:
+            _SESSIONS.pop(stale, None)
+        cache = _SESSIONS.get(key)
+        if cache is None:
+            cache = _SESSIONS[key] = CandleCache()
+        _SESSIONS.move_to_end(key)
+        cache.touched = now
+        while len(_SESSIONS) > MAX_SESSIONS:
+            _SESSIONS.popitem(last=False)
+        return cache
+
+
+def clear_sessions() -> None:
+    """Drop every session cache."""
+    with _SESSIONS_LOCK:
+        _SESSIONS.clear()
@@ -20,6 +20,7 @@ import numpy as np
 import pandas as pd
 
 from Exchange import V7
+import market_index
 from pb7_config import load_pb7_config
 from pbgui_purefunc import PBGDIR, pb7dir, pb7venv
 from strategy_explorer_types import (
@@ -559,62 +560,38 @@ def get_available_coins_v7(exchange: str, source_dir: str | None = None, *, incl
     return sorted(coins)
 
 
-def _load_binance_markets_index() -> dict:
-    """Build a lookup index for pbgui's local ccxt-style binance markets dump."""
-    markets_path = os.path.join(os.path.dirname(__file__), "..", "binance_markets.json")
-    markets_path = os.path.abspath(markets_path)
-    if not os.path.exists(markets_path):
-        return {}
-    with open(markets_path, "r", encoding="utf-8") as f:
-        markets = json.load(f)
+def _market_metadata_index_source(exchange: str, *, local_fallback: bool = True) -> tuple[market_index.MarketIndex | None, str]:
+    """Return the shared binary index of an exchange's markets dump and its source label.
 
-    index: dict[str, dict] = {}
-    for sym_key, m in markets.items():
-        if not isinstance(m, dict):
-            continue
-        # direct key (e.g. "DOGE/USDT")
-        index[str(sym_key)] = m
-        # common identifiers
-        for k in ("id", "lowercaseId", "symbol"):
-            v = m.get(k)
-            if v:
-                index[str(v)] = m
-    return index
-
-
-def _load_pb7_markets_index(exchange: str) -> dict:
-    """Build a lookup index for PB7's ccxt-style markets dump for a given exchange."""
-    if not exchange:
-        return {}
-    markets_path = os.path.join(pb7dir(), "caches", exchange, "markets.json")
-    if not os.path.exists(markets_path):
-        return {}
-    try:
-        with open(markets_path, "r", encoding="utf-8") as f:
-            markets = json.load(f)
-    except Exception:
-        return {}
-    if not isinstance(markets, dict):
-        return {}
+    The index covers PB7's ``caches/<exchange>/markets.json`` (``"pb7"``); with
+    ``local_fallback``, binance falls back to pbgui's local dump
+    (``"pbgui-binance"``).  Indexes live in ``data/market_index`` and are
+    rebuilt once per changed dump, so lookups never re-parse the JSON.
+    """
+    exchange_name = _safe_market_segment(exchange)
+    if not exchange_name:
+        return None, "none"
+    index_dir = os.path.join(str(PBGDIR), "data", "market_index")
+    sources = [("pb7", os.path.join(pb7dir(), "caches", exchange_name, "markets.json"), f"pb7_{exchange_name}.idx")]
+    if local_fallback and exchange_name == "binance":
+        sources.append(("pbgui-binance", os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "binance_markets.json")), "binance_markets.idx"))
+    for label, source, name in sources:
+        try:
+            index = market_index.ensure_index(source, os.path.join(index_dir, name))
+        except Exception:
+            index = None
+        if index is not None and len(index):
+            return index, label
+    return None, "none"
 
-    index: dict[str, dict] = {}
-    for sym_key, m in markets.items():
-        if not isinstance(m, dict):
-            continue
-        index[str(sym_key)] = m
-        for k in ("id", "lowercaseId", "symbol"):
-            v = m.get(k)
-            if v:
-                index[str(v)] = m
-    return index
-def _match_market_from_index(idx: dict, symbol: str) -> tuple[dict | None, str | None]:
-    """Return (market, matched_key) from a markets index for a symbol.
 
-    Mirrors the symbol normalization logic used throughout the visualizer.
-    """
-    if not idx or not symbol:
-        return None, None
+def _market_metadata_index(exchange: str, *, local_fallback: bool = True) -> market_index.MarketIndex | None:
+    """Return the shared binary index of an exchange's markets dump, or None."""
+    return _market_metadata_index_source(exchange, local_fallback=local_fallback)[0]
 
+
+def _market_lookup_keys(symbol: str) -> list[str]:
+    """Return the keys tried, in order, to find a symbol in a markets index."""
     attempted_keys: list[str] = []
     attempted_keys.append(symbol)
     attempted_keys.append(symbol.replace("/", ""))
@@ -626,18 +603,28 @@ def _match_market_from_index(idx: dict, symbol: str) -> tuple[dict | None, str |
     if "/" not in symbol and "_" not in symbol and not symbol.endswith("USDT"):
         attempted_keys.append(f"{symbol}/USDT:USDT")
         attempted_keys.append(f"{symbol}_USDT:USDT")
+    return attempted_keys
 
-    seen: set[str] = set()
-    for k in attempted_keys:
-        if not k or k in seen:
-            continue
-        seen.add(k)
-        m = idx.get(k)
-        if isinstance(m, dict):
-            return m, k
+
+def _match_market_key(index: market_index.MarketIndex | None, symbol: str) -> tuple[market_index.MarketEntry | None, str | None]:
+    """Return (market, matched_key) from a markets index for a symbol.
+
+    Mirrors the symbol normalization logic used throughout the visualizer.
+    """
+    if index is None or not symbol:
+        return None, None
+    for k in dict.fromkeys(_market_lookup_keys(symbol)):
+        entry = index.market(k) if k else None
+        if entry is not None:
+            return entry, k
     return None, None
 
 
+def _match_market_entry(index: market_index.MarketIndex | None, symbol: str) -> market_index.MarketEntry | None:
+    """Return the indexed market for a symbol, or None."""
+    return _match_market_key(index, symbol)[0]
+
+
 def _derive_exchange_params_from_market(exchange: str, symbol: str) -> dict:
     """Derive ExchangeParams fields from cached market metadata.
 
@@ -648,35 +635,18 @@ def _derive_exchange_params_from_market(exchange: str, symbol: str) -> dict:
     if not exchange or not symbol:
         return {"price_step": None, "qty_step": None, "min_qty": None, "min_cost": None, "c_mult": None}
 
-    # Prefer PB7 exchange markets.json if available (futures/perps live here, e.g. binanceusdm)
-    idx = _load_pb7_markets_index(exchange)
-    if not idx and exchange == "binance":
-        # spot fallback via pbgui local dump
-        idx = _load_binance_markets_index()
-    if not idx:
-        return {"price_step": None, "qty_step": None, "min_qty": None, "min_cost": None, "c_mult": None}
-
-    m, _ = _match_market_from_index(idx, symbol)
-    if not isinstance(m, dict):
+    # Prefer PB7 exchange markets.json if available (futures/perps live here, e.g. binanceusdm);
+    # binance falls back to pbgui's local spot dump.
+    m = _match_market_entry(_market_metadata_index(exchange), symbol)
+    if m is None:
         return {"price_step": None, "qty_step": None, "min_qty": None, "min_cost": None, "c_mult": None}
 
-    precision = m.get("precision") or {}
-    limits = m.get("limits") or {}
-    lim_amount = (limits.get("amount") or {})
-    lim_cost = (limits.get("cost") or {})
-
-    price_step = precision.get("price")
-    qty_step = precision.get("amount")
-    min_qty = lim_amount.get("min")
-    min_cost = lim_cost.get("min")
-    c_mult = m.get("contractSize")
-
     return {
-        "price_step": float(price_step) if price_step is not None else None,
-        "qty_step": float(qty_step) if qty_step is not None else None,
-        "min_qty": float(min_qty) if min_qty is not None else None,
-        "min_cost": float(min_cost) if min_cost is not None else None,
-        "c_mult": float(c_mult) if c_mult is not None else None,
+        "price_step": m.price_step,
+        "qty_step": m.qty_step,
+        "min_qty": m.min_qty,
+        "min_cost": m.min_cost,
+        "c_mult": m.contract_size,
     }
 
 
@@ -692,22 +662,12 @@ def _derive_exchange_fees_from_market(exchange: str, symbol: str) -> dict:
     if not exchange or not symbol:
         return {"maker_fee": 0.0, "taker_fee": 0.0}
 
-    idx = _load_pb7_markets_index(exchange)
-    if not idx and exchange == "binance":
-        idx = _load_binance_markets_index()
-    if not idx:
-        return {"maker_fee": 0.0, "taker_fee": 0.0}
-
-    m, _ = _match_market_from_index(idx, symbol)
-    if not isinstance(m, dict):
+    m = _match_market_entry(_market_metadata_index(exchange), symbol)
+    if m is None:
         return {"maker_fee": 0.0, "taker_fee": 0.0}
 
-    maker = m.get("maker_fee")
-    if maker is None:
-        maker = m.get("maker")
-    taker = m.get("taker_fee")
-    if taker is None:
-        taker = m.get("taker")
+    maker = m.maker_fee if m.maker_fee is not None else m.maker
+    taker = m.taker_fee if m.taker_fee is not None else m.taker
 
     try:
         maker_f = float(maker) if maker is not None else 0.0
@@ -833,88 +793,48 @@ def _market_metadata_source_debug(exchange: str, symbol: str) -> dict:
     if not exchange or not symbol:
         return debug
 
-    idx = _load_pb7_markets_index(exchange)
-    if idx:
-        debug["index_source"] = "pb7"
-        debug["index_size"] = int(len(idx))
-    elif exchange == "binance":
-        idx = _load_binance_markets_index()
-        if idx:
-            debug["index_source"] = "pbgui-binance"
-            debug["index_size"] = int(len(idx))
-
-    if not idx:
-        debug["index_source"] = "none"
+    idx, source = _market_metadata_index_source(exchange)
+    debug["index_source"] = source
+    if idx is None:
         return debug
+    debug["index_size"] = int(len(idx))
+    debug["attempted_keys"] = [k for k in dict.fromkeys(_market_lookup_keys(symbol)) if k]
 
-    attempted_keys: list[str] = []
-    attempted_keys.append(symbol)
-    attempted_keys.append(symbol.replace("/", ""))
-    attempted_keys.append(symbol.lower())
-    if symbol.endswith("USDT") and "/" not in symbol:
-        attempted_keys.append(f"{symbol[:-4]}/USDT")
-        attempted_keys.append(f"{symbol[:-4]}/USDT:USDT")
-    if "/" not in symbol and "_" not in symbol and not symbol.endswith("USDT"):
-        attempted_keys.append(f"{symbol}/USDT:USDT")
-        attempted_keys.append(f"{symbol}_USDT:USDT")
-
-    # De-dup while preserving order
-    seen: set[str] = set()
-    deduped: list[str] = []
-    for k in attempted_keys:
-        if k and k not in seen:
-            seen.add(k)
-            deduped.append(k)
-    debug["attempted_keys"] = deduped
-
-    m = None
-    matched_key = None
-    for k in deduped:
-        mm = idx.get(k)
-        if isinstance(mm, dict):
-            m = mm
-            matched_key = k
-            break
+    m, matched_key = _match_market_key(idx, symbol)
     debug["matched_key"] = matched_key
-    if not isinstance(m, dict):
+    if m is None:
         return debug
 
-    precision = m.get("precision") or {}
-    limits = m.get("limits") or {}
-    info = m.get("info") or {}
-    price_filter = info.get("priceFilter") or {}
-    lot_size_filter = info.get("lotSizeFilter") or {}
-
-    # Keep this snapshot small & JSON-safe.
+    # Keep this snapshot small & JSON-safe; it holds the fields the index keeps.
     debug["market_snapshot"] = {
-        "symbol": m.get("symbol"),
-        "id": m.get("id"),
-        "type": m.get("type"),
-        "spot": bool(m.get("spot")),
-        "swap": bool(m.get("swap")),
-        "future": bool(m.get("future")),
-        "linear": bool(m.get("linear")),
-        "contractSize": m.get("contractSize"),
+        "symbol": m.ccxt_symbol,
+        "id": m.symbol,
+        "swap": m.swap,
+        "linear": m.linear,
+        "active": m.active,
+        "contractSize": m.contract_size,
         "precision": {
-            "price": precision.get("price"),
-            "amount": precision.get("amount"),
+            "price": m.price_step,
+            "amount": m.qty_step,
         },
         "limits": {
-            "amount": {"min": (limits.get("amount") or {}).get("min")},
-            "cost": {"min": (limits.get("cost") or {}).get("min")},
+            "amount": {"min": m.min_qty},
+            "cost": {"min": m.min_cost},
         },
-        "info": {
-            "priceFilter.tickSize": price_filter.get("tickSize"),
-            "lotSizeFilter.qtyStep": lot_size_filter.get("qtyStep"),
+        "fees": {
+            "maker": m.maker,
+            "taker": m.taker,
+            "maker_fee": m.maker_fee,
+            "taker_fee": m.taker_fee,
         },
     }
 
     debug["derived"] = {
-        "price_step_from_precision.price": precision.get("price"),
-        "qty_step_from_precision.amount": precision.get("amount"),
-        "min_qty_from_limits.amount.min": (limits.get("amount") or {}).get("min"),
-        "min_cost_from_limits.cost.min": (limits.get("cost") or {}).get("min"),
-        "c_mult_from_contractSize": m.get("contractSize"),
+        "price_step_from_precision.price": m.price_step,
+        "qty_step_from_precision.amount": m.qty_step,
+        "min_qty_from_limits.amount.min": m.min_qty,
+        "min_cost_from_limits.cost.min": m.min_cost,
+        "c_mult_from_contractSize": m.contract_size,
     }
 
     return debug
@@ -1418,16 +1338,10 @@ def load_historical_ohlcv_v7(
     full_df = legacy_df.combine_first(primary_df)
     return _dedupe_sort(full_df)
 
-def calculate_v7_indicators(df: pd.DataFrame, ema0: float, ema1: float, vol_span_hours: float):
+def _v7_volatility_series(df: pd.DataFrame, vol_span_hours: float) -> pd.Series | float:
+    """Return the PB7 entry volatility column for numeric 1m OHLC candles."""
     # Volatility (PB7 semantics): log-range on 1h candles, EWM span in hours.
     # State param name is `entry_volatility_logrange_ema_1h`.
-    df = df.copy()  # Avoid modifying cached df
-
-    # Coerce OHLC numeric (some sources may load as object).
-    for c in ("open", "high", "low", "close"):
-        if c in df.columns:
-            df[c] = pd.to_numeric(df[c], errors="coerce")
-
     # Always compute a 1m fallback; used to fill any missing early 1h values.
     vol_1m = None
     try:
@@ -1457,25 +1371,37 @@ def calculate_v7_indicators(df: pd.DataFrame, ema0: float, ema1: float, vol_span
 
     if vol_series is None:
         # If 1h fails entirely, use 1m series (if available).
-        df["volatility"] = vol_1m if vol_1m is not None else 0.0
-    else:
-        # Fill early NaNs (before first completed 1h candle) from 1m series when possible.
-        if vol_1m is not None:
-            df["volatility"] = vol_series.combine_first(vol_1m)
-        else:
-            df["volatility"] = vol_series
-        df["volatility"] = df["volatility"].fillna(0.0)
+        return vol_1m if vol_1m is not None else 0.0
+    # Fill early NaNs (before first completed 1h candle) from 1m series when possible.
+    if vol_1m is not None:
+        vol_series = vol_series.combine_first(vol_1m)
+    return vol_series.fillna(0.0)
+
 
-    # EMAs
-    # PB7 uses three EMA spans: ema_span_0, ema_span_1, and sqrt(ema_span_0*ema_span_1),
-    # and a bias-adjusted EMA update (equivalent to pandas `adjust=True`).
+def _v7_ema_spans(ema0: float, ema1: float) -> tuple[float, float, float]:
+    """Return PB7's three EMA spans: ema_span_0, ema_span_1 and their geometric mean."""
     # Enforce minimum span of 1.0 to avoid ValueError.
     e0 = max(1.0, ema0)
     e1 = max(1.0, ema1)
-    e2 = max(1.0, float(e0 * e1) ** 0.5)
-    df["ema_0"] = df["close"].ewm(span=e0, adjust=True).mean()
-    df["ema_1"] = df["close"].ewm(span=e1, adjust=True).mean()
-    df["ema_2"] = df["close"].ewm(span=e2, adjust=True).mean()
+    return e0, e1, max(1.0, float(e0 * e1) ** 0.5)
+
+
+def _v7_ema_series(close: pd.Series, span: float) -> pd.Series:
+    """Return PB7's bias-adjusted EMA (equivalent to pandas `adjust=True`)."""
+    return close.ewm(span=span, adjust=True).mean()
+
+
+def calculate_v7_indicators(df: pd.DataFrame, ema0: float, ema1: float, vol_span_hours: float):
+    df = df.copy()  # Avoid modifying cached df
+
+    # Coerce OHLC numeric (some sources may load as object).
+    for c in ("open", "high", "low", "close"):
+        if c in df.columns:
+            df[c] = pd.to_numeric(df[c], errors="coerce")
+
+    df["volatility"] = _v7_volatility_series(df, vol_span_hours)
+    for column, span in zip(("ema_0", "ema_1", "ema_2"), _v7_ema_spans(ema0, ema1)):
+        df[column] = _v7_ema_series(df["close"], span)
 
     return df
 
@@ -2030,17 +1956,10 @@ def _infer_maker_taker_fees(exchange: str, coin: str) -> tuple[float, float]:
         return fee if math.isfinite(fee) and fee >= 0.0 else float(default)
 
     try:
-        idx = _load_pb7_markets_index(exchange)
-        m, _ = _match_market_from_index(idx, coin)
-        if isinstance(m, dict):
-            maker = m.get("maker")
-            if maker is None:
-                maker = m.get("maker_fee")
-            taker = m.get("taker")
-            if taker is None:
-                taker = m.get("taker_fee")
-            maker_f = _fee(maker, 0.0)
-            taker_f = _fee(taker, maker_f)
+        m = _match_market_entry(_market_metadata_index(exchange, local_fallback=False), coin)
+        if m is not None:
+            maker_f = _fee(m.maker if m.maker is not None else m.maker_fee, 0.0)
+            taker_f = _fee(m.taker if m.taker is not None else m.taker_fee, maker_f)
             return maker_f, taker_f
     except Exception:
         pass
@@ -2,7 +2,10 @@
 
 from __future__ import annotations
 
+import collections
+import contextlib
 import importlib.metadata
+import multiprocessing
 import os
 import queue
 import shutil
@@ -16,6 +19,15 @@ SERVICE = "StrategyExplorerExport"
 MAX_EXPORT_FRAMES = 2500
 MAX_EXPORT_OUTPUT_BYTES = 512 * 1024 * 1024
 _EXPORT_SLOT = threading.BoundedSemaphore(1)
+# Frame rendering: worker processes (each with its own kaleido), contiguous
+# chunks per task, and at most RENDER_WINDOW_FRAMES rendered-but-unwritten PNGs.
+MAX_RENDER_WORKERS = 4
+RENDER_CHUNK_FRAMES = 8
+RENDER_WINDOW_FRAMES = 64
+# Spawned workers re-import the server's main module and start their own
+# kaleido, which costs seconds and hundreds of MB each; only exports with at
+# least this many frames per worker are worth a pool.
+MIN_FRAMES_PER_RENDER_WORKER = 150
 
 ProgressCallback = Callable[[float, str], None]
 CancelCallback = Callable[[], bool]
@@ -375,6 +387,124 @@ def _apply_export_theme(fig: Any) -> None:
         pass
 
 
+def _render_png(fig_obj: Any, width: int, height: int, scale: int) -> bytes:
+    """Render one figure state to PNG bytes through kaleido."""
+    try:
+        return fig_obj.to_image(format="png", width=int(width), height=int(height), scale=int(scale))
+    except Exception as exc:
+        msg = str(exc)
+        if "kaleido" in msg.lower():
+            raise RuntimeError("Plotly image export requires the 'kaleido' package. Install it to export video.") from exc
+        raise RuntimeError(f"Failed to render frame image: {exc}") from exc
+
+
+class _FrameRenderer:
+    """Render animation frame states by index; frame 0 is the base figure.
+
+    Frames are applied cumulatively, so state ``i`` is the base with frames
+    ``1..i`` applied.  Moving forward only applies the missing frames; a
+    request for an earlier frame rebuilds from the base.
+    """
+
+    def __init__(self, base_json: dict[str, Any], frames_json: list[dict[str, Any]], size: tuple[int, int, int], render: Callable | None = None):
+        import plotly.graph_objects as go  # type: ignore
+
+        self._go = go
+        self._base_json = base_json
+        self._frames_json = frames_json
+        self._size = size
+        self._render = render or _render_png
+        self._fig = None
+        self._position = 0
+
+    def render(self, index: int) -> bytes:
+        if self._fig is None or self._position > index:
+            self._fig = self._go.Figure(self._base_json)
+            self._position = 0
+        while self._position < index:
+            _apply_plotly_frame_inplace(self._fig, self._go.Frame(self._frames_json[self._position]))
+            self._position += 1
+        return self._render(self._fig, *self._size)
+
+    def render_chunk(self, start: int, end: int) -> list[bytes]:
+        return [self.render(index) for index in range(start, end)]
+
+
+_WORKER_RENDERER: _FrameRenderer | None = None
+
+
+def _init_render_worker(base_json: dict[str, Any], frames_json: list[dict[str, Any]], size: tuple[int, int, int], render: Callable | None) -> None:
+    """Process-pool initializer: keep the figure and frames resident per worker."""
+    global _WORKER_RENDERER
+    _WORKER_RENDERER = _FrameRenderer(base_json, frames_json, size, render)
+
+
+def _render_worker_chunk(start: int, end: int) -> list[bytes]:
+    """Process-pool task: render frames ``start..end-1`` in order."""
+    if _WORKER_RENDERER is None:
+        raise RuntimeError("Movie render worker is not initialized.")
+    return _WORKER_RENDERER.render_chunk(start, end)
+
+
+def _render_worker_count(total: int) -> int:
+    """Return how many render processes are worth starting for ``total`` frames."""
+    workers = min(MAX_RENDER_WORKERS, max(1, (os.cpu_count() or 1) - 1), int(total) // MIN_FRAMES_PER_RENDER_WORKER)
+    return workers if workers >= 2 else 1
+
+
+def _iter_rendered_frames(
+    base_json: dict[str, Any],
+    frames_json: list[dict[str, Any]],
+    size: tuple[int, int, int],
+    *,
+    workers: int,
+    cancel_cb: CancelCallback | None = None,
+    render: Callable | None = None,
+):
+    """Yield ``(index, png)`` for every frame state in order.
+
+    With more than one worker, contiguous chunks are rendered in a spawn-based
+    process pool.  Chunks are submitted in order and consumed in order, and no
+    more than ``RENDER_WINDOW_FRAMES`` frames are in flight or buffered.
+    """
+    total = len(frames_json) + 1
+    if workers <= 1:
+        renderer = _FrameRenderer(base_json, frames_json, size, render)
+        for index in range(total):
+            _check_cancelled(cancel_cb)
+            yield index, renderer.render(index)
+        return
+
+    pool = multiprocessing.get_context("spawn").Pool(
+        processes=workers,
+        initializer=_init_render_worker,
+        initargs=(base_json, frames_json, size, render),
+    )
+    pending: collections.deque = collections.deque()
+    next_start = 0
+    finished = False
+    try:
+        while pending or next_start < total:
+            while next_start < total and (len(pending) + 1) * RENDER_CHUNK_FRAMES <= max(RENDER_WINDOW_FRAMES, RENDER_CHUNK_FRAMES):
+                end = min(total, next_start + RENDER_CHUNK_FRAMES)
+                pending.append((next_start, pool.apply_async(_render_worker_chunk, (next_start, end))))
+                next_start = end
+            start, result = pending.popleft()
+            while not result.ready():
+                _check_cancelled(cancel_cb)
+                result.wait(0.25)
+            for offset, png in enumerate(result.get()):
+                _check_cancelled(cancel_cb)
+                yield start + offset, png
+        finished = True
+    finally:
+        if finished:
+            pool.close()
+        else:
+            pool.terminate()
+        pool.join()
+
+
 def _export_progress(progress_cb: ProgressCallback | None, progress: float, message: str) -> None:
     """Emit bounded export progress."""
     if not callable(progress_cb):
@@ -581,44 +711,29 @@ def _export_plotly_animation_to_mp4(
                 )
             )
 
-        def _render_png(fig_obj: Any) -> bytes:
-            try:
-                return fig_obj.to_image(format="png", width=int(opts["width"]), height=int(opts["height"]), scale=int(opts["scale"]))
-            except Exception as exc:
-                msg = str(exc)
-                if "kaleido" in msg.lower():
-                    raise RuntimeError("Plotly image export requires the 'kaleido' package. Install it to export video.") from exc
-                raise RuntimeError(f"Failed to render frame image: {exc}") from exc
-
         total = len(frames) + 1
+        workers = _render_worker_count(total)
+        size = (int(opts["width"]), int(opts["height"]), int(opts["scale"]))
+        frames_json = [frame.to_plotly_json() for frame in frames]
         try:
-            work_fig = go.Figure(base_fig)
-            _export_progress(progress_cb, 0.0, f"Rendering frame 0/{total - 1} ({codec})")
+            _export_progress(progress_cb, 0.0, f"Rendering frame 0/{total - 1} ({codec}, {workers} render workers)")
             _check_cancelled(cancel_cb)
             if proc.poll() is not None:
                 _drain_stderr()
                 raise BrokenPipeError("ffmpeg exited before receiving frames")
-            proc.stdin.write(_render_png(work_fig))
-            try:
-                proc.stdin.flush()
-            except Exception:
-                pass
-            _drain_stderr()
-            if _stderr_has_fatal():
-                raise BrokenPipeError("ffmpeg reported fatal error")
-
-            for idx, frame in enumerate(frames, start=1):
-                _check_cancelled(cancel_cb)
-                _export_progress(progress_cb, float(idx) / float(max(1, total)), f"Rendering frame {idx}/{total - 1} ({codec})")
-                _apply_plotly_frame_inplace(work_fig, frame)
-                if proc.poll() is not None:
-                    _drain_stderr()
-                    raise BrokenPipeError("ffmpeg exited early")
-                proc.stdin.write(_render_png(work_fig))
-                if idx % 3 == 0:
-                    _drain_stderr()
-                    if _stderr_has_fatal():
-                        raise BrokenPipeError("ffmpeg reported fatal error")
+            # PNGs are piped to ffmpeg as soon as the next frame in order is ready.
+            rendered = _iter_rendered_frames(base_fig.to_plotly_json(), frames_json, size, workers=workers, cancel_cb=cancel_cb)
+            with contextlib.closing(rendered):
+                for idx, png in rendered:
+                    if proc.poll() is not None:
+                        _drain_stderr()
+                        raise BrokenPipeError("ffmpeg exited early")
+                    proc.stdin.write(png)
+                    _export_progress(progress_cb, 0.97 * float(idx + 1) / float(total), f"Rendered frame {idx}/{total - 1} ({codec}, {workers} render workers)")
+                    if idx % 3 == 0:
+                        _drain_stderr()
+                        if _stderr_has_fatal():
+                            raise BrokenPipeError("ffmpeg reported fatal error")
 
             _export_progress(progress_cb, 0.98, f"Encoding MP4 ({codec})")
             try:
@@ -654,7 +769,7 @@ def _export_plotly_animation_to_mp4(
         if out_mp4.stat().st_size > MAX_EXPORT_OUTPUT_BYTES:
             raise MovieExportTooLargeError("Movie export output exceeds the 512 MiB limit")
         _export_progress(progress_cb, 1.0, "Movie export ready.")
-        return out_mp4.read_bytes(), {"codec": codec, "preset": preset, "ffmpeg": ffmpeg_source, "frames": len(frames), "options": opts}
+        return out_mp4.read_bytes(), {"codec": codec, "preset": preset, "ffmpeg": ffmpeg_source, "frames": len(frames), "render_workers": workers, "options": opts}
 
 
 def export_plotly_animation_to_mp4(
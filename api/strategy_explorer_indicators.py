@@ -0,0 +1,174 @@
+"""Incremental V7 indicator columns for candle frames that grow at the tail.
+
+``calculate_v7_indicators`` recomputes every EMA over the whole frame with
+pandas ``ewm``.  When new candles are appended (fresh shards while the
+Strategy Explorer or Movie Builder is open), the columns only need the
+new rows: the bias-adjusted EMA is a ratio of two running sums
+(``num / den``), so keeping those sums at the last processed candle lets
+the column be extended in O(new candles).
+
+- :class:`IncrementalEma` reproduces ``Series.ewm(span, adjust=True).mean()``
+  (``ignore_na=False``: NaNs decay the sums without adding to them).
+- :class:`IncrementalVolatility` reproduces ``_v7_volatility_series``: the
+  hourly log-range EMA over closed ``label="right"`` hour bins, forward
+  filled to 1m, with the 1m log-range EMA as early fallback.
+
+``CandleCache`` keeps one engine per memoized full-history column and first
+checks :func:`frame_extends`; if the already processed history was edited,
+the columns are recomputed in full.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from api.strategy_explorer_core import _v7_ema_series, _v7_volatility_series
+
+# Rows before the last processed candle that must be unchanged for an append;
+# the newest day's shard is the one rewritten while candles are downloaded.
+TAIL_CHECK_ROWS = 1440
+_OHLC = ("open", "high", "low", "close")
+
+
+@dataclass(frozen=True)
+class FrameMark:
+    """Identity of the processed part of a frame, used to detect edits."""
+
+    rows: int
+    first: Any
+    last: Any
+    tail_digest: str
+
+
+def _tail_digest(frame: pd.DataFrame, rows: int) -> str:
+    tail = frame.iloc[max(0, rows - TAIL_CHECK_ROWS) : rows]
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(np.ascontiguousarray(tail.index.asi8).tobytes())
+    for column in _OHLC:
+        if column in tail.columns:
+            digest.update(np.ascontiguousarray(tail[column].to_numpy(dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+
+def frame_mark(frame: pd.DataFrame) -> FrameMark | None:
+    """Return the mark of a time-indexed frame, or None when it cannot be extended."""
+    if not isinstance(frame.index, pd.DatetimeIndex) or frame.empty or not frame.index.is_monotonic_increasing:
+        return None
+    return FrameMark(len(frame), frame.index[0], frame.index[-1], _tail_digest(frame, len(frame)))
+
+
+def frame_extends(mark: FrameMark | None, frame: pd.DataFrame) -> bool:
+    """Return True when ``frame`` is the marked frame plus rows appended after its last candle."""
+    if mark is None or not isinstance(frame.index, pd.DatetimeIndex) or len(frame) < mark.rows:
+        return False
+    if not frame.index.is_monotonic_increasing:
+        return False
+    if frame.index[0] != mark.first or frame.index[mark.rows - 1] != mark.last:
+        return False
+    if len(frame) > mark.rows and not frame.index[mark.rows] > mark.last:
+        return False
+    return _tail_digest(frame, mark.rows) == mark.tail_digest
+
+
+def _ema_sums(values: np.ndarray, decay: float) -> tuple[float, float]:
+    """Return pandas-equivalent adjusted EMA numerator/denominator after ``values``."""
+    finite = np.isfinite(values)
+    if not finite.any():
+        return 0.0, 0.0
+    age = (len(values) - 1 - np.flatnonzero(finite)).astype(np.float64)
+    weights = np.power(decay, age)
+    return float(np.dot(weights, values[finite])), float(weights.sum())
+
+
+class IncrementalEma:
+    """``Series.ewm(span=span, adjust=True).mean()`` that can be extended by appended values."""
+
+    def __init__(self, span: float) -> None:
+        self.span = float(span)
+        self.decay = 1.0 - 2.0 / (self.span + 1.0)
+        self.num = 0.0
+        self.den = 0.0
+
+    def compute(self, values: pd.Series) -> pd.Series:
+        """Full computation through pandas; also captures the running sums."""
+        out = _v7_ema_series(values, self.span)
+        self.num, self.den = _ema_sums(values.to_numpy(dtype=np.float64), self.decay)
+        return out
+
+    def extend_values(self, values: np.ndarray) -> np.ndarray:
+        """Advance the sums over ``values`` and return the EMA at each of them."""
+        out = np.empty(len(values), dtype=np.float64)
+        num, den, decay = self.num, self.den, self.decay
+        for i, value in enumerate(values):
+            num *= decay
+            den *= decay
+            if np.isfinite(value):
+                num += value
+                den += 1.0
+            out[i] = num / den if den > 0.0 else np.nan
+        self.num, self.den = num, den
+        return out
+
+
+def _hourly_log_ratio(frame: pd.DataFrame) -> pd.Series:
+    """Closed-right hourly log(high/low), filtered like ``_v7_volatility_series``."""
+    ohlc_1h = frame[list(_OHLC)].resample("1h", label="right", closed="right").agg(
+        {"open": "first", "high": "max", "low": "min", "close": "last"}
+    )
+    ohlc_1h = ohlc_1h.dropna(subset=list(_OHLC))
+    ohlc_1h = ohlc_1h[(ohlc_1h["high"] > 0.0) & (ohlc_1h["low"] > 0.0)]
+    return np.log(ohlc_1h["high"] / ohlc_1h["low"])
+
+
+class IncrementalVolatility:
+    """``_v7_volatility_series`` that can be extended by appended 1m candles."""
+
+    def __init__(self, vol_span_hours: float) -> None:
+        self.vol_span_hours = vol_span_hours
+        self.ema_1m = IncrementalEma(max(1.0, float(vol_span_hours or 0.0) * 60.0))
+        self.ema_1h = IncrementalEma(max(1.0, float(vol_span_hours) if vol_span_hours is not None else 1.0))
+        self.closed_label: pd.Timestamp | None = None
+        self.last_1h: float = np.nan
+
+    def _capture_hourly(self, frame: pd.DataFrame) -> None:
+        self.closed_label = frame.index[-1].floor("1h")
+        log_ratio = _hourly_log_ratio(frame)
+        closed = log_ratio[log_ratio.index <= self.closed_label]
+        values = closed.to_numpy(dtype=np.float64)
+        self.ema_1h.num, self.ema_1h.den = _ema_sums(values, self.ema_1h.decay)
+        self.last_1h = self.ema_1h.num / self.ema_1h.den if self.ema_1h.den > 0.0 else np.nan
+
+    def compute(self, frame: pd.DataFrame) -> pd.Series | float:
+        """Full computation through ``_v7_volatility_series``; captures extension state."""
+        out = _v7_volatility_series(frame, self.vol_span_hours)
+        log_range = np.log(frame["high"] / frame["low"]).to_numpy(dtype=np.float64)
+        self.ema_1m.num, self.ema_1m.den = _ema_sums(log_range, self.ema_1m.decay)
+        self._capture_hourly(frame)
+        return out
+
+    def extend(self, frame: pd.DataFrame, old_rows: int) -> pd.Series:
+        """Return the volatility of rows ``old_rows..`` of ``frame``, advancing the state."""
+        new = frame.iloc[old_rows:]
+        vol_1m = self.ema_1m.extend_values(np.log(new["high"] / new["low"]).to_numpy(dtype=np.float64))
+
+        # Re-bin only the open hour of the old tail plus the appended rows.
+        pending = frame.iloc[frame.index.searchsorted(self.closed_label, side="right") :]
+        log_ratio = _hourly_log_ratio(pending)
+        new_closed = new.index[-1].floor("1h")
+        labels = log_ratio.index[log_ratio.index <= new_closed]
+        ema_values = self.ema_1h.extend_values(log_ratio.loc[labels].to_numpy(dtype=np.float64))
+
+        # Forward fill: each new row takes the EMA of the last closed hour at or before it.
+        positions = np.searchsorted(labels.asi8, new.index.asi8, side="right") - 1
+        vol_1h = np.where(positions >= 0, ema_values[np.clip(positions, 0, None)] if len(ema_values) else np.nan, self.last_1h)
+        if len(ema_values):
+            self.last_1h = float(ema_values[-1])
+        self.closed_label = new_closed
+        out = np.where(np.isnan(vol_1h), vol_1m, vol_1h)
+        return pd.Series(np.nan_to_num(out, nan=0.0, posinf=np.inf, neginf=-np.inf), index=new.index)
+
@@ -31,6 +31,7 @@ from fastapi.responses import HTMLResponse
 
 from api.auth import SessionToken, authenticate_websocket, require_auth, validate_token
 from api.pb7_bridge import get_allowed_override_params, get_template_config
+from api.response_cache import CachedResponder, ConditionalCache, path_stamp, respond
 from cmc_pool import CmcPoolClient
 from credential_store import CredentialStore
 from logging_helpers import human_log as _log
@@ -1154,12 +1155,36 @@ def get_draft(
     return {"config": cfg, "param_status": param_status, "override_configs": override_configs}
 
 
+def _instances_version() -> tuple:
+    """Change key for the instance list: local config stats + VPS store revision.
+
+    Locally running PBRun processes are only visible through ``ps``; the
+    cache's max_age bounds how long such a change can go unnoticed.
+    """
+    run_dir = Path(PBGDIR) / "data" / "run_v7"
+    store = _monitor.store if _monitor else None
+    return (
+        path_stamp(run_dir, *sorted(run_dir.glob("*/config.json"))),
+        id(store),
+        getattr(store, "v7_revision", 0),
+    )
+
+
+_instances_cache = ConditionalCache("v7_instances.get_instances", version=_instances_version, max_age=5.0)
+
+
 @router.get("/instances")
-def get_instances(session: SessionToken = Depends(require_auth)):
+def get_instances(
+    session: SessionToken = Depends(require_auth),
+    cache: CachedResponder = Depends(_instances_cache),
+):
     """List all v7 instances with sync status from VPS data."""
-    instances = _load_local_instances()
-    instances = _enrich_with_vps_data(instances)
-    return {"instances": instances}
+    def build() -> dict:
+        instances = _load_local_instances()
+        instances = _enrich_with_vps_data(instances)
+        return {"instances": instances}
+
+    return respond(cache, build)
 
 
 @router.get("/instances/new-config")
@@ -17,6 +17,7 @@ import os
 import re
 import shlex
 import shutil
+import struct
 import sys
 import time
 import uuid
@@ -61,6 +62,7 @@ from master.cluster_state import (
     default_cluster_root,
     ensure_local_identity,
     membership_signing_public_key,
+    operation_exists,
     read_materialized_state,
     read_local_identity,
     rebuild_materialized_state,
@@ -68,7 +70,15 @@ from master.cluster_state import (
     validate_operation,
     write_operation,
 )
+from master.cluster_oplog import (
+    OplogError,
+    actor_dirs,
+    actor_sequences,
+    iter_actor_records,
+    read_operation_range as read_stored_operation_range,
+)
 from master.cluster_ssh_keys import ensure_cluster_ssh_key
+from master.cluster_blob_pack import encode_pack, read_reachable_pack
 from master.cluster_checkpoint import (
     ClusterCheckpointError,
     _deserialize_membership_trust,
@@ -109,6 +119,13 @@ MAX_GET_OPS = 1000
 MAX_GET_BLOBS = 100
 MAX_BLOB_COVERAGE_HASHES = 1000
 MAX_BLOB_COVERAGE_VERIFY_BYTES = 64 * 1024 * 1024
+MAX_BLOB_PACK_BYTES = 16 * 1024 * 1024
+MAX_STDIN_BYTES = max(MAX_CONFIG_BLOB_BATCH_BYTES, MAX_CONFIG_BLOB_BYTES, MAX_OPERATION_BATCH_BYTES, MAX_APPLY_BUNDLE_BYTES, MAX_CHECKPOINT_BYTES)
+MAX_GET_OP_RANGES = 256
+MAX_SESSION_HEADER_BYTES = 16 * 1024
+MAX_SESSION_BODY_BYTES = 64 * 1024 * 1024
+SESSION_VERB = "session"
+_SESSION_FRAME = struct.Struct(">II")
 MAILBOX_INDEX_VERBS = frozenset({"get-mailbox-index", "mailbox-list"})
 MAILBOX_GET_VERBS = frozenset({"get-mailbox-message", "mailbox-get"})
 MAILBOX_PUT_VERBS = frozenset({"put-mailbox-message", "mailbox-put"})
@@ -120,11 +137,13 @@ READ_VERBS = frozenset({
     "get-state-vector",
     "get-desired-state",
     "get-ops",
+    "get-op-ranges",
     "get-blob",
     "get-blobs",
     "get-secret-blob",
     "get-sealed-blob",
     "missing-blobs",
+    "get-blob-pack",
     *MAILBOX_INDEX_VERBS,
     *MAILBOX_GET_VERBS,
     "materialize-v7-preview",
@@ -139,8 +158,8 @@ READ_VERBS = frozenset({
     "join-get-ops",
 })
 WRITE_VERBS = frozenset({"join", "join-hello", "join-checkpoint", "join-register", "put-op", "put-ops", "repair-op-gap", "put-blob", "put-blobs", "put-secret-blob", "put-sealed-blob", "apply-bundle", "rebuild", "materialize-v7", "materialize-v8", "materialize-api-keys", "materialize-credentials", "prepare-checkpoint", "commit-checkpoint", "install-checkpoint", *MAILBOX_PUT_VERBS, *MAILBOX_ACK_VERBS})
-STDIN_VERBS = frozenset({"join-checkpoint", "join-register", "put-op", "put-ops", "repair-op-gap", "put-blob", "put-blobs", "put-secret-blob", "put-sealed-blob", "apply-bundle", "prepare-checkpoint", "commit-checkpoint", "install-checkpoint", "missing-blobs", *MAILBOX_PUT_VERBS})
-SUPPORTED_VERBS = READ_VERBS | WRITE_VERBS
+STDIN_VERBS = frozenset({"join-checkpoint", "join-register", "put-op", "put-ops", "repair-op-gap", "put-blob", "put-blobs", "put-secret-blob", "put-sealed-blob", "apply-bundle", "prepare-checkpoint", "commit-checkpoint", "install-checkpoint", "missing-blobs", "get-blob-pack", "get-op-ranges", *MAILBOX_PUT_VERBS})
+SUPPORTED_VERBS = READ_VERBS | WRITE_VERBS | {SESSION_VERB}
 
 
 class ClusterSyncCommandError(RuntimeError):
@@ -386,6 +405,10 @@ def run_command(
             "operations": operations,
             "missing": missing,
         }
+    if verb == "get-op-ranges":
+        _require_arity(tokens, 1)
+        request = _read_json_payload(stdin_data, MAX_OPERATION_BYTES)
+        return _operation_ranges_response(root, identity, request)
     if verb == "get-blob":
         _require_arity(tokens, 2)
         return _read_blob_response(paths.config_blobs, tokens[1], secret=False, cluster_root=root)
@@ -410,6 +433,10 @@ def run_command(
         _require_arity(tokens, 1)
         request = _read_json_payload(stdin_data, MAX_OPERATION_BATCH_BYTES)
         return _missing_blob_coverage(paths, request)
+    if verb == "get-blob-pack":
+        _require_arity(tokens, 1)
+        request = _read_json_payload(stdin_data, MAX_OPERATION_BATCH_BYTES)
+        return _blob_pack_response(root, paths, request)
     if verb in MAILBOX_INDEX_VERBS:
         _require_arity(tokens, 1)
         _verify_remote_node(root, remote_node, allow_join=False)
@@ -640,9 +667,103 @@ def run_command(
         _require_arity(tokens, 1)
         with advisory_file_lock(root / ".append_sequence"):
             return _apply_bundle(root, paths, cluster_id, stdin_data, remote_node=remote_node)
+    if verb == SESSION_VERB:
+        raise ClusterSyncCommandError("session requires a framed command stream")
     raise ClusterSyncCommandError(f"unsupported command: {verb}")
 
 
+def serve_session(
+    cluster_root: Path,
+    remote_node: str,
+    reader,
+    writer,
+    *,
+    allow_join: bool = False,
+) -> int:
+    """Answer framed commands from *reader* until EOF and return the request count.
+
+    Each frame is ``u32 header length | u32 body length | header JSON | body``.
+    Requests carry ``{"id", "command", "chain"}`` with the command's stdin
+    payload as body; responses carry ``{"id", "ok", "error"}`` with the JSON
+    result as body. Requests are answered in order, so a client may pipeline
+    several frames before reading. A ``chain`` request is skipped when the
+    request before it failed, which keeps pipelined command sequences as
+    fail-fast as separate SSH calls.
+    """
+
+    handled = 0
+    previous_ok = True
+    while True:
+        frame = read_session_frame(reader)
+        if frame is None:
+            return handled
+        header, body, _size = frame
+        response: dict[str, Any] = {"id": header.get("id"), "ok": False}
+        result: dict[str, Any] | None = None
+        if header.get("chain") and not previous_ok:
+            response["error"] = "skipped after a failed pipelined command"
+        else:
+            try:
+                command_text = str(header.get("command") or "")
+                verb = _parse_command(command_text)[0]
+                if verb == SESSION_VERB:
+                    raise ClusterSyncCommandError("session cannot be nested")
+                if body and verb not in STDIN_VERBS:
+                    raise ClusterSyncCommandError(f"{verb} does not accept a payload")
+                result = run_command(cluster_root, remote_node, command_text, body, allow_join=allow_join)
+                response["ok"] = True
+            except Exception as exc:
+                response["error"] = str(exc)
+        previous_ok = bool(response["ok"])
+        payload = json.dumps(result, sort_keys=True).encode("utf-8") if result is not None else b""
+        write_session_frame(writer, response, payload)
+        handled += 1
+
+
+def read_session_frame(reader) -> tuple[dict[str, Any], bytes, int] | None:
+    """Read one session frame as ``(header, body, frame size)``, or ``None`` on a clean EOF."""
+
+    prefix = _read_exact(reader, _SESSION_FRAME.size, allow_eof=True)
+    if prefix is None:
+        return None
+    header_len, body_len = _SESSION_FRAME.unpack(prefix)
+    if header_len > MAX_SESSION_HEADER_BYTES or body_len > MAX_SESSION_BODY_BYTES:
+        raise ClusterSyncCommandError("session frame too large")
+    try:
+        header = json.loads(_read_exact(reader, header_len))
+    except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ClusterSyncCommandError("invalid session frame header") from exc
+    if not isinstance(header, dict):
+        raise ClusterSyncCommandError("invalid session frame header")
+    return header, _read_exact(reader, body_len), _SESSION_FRAME.size + header_len + body_len
+
+
+def write_session_frame(writer, header: dict[str, Any], body: bytes = b"") -> int:
+    """Write and flush one session frame and return its size in bytes."""
+
+    raw_header = json.dumps(header, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    frame = _SESSION_FRAME.pack(len(raw_header), len(body)) + raw_header + bytes(body)
+    writer.write(frame)
+    writer.flush()
+    return len(frame)
+
+
+def _read_exact(reader, size: int, *, allow_eof: bool = False) -> bytes | None:
+    """Read exactly *size* bytes from a binary stream."""
+
+    chunks: list[bytes] = []
+    remaining = size
+    while remaining:
+        chunk = reader.read(remaining)
+        if not chunk:
+            if allow_eof and remaining == size:
+                return None
+            raise ClusterSyncCommandError("truncated session frame")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
 def main(argv: list[str] | None = None) -> int:
     """Command-line entry point for OpenSSH forced-command execution."""
 
@@ -655,6 +776,15 @@ def main(argv: list[str] | None = None) -> int:
 
     try:
         command_text = os.environ.get("SSH_ORIGINAL_COMMAND") or " ".join(args.command).strip()
+        if _parse_command(command_text) == [SESSION_VERB]:
+            serve_session(
+                Path(args.cluster_root),
+                str(args.remote_node),
+                sys.stdin.buffer,
+                sys.stdout.buffer,
+                allow_join=bool(args.allow_join),
+            )
+            return 0
         stdin_data = _read_stdin_for_command(command_text)
         payload = run_command(
             Path(args.cluster_root),
@@ -677,7 +807,7 @@ def _read_stdin_for_command(command_text: str) -> bytes:
     tokens = _parse_command(command_text)
     if tokens[0] not in STDIN_VERBS:
         return b""
-    return sys.stdin.buffer.read(max(MAX_CONFIG_BLOB_BATCH_BYTES, MAX_CONFIG_BLOB_BYTES, MAX_OPERATION_BATCH_BYTES, MAX_APPLY_BUNDLE_BYTES, MAX_CHECKPOINT_BYTES) + 1)
+    return sys.stdin.buffer.read(MAX_STDIN_BYTES + 1)
 
 
 def _hello_payload(cluster_root: Path, identity: dict[str, Any], remote_node: str) -> dict[str, Any]:
@@ -952,23 +1082,16 @@ def _gap_repair_membership_trust(cluster_root: Path, cluster_id: str):
     baseline = checkpoint.get("baseline_vector") if isinstance(checkpoint.get("baseline_vector"), dict) else {}
     membership_operations: list[dict[str, Any]] = []
     paths = ClusterPaths.from_root(cluster_root)
-    if paths.oplog.exists():
-        for actor_dir in sorted(path for path in paths.oplog.iterdir() if path.is_dir()):
-            actor = str(actor_dir.name)
-            expected = int(baseline.get(actor, 0)) + 1
-            for path in sorted(actor_dir.glob("*.json")):
-                try:
-                    seq = int(path.stem)
-                except ValueError as exc:
-                    raise ClusterSyncCommandError("operation gap repair found an invalid filename") from exc
-                if seq <= int(baseline.get(actor, 0)):
-                    continue
+    for actor_dir in actor_dirs(paths.oplog):
+        actor = str(actor_dir.name)
+        expected = int(baseline.get(actor, 0)) + 1
+        try:
+            records = iter_actor_records(actor_dir, after_seq=int(baseline.get(actor, 0)))
+            for record in records:
+                seq = record.seq
                 if seq != expected:
                     break
-                try:
-                    operation = json.loads(path.read_text(encoding="utf-8"))
-                except (OSError, json.JSONDecodeError) as exc:
-                    raise ClusterSyncCommandError("operation gap repair found an unreadable operation") from exc
+                operation = json.loads(record.raw)
                 if (
                     not isinstance(operation, dict)
                     or str(operation.get("actor") or "") != actor
@@ -978,6 +1101,10 @@ def _gap_repair_membership_trust(cluster_root: Path, cluster_id: str):
                 if str(operation.get("op") or "") in MEMBERSHIP_OPS:
                     membership_operations.append(operation)
                 expected += 1
+        except OplogError as exc:
+            raise ClusterSyncCommandError("operation gap repair found an invalid filename") from exc
+        except (OSError, UnicodeDecodeError, json.JSONDecodeError) as exc:
+            raise ClusterSyncCommandError("operation gap repair found an unreadable operation") from exc
     membership_operations.sort(
         key=lambda item: (
             int(item.get("created_at") or 0),
@@ -1023,11 +1150,11 @@ def _repair_operation_gap(
     expected = int(baseline.get(actor, 0)) + 1
     later_exists = False
     if actor_dir.exists():
-        for path in sorted(actor_dir.glob("*.json")):
-            try:
-                existing_seq = int(path.stem)
-            except ValueError as exc:
-                raise ClusterSyncCommandError("operation gap repair found an invalid filename") from exc
+        try:
+            stored = actor_sequences(actor_dir)
+        except OplogError as exc:
+            raise ClusterSyncCommandError("operation gap repair found an invalid filename") from exc
+        for existing_seq in sorted(stored):
             if existing_seq < expected:
                 continue
             if existing_seq == expected:
@@ -1035,7 +1162,7 @@ def _repair_operation_gap(
                 continue
             later_exists = True
             break
-    if seq != expected or not later_exists or (actor_dir / f"{seq:08d}.json").exists():
+    if seq != expected or not later_exists or operation_exists(cluster_root, actor, seq):
         raise ClusterSyncCommandError("operation is not the first missing checkpoint-tail sequence")
     trust = _gap_repair_membership_trust(cluster_root, cluster_id)
     _safe_state_call(
@@ -1111,14 +1238,18 @@ def _read_operation_range(
     operations: list[dict[str, Any]] = []
     missing: list[int] = []
     op_dir = ClusterPaths.from_root(cluster_root).oplog / actor
+    try:
+        records = read_stored_operation_range(op_dir, from_seq, to_seq)
+    except (OplogError, OSError) as exc:
+        raise ClusterSyncCommandError(f"failed to read operations {actor}:{from_seq:08d}-{to_seq:08d}") from exc
     for seq in range(from_seq, to_seq + 1):
-        path = op_dir / f"{seq:08d}.json"
-        if not path.is_file():
+        record = records.get(seq)
+        if record is None:
             missing.append(seq)
             continue
         try:
-            operation = json.loads(path.read_text(encoding="utf-8"))
-        except (OSError, json.JSONDecodeError) as exc:
+            operation = json.loads(record.raw)
+        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
             raise ClusterSyncCommandError(f"failed to read operation {actor}:{seq:08d}") from exc
         _safe_state_call(
             lambda op=operation: validate_operation(
@@ -1133,6 +1264,45 @@ def _read_operation_range(
     return operations, missing
 
 
+def _operation_ranges_response(cluster_root: Path, identity: dict[str, Any], request: dict[str, Any]) -> dict[str, Any]:
+    """Read several actor operation ranges for one ``get-op-ranges`` request."""
+
+    raw_ranges = request.get("ranges")
+    if not isinstance(raw_ranges, list) or not raw_ranges or len(raw_ranges) > MAX_GET_OP_RANGES:
+        raise ClusterSyncCommandError(f"get-op-ranges requires 1..{MAX_GET_OP_RANGES} range(s)")
+    cluster_id = str(identity["cluster_id"])
+    requested: list[tuple[str, int, int]] = []
+    total = 0
+    for item in raw_ranges:
+        if not isinstance(item, list) or len(item) != 3:
+            raise ClusterSyncCommandError("invalid operation range")
+        actor = _validate_node_id(item[0], "actor")
+        from_seq = _parse_positive_int(str(item[1]), "from_seq")
+        to_seq = _parse_positive_int(str(item[2]), "to_seq")
+        if to_seq < from_seq:
+            raise ClusterSyncCommandError("to_seq must be greater than or equal to from_seq")
+        total += to_seq - from_seq + 1
+        requested.append((actor, from_seq, to_seq))
+    if total > MAX_GET_OPS:
+        raise ClusterSyncCommandError(f"get-op-ranges cannot exceed {MAX_GET_OPS} operation(s)")
+    baseline = active_checkpoint_baseline(cluster_root)
+    ranges: list[dict[str, Any]] = []
+    for actor, from_seq, to_seq in requested:
+        entry: dict[str, Any] = {"actor": actor, "from_seq": from_seq, "to_seq": to_seq}
+        if from_seq <= int(baseline.get(actor, 0)):
+            entry.update({"status": "checkpoint_required", "operations": [], "missing": []})
+        else:
+            operations, missing = _read_operation_range(cluster_root, actor, from_seq, to_seq, expected_cluster_id=cluster_id)
+            entry.update({"status": "ok", "operations": operations, "missing": missing})
+        ranges.append(entry)
+    return {
+        "ok": True,
+        "cluster_id": cluster_id,
+        "node_id": str(identity["node_id"]),
+        "ranges": ranges,
+    }
+
+
 def _credential_cutoff(cluster_root: Path) -> dict[str, Any] | None:
     """Return the current non-conflicted signed credential cutoff."""
 
@@ -1228,6 +1398,98 @@ def _missing_blob_coverage(paths: ClusterPaths, request: dict[str, Any]) -> dict
     return {"ok": True, "requested": total, "missing": missing}
 
 
+def _blob_pack_response(root: Path, paths: ClusterPaths, request: dict[str, Any]) -> dict[str, Any]:
+    """Answer a have/want request with one compressed pack of the wanted blobs.
+
+    The caller lists only hashes it does not hold.  With ``expand_manifests``
+    the file blobs of every served config manifest are added to the pack, so a
+    checkpoint or operation batch needs a single round trip.  Blobs beyond the
+    pack budget are returned under ``deferred`` for a follow-up request.
+    """
+
+    want = request.get("want") if isinstance(request.get("want"), dict) else None
+    if want is None or set(want) != {"config", "secret", "sealed"}:
+        raise ClusterSyncCommandError("get-blob-pack want must contain config, secret, and sealed lists")
+    normalized: dict[str, list[str]] = {}
+    for kind in ("config", "secret", "sealed"):
+        values = want.get(kind)
+        if not isinstance(values, list) or any(not isinstance(item, str) for item in values):
+            raise ClusterSyncCommandError(f"get-blob-pack {kind} must be a hash list")
+        hashes = [_validate_hash(item) for item in values]
+        if hashes != sorted(set(hashes)):
+            raise ClusterSyncCommandError(f"get-blob-pack {kind} hashes must be sorted and unique")
+        normalized[kind] = hashes
+    if sum(len(hashes) for hashes in normalized.values()) > MAX_BLOB_COVERAGE_HASHES:
+        raise ClusterSyncCommandError("get-blob-pack request is too large")
+    expand = request.get("expand_manifests") is True
+
+    obsolete = set((_credential_cutoff(root) or {}).get("obsolete_secret_blob_hashes") or [])
+    packed = read_reachable_pack(paths.config_blobs, normalized["config"])
+    entries: list[tuple[str, str, bytes]] = []
+    missing: dict[str, list[str]] = {"config": [], "secret": [], "sealed": []}
+    deferred: dict[str, list[str]] = {"config": [], "secret": [], "sealed": []}
+    seen: set[tuple[str, str]] = set()
+    queue = [(kind, blob_hash, expand and kind == "config") for kind in ("config", "secret", "sealed") for blob_hash in normalized[kind]]
+    total = 0
+    while queue:
+        kind, blob_hash, expand_children = queue.pop(0)
+        if (kind, blob_hash) in seen:
+            continue
+        seen.add((kind, blob_hash))
+        try:
+            if kind == "config":
+                raw = packed.get(blob_hash)
+                if raw is None:
+                    raw = base64.b64decode(
+                        _read_blob_response(paths.config_blobs, blob_hash, secret=False, cluster_root=root)["content_b64"]
+                    )
+            elif kind == "secret":
+                if blob_hash in obsolete:
+                    raise ClusterSyncCommandError("pre-cutoff plaintext secret blob is unavailable")
+                raw = _read_verified_blob(paths.secret_blobs, blob_hash, "secret blob", max_size=MAX_SECRET_BLOB_BYTES)
+            else:
+                raw = _read_verified_blob(paths.sealed_blobs, blob_hash, "secret blob", max_size=MAX_SEALED_BLOB_BYTES)
+                _validate_sealed_blob_payload(root, raw)
+        except (OSError, ClusterSyncCommandError):
+            missing[kind].append(blob_hash)
+            continue
+        if total + len(raw) > MAX_BLOB_PACK_BYTES and entries:
+            deferred[kind].append(blob_hash)
+            continue
+        total += len(raw)
+        entries.append((kind, blob_hash, raw))
+        if expand_children:
+            queue.extend(("config", child_hash, False) for child_hash in _pack_manifest_children(raw))
+    for values in (*missing.values(), *deferred.values()):
+        values.sort()
+    return {
+        "ok": True,
+        "count": len(entries),
+        "bytes": total,
+        "pack_b64": base64.b64encode(encode_pack(entries)).decode("ascii"),
+        "missing": missing,
+        "deferred": deferred,
+    }
+
+
+def _pack_manifest_children(raw: bytes) -> list[str]:
+    """Return valid file blob hashes of a config manifest, or none for other blobs."""
+
+    try:
+        manifest = json.loads(raw.decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return []
+    files = manifest.get("files") if isinstance(manifest, dict) else None
+    children: list[str] = []
+    for meta in (files.values() if isinstance(files, dict) else []):
+        sha = str((meta if isinstance(meta, dict) else {}).get("sha256") or "")
+        try:
+            children.append(_validate_hash(f"sha256:{sha}"))
+        except ClusterSyncCommandError:
+            continue
+    return children
+
+
 def _repair_config_blob_response_from_run_v7(cluster_root: Path, requested_hash: str) -> bool:
     """Rebuild a missing config blob from matching local run_v7 files."""
 
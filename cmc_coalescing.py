@@ -0,0 +1,291 @@
+"""Request coalescing and a persistent ``/info`` store in front of the CMC pool.
+
+Several PBGui processes (PBCoinData, API refresh jobs, PBRun status checks)
+issue the same CoinMarketCap requests within seconds of each other.
+:class:`CmcRequestCoalescer` makes every request single-flight per
+endpoint + params across threads and processes: the first caller registers
+an in-flight marker and performs the upstream call, later callers join that
+flight and reuse the published response, as do callers arriving within a
+short reuse window.  Locks are only held to check the cache and register or
+join a flight, never across the upstream call and its retries.  Credits
+that were not spent that way are accounted as saved.
+
+:class:`CmcInfoStore` keeps the latest ``/info`` record per CMC id in SQLite,
+so metadata refreshes only request ids without a recent record.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Mapping
+
+from file_lock import advisory_file_lock
+from secure_files import atomic_write_private_text
+
+# Seconds an identical successful response is reused without an upstream call.
+REUSE_SECONDS = {"listings": 120.0, "status": 60.0, "metadata": 300.0}
+INFO_REUSE_SECONDS = 6 * 3600
+_MAX_RESPONSES = 32
+# Flights hash onto a fixed set of lock files; /info id lists vary per call.
+LOCK_STRIPES = 64
+# A flight whose owner is still alive is joined for at most this long.
+FLIGHT_TIMEOUT_SECONDS = 300.0
+FLIGHT_POLL_SECONDS = 0.05
+_STATS_VERSION = 1
+# In-process flights per (cache root, request key); set once the flight ends.
+_FLIGHTS: dict[tuple[str, str], threading.Event] = {}
+_FLIGHTS_LOCK = threading.Lock()
+
+FetchResult = tuple[Any, int | None, int, str | None]
+
+
+def request_key(endpoint: str, params: Mapping[str, Any] | None) -> str:
+    """Return a stable file-name-safe key for one endpoint + params combination."""
+    canonical = json.dumps(
+        {"endpoint": str(endpoint), "params": {str(k): str(v) for k, v in (params or {}).items()}},
+        sort_keys=True,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+class CmcRequestCoalescer:
+    """Single-flight CMC requests per endpoint + params and account saved credits."""
+
+    def __init__(self, root: Path | str, *, clock: Callable[[], float] = time.time) -> None:
+        self.root = Path(root)
+        self._responses = self.root / "responses"
+        self._flights = self.root / "flights"
+        self._stats_path = self.root / "stats.json"
+        self._clock = clock
+
+    def fetch(
+        self,
+        endpoint: str,
+        params: Mapping[str, Any] | None,
+        fetcher: Callable[[], FetchResult],
+        *,
+        estimated_credits: float,
+        reuse_seconds: float | None = None,
+        is_valid: Callable[[Any], bool] | None = None,
+    ) -> FetchResult:
+        """Return ``fetcher()``'s result, or a response another caller just fetched.
+
+        ``fetcher`` returns ``(payload, status_code, attempts, error)`` like
+        ``CoinData._cmc_get_json``; coalesced results report zero attempts.
+        Only successful payloads are shared.
+        """
+        key = request_key(endpoint, params)
+        window = float(REUSE_SECONDS.get(endpoint, 0.0) if reuse_seconds is None else reuse_seconds)
+        started = float(self._clock())
+        flight_key = (str(self.root.resolve(strict=False)), key)
+        while True:
+            with _FLIGHTS_LOCK:
+                flight = _FLIGHTS.get(flight_key)
+                leader = flight is None
+                if leader:
+                    flight = _FLIGHTS[flight_key] = threading.Event()
+            if leader:
+                break
+            # Re-check the cache once the in-process flight ends; a failed
+            # flight shares nothing, so the next waiter leads a new one.
+            flight.wait()
+        try:
+            return self._fetch_once(key, endpoint, fetcher, started, window, estimated_credits, is_valid)
+        finally:
+            with _FLIGHTS_LOCK:
+                _FLIGHTS.pop(flight_key, None)
+            flight.set()
+
+    def _fetch_once(
+        self,
+        key: str,
+        endpoint: str,
+        fetcher: Callable[[], FetchResult],
+        started: float,
+        window: float,
+        estimated_credits: float,
+        is_valid: Callable[[Any], bool] | None,
+    ) -> FetchResult:
+        """Join another process's flight for ``key`` or run the upstream call as its owner."""
+        stripe = self.root / ".locks" / f"flight-{int(key[:8], 16) % LOCK_STRIPES:02d}"
+        marker_path = self._flights / f"{key}.json"
+        deadline = time.monotonic() + FLIGHT_TIMEOUT_SECONDS
+        while True:
+            with advisory_file_lock(stripe):
+                cached = self._read_response(key)
+                if cached is not None:
+                    fetched_at = float(cached.get("fetched_at") or 0.0)
+                    payload = cached.get("payload")
+                    fresh = fetched_at >= started or float(self._clock()) - fetched_at <= window
+                    if fresh and (is_valid is None or is_valid(payload)):
+                        self.record(endpoint, coalesced=True, credits=estimated_credits)
+                        return payload, 200, 0, None
+                owner = _read_marker(marker_path)
+                if owner is None or not _pid_alive(owner["pid"]) or time.monotonic() >= deadline:
+                    marker = {"pid": os.getpid(), "token": os.urandom(8).hex()}
+                    atomic_write_private_text(marker_path, json.dumps(marker))
+                    break
+            time.sleep(FLIGHT_POLL_SECONDS)
+        try:
+            payload, status_code, attempts, error = fetcher()
+            if payload is not None and error is None:
+                self._write_response(key, endpoint, payload)
+                self.record(endpoint, coalesced=False, credits=_credit_count(payload, estimated_credits))
+            return payload, status_code, attempts, error
+        finally:
+            with advisory_file_lock(stripe):
+                if _read_marker(marker_path) == marker:
+                    marker_path.unlink(missing_ok=True)
+
+    def record(self, endpoint: str, *, coalesced: bool, credits: float, calls: int = 1) -> None:
+        """Count upstream or coalesced requests; coalesced credits count as saved.
+
+        ``calls=0`` records credits saved by a request that was only narrowed.
+        """
+        with advisory_file_lock(self._stats_path):
+            stats = self._read_stats()
+            for bucket in (stats, stats["endpoints"].setdefault(endpoint, _empty_counters())):
+                if coalesced:
+                    bucket["coalesced_calls"] += calls
+                    bucket["credits_saved"] += float(credits)
+                else:
+                    bucket["upstream_calls"] += calls
+                    bucket["credits_spent"] += float(credits)
+            atomic_write_private_text(self._stats_path, json.dumps(stats, indent=4, sort_keys=True) + "\n")
+
+    def stats(self) -> dict[str, Any]:
+        """Return coalescing counters since the stats file was created."""
+        stats = self._read_stats()
+        total = stats["upstream_calls"] + stats["coalesced_calls"]
+        stats["coalesced_ratio"] = stats["coalesced_calls"] / total if total else 0.0
+        return stats
+
+    def _read_stats(self) -> dict[str, Any]:
+        try:
+            stats = json.loads(self._stats_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            stats = None
+        if not isinstance(stats, dict) or stats.get("version") != _STATS_VERSION:
+            stats = {"version": _STATS_VERSION, "since": float(self._clock()), "endpoints": {}, **_empty_counters()}
+        return stats
+
+    def _read_response(self, key: str) -> dict[str, Any] | None:
+        try:
+            cached = json.loads((self._responses / f"{key}.json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        return cached if isinstance(cached, dict) else None
+
+    def _write_response(self, key: str, endpoint: str, payload: Any) -> None:
+        body = {"endpoint": endpoint, "fetched_at": float(self._clock()), "payload": payload}
+        atomic_write_private_text(self._responses / f"{key}.json", json.dumps(body, separators=(",", ":")))
+        files = sorted(self._responses.glob("*.json"), key=lambda path: path.stat().st_mtime_ns)
+        for stale in files[:-_MAX_RESPONSES]:
+            stale.unlink(missing_ok=True)
+
+
+def _read_marker(path: Path) -> dict[str, Any] | None:
+    try:
+        marker = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(marker, dict) or not isinstance(marker.get("pid"), int):
+        return None
+    return marker
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return True
+
+
+def _empty_counters() -> dict[str, float]:
+    return {"upstream_calls": 0, "coalesced_calls": 0, "credits_spent": 0.0, "credits_saved": 0.0}
+
+
+def _credit_count(payload: Any, default: float) -> float:
+    status = payload.get("status") if isinstance(payload, dict) else None
+    try:
+        return float(status["credit_count"])
+    except (KeyError, TypeError, ValueError):
+        return float(default)
+
+
+class CmcInfoStore:
+    """SQLite store of the latest ``/info`` record per CMC id."""
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        self._init_lock = threading.Lock()
+        self._initialized = False
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        try:
+            with self._init_lock:
+                if not self._initialized:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.executescript(
+                        """
+                        CREATE TABLE IF NOT EXISTS info (
+                            cmc_id INTEGER PRIMARY KEY,
+                            fetched_at INTEGER NOT NULL,
+                            record TEXT NOT NULL
+                        );
+                        """
+                    )
+                    self._initialized = True
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def info_records(self, ids: Iterable[int], *, max_age: float, now: float | None = None) -> tuple[dict[str, Any], list[int]]:
+        """Split ids into (stored ``/info`` records younger than ``max_age``, ids to fetch)."""
+        wanted = sorted({int(i) for i in ids})
+        cutoff = int((now if now is not None else time.time()) - max_age)
+        found: dict[str, Any] = {}
+        with self._connect() as conn:
+            for start in range(0, len(wanted), 500):
+                chunk = wanted[start:start + 500]
+                marks = ",".join("?" * len(chunk))
+                for cmc_id, record in conn.execute(
+                    f"SELECT cmc_id, record FROM info WHERE fetched_at >= ? AND cmc_id IN ({marks})",
+                    [cutoff, *chunk],
+                ):
+                    try:
+                        found[str(cmc_id)] = json.loads(record)
+                    except ValueError:
+                        continue
+        return found, [i for i in wanted if str(i) not in found]
+
+    def record_info(self, records: Mapping[str, Any], *, now: float | None = None) -> int:
+        """Store ``/info`` records keyed by CMC id."""
+        ts = int(now if now is not None else time.time())
+        rows = []
+        for cmc_id, record in records.items():
+            try:
+                rows.append((int(cmc_id), ts, json.dumps(record, separators=(",", ":"))))
+            except (TypeError, ValueError):
+                continue
+        if rows:
+            with self._connect() as conn:
+                conn.executemany("INSERT OR REPLACE INTO info VALUES (?, ?, ?)", rows)
+        return len(rows)
+
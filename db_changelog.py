@@ -0,0 +1,285 @@
+"""Change-data-capture log for the per-user state tables of pbgui.db.
+
+DB Tools sync jobs used to delete and re-insert every position, order,
+price, balance and scan-meta row of the selected users on each run.  This
+module lets them ship only what changed:
+
+- ``db_changes`` — one row per changed *row identity* (table + stable key,
+  e.g. ``orders.uniqueid`` or ``position(user, symbol, side)``) with the
+  monotonic sequence number of its latest change.  ``AFTER`` triggers on the
+  state tables bump ``db_change_seq`` and upsert the key, so repeated price
+  ticks of one symbol coalesce into a single entry instead of growing the
+  log.  Row content is not copied: readers join back to the current rows,
+  and a key without rows is a delete.
+- ``db_changelog_meta`` — the log id (a new id means "new history", e.g.
+  a fresh database) and the highest sequence number whose delete
+  tombstones were pruned.
+- ``db_replication_cursors`` — on a *target*, the last source sequence
+  applied per (source log id, user scope), written in the same transaction
+  as the rows, so a batch is applied exactly once.
+
+The income ``history`` view (monthly partitions) and the append-only
+``executions`` table are not logged: their sync already reads only rows
+newer than the target's latest timestamp.
+
+Only the standard library is used: DB Tools imports this module inside the
+remote helper scripts it runs with the system ``python3`` on other masters.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+import uuid
+import zlib
+
+CHANGE_TABLE = "db_changes"
+SEQ_TABLE = "db_change_seq"
+META_TABLE = "db_changelog_meta"
+CURSOR_TABLE = "db_replication_cursors"
+# Stable row identity per logged table; every logged table has a "user" column.
+CHANGE_KEYS = {
+    "position": ("user", "symbol", "side"),
+    "orders": ("uniqueid",),
+    "prices": ("user", "symbol"),
+    "balances": ("user",),
+    "history_scan_meta": ("user", "exchange"),
+}
+TOMBSTONE_RETENTION_SECONDS = 7 * 86400
+BATCH_SIZE = 2000
+
+
+def _key_expr(cols, prefix: str = "") -> str:
+    return "json_array(" + ", ".join(f'{prefix}"{col}"' for col in cols) + ")"
+
+
+def _log_row_sql(table: str, row: str) -> str:
+    return (
+        f"UPDATE {SEQ_TABLE} SET seq = seq + 1 WHERE id = 1; "
+        f"INSERT INTO {CHANGE_TABLE} (tbl, key, user, seq, ts) VALUES "
+        f"('{table}', {_key_expr(CHANGE_KEYS[table], row + '.')}, {row}.\"user\", "
+        f"(SELECT seq FROM {SEQ_TABLE} WHERE id = 1), CAST(strftime('%s', 'now') AS INTEGER)) "
+        f"ON CONFLICT(tbl, key) DO UPDATE SET seq = excluded.seq, user = excluded.user, ts = excluded.ts; "
+    )
+
+
+def _trigger_sqls(table: str) -> dict[str, str]:
+    """Return {trigger name: CREATE TRIGGER sql} for one logged table.
+
+    An update logs its NEW key; the OLD key is logged by a separate trigger
+    only when a key column changed, so price ticks and order refreshes cost
+    one log write instead of two.
+    """
+    changed = " OR ".join(f'OLD."{col}" IS NOT NEW."{col}"' for col in CHANGE_KEYS[table])
+    return {
+        f"trg_cdc_{table}_insert": f'CREATE TRIGGER trg_cdc_{table}_insert AFTER INSERT ON "{table}" BEGIN {_log_row_sql(table, "NEW")}END',
+        f"trg_cdc_{table}_update": f'CREATE TRIGGER trg_cdc_{table}_update AFTER UPDATE ON "{table}" BEGIN {_log_row_sql(table, "NEW")}END',
+        f"trg_cdc_{table}_update_key": (
+            f'CREATE TRIGGER trg_cdc_{table}_update_key AFTER UPDATE ON "{table}" '
+            f"WHEN {changed} BEGIN {_log_row_sql(table, 'OLD')}END"
+        ),
+        f"trg_cdc_{table}_delete": f'CREATE TRIGGER trg_cdc_{table}_delete AFTER DELETE ON "{table}" BEGIN {_log_row_sql(table, "OLD")}END',
+    }
+
+
+def _ensure_cursor_table(conn: sqlite3.Connection) -> None:
+    conn.execute(
+        f"""CREATE TABLE IF NOT EXISTS {CURSOR_TABLE} (
+                source_log TEXT NOT NULL,
+                scope TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                updated_at INTEGER NOT NULL,
+                PRIMARY KEY (source_log, scope)
+        )"""
+    )
+
+
+def ensure_changelog(conn: sqlite3.Connection) -> None:
+    """Create the change log tables and (re)create triggers whose SQL changed."""
+    conn.execute(
+        f"""CREATE TABLE IF NOT EXISTS {CHANGE_TABLE} (
+                tbl TEXT NOT NULL,
+                key TEXT NOT NULL,
+                user TEXT,
+                seq INTEGER NOT NULL,
+                ts INTEGER NOT NULL,
+                PRIMARY KEY (tbl, key)
+        )"""
+    )
+    conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{CHANGE_TABLE}_seq ON {CHANGE_TABLE}(seq)")
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {SEQ_TABLE} (id INTEGER PRIMARY KEY CHECK (id = 1), seq INTEGER NOT NULL)")
+    conn.execute(f"INSERT OR IGNORE INTO {SEQ_TABLE} (id, seq) VALUES (1, 0)")
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {META_TABLE} (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    conn.execute(f"INSERT OR IGNORE INTO {META_TABLE} (key, value) VALUES ('log_id', ?)", (uuid.uuid4().hex,))
+    conn.execute(f"INSERT OR IGNORE INTO {META_TABLE} (key, value) VALUES ('pruned_seq', '0')")
+    _ensure_cursor_table(conn)
+    existing = dict(conn.execute("SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name LIKE 'trg_cdc_%'"))
+    tables = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    for table in CHANGE_KEYS:
+        if table not in tables:
+            continue
+        for name, sql in _trigger_sqls(table).items():
+            if existing.get(name) != sql:
+                conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+                conn.execute(sql)
+    conn.commit()
+
+
+def has_changelog(conn: sqlite3.Connection) -> bool:
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (CHANGE_TABLE,)).fetchone()
+    return row is not None
+
+
+def log_state(conn: sqlite3.Connection) -> dict:
+    """Return the log id, current sequence and pruned-through sequence."""
+    meta = dict(conn.execute(f"SELECT key, value FROM {META_TABLE}"))
+    row = conn.execute(f"SELECT seq FROM {SEQ_TABLE} WHERE id = 1").fetchone()
+    return {"log_id": meta.get("log_id", ""), "seq": int(row[0]) if row else 0, "pruned_seq": int(meta.get("pruned_seq") or 0)}
+
+
+def scope_key(users) -> str:
+    """Return a short stable id for a set of synced users."""
+    return hashlib.sha1(json.dumps(sorted(set(users))).encode("utf-8")).hexdigest()[:16]
+
+
+def _columns(conn: sqlite3.Connection, table: str) -> list:
+    return [str(row[1]) for row in conn.execute(f'PRAGMA table_info("{table}")') if str(row[1]) != "id"]
+
+
+def read_changes(conn: sqlite3.Connection, users, after_seq: int, limit: int = BATCH_SIZE) -> dict:
+    """Return the next change batch for *users* after ``after_seq``.
+
+    ``through`` is the sequence a target may acknowledge after applying the
+    batch; ``more`` is True when the batch was cut at ``limit``.
+    """
+    users = sorted(set(users))
+    state = log_state(conn)
+    batch = {"log_id": state["log_id"], "after": int(after_seq), "through": state["seq"], "more": False, "tables": {}}
+    if not users or after_seq >= state["seq"]:
+        batch["through"] = max(int(after_seq), state["seq"])
+        return batch
+    marks = ",".join("?" for _ in users)
+    changes = conn.execute(
+        f"SELECT tbl, key, user, seq FROM {CHANGE_TABLE} WHERE seq > ? AND seq <= ? AND user IN ({marks}) ORDER BY seq LIMIT ?",
+        [int(after_seq), state["seq"], *users, int(limit)],
+    ).fetchall()
+    if len(changes) >= limit:
+        batch["through"] = int(changes[-1][3])
+        batch["more"] = True
+    by_table: dict = {}
+    for table, key, user, _seq in changes:
+        by_table.setdefault(table, {})[key] = user
+    for table, keys in by_table.items():
+        if table not in CHANGE_KEYS:
+            continue
+        columns = _columns(conn, table)
+        rows_by_key: dict = {}
+        changed = [[key, user] for key, user in keys.items() if user is not None]
+        if changed:
+            # Join the changed keys (one JSON parameter) to the rows column by
+            # column, so each key is an index lookup instead of a user scan.
+            col_expr = ", ".join(f't."{col}"' for col in columns)
+            match = " AND ".join(
+                f't."{col}" IS json_extract(json_extract(k.value, \'$[0]\'), \'$[{position}]\')'
+                for position, col in enumerate(CHANGE_KEYS[table])
+            )
+            for row in conn.execute(
+                f'SELECT json_extract(k.value, \'$[0]\'), {col_expr} FROM json_each(?) k '
+                f'JOIN "{table}" t ON t."user" IS json_extract(k.value, \'$[1]\') AND {match}',
+                (json.dumps(changed),),
+            ):
+                rows_by_key.setdefault(row[0], []).append(list(row[1:]))
+        batch["tables"][table] = {
+            "columns": columns,
+            "changes": [[key, user, rows_by_key.get(key, [])] for key, user in keys.items()],
+        }
+    return batch
+
+
+def encode_batch(batch: dict) -> bytes:
+    return zlib.compress(json.dumps(batch, separators=(",", ":")).encode("utf-8"), 6)
+
+
+def decode_batch(data: bytes) -> dict:
+    return json.loads(zlib.decompress(data).decode("utf-8"))
+
+
+def get_cursor(conn: sqlite3.Connection, source_log: str, scope: str):
+    """Return the acknowledged source sequence for (source log, scope), or None."""
+    _ensure_cursor_table(conn)
+    row = conn.execute(f"SELECT seq FROM {CURSOR_TABLE} WHERE source_log = ? AND scope = ?", (source_log, scope)).fetchone()
+    return int(row[0]) if row else None
+
+
+def apply_batch(conn: sqlite3.Connection, batch: dict, scope: str) -> dict:
+    """Apply a change batch on a target and acknowledge ``through`` atomically.
+
+    Every change replaces the target rows of one key with the shipped rows,
+    so replaying a batch is harmless.  Returns per-table row counts.
+    """
+    _ensure_cursor_table(conn)
+    stats: dict = {}
+    tables = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    try:
+        for table, entry in (batch.get("tables") or {}).items():
+            changes = entry.get("changes") or []
+            table_stats = stats.setdefault(table, {"changes": len(changes), "fetched": 0, "inserted": 0, "skipped": 0, "deleted": 0})
+            table_stats["fetched"] = sum(len(rows or []) for _key, _user, rows in changes)
+            if table not in CHANGE_KEYS or table not in tables:
+                table_stats["skipped"] = table_stats["fetched"]
+                continue
+            source_columns = [str(col) for col in entry.get("columns") or []]
+            target_columns = set(_columns(conn, table))
+            columns = [col for col in source_columns if col in target_columns]
+            indexes = [source_columns.index(col) for col in columns]
+            delete_sql = f'DELETE FROM "{table}" WHERE "user" IS ? AND ' + " AND ".join(f'"{col}" IS ?' for col in CHANGE_KEYS[table])
+            insert_sql = (
+                f'INSERT OR REPLACE INTO "{table}" ({", ".join(f"{chr(34)}{col}{chr(34)}" for col in columns)}) '
+                f'VALUES ({", ".join("?" for _ in columns)})'
+            )
+            for key, user, rows in changes:
+                table_stats["deleted"] += max(0, conn.execute(delete_sql, (user, *json.loads(key))).rowcount)
+                for row in rows or []:
+                    conn.execute(insert_sql, [row[index] for index in indexes])
+                    table_stats["inserted"] += 1
+        conn.execute(
+            f"INSERT INTO {CURSOR_TABLE} (source_log, scope, seq, updated_at) VALUES (?, ?, ?, ?) "
+            f"ON CONFLICT(source_log, scope) DO UPDATE SET seq = excluded.seq, updated_at = excluded.updated_at",
+            (str(batch.get("log_id") or ""), scope, int(batch.get("through") or 0), int(time.time())),
+        )
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return stats
+
+
+def prune(conn: sqlite3.Connection, *, retain_seconds: int = TOMBSTONE_RETENTION_SECONDS, now=None) -> int:
+    """Drop delete tombstones older than ``retain_seconds``; returns rows removed.
+
+    Targets whose cursor is older than the pruned sequence may have missed a
+    delete and must resynchronize fully.
+    """
+    cutoff = int(now if now is not None else time.time()) - int(retain_seconds)
+    removed = 0
+    pruned_seq = 0
+    for table in CHANGE_KEYS:
+        exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+        if not exists:
+            continue
+        stale = conn.execute(
+            f'SELECT c.key, c.seq FROM {CHANGE_TABLE} c WHERE c.tbl = ? AND c.ts < ? '
+            f'AND NOT EXISTS (SELECT 1 FROM "{table}" t WHERE t."user" IS c.user AND {_key_expr(CHANGE_KEYS[table], "t.")} = c.key)',
+            (table, cutoff),
+        ).fetchall()
+        for key, seq in stale:
+            conn.execute(f"DELETE FROM {CHANGE_TABLE} WHERE tbl = ? AND key = ?", (table, key))
+            pruned_seq = max(pruned_seq, int(seq))
+        removed += len(stale)
+    if pruned_seq:
+        conn.execute(
+            f"UPDATE {META_TABLE} SET value = CAST(MAX(CAST(value AS INTEGER), ?) AS TEXT) WHERE key = 'pruned_seq'",
+            (pruned_seq,),
+        )
+    conn.commit()
+    return removed
@@ -0,0 +1,232 @@
+"""Checkpointed executions backfill for the trades database.
+
+The regular executions poller (``Database.update_executions``) is an
+incremental updater: it restarts from ``MAX(timestamp)`` per user/exchange
+and stores the verbose ``raw_json`` inline.  Backfilling many accounts that
+way re-scans everything after any failure.  The ``executions_backfill``
+task-worker job uses this module instead:
+
+- work is split into units of (user, exchange, symbol) — symbol ``''`` for
+  exchanges that return fills for all symbols at once;
+- every finished unit records a cursor in ``execution_backfill_cursors``,
+  so a requeued/retried job skips units already done in this run and a
+  later run continues from the cursor;
+- rows are written with batched ``executemany`` (``Database.store_executions``);
+- ``raw_json`` can optionally be stored zlib-compressed in ``execution_raw``;
+- progress (units, rows, rows/sec) is published through a callback, and
+  ``stop_check`` cancels the job between units and batches.
+"""
+
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Any, Callable
+
+from logging_helpers import human_log as _log
+
+SERVICE = "ExecutionsBackfill"
+
+# Keep in sync with Database.update_executions() support.
+EXECUTIONS_EXCHANGES = ('hyperliquid', 'binance', 'bitget', 'bybit', 'kucoinfutures', 'okx', 'gateio', 'bitunix', 'weex')
+# Exchanges whose fills endpoint needs a symbol; units are split per income symbol.
+SYMBOL_EXCHANGES = ('binance', 'bitget')
+# Bitget side repair reads raw_json with json_extract, so it is never compressed.
+INLINE_RAW_EXCHANGES = ('bitget',)
+
+CURSOR_OVERLAP_MS = 5 * 60 * 1000
+DEFAULT_BATCH_SIZE = 500
+
+
+class BackfillCancelled(RuntimeError):
+    """Raised when ``stop_check`` asks a running backfill to stop."""
+
+
+def compress_raw_json(text: str) -> tuple[str, bytes]:
+    """Return (codec, compressed bytes) for one raw_json payload."""
+    return "zlib", zlib.compress(str(text).encode("utf-8"), 9)
+
+
+def decompress_raw_json(codec: str, data: bytes) -> str:
+    """Inverse of :func:`compress_raw_json`."""
+    if codec == "zlib":
+        return zlib.decompress(data).decode("utf-8")
+    raise ValueError(f"unknown raw_json codec {codec!r}")
+
+
+def executions_exchange_id(exchange: str) -> str:
+    """Return the Exchange.id used for executions rows (kucoin → kucoinfutures)."""
+    return "kucoinfutures" if exchange == "kucoin" else str(exchange or "")
+
+
+@dataclass(frozen=True)
+class BackfillUnit:
+    user: Any
+    exchange: str
+    symbol: str
+
+    @property
+    def label(self) -> str:
+        return f"{self.user.name}/{self.exchange}" + (f"/{self.symbol}" if self.symbol else "")
+
+
+class BackfillProgress:
+    """Unit/row counters with a throttled publish callback."""
+
+    def __init__(self, total: int, publish: Callable[[dict], None] | None = None, interval: float = 2.0):
+        self.total = max(0, int(total))
+        self.publish = publish
+        self.interval = float(interval)
+        self.completed = 0
+        self.skipped = 0
+        self.rows = 0
+        self.inserted = 0
+        self.errors: list[str] = []
+        self.current = ""
+        self.started = time.monotonic()
+        self._last_publish = 0.0
+
+    def rows_per_sec(self) -> float:
+        elapsed = time.monotonic() - self.started
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    def snapshot(self) -> dict:
+        rate = self.rows_per_sec()
+        return {
+            "total": self.total,
+            "step": min(self.total, self.completed + 1) if self.total else 0,
+            "completed": self.completed,
+            "skipped": self.skipped,
+            "stage": f"{self.current} · {rate:.0f} rows/s" if self.current else f"{rate:.0f} rows/s",
+            "rows": self.rows,
+            "inserted": self.inserted,
+            "rows_per_sec": round(rate, 1),
+            "elapsed_s": round(time.monotonic() - self.started, 1),
+            "errors": list(self.errors[-20:]),
+        }
+
+    def _maybe_publish(self, force: bool = False) -> None:
+        if self.publish is None:
+            return
+        now = time.monotonic()
+        if force or now - self._last_publish >= self.interval:
+            self._last_publish = now
+            self.publish(self.snapshot())
+
+    def start_unit(self, label: str) -> None:
+        self.current = label
+        self._maybe_publish(force=True)
+
+    def add_rows(self, prepared: int, inserted: int) -> None:
+        self.rows += int(prepared)
+        self.inserted += int(inserted)
+        self._maybe_publish()
+
+    def finish_unit(self, *, skipped: bool = False, error: str | None = None) -> None:
+        self.completed += 1
+        if skipped:
+            self.skipped += 1
+        if error:
+            self.errors.append(f"{self.current}: {error}")
+        self._maybe_publish(force=True)
+
+
+def plan_units(db, users, now_ms: int, initial_lookback_days: int | None = None) -> list[BackfillUnit]:
+    """Return backfill units for *users* (symbol-required exchanges split per income symbol)."""
+    units = []
+    for user in users:
+        exchange_id = executions_exchange_id(getattr(user, "exchange", ""))
+        if exchange_id not in EXECUTIONS_EXCHANGES:
+            continue
+        if exchange_id not in SYMBOL_EXCHANGES:
+            units.append(BackfillUnit(user, exchange_id, ""))
+            continue
+        since = db.execution_fetch_since(exchange_id, None, now_ms, initial_lookback_days) or 0
+        for symbol in db.list_income_symbols(user.name, int(since), int(now_ms)):
+            units.append(BackfillUnit(user, exchange_id, symbol))
+    return units
+
+
+def run_backfill(
+    db,
+    users,
+    *,
+    started_ms: int,
+    initial_lookback_days: int | None = None,
+    compress_raw: bool = False,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    publish: Callable[[dict], None] | None = None,
+    exchange_factory: Callable | None = None,
+    stop_check: Callable[[], bool] | None = None,
+) -> dict:
+    """Backfill executions for *users*, resuming from per-unit cursors.
+
+    Units whose cursor was already written at or after *started_ms* (the
+    job's first start) are skipped, so a retried job only processes what is
+    left.  A failing unit is logged and left without a new cursor; the
+    remaining units still run and the summary lists the errors.  When
+    *stop_check* returns True, :class:`BackfillCancelled` is raised before
+    the next unit or row batch; finished units keep their cursors.
+    """
+    if exchange_factory is None:
+        from Exchange import Exchange as exchange_factory
+
+    now_ms = int(time.time() * 1000)
+    units = plan_units(db, users, now_ms, initial_lookback_days)
+    progress = BackfillProgress(len(units), publish)
+    repair_bitget = set()
+
+    def raise_if_stopped() -> None:
+        if stop_check is not None and stop_check():
+            raise BackfillCancelled("cancelled")
+
+    def on_batch(prepared: int, inserted: int) -> None:
+        progress.add_rows(prepared, inserted)
+        raise_if_stopped()
+
+    for unit in units:
+        raise_if_stopped()
+        progress.start_unit(unit.label)
+        cursor = db.get_execution_cursor(unit.user.name, unit.exchange, unit.symbol)
+        if cursor is not None and cursor["updated_ts"] >= int(started_ms):
+            progress.finish_unit(skipped=True)
+            continue
+        since = max(0, cursor["cursor_ts"] - CURSOR_OVERLAP_MS) if cursor is not None else None
+        fetch_started = int(time.time() * 1000)
+        since = db.execution_fetch_since(unit.exchange, since, fetch_started, initial_lookback_days)
+        exchange = exchange_factory(unit.user.exchange, unit.user)
+        try:
+            executions = exchange.fetch_executions(since, symbols=[unit.symbol] if unit.symbol else None)
+            stored = db.store_executions(
+                unit.user.name,
+                unit.exchange,
+                executions,
+                batch_size=batch_size,
+                compress_raw=compress_raw and unit.exchange not in INLINE_RAW_EXCHANGES,
+                on_batch=on_batch,
+            )
+        except BackfillCancelled:
+            raise
+        except Exception as e:
+            _log(SERVICE, f"backfill unit {unit.label} failed: {e}", level='WARNING', user=unit.user.name)
+            progress.finish_unit(error=str(e))
+            continue
+        finally:
+            exchange.close()
+        db.set_execution_cursor(unit.user.name, unit.exchange, unit.symbol, fetch_started, stored["prepared"])
+        if unit.exchange == 'bitget':
+            repair_bitget.add(unit.user.name)
+        progress.finish_unit()
+
+    for user_name in sorted(repair_bitget):
+        db._repair_bitget_execution_sides(user_name)
+
+    summary = progress.snapshot()
+    summary["stage"] = f"done · {summary['rows_per_sec']:.0f} rows/s"
+    if publish is not None:
+        publish(summary)
+    _log(
+        SERVICE,
+        f"backfill done units={progress.completed} skipped={progress.skipped} rows={progress.rows} inserted={progress.inserted} rows_per_sec={summary['rows_per_sec']} errors={len(progress.errors)}",
+        level='INFO',
+    )
+    return summary
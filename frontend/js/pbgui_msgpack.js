@@ -0,0 +1,183 @@
+/* MessagePack transport decoder for high-volume API endpoints.
+   Requests are sent with "Accept: application/msgpack"; msgpack responses are
+   decoded and columnar blocks ({__columnar__: [...], values: [[...], ...]})
+   are expanded back to arrays of objects, so callers see the same shape as the
+   JSON endpoint.  JSON responses (older servers, errors) pass through as-is. */
+(function () {
+  'use strict';
+
+  if (window.PBGuiMsgpack) return;
+
+  var MEDIA_TYPE = 'application/msgpack';
+  var ACCEPT = MEDIA_TYPE + ', application/json;q=0.9';
+  var COLUMNAR_MARKER = '__columnar__';
+  var utf8 = typeof TextDecoder !== 'undefined' ? new TextDecoder('utf-8') : null;
+
+  function decode(buffer) {
+    var bytes = buffer instanceof Uint8Array ? buffer : new Uint8Array(buffer);
+    var view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+    var pos = 0;
+
+    function str(len) {
+      var chunk = bytes.subarray(pos, pos + len);
+      pos += len;
+      if (utf8) return utf8.decode(chunk);
+      var out = '';
+      for (var i = 0; i < chunk.length; i++) out += String.fromCharCode(chunk[i]);
+      return decodeURIComponent(escape(out));
+    }
+
+    function bin(len) {
+      var chunk = bytes.slice(pos, pos + len);
+      pos += len;
+      return chunk;
+    }
+
+    function array(len) {
+      var out = new Array(len);
+      for (var i = 0; i < len; i++) out[i] = read();
+      return out;
+    }
+
+    function map(len) {
+      var out = {};
+      for (var i = 0; i < len; i++) {
+        var key = read();
+        out[key] = read();
+      }
+      return out;
+    }
+
+    function ext(len) {
+      var type = view.getInt8(pos);
+      pos += 1;
+      if (type === -1) {
+        /* msgpack timestamp extension → Date */
+        var ms;
+        if (len === 4) {
+          ms = view.getUint32(pos) * 1000;
+        } else if (len === 8) {
+          var hi = view.getUint32(pos);
+          var lo = view.getUint32(pos + 4);
+          ms = ((hi & 0x3) * 4294967296 + lo) * 1000 + (hi >>> 2) / 1e6;
+        } else {
+          ms = Number(view.getBigInt64(pos + 4)) * 1000 + view.getUint32(pos) / 1e6;
+        }
+        pos += len;
+        return new Date(ms);
+      }
+      return { type: type, data: bin(len) };
+    }
+
+    function read() {
+      var b = bytes[pos++];
+      var v;
+      if (b <= 0x7f) return b;
+      if (b >= 0xe0) return b - 0x100;
+      if ((b & 0xf0) === 0x80) return map(b & 0x0f);
+      if ((b & 0xf0) === 0x90) return array(b & 0x0f);
+      if ((b & 0xe0) === 0xa0) return str(b & 0x1f);
+      switch (b) {
+        case 0xc0: return null;
+        case 0xc2: return false;
+        case 0xc3: return true;
+        case 0xc4: v = bytes[pos]; pos += 1; return bin(v);
+        case 0xc5: v = view.getUint16(pos); pos += 2; return bin(v);
+        case 0xc6: v = view.getUint32(pos); pos += 4; return bin(v);
+        case 0xc7: v = bytes[pos]; pos += 1; return ext(v);
+        case 0xc8: v = view.getUint16(pos); pos += 2; return ext(v);
+        case 0xc9: v = view.getUint32(pos); pos += 4; return ext(v);
+        case 0xca: v = view.getFloat32(pos); pos += 4; return v;
+        case 0xcb: v = view.getFloat64(pos); pos += 8; return v;
+        case 0xcc: v = bytes[pos]; pos += 1; return v;
+        case 0xcd: v = view.getUint16(pos); pos += 2; return v;
+        case 0xce: v = view.getUint32(pos); pos += 4; return v;
+        case 0xcf: v = view.getUint32(pos) * 4294967296 + view.getUint32(pos + 4); pos += 8; return v;
+        case 0xd0: v = view.getInt8(pos); pos += 1; return v;
+        case 0xd1: v = view.getInt16(pos); pos += 2; return v;
+        case 0xd2: v = view.getInt32(pos); pos += 4; return v;
+        case 0xd3: v = view.getInt32(pos) * 4294967296 + view.getUint32(pos + 4); pos += 8; return v;
+        case 0xd4: return ext(1);
+        case 0xd5: return ext(2);
+        case 0xd6: return ext(4);
+        case 0xd7: return ext(8);
+        case 0xd8: return ext(16);
+        case 0xd9: v = bytes[pos]; pos += 1; return str(v);
+        case 0xda: v = view.getUint16(pos); pos += 2; return str(v);
+        case 0xdb: v = view.getUint32(pos); pos += 4; return str(v);
+        case 0xdc: v = view.getUint16(pos); pos += 2; return array(v);
+        case 0xdd: v = view.getUint32(pos); pos += 4; return array(v);
+        case 0xde: v = view.getUint16(pos); pos += 2; return map(v);
+        case 0xdf: v = view.getUint32(pos); pos += 4; return map(v);
+      }
+      throw new Error('msgpack: unsupported type byte 0x' + b.toString(16));
+    }
+
+    return read();
+  }
+
+  function expandColumnar(value) {
+    if (Array.isArray(value)) {
+      for (var i = 0; i < value.length; i++) value[i] = expandColumnar(value[i]);
+      return value;
+    }
+    if (!value || typeof value !== 'object' || value instanceof Uint8Array || value instanceof Date) {
+      return value;
+    }
+    var columns = value[COLUMNAR_MARKER];
+    if (Array.isArray(columns) && Array.isArray(value.values)) {
+      var cols = value.values;
+      var count = cols.length ? cols[0].length : 0;
+      var rows = new Array(count);
+      for (var r = 0; r < count; r++) {
+        var row = {};
+        for (var c = 0; c < columns.length; c++) row[columns[c]] = expandColumnar(cols[c][r]);
+        rows[r] = row;
+      }
+      return rows;
+    }
+    for (var key in value) {
+      if (Object.prototype.hasOwnProperty.call(value, key)) value[key] = expandColumnar(value[key]);
+    }
+    return value;
+  }
+
+  function withAccept(options) {
+    var opts = Object.assign({}, options || {});
+    var headers = Object.assign({}, opts.headers || {});
+    headers['Accept'] = ACCEPT;
+    opts.headers = headers;
+    return opts;
+  }
+
+  function readResponse(res) {
+    var type = String(res.headers.get('Content-Type') || '').toLowerCase();
+    if (type.indexOf(MEDIA_TYPE) === 0 || type.indexOf('application/x-msgpack') === 0) {
+      return res.arrayBuffer().then(function (buf) { return expandColumnar(decode(buf)); });
+    }
+    return res.json();
+  }
+
+  /* fetch() wrapper: rejects on HTTP errors like the callers' JSON paths. */
+  function fetchPacked(url, options) {
+    return fetch(url, withAccept(options)).then(function (res) {
+      if (!res.ok) {
+        return res.text().then(function (text) {
+          var err = new Error(text || String(res.status));
+          err.status = res.status;
+          throw err;
+        });
+      }
+      return readResponse(res);
+    });
+  }
+
+  window.PBGuiMsgpack = {
+    ACCEPT: ACCEPT,
+    decode: decode,
+    expandColumnar: expandColumnar,
+    withAccept: withAccept,
+    readResponse: readResponse,
+    fetch: fetchPacked
+  };
+}());
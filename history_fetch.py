@@ -0,0 +1,160 @@
+"""Parallel time-window fetcher for exchange income history.
+
+A first import (new user, or a long gap since the last scan) used to walk
+the exchange ledger one week at a time, serially, for up to two years.  The
+windows are independent, so :class:`HistoryWindowFetcher` splits the
+lookback into fixed windows and fetches several of them concurrently via
+``Exchange.fetch_history_window``:
+
+- every REST page first draws weight from a rate budget — the PBData budget
+  when one is passed in, else the host-wide :class:`SharedRateLimitBudget`
+  from ``HISTORY_BACKFILL_RATE_LIMITS`` that all processes draw from, tuned
+  by an :class:`AdaptiveRateController` once per completed response;
+- results are merged and deduplicated by ``uniqueid`` (adjacent windows
+  share their boundary millisecond);
+- each finished window is handed to an ``on_window`` callback so the caller
+  can persist rows and a checkpoint together, and windows listed in ``skip``
+  are not fetched again — ``Database.update_history`` uses this to resume
+  an interrupted import.
+
+Usage::
+
+    fetcher = HistoryWindowFetcher(exchange, window_ms=WEEK)
+    rows = fetcher.run(since, until)
+"""
+
+import asyncio
+from typing import Callable, Iterable
+
+from logging_helpers import human_log as _log
+from rate_limit_budget import (
+    HISTORY_BACKFILL_RATE_LIMITS,
+    AdaptiveRateController,
+    RateLimitBudget,
+    SharedRateLimitBudget,
+    get_weight,
+)
+
+SERVICE = "HistoryFetch"
+
+DEFAULT_WORKERS = 4
+BUDGET_TIMEOUT_S = 120.0
+OPERATION = 'fetch_history_window'
+
+
+class HistoryBudgetTimeout(RuntimeError):
+    """Raised when a window could not get rate budget in time."""
+
+
+def split_windows(since: int, until: int, window_ms: int) -> list[tuple[int, int]]:
+    """Split [since, until] into windows ``(start, start + window_ms)``.
+
+    The grid is anchored at *since*, so re-planning the same *since* later
+    yields the same window keys for every window that was already complete.
+    The last window may end after *until*, like the serial walk does.
+    """
+    if window_ms <= 0:
+        raise ValueError("window_ms must be positive")
+    windows = []
+    start = int(since)
+    while start <= until:
+        windows.append((start, start + window_ms))
+        start += window_ms
+    return windows
+
+
+def merge_incomes(chunks: Iterable[list[dict]]) -> list[dict]:
+    """Merge window results, keeping the first row per ``uniqueid``, oldest first."""
+    merged: dict[str, dict] = {}
+    for rows in chunks:
+        for row in rows or ():
+            merged.setdefault(str(row["uniqueid"]), row)
+    return sorted(merged.values(), key=lambda row: int(row["timestamp"]))
+
+
+class HistoryWindowFetcher:
+    """Fetch income history for many time windows concurrently.
+
+    *budget* / *budget_loop*: a :class:`RateLimitBudget` and the event loop
+    that owns it (PBData's loop).  Without them the host-wide shared budget
+    from ``HISTORY_BACKFILL_RATE_LIMITS`` is used for this run.
+    *on_window(start, end, rows)* runs in a worker thread after each window.
+    """
+
+    def __init__(
+        self,
+        exchange,
+        *,
+        window_ms: int,
+        workers: int = DEFAULT_WORKERS,
+        budget: RateLimitBudget | SharedRateLimitBudget | None = None,
+        budget_loop: asyncio.AbstractEventLoop | None = None,
+        on_window: Callable[[int, int, list], None] | None = None,
+        skip: Iterable[tuple[int, int]] = (),
+    ):
+        self.exchange = exchange
+        self.window_ms = int(window_ms)
+        self.workers = max(1, int(workers))
+        self.budget = budget
+        self.budget_loop = budget_loop
+        self.on_window = on_window
+        self.skip = {(int(start), int(end)) for start, end in skip}
+        self.weight = get_weight(exchange.id, OPERATION)
+
+    def run(self, since: int, until: int) -> list[dict]:
+        """Fetch all windows of [since, until] not in ``skip``; return merged rows.
+
+        Must be called from a thread without a running event loop
+        (``Database.update_history`` runs via ``asyncio.to_thread``).
+        Every window is attempted even if another fails, so as much progress
+        as possible is checkpointed; the first error is then re-raised.
+        """
+        if not self.exchange.instance:
+            self.exchange.connect()
+        windows = [w for w in split_windows(since, until, self.window_ms) if w not in self.skip]
+        if not windows:
+            return []
+        _log(SERVICE, f"fetching {len(windows)} windows ({len(self.skip)} already done) with {min(self.workers, len(windows))} workers", level='INFO', user=self.exchange.user)
+        return asyncio.run(self._run(windows))
+
+    async def _run(self, windows: list[tuple[int, int]]) -> list[dict]:
+        loop = asyncio.get_running_loop()
+        if self.budget is not None and self.budget_loop is not None:
+            budget, budget_loop = self.budget, self.budget_loop
+        else:
+            budget = self.budget or SharedRateLimitBudget(self.exchange.id, **HISTORY_BACKFILL_RATE_LIMITS.get(
+                self.exchange.id, {'weight_per_minute': 600, 'burst_capacity': 60}))
+            budget_loop = loop
+
+        controller = AdaptiveRateController(self.exchange.id, budget)
+
+        def observe():
+            # The controller ignores a headers object it has already seen, so
+            # each completed response is counted once across all workers.
+            controller.observe_headers(getattr(self.exchange.instance, 'last_response_headers', None))
+
+        def pace():
+            # Called from worker threads before each REST page, i.e. after
+            # the previous page's response has completed.
+            observe()
+            future = asyncio.run_coroutine_threadsafe(
+                budget.acquire(weight=self.weight, timeout=BUDGET_TIMEOUT_S, tag=OPERATION), budget_loop)
+            if not future.result():
+                raise HistoryBudgetTimeout(f"rate budget timeout for {self.exchange.id} {OPERATION}")
+
+        semaphore = asyncio.Semaphore(self.workers)
+
+        async def fetch(start: int, end: int) -> list[dict]:
+            async with semaphore:
+                rows = await asyncio.to_thread(self.exchange.fetch_history_window, start, end, pace)
+                observe()
+                if self.on_window is not None:
+                    await asyncio.to_thread(self.on_window, start, end, rows)
+                return rows
+
+        results = await asyncio.gather(*(fetch(start, end) for start, end in windows), return_exceptions=True)
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            _log(SERVICE, f"{len(errors)}/{len(windows)} windows failed: {errors[0]}", level='WARNING', user=self.exchange.user)
+            raise errors[0]
+        return merge_incomes(results)
@@ -0,0 +1,382 @@
+"""Monthly partitions for the income ``history`` table of pbgui.db.
+
+The income ledger used to be one monolithic table.  Retention deletes of a
+year of rows held the write lock long enough to stall PBData writers, and
+every backup copied the whole file.  The table is now split into:
+
+- ``history_live`` — the hot table every writer inserts into (the old
+  ``history`` table is renamed on first start, which is O(1));
+- ``history_pYYYYMM`` — one archive table per closed UTC month, filled by
+  :func:`rotate` in small batches;
+- ``history`` — a ``UNION ALL`` view over all of them, so every existing
+  SELECT keeps working.  ``INSTEAD OF`` triggers route INSERT/UPDATE/DELETE
+  on the view to the physical tables, so db_tools sync/copy/cleanup and the
+  remote helper scripts need no partition knowledge.
+
+Invariants kept by the triggers: ``uniqueid`` is unique across all
+partitions (an insert whose uniqueid is already archived is dropped) and new
+ids continue after the largest id of any partition.
+
+Retention (:func:`delete_older_than`) drops whole archive tables and only
+deletes row-wise in the boundary month, one short transaction per table.
+:func:`backup` writes a base file without archive rows plus one file per
+archive partition, and copies a partition only when its content changed.
+"""
+
+import hashlib
+import sqlite3
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from pathlib import Path
+
+LIVE_TABLE = "history_live"
+VIEW = "history"
+REGISTRY = "history_partitions"
+MANIFEST = "backup_partitions"
+COLUMNS = ("id", "symbol", "timestamp", "income", "uniqueid", "user")
+
+# Current and previous month stay in history_live (late fees/fundings).
+HOT_MONTHS = 2
+MOVE_BATCH_SIZE = 5000
+
+
+def _table_sql(name: str) -> str:
+    return f'''CREATE TABLE IF NOT EXISTS "{name}" (
+                    id INTEGER PRIMARY KEY,
+                    symbol TEXT NOT NULL,
+                    timestamp INTEGER NOT NULL,
+                    income REAL NOT NULL,
+                    uniqueid text NOT NULL UNIQUE,
+                    user TEXT NOT NULL
+            )'''
+
+
+REGISTRY_SQL = f'''CREATE TABLE IF NOT EXISTS {REGISTRY} (
+        name TEXT PRIMARY KEY,
+        month_start INTEGER NOT NULL,
+        month_end INTEGER NOT NULL
+)'''
+
+
+def month_start_ms(ts_ms: int) -> int:
+    """Return the UTC month start (epoch ms) containing *ts_ms*."""
+    dt = datetime.fromtimestamp(int(ts_ms) / 1000, tz=timezone.utc)
+    return int(datetime(dt.year, dt.month, 1, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def add_months_ms(start_ms: int, months: int) -> int:
+    """Shift a month start by *months* (may be negative)."""
+    dt = datetime.fromtimestamp(int(start_ms) / 1000, tz=timezone.utc)
+    index = dt.year * 12 + (dt.month - 1) + int(months)
+    return int(datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+def partition_name(ts_ms: int) -> str:
+    dt = datetime.fromtimestamp(int(ts_ms) / 1000, tz=timezone.utc)
+    return f"history_p{dt.year:04d}{dt.month:02d}"
+
+
+def list_partitions(conn: sqlite3.Connection) -> list[tuple[str, int, int]]:
+    """Return archive partitions as (name, month_start, month_end), oldest first."""
+    rows = conn.execute(f'SELECT name, month_start, month_end FROM {REGISTRY} ORDER BY month_start').fetchall()
+    return [(str(name), int(start), int(end)) for name, start, end in rows]
+
+
+def physical_tables(conn: sqlite3.Connection) -> list[str]:
+    """Return the hot table followed by all archive partitions."""
+    return [LIVE_TABLE] + [name for name, _start, _end in list_partitions(conn)]
+
+
+def _object_type(conn: sqlite3.Connection, name: str) -> str | None:
+    row = conn.execute("SELECT type FROM sqlite_master WHERE name = ?", (name,)).fetchone()
+    return str(row[0]) if row else None
+
+
+def _create_table(conn: sqlite3.Connection, name: str) -> None:
+    # The live table keeps the index name of the former monolithic table.
+    index = "idx_history_user_ts" if name == LIVE_TABLE else f"idx_{name}_user_ts"
+    conn.execute(_table_sql(name))
+    conn.execute(f'CREATE INDEX IF NOT EXISTS "{index}" ON "{name}"(user, timestamp)')
+
+
+def _rebuild_view(conn: sqlite3.Connection) -> None:
+    """(Re)create the history view and its routing triggers.
+
+    Must run inside the caller's transaction; dropping the view also drops
+    its triggers, so readers never observe a half-built state.
+    """
+    tables = physical_tables(conn)
+    archives = tables[1:]
+    cols = ", ".join(COLUMNS)
+    select = "\n  UNION ALL ".join(f'SELECT {cols} FROM "{name}"' for name in tables)
+    max_id = " UNION ALL ".join(f'SELECT MAX(id) AS id FROM "{name}"' for name in tables)
+    not_archived = "".join(
+        f' AND NOT EXISTS (SELECT 1 FROM "{name}" WHERE uniqueid = NEW.uniqueid)' for name in archives
+    )
+    updates = "".join(
+        f'  UPDATE "{name}" SET symbol = NEW.symbol, timestamp = NEW.timestamp, income = NEW.income,'
+        f' uniqueid = NEW.uniqueid, user = NEW.user WHERE id = OLD.id;\n'
+        for name in tables
+    )
+    deletes = "".join(f'  DELETE FROM "{name}" WHERE id = OLD.id;\n' for name in tables)
+    conn.execute(f"DROP VIEW IF EXISTS {VIEW}")
+    conn.execute(f"CREATE VIEW {VIEW} AS {select}")
+    conn.execute(f"""CREATE TRIGGER history_insert INSTEAD OF INSERT ON {VIEW} BEGIN
+  INSERT INTO {LIVE_TABLE}({cols})
+  SELECT COALESCE(NEW.id, (SELECT MAX(id) FROM ({max_id})) + 1),
+         NEW.symbol, NEW.timestamp, NEW.income, NEW.uniqueid, NEW.user
+  WHERE 1{not_archived};
+END""")
+    conn.execute(f"CREATE TRIGGER history_update INSTEAD OF UPDATE ON {VIEW} BEGIN\n{updates}END")
+    conn.execute(f"CREATE TRIGGER history_delete INSTEAD OF DELETE ON {VIEW} BEGIN\n{deletes}END")
+
+
+def ensure_schema(conn: sqlite3.Connection) -> None:
+    """Create/migrate the partitioned layout; an existing history table becomes history_live.
+
+    The view is only rebuilt here when missing; partition changes rebuild it
+    themselves.
+    """
+    conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        if _object_type(conn, VIEW) == "table":
+            conn.execute(f"ALTER TABLE {VIEW} RENAME TO {LIVE_TABLE}")
+        _create_table(conn, LIVE_TABLE)
+        conn.execute(f'CREATE INDEX IF NOT EXISTS "idx_{LIVE_TABLE}_ts" ON {LIVE_TABLE}(timestamp)')
+        conn.execute(REGISTRY_SQL)
+        if _object_type(conn, VIEW) != "view":
+            _rebuild_view(conn)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def _ensure_partition(conn: sqlite3.Connection, start_ms: int) -> str:
+    name = partition_name(start_ms)
+    if conn.execute(f"SELECT 1 FROM {REGISTRY} WHERE name = ?", (name,)).fetchone():
+        return name
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        _create_table(conn, name)
+        conn.execute(
+            f"INSERT INTO {REGISTRY}(name, month_start, month_end) VALUES (?, ?, ?)",
+            (name, int(start_ms), add_months_ms(start_ms, 1)),
+        )
+        _rebuild_view(conn)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return name
+
+
+def rotate(conn: sqlite3.Connection, now_ms: int, *, lock=None, hot_months: int = HOT_MONTHS,
+           batch_size: int = MOVE_BATCH_SIZE) -> dict[str, int]:
+    """Move rows of closed months from history_live into their archive partitions.
+
+    Rows are moved in batches of *batch_size*, each in its own short write
+    transaction taken under *lock*, so PBData writers interleave.  Returns
+    ``{partition: rows_moved}``.
+    """
+    boundary = add_months_ms(month_start_ms(now_ms), -(max(1, int(hot_months)) - 1))
+    moved: dict[str, int] = {}
+    cols = ", ".join(COLUMNS)
+    conn.commit()
+    while True:
+        row = conn.execute(f"SELECT MIN(timestamp) FROM {LIVE_TABLE} WHERE timestamp < ?", (boundary,)).fetchone()
+        if row is None or row[0] is None:
+            return moved
+        start = month_start_ms(row[0])
+        end = add_months_ms(start, 1)
+        name = _ensure_partition(conn, start)
+        batch = f"SELECT id FROM {LIVE_TABLE} WHERE timestamp >= ? AND timestamp < ? ORDER BY id LIMIT ?"
+        while True:
+            with lock if lock is not None else nullcontext():
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    conn.execute(
+                        f'INSERT OR IGNORE INTO "{name}"({cols}) SELECT {cols} FROM {LIVE_TABLE} WHERE id IN ({batch})',
+                        (start, end, int(batch_size)),
+                    )
+                    count = conn.execute(f"DELETE FROM {LIVE_TABLE} WHERE id IN ({batch})", (start, end, int(batch_size))).rowcount
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+            moved[name] = moved.get(name, 0) + int(count or 0)
+            if not count or count < batch_size:
+                break
+
+
+def delete_older_than(conn: sqlite3.Connection, users: list | None, timestamp_ms: int, *, lock=None) -> int:
+    """Delete rows with ``timestamp <= timestamp_ms`` (all users if *users* is empty/None).
+
+    Archive partitions that lie entirely before the cutoff are dropped when
+    no user filter is given; everything else is deleted per table in its own
+    transaction.  Partitions left empty are dropped as well.
+    """
+    cutoff = int(timestamp_ms)
+    user_list = [str(u) for u in users or []]
+    where = "timestamp <= ?"
+    params: list = [cutoff]
+    if user_list:
+        where = f"user IN ({','.join('?' * len(user_list))}) AND " + where
+        params = user_list + params
+    deleted = 0
+    drop = []
+    conn.commit()
+    for name, start, end in list_partitions(conn):
+        if start > cutoff:
+            continue
+        with lock if lock is not None else nullcontext():
+            if not user_list and end - 1 <= cutoff:
+                deleted += int(conn.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0])
+                drop.append(name)
+                continue
+            deleted += int(conn.execute(f'DELETE FROM "{name}" WHERE {where}', params).rowcount or 0)
+            conn.commit()
+            if conn.execute(f'SELECT 1 FROM "{name}" LIMIT 1').fetchone() is None:
+                drop.append(name)
+    with lock if lock is not None else nullcontext():
+        deleted += int(conn.execute(f"DELETE FROM {LIVE_TABLE} WHERE {where}", params).rowcount or 0)
+        conn.commit()
+        if drop:
+            _drop_partitions(conn, drop)
+    return deleted
+
+
+def _drop_partitions(conn: sqlite3.Connection, names: list[str]) -> None:
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        for name in names:
+            conn.execute(f"DELETE FROM {REGISTRY} WHERE name = ?", (name,))
+        _rebuild_view(conn)
+        for name in names:
+            conn.execute(f'DROP TABLE IF EXISTS "{name}"')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+def delete_ids(conn: sqlite3.Connection, ids: list) -> int:
+    """Delete rows by id from every physical table (ids are unique across partitions)."""
+    placeholders = ",".join("?" * len(ids))
+    deleted = 0
+    for name in physical_tables(conn):
+        deleted += int(conn.execute(f'DELETE FROM "{name}" WHERE id IN ({placeholders})', list(ids)).rowcount or 0)
+    conn.commit()
+    return deleted
+
+
+# --- Incremental backups ------------------------------------------------------
+
+def partition_signature(conn: sqlite3.Connection, name: str) -> str:
+    """Return a short content signature (row count, id sum/max, income total) of a partition."""
+    row = conn.execute(f'SELECT COUNT(*), MAX(id), TOTAL(id), TOTAL(income) FROM "{name}"').fetchone()
+    return hashlib.sha1(repr(tuple(row)).encode("utf-8")).hexdigest()[:12]
+
+
+def backup(conn: sqlite3.Connection, base_path: Path, partitions_dir: Path) -> dict:
+    """Write an incremental backup set.
+
+    *base_path* receives every table except archive rows (archive tables are
+    created empty so the view stays valid) plus a ``backup_partitions``
+    manifest.  Each archive partition is stored once per content version as
+    ``<partitions_dir>/<name>-<signature>.db``; unchanged partitions are not
+    copied again.  Returns ``{"copied": [...], "reused": [...]}``.
+    """
+    partitions_dir.mkdir(parents=True, exist_ok=True)
+    archives = {name for name, _start, _end in list_partitions(conn)}
+    conn.commit()
+
+    copied, reused, manifest = [], [], []
+    for name in sorted(archives):
+        sig = partition_signature(conn, name)
+        target = partitions_dir / f"{name}-{sig}.db"
+        manifest.append((name, target.name))
+        if target.exists():
+            reused.append(name)
+            continue
+        tmp = target.with_suffix(".tmp")
+        tmp.unlink(missing_ok=True)
+        _copy_tables(conn, tmp, [name], schema=[_table_sql(name)])
+        tmp.replace(target)
+        copied.append(name)
+
+    objects = conn.execute(
+        "SELECT type, name, sql FROM sqlite_master WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%'"
+    ).fetchall()
+    order = {"table": 0, "index": 1, "view": 2, "trigger": 3}
+    schema = [sql for _type, _name, sql in sorted(objects, key=lambda o: order.get(o[0], 9))]
+    schema.append(f"CREATE TABLE {MANIFEST} (name TEXT PRIMARY KEY, file TEXT NOT NULL)")
+    tables = [name for kind, name, _sql in objects if kind == "table" and name not in archives]
+    _copy_tables(conn, base_path, tables, schema=schema, manifest=manifest)
+    return {"copied": copied, "reused": reused}
+
+
+def _copy_tables(conn: sqlite3.Connection, path: Path, tables: list[str], *, schema: list[str],
+                 manifest: list[tuple[str, str]] | None = None) -> None:
+    dst = sqlite3.connect(path)
+    try:
+        for sql in schema:
+            dst.execute(sql)
+        if manifest:
+            dst.executemany(f"INSERT INTO {MANIFEST}(name, file) VALUES (?, ?)", manifest)
+        dst.commit()
+    finally:
+        dst.close()
+    conn.execute("ATTACH DATABASE ? AS bk", (str(path),))
+    try:
+        # One read transaction → all tables come from the same snapshot.
+        conn.execute("BEGIN")
+        for name in tables:
+            conn.execute(f'INSERT INTO bk."{name}" SELECT * FROM main."{name}"')
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.execute("DETACH DATABASE bk")
+
+
+def manifest_files(base_path: Path) -> list[str]:
+    """Return partition file names referenced by a backup base (empty for plain copies)."""
+    conn = sqlite3.connect(f"{Path(base_path).resolve().as_uri()}?mode=ro", uri=True)
+    try:
+        if _object_type(conn, MANIFEST) != "table":
+            return []
+        return [str(row[0]) for row in conn.execute(f"SELECT file FROM {MANIFEST}")]
+    except sqlite3.DatabaseError:
+        return []
+    finally:
+        conn.close()
+
+
+def restore_partitions(db_path: Path, partitions_dir: Path) -> int:
+    """Refill archive tables of a just-restored base from its partition files.
+
+    No-op for plain full copies.  Returns the number of partitions loaded.
+    """
+    conn = sqlite3.connect(db_path, timeout=30)
+    try:
+        if _object_type(conn, MANIFEST) != "table":
+            return 0
+        entries = conn.execute(f"SELECT name, file FROM {MANIFEST}").fetchall()
+        for name, file in entries:
+            source = partitions_dir / str(file)
+            if not source.exists():
+                raise FileNotFoundError(f"missing partition backup {source.name}")
+            conn.execute("ATTACH DATABASE ? AS part", (str(source),))
+            try:
+                conn.execute(f'INSERT INTO main."{name}" SELECT * FROM part."{name}"')
+                conn.commit()
+            finally:
+                conn.execute("DETACH DATABASE part")
+        conn.execute(f"DROP TABLE {MANIFEST}")
+        conn.commit()
+        return len(entries)
+    finally:
+        conn.close()
@@ -1550,6 +1550,33 @@ def catalog_summary(*, exchange: str = "bybit", db_path: Path | None = None) ->
     }
 
 
+def catalog_file_checksums(exchange: str, *, db_path: Path | None = None) -> dict[str, tuple[str, int, int]]:
+    """Return ``1m/<coin>/<day>.npz`` -> (sha256, file_size, file_mtime_ns) for checksummed days."""
+    ex = _validate_exchange(exchange)
+    path = Path(db_path) if db_path is not None else checksum_database_path()
+    try:
+        conn = _connect(path, readonly=True)
+    except (FileNotFoundError, sqlite3.Error):
+        return {}
+    try:
+        rows = conn.execute(
+            """
+            SELECT coin, day, sha256, file_size, file_mtime_ns
+            FROM daily_checksums
+            WHERE exchange=? AND timeframe=? AND sha256 != ''
+            """,
+            (ex, TIMEFRAME),
+        ).fetchall()
+    except sqlite3.Error:
+        return {}
+    finally:
+        conn.close()
+    return {
+        f"{TIMEFRAME}/{row['coin']}/{row['day']}.npz": (str(row["sha256"]), int(row["file_size"]), int(row["file_mtime_ns"]))
+        for row in rows
+    }
+
+
 def invalidate_catalog_for_deletion(
     *,
     exchange: str,
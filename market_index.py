@@ -0,0 +1,397 @@
+"""Compact, memory-mapped exchange market-metadata index.
+
+Several services look up a handful of fields (precision, min qty/cost, fees,
+coin ↔ symbol) in large ccxt-style ``markets.json`` / ``mapping.json`` files
+and each used to ``json.load`` the whole file per process.  This module
+stores those fields in one binary file per market source that every process
+maps read-only and queries in O(1) without parsing JSON:
+
+- :func:`write_index` serializes :class:`MarketEntry` rows plus a
+  coin → swap-symbol table.  PBCoinData regenerates
+  ``data/coindata/<exchange>/markets.idx`` whenever it saves markets or the
+  mapping; :func:`ensure_index` builds an index for JSON dumps PBGui does not
+  own (PB7 ``caches/<exchange>/markets.json``) on first use.
+- :class:`MarketIndex` is the reader.  :func:`open_index` keeps one mapping
+  per path and reopens it when the file is replaced (writers use
+  ``os.replace``, so open mappings stay valid).
+
+Each index records a ``source_signature`` of the files it was built from;
+readers compare it with :func:`source_signature` and fall back to the JSON
+path when the index is stale.
+
+File layout (little endian, version 2)::
+
+    header   64 bytes   magic, version, counts, section offsets, signature
+    records  N × 120    string refs + float64 fields + inception + flags
+    keys     K × 12     string ref, kind, record number
+    buckets  B × 4      open-addressing table of key numbers (B = 2^n ≥ 2K)
+    strings             UTF-8 blob
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Mapping
+
+from file_lock import advisory_file_lock
+
+INDEX_FILENAME = "markets.idx"
+FORMAT_VERSION = 2
+_MAGIC = b"PBMI"
+_HEADER = struct.Struct("<4sHHIIIQQ16s12x")
+_STRING_FIELDS = ("symbol", "ccxt_symbol", "coin", "base", "quote")
+_FLOAT_FIELDS = ("price_step", "qty_step", "min_qty", "min_cost", "contract_size", "maker_fee", "taker_fee", "maker", "taker")
+_RECORD = struct.Struct("<" + "IH" * len(_STRING_FIELDS) + "2x" + "d" * len(_FLOAT_FIELDS) + "qI4x")
+_KEY = struct.Struct("<IHBxI")
+_BUCKET = struct.Struct("<I")
+_EMPTY = 0xFFFFFFFF
+_KIND_MARKET = 0
+_KIND_COIN = 1
+_FLAG_SWAP = 1
+_FLAG_LINEAR = 2
+_FLAG_ACTIVE = 4
+
+
+class MarketIndexError(ValueError):
+    """Raised when an index file is missing, truncated or of another format."""
+
+
+@dataclass(frozen=True)
+class MarketEntry:
+    """The market fields kept in the index; unknown numbers are None.
+
+    ``maker``/``taker`` are ccxt's fee keys and ``maker_fee``/``taker_fee``
+    the explicit ones some dumps carry; both are kept so callers choose the
+    precedence they always used.
+    """
+
+    symbol: str
+    ccxt_symbol: str = ""
+    coin: str = ""
+    base: str = ""
+    quote: str = ""
+    price_step: float | None = None
+    qty_step: float | None = None
+    min_qty: float | None = None
+    min_cost: float | None = None
+    contract_size: float | None = None
+    maker_fee: float | None = None
+    taker_fee: float | None = None
+    maker: float | None = None
+    taker: float | None = None
+    inception_ms: int | None = None
+    swap: bool = False
+    linear: bool = True
+    active: bool = True
+
+
+def _float_or_none(value: Any) -> float | None:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def entries_from_ccxt_markets(markets: Mapping[str, Any], coins: Mapping[str, str] | None = None) -> list[tuple[MarketEntry, list[str]]]:
+    """Convert a ccxt-style markets dict into index entries and their lookup keys.
+
+    Keys are the dict key plus ``id``, ``lowercaseId`` and ``symbol``, the
+    identifiers callers look markets up by.  ``coins`` maps market ids to
+    the normalized coin name (from PBCoinData's mapping).
+    """
+    out: list[tuple[MarketEntry, list[str]]] = []
+    coins = coins or {}
+    for key, market in markets.items():
+        if not isinstance(market, dict):
+            continue
+        precision = market.get("precision") or {}
+        limits = market.get("limits") or {}
+        market_id = str(market.get("id") or key)
+        created = _float_or_none(market.get("created"))
+        entry = MarketEntry(
+            symbol=market_id,
+            ccxt_symbol=str(market.get("symbol") or key),
+            coin=str(coins.get(market_id) or ""),
+            base=str(market.get("base") or ""),
+            quote=str(market.get("quote") or ""),
+            price_step=_float_or_none(precision.get("price")),
+            qty_step=_float_or_none(precision.get("amount")),
+            min_qty=_float_or_none((limits.get("amount") or {}).get("min")),
+            min_cost=_float_or_none((limits.get("cost") or {}).get("min")),
+            contract_size=_float_or_none(market.get("contractSize")),
+            maker_fee=_float_or_none(market.get("maker_fee")),
+            taker_fee=_float_or_none(market.get("taker_fee")),
+            maker=_float_or_none(market.get("maker")),
+            taker=_float_or_none(market.get("taker")),
+            inception_ms=int(created) if created is not None else None,
+            swap=bool(market.get("swap", False)),
+            linear=bool(market.get("linear", True)),
+            active=bool(market.get("active", True)),
+        )
+        keys = [str(key)] + [str(market[k]) for k in ("id", "lowercaseId", "symbol") if market.get(k)]
+        out.append((entry, keys))
+    return out
+
+
+def source_signature(*paths: Path | str) -> bytes:
+    """Return a 16-byte digest of the (path, mtime, size) of the index's source files."""
+    digest = hashlib.blake2b(digest_size=16)
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            digest.update(f"{os.fspath(path)}:{stat.st_mtime_ns}:{stat.st_size};".encode())
+        except OSError:
+            digest.update(f"{os.fspath(path)}:missing;".encode())
+    return digest.digest()
+
+
+def _key_hash(kind: int, key: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(bytes((kind,)) + key, digest_size=8).digest(), "little")
+
+
+class _Strings:
+    def __init__(self) -> None:
+        self.blob = bytearray()
+        self._offsets: dict[bytes, int] = {}
+
+    def add(self, text: str) -> tuple[int, int]:
+        raw = text.encode("utf-8")[:0xFFFF]
+        offset = self._offsets.get(raw)
+        if offset is None:
+            offset = self._offsets[raw] = len(self.blob)
+            self.blob += raw
+        return offset, len(raw)
+
+
+def _pack_record(strings: _Strings, entry: MarketEntry) -> bytes:
+    fields: list[Any] = []
+    for name in _STRING_FIELDS:
+        fields.extend(strings.add(getattr(entry, name) or ""))
+    for name in _FLOAT_FIELDS:
+        value = getattr(entry, name)
+        fields.append(float("nan") if value is None else float(value))
+    flags = (_FLAG_SWAP if entry.swap else 0) | (_FLAG_LINEAR if entry.linear else 0) | (_FLAG_ACTIVE if entry.active else 0)
+    fields.extend((-1 if entry.inception_ms is None else int(entry.inception_ms), flags))
+    return _RECORD.pack(*fields)
+
+
+def write_index(
+    path: Path | str,
+    entries: Iterable[tuple[MarketEntry, Iterable[str]]],
+    *,
+    coin_symbols: Mapping[str, str] | None = None,
+    signature: bytes = b"",
+) -> int:
+    """Atomically write an index; returns the number of markets.
+
+    A lookup key registered by several entries resolves to the last one, like
+    the ``dict`` indexes the JSON helpers build.  ``coin_symbols`` maps
+    normalized coins to an entry ``symbol``; symbols without an entry get a
+    bare swap record.
+    """
+    strings = _Strings()
+    records = bytearray()
+    keys: dict[tuple[int, bytes], int] = {}
+    count = 0
+    for entry, entry_keys in entries:
+        records += _pack_record(strings, entry)
+        for key in entry_keys:
+            if key:
+                keys[(_KIND_MARKET, key.encode("utf-8")[:0xFFFF])] = count
+        count += 1
+    symbol_records: dict[bytes, int] = {}
+    for position in range(count):
+        offset, length = struct.unpack_from("<IH", records, position * _RECORD.size)
+        symbol_records.setdefault(bytes(strings.blob[offset:offset + length]), position)
+    for coin, symbol in (coin_symbols or {}).items():
+        if not coin or not symbol:
+            continue
+        raw_symbol = str(symbol).encode("utf-8")[:0xFFFF]
+        record = symbol_records.get(raw_symbol)
+        if record is None:
+            # Mapping rows without a cached ccxt market still resolve coin -> symbol.
+            record = symbol_records[raw_symbol] = count
+            records += _pack_record(strings, MarketEntry(symbol=str(symbol), coin=str(coin), swap=True))
+            count += 1
+        keys.setdefault((_KIND_COIN, str(coin).upper().encode("utf-8")[:0xFFFF]), record)
+
+    bucket_count = 8
+    while bucket_count < 2 * max(1, len(keys)):
+        bucket_count *= 2
+    buckets = [_EMPTY] * bucket_count
+    key_rows = bytearray()
+    for number, ((kind, raw), record) in enumerate(keys.items()):
+        offset, length = strings.add(raw.decode("utf-8", "ignore"))
+        key_rows += _KEY.pack(offset, length, kind, record)
+        slot = _key_hash(kind, raw) & (bucket_count - 1)
+        while buckets[slot] != _EMPTY:
+            slot = (slot + 1) & (bucket_count - 1)
+        buckets[slot] = number
+
+    strings_offset = _HEADER.size + len(records) + len(key_rows) + bucket_count * _BUCKET.size
+    header = _HEADER.pack(
+        _MAGIC, FORMAT_VERSION, 0, count, len(keys), bucket_count,
+        strings_offset, len(strings.blob), signature.ljust(16, b"\0")[:16],
+    )
+    target = Path(path)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    try:
+        with tmp.open("wb") as handle:
+            handle.write(header)
+            handle.write(records)
+            handle.write(key_rows)
+            handle.write(struct.pack(f"<{bucket_count}I", *buckets))
+            handle.write(strings.blob)
+        os.replace(tmp, target)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return count
+
+
+class MarketIndex:
+    """Read-only view of one index file."""
+
+    def __init__(self, path: Path | str) -> None:
+        self.path = Path(path)
+        with self.path.open("rb") as handle:
+            stat = os.fstat(handle.fileno())
+            if stat.st_size < _HEADER.size:
+                raise MarketIndexError(f"{self.path} is not a market index")
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        self.stat_key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        magic, version, _flags, self.records, self.keys, self._buckets, self._strings, strings_size, signature = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != FORMAT_VERSION:
+            self._map.close()
+            raise MarketIndexError(f"{self.path} has unsupported format {magic!r} v{version}")
+        if self._strings + strings_size > len(self._map):
+            self._map.close()
+            raise MarketIndexError(f"{self.path} is truncated")
+        self.version = version
+        self.source_signature = signature
+        self._records_at = _HEADER.size
+        self._keys_at = self._records_at + self.records * _RECORD.size
+        self._buckets_at = self._keys_at + self.keys * _KEY.size
+
+    def __len__(self) -> int:
+        return self.records
+
+    def close(self) -> None:
+        self._map.close()
+
+    def matches(self, signature: bytes) -> bool:
+        """Return True when the index was built from sources with ``signature``."""
+        return self.source_signature == signature.ljust(16, b"\0")[:16]
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._strings + offset
+        return self._map[start:start + length].decode("utf-8")
+
+    def _find(self, kind: int, key: str) -> int | None:
+        raw = key.encode("utf-8")
+        if not raw or not self._buckets:
+            return None
+        mask = self._buckets - 1
+        slot = _key_hash(kind, raw) & mask
+        for _probe in range(self._buckets):
+            (number,) = _BUCKET.unpack_from(self._map, self._buckets_at + slot * _BUCKET.size)
+            if number == _EMPTY:
+                return None
+            offset, length, key_kind, record = _KEY.unpack_from(self._map, self._keys_at + number * _KEY.size)
+            if key_kind == kind and length == len(raw):
+                start = self._strings + offset
+                if self._map[start:start + length] == raw:
+                    return record
+            slot = (slot + 1) & mask
+        return None
+
+    def _entry(self, record: int) -> MarketEntry:
+        values = _RECORD.unpack_from(self._map, self._records_at + record * _RECORD.size)
+        strings = [self._string(values[i], values[i + 1]) for i in range(0, 2 * len(_STRING_FIELDS), 2)]
+        floats = values[2 * len(_STRING_FIELDS):2 * len(_STRING_FIELDS) + len(_FLOAT_FIELDS)]
+        inception, flags = values[-2:]
+        return MarketEntry(
+            *strings,
+            *(None if math.isnan(value) else value for value in floats),
+            inception_ms=None if inception < 0 else inception,
+            swap=bool(flags & _FLAG_SWAP),
+            linear=bool(flags & _FLAG_LINEAR),
+            active=bool(flags & _FLAG_ACTIVE),
+        )
+
+    def market(self, key: str) -> MarketEntry | None:
+        """Return the market registered under an id, ccxt symbol or markets.json key."""
+        record = self._find(_KIND_MARKET, str(key or ""))
+        return None if record is None else self._entry(record)
+
+    def symbol_for_coin(self, coin: str) -> str | None:
+        """Return the swap symbol PBCoinData maps a normalized coin to."""
+        record = self._find(_KIND_COIN, str(coin or "").upper())
+        if record is None:
+            return None
+        values = _RECORD.unpack_from(self._map, self._records_at + record * _RECORD.size)
+        return self._string(values[0], values[1])
+
+
+_OPEN: dict[str, MarketIndex] = {}
+_OPEN_LOCK = threading.Lock()
+
+
+def open_index(path: Path | str) -> MarketIndex | None:
+    """Return the shared reader for ``path``, reopening it after the file was replaced."""
+    key = os.fspath(path)
+    try:
+        stat = os.stat(key)
+    except OSError:
+        with _OPEN_LOCK:
+            _OPEN.pop(key, None)
+        return None
+    stat_key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    with _OPEN_LOCK:
+        current = _OPEN.get(key)
+        if current is not None and current.stat_key == stat_key:
+            return current
+        try:
+            current = MarketIndex(key)
+        except (OSError, ValueError):
+            _OPEN.pop(key, None)
+            return None
+        # Older readers are left to the garbage collector; callers may still hold them.
+        _OPEN[key] = current
+        return current
+
+
+def ensure_index(source: Path | str, index_path: Path | str) -> MarketIndex | None:
+    """Return an up-to-date index of a ccxt-style markets JSON, building it once if stale.
+
+    The first process to see a new ``source`` parses it under an advisory lock;
+    everyone else maps the result.
+    """
+    if not os.path.exists(source):
+        return None
+    signature = source_signature(source)
+    index = open_index(index_path)
+    if index is not None and index.matches(signature):
+        return index
+    with advisory_file_lock(Path(index_path)):
+        index = open_index(index_path)
+        if index is not None and index.matches(signature):
+            return index
+        try:
+            with open(source, "r", encoding="utf-8") as handle:
+                markets = json.load(handle)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(markets, dict):
+            return None
+        write_index(index_path, entries_from_ccxt_markets(markets), signature=signature)
+    return open_index(index_path)
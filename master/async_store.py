@@ -122,6 +122,8 @@ class VPSStore:
         self.instances: dict[str, list[dict]] = {}
         self.v7_instances: dict[str, list[dict]] = {}  # v7 config details per host
         self.v8_instances: dict[str, list[dict]] = {}  # v8 config details per host
+        # Bumped on every v7_instances write; lets pollers detect changes cheaply.
+        self.v7_revision = 0
         self.host_meta: dict[str, dict] = {}
         self.services: dict[str, dict] = {}
         self.streams: dict[str, dict] = {}  # stream diagnostics per host
@@ -177,6 +179,7 @@ class VPSStore:
     def update_v7_instances(self, hostname: str, data: list[dict]):
         """Update v7 instance details (config_version, running_version, enabled_on)."""
         self.v7_instances[hostname] = data
+        self.v7_revision += 1
         self.changed.set()
 
     def update_v8_instances(self, hostname: str, data: list[dict]):
@@ -234,7 +237,8 @@ class VPSStore:
         """Remove all data for a host."""
         self.system.pop(hostname, None)
         self.instances.pop(hostname, None)
-        self.v7_instances.pop(hostname, None)
+        if self.v7_instances.pop(hostname, None) is not None:
+            self.v7_revision += 1
         self.v8_instances.pop(hostname, None)
         self.host_meta.pop(hostname, None)
         self.streams.pop(hostname, None)
@@ -0,0 +1,248 @@
+"""Content-addressed blob packfiles for PBCluster sync.
+
+A pack bundles typed content-addressed blobs (``config``, ``secret``,
+``sealed``) into one zlib-compressed payload::
+
+    b"PBGPACK1" + zlib( u32 header length | header JSON | blob bytes... )
+
+where the header lists ``[kind, "sha256:<hex>", size]`` in payload order.
+Readers verify every blob against its address, so a pack is only a transport
+and cache format: the loose ``<kind>_blobs/sha256/xx/<digest>.json`` files
+stay the source of truth for materialization, coverage checks and blob GC.
+
+Packs are used in two places:
+
+* the ``get-blob-pack`` peer verb answers a have/want request (the caller
+  sends only hashes it does not hold) with all available blobs in one
+  round trip instead of one ``get-blob`` call per hash, and
+* blob GC repacks every reachable config blob into
+  ``config_blobs/packs/reachable.pack`` so serving a large want list reads
+  one file instead of thousands of small ones.
+
+The reachable pack is written with a full zlib flush after every blob, so
+each blob can be inflated on its own from its compressed offset while the
+file stays a valid pack. ``reachable.idx`` next to it maps each hash to
+``[offset, compressed length, size]``; requests seek to and verify only the
+blobs they return.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import struct
+import zlib
+from pathlib import Path
+from typing import Iterable
+
+from secure_files import atomic_write_private_bytes
+
+PACK_MAGIC = b"PBGPACK1"
+PACK_KINDS = ("config", "secret", "sealed")
+PACK_DIR_NAME = "packs"
+REACHABLE_PACK_NAME = "reachable.pack"
+REACHABLE_INDEX_NAME = "reachable.idx"
+MAX_PACK_HEADER_BYTES = 4 * 1024 * 1024
+MAX_REACHABLE_PACK_BYTES = 256 * 1024 * 1024
+_HEADER_LENGTH = struct.Struct(">I")
+_index_cache: dict[str, tuple[tuple[int, int, int, int], dict[str, tuple[int, int, int]]]] = {}
+
+
+class ClusterBlobPackError(ValueError):
+    """Raised when a blob pack is malformed or fails verification."""
+
+
+def encode_pack(entries: Iterable[tuple[str, str, bytes]]) -> bytes:
+    """Return one compressed pack for ``(kind, hash, raw)`` entries."""
+
+    index: list[list[object]] = []
+    chunks: list[bytes] = []
+    for kind, blob_hash, raw in entries:
+        if kind not in PACK_KINDS:
+            raise ClusterBlobPackError(f"unsupported blob kind: {kind}")
+        index.append([kind, str(blob_hash), len(raw)])
+        chunks.append(bytes(raw))
+    header = json.dumps({"entries": index}, separators=(",", ":")).encode("utf-8")
+    body = _HEADER_LENGTH.pack(len(header)) + header + b"".join(chunks)
+    return PACK_MAGIC + zlib.compress(body, 6)
+
+
+def decode_pack(data: bytes, *, max_bytes: int) -> list[tuple[str, str, bytes]]:
+    """Decode and hash-verify a pack whose blobs total at most *max_bytes*."""
+
+    if not data.startswith(PACK_MAGIC):
+        raise ClusterBlobPackError("blob pack has an invalid header")
+    decompressor = zlib.decompressobj()
+    limit = _HEADER_LENGTH.size + MAX_PACK_HEADER_BYTES + int(max_bytes)
+    try:
+        body = decompressor.decompress(data[len(PACK_MAGIC):], limit + 1)
+    except zlib.error as exc:
+        raise ClusterBlobPackError("blob pack is not valid zlib data") from exc
+    if len(body) > limit or decompressor.unconsumed_tail:
+        raise ClusterBlobPackError("blob pack exceeds its size limit")
+    if not decompressor.eof:
+        raise ClusterBlobPackError("blob pack is truncated")
+    if len(body) < _HEADER_LENGTH.size:
+        raise ClusterBlobPackError("blob pack is truncated")
+    (header_len,) = _HEADER_LENGTH.unpack_from(body)
+    if header_len > MAX_PACK_HEADER_BYTES:
+        raise ClusterBlobPackError("blob pack header is too large")
+    offset = _HEADER_LENGTH.size + header_len
+    try:
+        header = json.loads(body[_HEADER_LENGTH.size:offset])
+    except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ClusterBlobPackError("blob pack header is invalid") from exc
+    index = header.get("entries") if isinstance(header, dict) else None
+    if not isinstance(index, list):
+        raise ClusterBlobPackError("blob pack header is invalid")
+    entries: list[tuple[str, str, bytes]] = []
+    total = 0
+    for item in index:
+        if (
+            not isinstance(item, list)
+            or len(item) != 3
+            or item[0] not in PACK_KINDS
+            or not isinstance(item[1], str)
+            or type(item[2]) is not int
+            or item[2] < 0
+        ):
+            raise ClusterBlobPackError("blob pack entry is invalid")
+        kind, blob_hash, size = item
+        total += size
+        if total > max_bytes or offset + size > len(body):
+            raise ClusterBlobPackError("blob pack entry exceeds the payload")
+        raw = body[offset:offset + size]
+        offset += size
+        if not blob_hash.startswith("sha256:") or hashlib.sha256(raw).hexdigest() != blob_hash.removeprefix("sha256:"):
+            raise ClusterBlobPackError(f"blob pack hash mismatch: {blob_hash}")
+        entries.append((kind, blob_hash, raw))
+    if offset != len(body):
+        raise ClusterBlobPackError("blob pack has trailing data")
+    return entries
+
+
+def reachable_pack_path(config_blobs: Path) -> Path:
+    """Return the repacked reachable-config pack below a config blob root."""
+
+    return Path(config_blobs) / PACK_DIR_NAME / REACHABLE_PACK_NAME
+
+
+def reachable_index_path(config_blobs: Path) -> Path:
+    """Return the offset index of the reachable-config pack."""
+
+    return Path(config_blobs) / PACK_DIR_NAME / REACHABLE_INDEX_NAME
+
+
+def _encode_seekable_pack(entries: list[tuple[str, str, bytes]]) -> tuple[bytes, list[list[object]]]:
+    """Return a pack whose blobs start at flush points, plus ``[hash, offset, length, size]`` rows."""
+
+    index = [[kind, str(blob_hash), len(raw)] for kind, blob_hash, raw in entries]
+    header = json.dumps({"entries": index}, separators=(",", ":")).encode("utf-8")
+    compressor = zlib.compressobj(6)
+    chunks = [PACK_MAGIC, compressor.compress(_HEADER_LENGTH.pack(len(header)) + header), compressor.flush(zlib.Z_FULL_FLUSH)]
+    position = sum(len(chunk) for chunk in chunks)
+    offsets: list[list[object]] = []
+    for _kind, blob_hash, raw in entries:
+        chunk = compressor.compress(bytes(raw)) + compressor.flush(zlib.Z_FULL_FLUSH)
+        offsets.append([str(blob_hash), position, len(chunk), len(raw)])
+        chunks.append(chunk)
+        position += len(chunk)
+    chunks.append(compressor.flush())
+    return b"".join(chunks), offsets
+
+
+def write_reachable_pack(config_blobs: Path, blobs: Iterable[tuple[str, bytes]]) -> dict[str, int]:
+    """Atomically replace the reachable-config pack and its index; return size stats."""
+
+    entries = [("config", blob_hash, raw) for blob_hash, raw in sorted(blobs)]
+    data, offsets = _encode_seekable_pack(entries)
+    path = reachable_pack_path(config_blobs)
+    if path.parent.is_symlink():
+        raise ClusterBlobPackError("blob pack directory must not be a symlink")
+    atomic_write_private_bytes(path, data)
+    index = {"pack_bytes": len(data), "entries": offsets}
+    atomic_write_private_bytes(reachable_index_path(config_blobs), json.dumps(index, separators=(",", ":")).encode("utf-8"))
+    return {
+        "blobs": len(entries),
+        "bytes": sum(len(raw) for _kind, _hash, raw in entries),
+        "packed_bytes": len(data),
+    }
+
+
+def remove_reachable_pack(config_blobs: Path) -> None:
+    """Drop a stale reachable-config pack and its index."""
+
+    for path in (reachable_index_path(config_blobs), reachable_pack_path(config_blobs)):
+        if not path.is_symlink():
+            path.unlink(missing_ok=True)
+
+
+def _load_reachable_index(config_blobs: Path) -> dict[str, tuple[int, int, int]]:
+    """Return ``{hash: (offset, length, size)}``, cached until the pack or index changes."""
+
+    pack = reachable_pack_path(config_blobs)
+    index_path = reachable_index_path(config_blobs)
+    pack_stat = pack.stat()
+    index_stat = index_path.stat()
+    key = (pack_stat.st_mtime_ns, pack_stat.st_size, index_stat.st_mtime_ns, index_stat.st_size)
+    cached = _index_cache.get(str(index_path))
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    try:
+        document = json.loads(index_path.read_bytes())
+    except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ClusterBlobPackError("blob pack index is invalid") from exc
+    rows = document.get("entries") if isinstance(document, dict) else None
+    if not isinstance(rows, list) or document.get("pack_bytes") != pack_stat.st_size:
+        raise ClusterBlobPackError("blob pack index does not match its pack")
+    entries: dict[str, tuple[int, int, int]] = {}
+    for row in rows:
+        if (
+            not isinstance(row, list)
+            or len(row) != 4
+            or not isinstance(row[0], str)
+            or any(type(value) is not int or value < 0 for value in row[1:])
+            or row[1] + row[2] > pack_stat.st_size
+        ):
+            raise ClusterBlobPackError("blob pack index entry is invalid")
+        entries[row[0]] = (row[1], row[2], row[3])
+    _index_cache[str(index_path)] = (key, entries)
+    return entries
+
+
+def read_reachable_pack(
+    config_blobs: Path,
+    wanted: Iterable[str],
+    *,
+    max_bytes: int = MAX_REACHABLE_PACK_BYTES,
+) -> dict[str, bytes]:
+    """Return verified blobs from the reachable-config pack that are in *wanted*.
+
+    Only the wanted blobs are read, inflated and hash-checked. A missing,
+    oversized or corrupt pack or index yields an empty result, and a blob that
+    fails verification is left out, so callers fall back to loose blob files.
+    """
+
+    wanted_set = set(wanted)
+    path = reachable_pack_path(config_blobs)
+    if not wanted_set or path.is_symlink() or reachable_index_path(config_blobs).is_symlink() or not path.is_file():
+        return {}
+    try:
+        index = _load_reachable_index(config_blobs)
+        result: dict[str, bytes] = {}
+        with path.open("rb") as handle:
+            for blob_hash, (offset, length, size) in sorted(
+                (item for item in index.items() if item[0] in wanted_set), key=lambda item: item[1][0]
+            ):
+                if size > max_bytes or not blob_hash.startswith("sha256:"):
+                    continue
+                handle.seek(offset)
+                try:
+                    raw = zlib.decompressobj(-zlib.MAX_WBITS).decompress(handle.read(length), size + 1)
+                except zlib.error:
+                    continue
+                if len(raw) == size and hashlib.sha256(raw).hexdigest() == blob_hash.removeprefix("sha256:"):
+                    result[blob_hash] = raw
+        return result
+    except (OSError, ClusterBlobPackError):
+        return {}
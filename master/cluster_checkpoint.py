@@ -9,7 +9,7 @@ import shutil
 import time
 from copy import deepcopy
 from pathlib import Path
-from typing import Any, Iterable, Mapping
+from typing import Any, Iterable, Iterator, Mapping
 
 from file_lock import advisory_file_lock
 from cluster_credentials import (
@@ -18,6 +18,21 @@ from cluster_credentials import (
     sign_operation,
     verify_operation,
 )
+from master.cluster_blob_pack import (
+    MAX_REACHABLE_PACK_BYTES,
+    ClusterBlobPackError,
+    remove_reachable_pack,
+    write_reachable_pack,
+)
+from master.cluster_oplog import (
+    OplogError,
+    actor_dirs,
+    actor_sequences,
+    iter_actor_records,
+    iter_records,
+    oplog_totals,
+    segment_range,
+)
 from master.cluster_state import (
     API_KEY_OPS,
     CLUSTER_POLICY_OPS,
@@ -742,23 +757,24 @@ def load_checkpoint_tail(
     operations: list[dict[str, Any]] = []
     if not paths.oplog.exists():
         return operations
-    for actor_dir in sorted(path for path in paths.oplog.iterdir() if path.is_dir()):
+    for actor_dir in actor_dirs(paths.oplog):
         actor = str(actor_dir.name)
         expected = int(baseline.get(actor, 0)) + 1
-        for path in sorted(actor_dir.glob("*.json")):
-            try:
-                seq = int(path.stem)
-            except ValueError as exc:
-                raise ClusterCheckpointError("oplog contains an invalid operation filename") from exc
-            if seq <= int(baseline.get(actor, 0)):
-                continue
+        try:
+            records = list(iter_actor_records(actor_dir, after_seq=int(baseline.get(actor, 0))))
+        except OplogError as exc:
+            raise ClusterCheckpointError("oplog contains an invalid operation filename") from exc
+        except OSError as exc:
+            raise ClusterCheckpointError("checkpoint tail operation is unreadable") from exc
+        for record in records:
+            seq = record.seq
             if seq != expected:
                 raise ClusterCheckpointError(
                     f"checkpoint tail sequence gap for actor {actor}: expected {expected}, got {seq}"
                 )
             try:
-                operation = json.loads(path.read_text(encoding="utf-8"))
-            except (OSError, json.JSONDecodeError) as exc:
+                operation = json.loads(record.raw)
+            except (UnicodeDecodeError, json.JSONDecodeError) as exc:
                 raise ClusterCheckpointError("checkpoint tail operation is unreadable") from exc
             if not isinstance(operation, dict) or str(operation.get("actor") or "") != actor or int(operation.get("seq") or 0) != seq:
                 raise ClusterCheckpointError("checkpoint tail operation path mismatch")
@@ -1274,9 +1290,8 @@ def retention_preview(
         }
         for item in candidates[:None if item_limit is None else max(0, int(item_limit))]
     ]
-    operation_paths = sorted(paths.oplog.glob("*/*.json")) if paths.oplog.exists() else []
-    total_bytes = sum(int(path.stat().st_size) for path in operation_paths)
-    retained_count = len(operation_paths) - eligible_count
+    total_count, total_bytes = _oplog_totals(paths.oplog)
+    retained_count = total_count - eligible_count
     retained_bytes = total_bytes - eligible_bytes
     return {
         "status": "dry_run",
@@ -1346,8 +1361,7 @@ def prune_operation_history(
             require_receipt_age=False,
         )
         candidate_digest = _sha256_json(candidates)
-        operation_paths = sorted(paths.oplog.glob("*/*.json")) if paths.oplog.exists() else []
-        total_bytes = sum(int(path.stat().st_size) for path in operation_paths)
+        total_count, total_bytes = _oplog_totals(paths.oplog)
         eligible_bytes = sum(int(item["size"]) for item in candidates)
         report = {
             "schema_version": 1,
@@ -1362,7 +1376,7 @@ def prune_operation_history(
             "candidate_digest": candidate_digest,
             "eligible_operations": len(candidates),
             "eligible_bytes": eligible_bytes,
-            "retained_operations": len(operation_paths) - len(candidates),
+            "retained_operations": total_count - len(candidates),
             "retained_bytes": total_bytes - eligible_bytes,
             "blockers": sorted(set(blockers)),
             "dry_run": bool(dry_run or blockers),
@@ -1399,6 +1413,10 @@ def prune_operation_history(
         journal["phase"] = "pruning"
         atomic_write_private_text(journal_path, json.dumps(journal, indent=4, sort_keys=True) + "\n")
         deleted_bytes = 0
+        segment_members: dict[str, set[int]] = {}
+        for candidate in journal["candidates"]:
+            if segment_range(Path(str(candidate["path"]))) is not None:
+                segment_members.setdefault(str(candidate["path"]), set()).add(int(candidate["seq"]))
         for index, candidate in enumerate(journal["candidates"], start=1):
             relative = str(candidate["path"])
             if relative in completed:
@@ -1413,8 +1431,14 @@ def prune_operation_history(
                 seq = int(candidate["seq"])
                 if seq > int(safe_baseline.get(actor, 0)):
                     raise ClusterCheckpointError("prune candidate exceeds safe baseline")
+                bounds = segment_range(path)
+                if bounds is not None:
+                    if segment_members.get(relative) != set(range(bounds[0], bounds[1] + 1)):
+                        raise ClusterCheckpointError("prune candidate covers only part of a segment")
+                    deleted_bytes += int(path.stat().st_size)
+                else:
+                    deleted_bytes += int(candidate["size"])
                 path.unlink()
-                deleted_bytes += int(candidate["size"])
             completed.add(relative)
             if index % 100 == 0:
                 journal["completed"] = sorted(completed)
@@ -1441,7 +1465,7 @@ def prune_operation_history(
         report.update({
             "status": "complete",
             "dry_run": False,
-            "deleted_operations": len(completed),
+            "deleted_operations": sum(1 for item in journal["candidates"] if str(item["path"]) in completed),
             "deleted_bytes": deleted_bytes,
             "deleted_quarantines": quarantine_count,
             "deleted_quarantine_bytes": quarantine_bytes,
@@ -1525,15 +1549,7 @@ def replica_blob_hashes(cluster_root: Path | str) -> dict[str, list[str]]:
                 "sealed": refs.get("sealed") or [],
             },
         )
-    for operation_path in sorted(paths.oplog.glob("*/*.json")) if paths.oplog.exists() else []:
-        if operation_path.is_symlink():
-            raise ClusterCheckpointError("retained operation must not be a symlink")
-        try:
-            operation = json.loads(operation_path.read_text(encoding="utf-8"))
-        except FileNotFoundError:
-            continue
-        except (OSError, json.JSONDecodeError) as exc:
-            raise ClusterCheckpointError("retained operation is unreadable") from exc
+    for operation in _retained_operations(paths.oplog):
         _merge_operation_blob_refs(reachable, operation, obsolete_secret_hashes)
         config_manifest_refs.update(_collect_hash_field_refs(operation, "config_manifest_hash"))
     _collect_mailbox_blob_refs(paths, reachable, config_manifest_refs=config_manifest_refs)
@@ -1626,8 +1642,8 @@ def _blob_gc_report_for_preview(root: Path, shadow: Mapping[str, Any], timestamp
     if committed is None:
         blockers.append("checkpoint_missing")
     try:
-        pruned_paths = {
-            str(item["path"])
+        pruned = {
+            (str(item["actor"]), int(item["seq"]))
             for item in _operation_prune_candidates(
                 paths.oplog,
                 safe_baseline,
@@ -1639,12 +1655,7 @@ def _blob_gc_report_for_preview(root: Path, shadow: Mapping[str, Any], timestamp
         _merge_blob_refs(reachable, shadow.get("blob_refs") or {})
         _merge_blob_refs(reachable, previous.get("blob_refs") or {})
         obsolete_secret_hashes = _sealed_obsolete_secret_hashes(shadow)
-        for operation_path in sorted(paths.oplog.glob("*/*.json")) if paths.oplog.exists() else []:
-            if str(operation_path.relative_to(paths.root)) in pruned_paths:
-                continue
-            if operation_path.is_symlink():
-                raise ClusterCheckpointError("retained operation must not be a symlink")
-            operation = json.loads(operation_path.read_text(encoding="utf-8"))
+        for operation in _retained_operations(paths.oplog, exclude=pruned):
             _merge_operation_blob_refs(reachable, operation, obsolete_secret_hashes)
         _collect_mailbox_blob_refs(paths, reachable)
         _expand_config_manifest_refs(paths, reachable["config"])
@@ -1725,10 +1736,7 @@ def garbage_collect_blobs(
             if previous is not None:
                 _merge_blob_refs(reachable, previous.get("blob_refs") or {})
             obsolete_secret_hashes = _sealed_obsolete_secret_hashes(current)
-            for operation_path in sorted(paths.oplog.glob("*/*.json")) if paths.oplog.exists() else []:
-                if operation_path.is_symlink():
-                    raise ClusterCheckpointError("retained operation must not be a symlink")
-                operation = json.loads(operation_path.read_text(encoding="utf-8"))
+            for operation in _retained_operations(paths.oplog):
                 _merge_operation_blob_refs(reachable, operation, obsolete_secret_hashes)
             _collect_mailbox_blob_refs(paths, reachable)
             _expand_config_manifest_refs(paths, reachable["config"])
@@ -1755,6 +1763,7 @@ def garbage_collect_blobs(
             "candidates": candidates,
         }
         atomic_write_private_text(candidate_path, json.dumps(candidate_state, indent=4, sort_keys=True) + "\n")
+        repack = _repack_reachable_config_blobs(paths, reachable["config"]) if reachable_complete and not dry_run else None
         report = {
             "schema_version": 1,
             "status": "blocked" if blockers else "ready",
@@ -1777,6 +1786,7 @@ def garbage_collect_blobs(
             "dry_run": bool(dry_run or blockers),
             "deleted_blobs": 0,
             "deleted_bytes": 0,
+            "repack": repack,
         }
         if blockers or dry_run or not candidates:
             atomic_write_private_text(report_path, json.dumps(report, indent=4, sort_keys=True) + "\n")
@@ -1840,6 +1850,25 @@ def garbage_collect_blobs(
         return report
 
 
+def _repack_reachable_config_blobs(paths: ClusterPaths, config_hashes: set[str]) -> dict[str, Any]:
+    """Rewrite the reachable-config pack that peers are served from after marking."""
+
+    blobs: list[tuple[str, bytes]] = []
+    total = 0
+    try:
+        for blob_hash in sorted(config_hashes):
+            raw = _read_verified_blob(_content_addressed_blob_path(paths.config_blobs, blob_hash), blob_hash)
+            total += len(raw)
+            if total > MAX_REACHABLE_PACK_BYTES:
+                remove_reachable_pack(paths.config_blobs)
+                return {"status": "skipped", "reason": "reachable_config_too_large"}
+            blobs.append((blob_hash, raw))
+        stats = write_reachable_pack(paths.config_blobs, blobs)
+    except (OSError, ClusterCheckpointError, ClusterBlobPackError) as exc:
+        return {"status": "failed", "reason": str(exc)}
+    return {"status": "complete", **stats}
+
+
 def _merge_blob_refs(target: dict[str, set[str]], refs: Mapping[str, Any]) -> None:
     """Merge normalized typed blob references into one mark set."""
 
@@ -2083,34 +2112,69 @@ def _operation_prune_candidates(
     result: list[dict[str, Any]] = []
     if not oplog.exists():
         return result
-    for actor_dir in sorted(path for path in oplog.iterdir() if path.is_dir()):
+    for actor_dir in actor_dirs(oplog):
         actor = str(actor_dir.name)
         actor_baseline = int(safe_baseline.get(actor, 0))
-        for path in sorted(actor_dir.glob("*.json")):
-            if path.is_symlink():
-                raise ClusterCheckpointError("oplog operation must not be a symlink")
-            try:
-                seq = int(path.stem)
-                stat = path.stat()
-                operation = json.loads(path.read_text(encoding="utf-8"))
-            except (ValueError, OSError, json.JSONDecodeError) as exc:
-                raise ClusterCheckpointError("oplog operation is unreadable during retention scan") from exc
-            created_at = int(operation.get("created_at") or 0) if isinstance(operation, dict) else 0
-            receipt_is_old = int(stat.st_mtime) < cutoff
-            if seq <= actor_baseline and created_at < cutoff and (receipt_is_old or not require_receipt_age):
-                result.append({
-                    "actor": actor,
-                    "seq": seq,
-                    "op_id": str(operation.get("op_id") or ""),
-                    "op": str(operation.get("op") or ""),
-                    "created_at": created_at,
-                    "first_seen_at": int(stat.st_mtime),
-                    "size": int(stat.st_size),
-                    "path": str(path.relative_to(oplog.parent)),
-                })
+        segment_items: dict[Path, list[dict[str, Any] | None]] = {}
+        try:
+            for record in iter_actor_records(actor_dir):
+                if record.path.is_symlink():
+                    raise ClusterCheckpointError("oplog operation must not be a symlink")
+                operation = json.loads(record.raw)
+                created_at = int(operation.get("created_at") or 0) if isinstance(operation, dict) else 0
+                receipt_is_old = record.first_seen_at < cutoff
+                item = None
+                if record.seq <= actor_baseline and created_at < cutoff and (receipt_is_old or not require_receipt_age):
+                    item = {
+                        "actor": actor,
+                        "seq": record.seq,
+                        "op_id": str(operation.get("op_id") or ""),
+                        "op": str(operation.get("op") or ""),
+                        "created_at": created_at,
+                        "first_seen_at": record.first_seen_at,
+                        "size": record.size,
+                        "path": str(record.path.relative_to(oplog.parent)),
+                    }
+                if record.in_segment:
+                    segment_items.setdefault(record.path, []).append(item)
+                elif item is not None:
+                    result.append(item)
+        except (OplogError, OSError, UnicodeDecodeError, json.JSONDecodeError) as exc:
+            raise ClusterCheckpointError("oplog operation is unreadable during retention scan") from exc
+        for items in segment_items.values():
+            if all(item is not None for item in items):
+                result.extend(item for item in items if item is not None)
+    result.sort(key=lambda item: (str(item["actor"]), int(item["seq"])))
     return result
 
 
+def _retained_operations(
+    oplog: Path,
+    *,
+    exclude: set[tuple[str, int]] | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Yield stored operations that are not in *exclude* for blob reachability."""
+
+    try:
+        for record in iter_records(oplog):
+            if exclude and (record.actor, record.seq) in exclude:
+                continue
+            if record.path.is_symlink():
+                raise ClusterCheckpointError("retained operation must not be a symlink")
+            yield json.loads(record.raw)
+    except (OplogError, OSError, UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ClusterCheckpointError("retained operation is unreadable") from exc
+
+
+def _oplog_totals(oplog: Path) -> tuple[int, int]:
+    """Return the stored operation count and bytes for retention reports."""
+
+    try:
+        return oplog_totals(oplog)
+    except (OplogError, OSError) as exc:
+        raise ClusterCheckpointError("oplog operation is unreadable during retention scan") from exc
+
+
 def _prune_old_oplog_quarantines(root: Path, cutoff: int) -> tuple[int, int]:
     """Remove old rebootstrap quarantines only after checkpoint reconstruction succeeds."""
 
@@ -2566,15 +2630,13 @@ def _operation_file_vector(
     if not oplog.exists():
         return base
     vector: dict[str, int] = dict(base)
-    for actor_dir in sorted(path for path in oplog.iterdir() if path.is_dir()):
+    for actor_dir in actor_dirs(oplog):
         actor = str(actor_dir.name)
         actor_baseline = int(base.get(actor, 0))
-        values: set[int] = set()
-        for path in actor_dir.glob("*.json"):
-            try:
-                values.add(int(path.stem))
-            except ValueError as exc:
-                raise ClusterCheckpointError("oplog contains an invalid operation filename") from exc
+        try:
+            values = actor_sequences(actor_dir)
+        except OplogError as exc:
+            raise ClusterCheckpointError("oplog contains an invalid operation filename") from exc
         if not values:
             continue
         maximum = max(values)
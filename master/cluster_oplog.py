@@ -0,0 +1,447 @@
+"""Segmented per-actor storage for the PBCluster operation log.
+
+Operations are appended as one ``oplog/<actor>/<seq:08d>.json`` file each:
+that keeps single-operation writes atomic, idempotent and readable by older
+PBGui versions. Once an actor has accumulated a contiguous run of loose files,
+:func:`seal_oplog_segments` folds the run into one immutable segment file::
+
+    oplog/<actor>/<first:08d>-<last:08d>.seg
+
+    b"PBGSEG01"
+    records      u32 length | operation JSON bytes           (one per seq)
+    index        u64 offset | u32 length | u32 crc32 | u64 first_seen_at
+    trailer      u64 first_seq | u64 count | u64 index offset | b"PBGSEG01"
+
+Record bytes are the original file bytes and ``first_seen_at`` keeps the
+file's receipt time for retention. Range reads use the index to read one
+contiguous byte span, and history pruning removes whole segments.
+
+Readers in this module merge segments with loose files (a loose file that is
+also covered by a segment, left behind by an interrupted seal, is ignored),
+so existing per-file oplogs stay readable without migration. Readers do not
+take the append lock: a seal writes its segment before unlinking the loose
+files, so a reader that misses a loose file re-lists the segments once.
+"""
+
+from __future__ import annotations
+
+import os
+import re
+import struct
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Mapping
+
+from secure_files import atomic_write_private_bytes
+
+SEGMENT_MAGIC = b"PBGSEG01"
+SEGMENT_SUFFIX = ".seg"
+SEGMENT_MIN_RECORDS = 256
+SEGMENT_MAX_RECORDS = 4096
+SEGMENT_MAX_BYTES = 8 * 1024 * 1024
+_RECORD_LENGTH = struct.Struct(">I")
+_INDEX_ENTRY = struct.Struct(">QIIQ")
+_TRAILER = struct.Struct(">QQQ8s")
+_LOOSE_NAME = re.compile(r"^[0-9]+\.json$")
+_SEGMENT_NAME = re.compile(r"^([0-9]{8,})-([0-9]{8,})\.seg$")
+
+
+class OplogError(ValueError):
+    """Raised when an oplog file or segment is malformed."""
+
+
+@dataclass(frozen=True)
+class OplogRecord:
+    """One stored operation, either a loose file or a segment record."""
+
+    actor: str
+    seq: int
+    raw: bytes
+    path: Path
+    size: int
+    first_seen_at: int
+    in_segment: bool
+
+
+@dataclass(frozen=True)
+class _SegmentIndex:
+    path: Path
+    first_seq: int
+    entries: tuple[tuple[int, int, int, int], ...]
+
+    @property
+    def last_seq(self) -> int:
+        return self.first_seq + len(self.entries) - 1
+
+
+def segment_name(first_seq: int, last_seq: int) -> str:
+    """Return the file name of the segment holding ``first_seq..last_seq``."""
+
+    return f"{int(first_seq):08d}-{int(last_seq):08d}{SEGMENT_SUFFIX}"
+
+
+def segment_range(path: Path) -> tuple[int, int] | None:
+    """Return the sequence range encoded in a segment file name."""
+
+    match = _SEGMENT_NAME.match(Path(path).name)
+    if match is None:
+        return None
+    first, last = int(match.group(1)), int(match.group(2))
+    return (first, last) if 0 < first <= last else None
+
+
+def actor_dirs(oplog: Path) -> list[Path]:
+    """Return actor directories in deterministic order."""
+
+    if not Path(oplog).exists():
+        return []
+    return sorted(path for path in Path(oplog).iterdir() if path.is_dir())
+
+
+def loose_operation_paths(actor_dir: Path) -> dict[int, Path]:
+    """Return per-file operations of one actor by sequence."""
+
+    result: dict[int, Path] = {}
+    for path in Path(actor_dir).glob("*.json"):
+        if not _LOOSE_NAME.match(path.name):
+            raise OplogError(f"oplog contains an invalid operation filename: {path}")
+        result[int(path.stem)] = path
+    return result
+
+
+def segment_paths(actor_dir: Path) -> list[Path]:
+    """Return sealed segments of one actor ordered by first sequence."""
+
+    segments: list[tuple[int, int, Path]] = []
+    for path in Path(actor_dir).glob(f"*{SEGMENT_SUFFIX}"):
+        bounds = segment_range(path)
+        if bounds is None:
+            raise OplogError(f"oplog contains an invalid segment filename: {path}")
+        segments.append((bounds[0], bounds[1], path))
+    segments.sort()
+    for (_first, last, path), (next_first, _next_last, _next_path) in zip(segments, segments[1:]):
+        if next_first <= last:
+            raise OplogError(f"oplog segments overlap: {path}")
+    return [path for _first, _last, path in segments]
+
+
+def actor_sequences(actor_dir: Path) -> set[int]:
+    """Return every stored sequence of one actor from file names only."""
+
+    values = set(loose_operation_paths(actor_dir))
+    for path in segment_paths(actor_dir):
+        first, last = segment_range(path) or (0, -1)
+        values.update(range(first, last + 1))
+    return values
+
+
+def max_sequence(actor_dir: Path) -> int:
+    """Return the highest stored sequence of one actor, or 0."""
+
+    highest = max(loose_operation_paths(actor_dir), default=0)
+    segments = segment_paths(actor_dir)
+    if segments:
+        highest = max(highest, (segment_range(segments[-1]) or (0, 0))[1])
+    return highest
+
+
+def operation_location(actor_dir: Path, seq: int) -> Path | None:
+    """Return the file that stores one operation, or ``None``."""
+
+    seq = int(seq)
+    for path in segment_paths(actor_dir):
+        first, last = segment_range(path) or (0, -1)
+        if first <= seq <= last:
+            return path
+    loose = Path(actor_dir) / f"{seq:08d}.json"
+    return loose if loose.is_file() else None
+
+
+def iter_actor_records(actor_dir: Path, *, after_seq: int = 0) -> Iterator[OplogRecord]:
+    """Yield one actor's operations above *after_seq* in sequence order."""
+
+    actor_dir = Path(actor_dir)
+    actor = actor_dir.name
+    loose = loose_operation_paths(actor_dir)
+    covered: set[int] = set()
+    pending: list[tuple[int, Path | _SegmentIndex]] = []
+    for path in segment_paths(actor_dir):
+        first, last = segment_range(path) or (0, -1)
+        covered.update(range(first, last + 1))
+        if last > after_seq:
+            pending.append((first, _read_segment_index(path)))
+    pending.extend((seq, path) for seq, path in loose.items() if seq > after_seq and seq not in covered)
+    pending.sort(key=lambda item: item[0])
+    sealed_through = 0
+    for seq, source in pending:
+        if isinstance(source, _SegmentIndex):
+            start = max(source.first_seq, int(after_seq) + 1)
+            yield from _segment_records(actor, source, start, source.last_seq)
+            continue
+        if seq <= sealed_through:
+            continue
+        record = _read_loose_record(actor, seq, source)
+        if record is not None:
+            yield record
+            continue
+        # Sealed since the directory was listed: continue from the new segment.
+        index = _covering_segment(actor_dir, seq)
+        if index is None:
+            continue
+        yield from _segment_records(actor, index, seq, index.last_seq)
+        sealed_through = index.last_seq
+
+
+def _read_loose_record(actor: str, seq: int, path: Path) -> OplogRecord | None:
+    """Return one loose operation, or ``None`` when the file does not exist."""
+
+    if path.is_symlink():
+        raise OplogError(f"oplog operation must not be a symlink: {path}")
+    try:
+        raw = path.read_bytes()
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return OplogRecord(actor, seq, raw, path, int(stat.st_size), int(stat.st_mtime), False)
+
+
+def _covering_segment(actor_dir: Path, seq: int) -> _SegmentIndex | None:
+    """Return the index of the segment that stores *seq*, if any."""
+
+    for path in segment_paths(actor_dir):
+        first, last = segment_range(path) or (0, -1)
+        if first <= seq <= last:
+            return _read_segment_index(path)
+    return None
+
+
+def iter_records(oplog: Path, *, baseline: Mapping[str, int] | None = None) -> Iterator[OplogRecord]:
+    """Yield all operations, actor by actor, optionally only above *baseline*."""
+
+    for actor_dir in actor_dirs(oplog):
+        after = int((baseline or {}).get(actor_dir.name, 0))
+        yield from iter_actor_records(actor_dir, after_seq=after)
+
+
+def read_operation_range(actor_dir: Path, from_seq: int, to_seq: int) -> dict[int, OplogRecord]:
+    """Return stored operations in ``from_seq..to_seq`` by sequence.
+
+    Each overlapping segment is served by one seek and one contiguous read.
+    """
+
+    actor_dir = Path(actor_dir)
+    if not actor_dir.is_dir():
+        return {}
+    from_seq, to_seq = int(from_seq), int(to_seq)
+    result: dict[int, OplogRecord] = {}
+    for path in segment_paths(actor_dir):
+        first, last = segment_range(path) or (0, -1)
+        if last < from_seq or first > to_seq:
+            continue
+        index = _read_segment_index(path)
+        for record in _segment_records(actor_dir.name, index, max(first, from_seq), min(last, to_seq)):
+            result[record.seq] = record
+    vanished = False
+    for seq in range(from_seq, to_seq + 1):
+        if seq in result:
+            continue
+        path = actor_dir / f"{seq:08d}.json"
+        record = _read_loose_record(actor_dir.name, seq, path)
+        if record is None:
+            vanished = True
+            continue
+        result[seq] = record
+    if vanished:
+        # A concurrent seal moved loose files into a segment listed after ours.
+        for path in segment_paths(actor_dir):
+            first, last = segment_range(path) or (0, -1)
+            if last < from_seq or first > to_seq or all(seq in result for seq in range(max(first, from_seq), min(last, to_seq) + 1)):
+                continue
+            index = _read_segment_index(path)
+            for record in _segment_records(actor_dir.name, index, max(first, from_seq), min(last, to_seq)):
+                result.setdefault(record.seq, record)
+    return result
+
+
+def oplog_totals(oplog: Path, *, baseline: Mapping[str, int] | None = None) -> tuple[int, int]:
+    """Return stored operation count and record bytes, optionally above *baseline*."""
+
+    count = 0
+    size = 0
+    for actor_dir in actor_dirs(oplog):
+        after = int((baseline or {}).get(actor_dir.name, 0))
+        try:
+            totals = _actor_totals(actor_dir, after)
+        except FileNotFoundError:
+            # Sealed concurrently; the next listing sees the new segment.
+            totals = _actor_totals(actor_dir, after)
+        count += totals[0]
+        size += totals[1]
+    return count, size
+
+
+def _actor_totals(actor_dir: Path, after: int) -> tuple[int, int]:
+    count = 0
+    size = 0
+    loose = loose_operation_paths(actor_dir)
+    covered: set[int] = set()
+    for path in segment_paths(actor_dir):
+        index = _read_segment_index(path)
+        covered.update(range(index.first_seq, index.last_seq + 1))
+        for offset, (_start, length, _crc, _seen) in enumerate(index.entries):
+            if index.first_seq + offset > after:
+                count += 1
+                size += length
+    for seq, path in loose.items():
+        if seq > after and seq not in covered:
+            count += 1
+            size += int(path.stat().st_size)
+    return count, size
+
+
+def seal_actor_segments(
+    actor_dir: Path,
+    *,
+    min_records: int = SEGMENT_MIN_RECORDS,
+    max_records: int = SEGMENT_MAX_RECORDS,
+    max_bytes: int = SEGMENT_MAX_BYTES,
+) -> dict[str, int]:
+    """Fold contiguous loose operations of one actor into sealed segments.
+
+    Callers must hold the oplog append lock. Loose files already covered by a
+    segment (an interrupted earlier seal) are removed once their bytes match.
+    """
+
+    actor_dir = Path(actor_dir)
+    loose = loose_operation_paths(actor_dir)
+    stats = {"segments": 0, "operations": 0, "bytes": 0, "stale_files": 0}
+    covered_end = 0
+    for path in segment_paths(actor_dir):
+        index = _read_segment_index(path)
+        covered_end = max(covered_end, index.last_seq)
+        for record in _segment_records(actor_dir.name, index, index.first_seq, index.last_seq):
+            stale = loose.pop(record.seq, None)
+            if stale is None:
+                continue
+            if stale.read_bytes() != record.raw:
+                raise OplogError(f"loose operation differs from its sealed segment: {stale}")
+            stale.unlink()
+            stats["stale_files"] += 1
+    run: list[int] = []
+    for seq in sorted(seq for seq in loose if seq > covered_end):
+        if run and seq != run[-1] + 1:
+            break
+        run.append(seq)
+    while len(run) >= max(1, int(min_records)):
+        batch: list[tuple[int, bytes, int]] = []
+        batch_bytes = 0
+        for seq in run[:max(1, int(max_records))]:
+            path = loose[seq]
+            if path.is_symlink():
+                raise OplogError(f"oplog operation must not be a symlink: {path}")
+            raw = path.read_bytes()
+            if batch and batch_bytes + len(raw) > max_bytes:
+                break
+            batch.append((seq, raw, int(path.stat().st_mtime)))
+            batch_bytes += len(raw)
+        if len(batch) < max(1, int(min_records)):
+            break
+        write_segment(actor_dir, batch)
+        for seq, _raw, _seen in batch:
+            loose[seq].unlink()
+        stats["segments"] += 1
+        stats["operations"] += len(batch)
+        stats["bytes"] += batch_bytes
+        run = run[len(batch):]
+    return stats
+
+
+def seal_oplog_segments(oplog: Path, **limits: int) -> dict[str, int]:
+    """Seal contiguous loose operations for every actor; see :func:`seal_actor_segments`."""
+
+    totals = {"actors": 0, "segments": 0, "operations": 0, "bytes": 0, "stale_files": 0}
+    for actor_dir in actor_dirs(oplog):
+        stats = seal_actor_segments(actor_dir, **limits)
+        if stats["segments"] or stats["stale_files"]:
+            totals["actors"] += 1
+        for key, value in stats.items():
+            totals[key] += value
+    return totals
+
+
+def write_segment(actor_dir: Path, records: list[tuple[int, bytes, int]]) -> Path:
+    """Atomically write one segment for contiguous ``(seq, raw, first_seen_at)`` records."""
+
+    if not records:
+        raise OplogError("segment must contain at least one record")
+    first_seq = int(records[0][0])
+    for offset, (seq, _raw, _seen) in enumerate(records):
+        if int(seq) != first_seq + offset:
+            raise OplogError("segment records must be contiguous")
+    chunks = [SEGMENT_MAGIC]
+    position = len(SEGMENT_MAGIC)
+    index: list[bytes] = []
+    for _seq, raw, first_seen_at in records:
+        raw = bytes(raw)
+        chunks.append(_RECORD_LENGTH.pack(len(raw)))
+        position += _RECORD_LENGTH.size
+        index.append(_INDEX_ENTRY.pack(position, len(raw), zlib.crc32(raw), max(0, int(first_seen_at))))
+        chunks.append(raw)
+        position += len(raw)
+    chunks.extend(index)
+    chunks.append(_TRAILER.pack(first_seq, len(records), position, SEGMENT_MAGIC))
+    path = Path(actor_dir) / segment_name(first_seq, first_seq + len(records) - 1)
+    atomic_write_private_bytes(path, b"".join(chunks))
+    return path
+
+
+def _read_segment_index(path: Path) -> _SegmentIndex:
+    """Read and check the trailer and offset index of one segment."""
+
+    path = Path(path)
+    if path.is_symlink():
+        raise OplogError(f"oplog segment must not be a symlink: {path}")
+    bounds = segment_range(path)
+    with path.open("rb") as handle:
+        size = os.fstat(handle.fileno()).st_size
+        if size < len(SEGMENT_MAGIC) + _TRAILER.size:
+            raise OplogError(f"oplog segment is truncated: {path}")
+        handle.seek(size - _TRAILER.size)
+        first_seq, count, index_offset, magic = _TRAILER.unpack(handle.read(_TRAILER.size))
+        if (
+            magic != SEGMENT_MAGIC
+            or bounds is None
+            or (first_seq, first_seq + count - 1) != bounds
+            or index_offset + count * _INDEX_ENTRY.size + _TRAILER.size != size
+        ):
+            raise OplogError(f"oplog segment trailer is invalid: {path}")
+        handle.seek(index_offset)
+        raw_index = handle.read(count * _INDEX_ENTRY.size)
+    entries = tuple(_INDEX_ENTRY.iter_unpack(raw_index))
+    for start, length, _crc, _seen in entries:
+        if start + length > index_offset:
+            raise OplogError(f"oplog segment index is invalid: {path}")
+    return _SegmentIndex(path, int(first_seq), entries)
+
+
+def _segment_records(actor: str, index: _SegmentIndex, from_seq: int, to_seq: int) -> Iterator[OplogRecord]:
+    """Read ``from_seq..to_seq`` from one segment with a single contiguous read."""
+
+    if to_seq < from_seq:
+        return
+    first = from_seq - index.first_seq
+    last = to_seq - index.first_seq
+    span_start = index.entries[first][0]
+    span_end = index.entries[last][0] + index.entries[last][1]
+    with index.path.open("rb") as handle:
+        handle.seek(span_start)
+        data = handle.read(span_end - span_start)
+    if len(data) != span_end - span_start:
+        raise OplogError(f"oplog segment is truncated: {index.path}")
+    for position in range(first, last + 1):
+        start, length, crc, first_seen_at = index.entries[position]
+        raw = data[start - span_start:start - span_start + length]
+        if zlib.crc32(raw) != crc:
+            raise OplogError(f"oplog segment record is corrupt: {index.path}")
+        yield OplogRecord(actor, index.first_seq + position, raw, index.path, length, int(first_seen_at), True)
@@ -28,6 +28,12 @@ from cluster_credentials import (
     verify_operation,
 )
 from file_lock import advisory_file_lock
+from master.cluster_oplog import (
+    OplogError,
+    iter_records,
+    max_sequence,
+    read_operation_range,
+)
 
 SERVICE = "ClusterState"
 
@@ -498,15 +504,11 @@ def _ensure_local_crypto_membership(
 def _membership_target_was_removed(paths: ClusterPaths, node_id: str) -> bool:
     """Return whether membership history permanently removed one node ID."""
 
-    if not paths.oplog.exists():
-        return False
-    for actor_dir in paths.oplog.iterdir():
-        if not actor_dir.is_dir():
-            continue
-        for op_path in actor_dir.glob("*.json"):
+    try:
+        for record in iter_records(paths.oplog):
             try:
-                operation = _read_json(op_path)
-            except (OSError, json.JSONDecodeError):
+                operation = json.loads(record.raw)
+            except (UnicodeDecodeError, json.JSONDecodeError):
                 continue
             if (
                 isinstance(operation, dict)
@@ -514,6 +516,8 @@ def _membership_target_was_removed(paths: ClusterPaths, node_id: str) -> bool:
                 and operation.get("node_id") == node_id
             ):
                 return True
+    except (OSError, OplogError) as exc:
+        raise ClusterStateError(str(exc)) from exc
     return False
 
 
@@ -588,18 +592,36 @@ def _write_operation_unlocked(
     paths = ClusterPaths.from_root(cluster_root)
     actor = str(operation["actor"])
     seq = int(operation["seq"])
-    op_dir = paths.oplog / actor
-    op_path = op_dir / f"{seq:08d}.json"
-    if op_path.exists():
-        existing = _read_json(op_path)
+    op_path = paths.oplog / actor / f"{seq:08d}.json"
+    stored = _stored_operation(paths, actor, seq)
+    if stored is not None:
+        existing_path, existing = stored
         if existing == operation:
-            return op_path
-        raise ClusterStateError(f"operation already exists with different content: {op_path}")
+            return existing_path
+        raise ClusterStateError(f"operation already exists with different content: {existing_path}")
     _atomic_write_json(op_path, operation)
     _touch_sync_request(paths.root)
     return op_path
 
 
+def operation_exists(cluster_root: Path, actor: str, seq: int) -> bool:
+    """Return whether one operation is stored as a file or in a sealed segment."""
+
+    return _stored_operation(ClusterPaths.from_root(cluster_root), str(actor), int(seq)) is not None
+
+
+def _stored_operation(paths: ClusterPaths, actor: str, seq: int) -> tuple[Path, Any] | None:
+    """Return the storage path and decoded value of one stored operation."""
+
+    try:
+        record = read_operation_range(paths.oplog / actor, seq, seq).get(seq)
+        if record is None:
+            return None
+        return record.path, json.loads(record.raw)
+    except (OSError, OplogError, UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ClusterStateError(f"stored operation is unreadable: {actor}:{seq:08d}") from exc
+
+
 def validate_operation(
     operation: dict[str, Any],
     *,
@@ -733,11 +755,11 @@ def load_operations(cluster_root: Path, *, expected_cluster_id: str | None = Non
         cluster_root,
         expected_cluster_id=expected_cluster_id or str(read_local_identity(cluster_root)["cluster_id"]),
     )
-    for actor_dir in sorted(p for p in paths.oplog.iterdir() if p.is_dir()):
-        for op_path in sorted(actor_dir.glob("*.json")):
-            operation = _read_json(op_path)
+    try:
+        for record in iter_records(paths.oplog):
+            operation = json.loads(record.raw)
             if not isinstance(operation, dict):
-                raise ClusterStateError(f"operation file is not an object: {op_path}")
+                raise ClusterStateError(f"operation file is not an object: {record.path}")
             validate_operation(
                 operation,
                 expected_cluster_id=expected_cluster_id,
@@ -745,11 +767,11 @@ def load_operations(cluster_root: Path, *, expected_cluster_id: str | None = Non
                 membership_trust=trust,
                 allow_legacy_membership=True,
             )
-            actor = str(operation["actor"])
-            seq = int(operation["seq"])
-            if actor_dir.name != actor or op_path.name != f"{seq:08d}.json":
-                raise ClusterStateError(f"operation path does not match actor/seq: {op_path}")
+            if record.actor != str(operation["actor"]) or record.seq != int(operation["seq"]):
+                raise ClusterStateError(f"operation path does not match actor/seq: {record.path}")
             operations.append(operation)
+    except OplogError as exc:
+        raise ClusterStateError(str(exc)) from exc
     operations.sort(key=lambda item: (int(item["created_at"]), str(item["actor"]), int(item["seq"]), str(item["op_id"])))
     return operations
 
@@ -2786,18 +2808,19 @@ def _load_membership_trust(
         return trust
     paths = ClusterPaths.from_root(cluster_root)
     membership_operations: list[dict[str, Any]] = []
-    if paths.oplog.exists():
-        for actor_dir in sorted(path for path in paths.oplog.iterdir() if path.is_dir()):
-            for op_path in sorted(actor_dir.glob("*.json")):
-                operation = _read_json(op_path)
-                if not isinstance(operation, dict) or str(operation.get("op") or "") not in MEMBERSHIP_OPS:
-                    continue
-                validate_operation(
-                    operation,
-                    expected_cluster_id=expected_cluster_id,
-                    validate_membership_auth=False,
-                )
-                membership_operations.append(operation)
+    try:
+        for record in iter_records(paths.oplog):
+            operation = json.loads(record.raw)
+            if not isinstance(operation, dict) or str(operation.get("op") or "") not in MEMBERSHIP_OPS:
+                continue
+            validate_operation(
+                operation,
+                expected_cluster_id=expected_cluster_id,
+                validate_membership_auth=False,
+            )
+            membership_operations.append(operation)
+    except OplogError as exc:
+        raise ClusterStateError(str(exc)) from exc
     membership_operations.sort(
         key=lambda item: (
             int(item["created_at"]),
@@ -3522,13 +3545,10 @@ def _next_seq(paths: ClusterPaths, actor: str) -> int:
     op_dir = paths.oplog / actor
     if not op_dir.exists():
         return baseline + 1
-    max_seq = baseline
-    for item in op_dir.glob("*.json"):
-        try:
-            max_seq = max(max_seq, int(item.stem))
-        except ValueError:
-            continue
-    return max_seq + 1
+    try:
+        return max(baseline, max_sequence(op_dir)) + 1
+    except OplogError as exc:
+        raise ClusterStateError(str(exc)) from exc
 
 
 def _read_text(path: Path) -> str | None:
@@ -12,6 +12,7 @@ import os
 import base64
 import binascii
 import hashlib
+import queue
 import re
 import shlex
 import subprocess
@@ -25,16 +26,21 @@ from typing import Any, Callable, Mapping
 from cluster_sync_command import (
     ClusterSyncCommandError,
     MAX_BLOB_COVERAGE_HASHES,
+    MAX_BLOB_PACK_BYTES,
     MAX_CONFIG_BLOB_BYTES,
+    MAX_GET_OP_RANGES,
     MAX_GET_OPS,
     MAX_SEALED_BLOB_BYTES,
     MAX_SECRET_BLOB_BYTES,
+    SESSION_VERB,
     _append_credential_migration_acks,
     _materialize_api_keys,
     _materialize_pb8_configs,
     _materialize_credentials,
     _materialize_v7_configs,
     _validate_sealed_blob_payload,
+    read_session_frame,
+    write_session_frame,
 )
 from cmc_leases import ClusterMailbox
 from credential_reconciler import reconcile_pending_credentials
@@ -55,6 +61,7 @@ from master.cluster_state import (
     default_cluster_root,
     load_operations,
     normalize_node_sync_mode,
+    operation_exists,
     PB8_OPS,
     PB8_OPERATION_CAPABILITY,
     read_materialized_state,
@@ -67,7 +74,9 @@ from master.cluster_state import (
     write_operation,
 )
 from secure_files import atomic_write_private_bytes, ensure_private_directory_tree
+from master.cluster_oplog import OplogError, oplog_totals, seal_oplog_segments
 from master.cluster_ssh_keys import ensure_cluster_ssh_key
+from master.cluster_blob_pack import ClusterBlobPackError, decode_pack
 from master.cluster_checkpoint import (
     ClusterCheckpointError,
     activate_checkpoint,
@@ -247,6 +256,10 @@ class ClusterSyncWorker:
         self._peer_backoff: dict[str, dict[str, Any]] = {}
         self._blob_coverage_cursors: dict[str, int] = {}
         self._blob_recovery_cursors: dict[str, int] = {}
+        self._blob_pack_unsupported: set[str] = set()
+        self._op_ranges_unsupported: set[str] = set()
+        self._session_unsupported: set[str] = set()
+        self._peer_channels = threading.local()
         self._local_state_lock = threading.Lock()
         self._last_trigger_mtime = self._trigger_mtime()
         self._stop = threading.Event()
@@ -604,6 +617,20 @@ class ClusterSyncWorker:
             _atomic_write_json(self.status_path, status)
             return status
 
+    def _seal_oplog_segments(self) -> dict[str, Any]:
+        """Fold contiguous loose operation files into sealed per-actor segments."""
+
+        oplog = ClusterPaths.from_root(self.cluster_root).oplog
+        try:
+            with advisory_file_lock(self.cluster_root / ".append_sequence"):
+                stats: dict[str, Any] = seal_oplog_segments(oplog)
+        except (OSError, OplogError) as exc:
+            detail = str(exc)[:240]
+            _log(SERVICE, f"Cluster oplog segment sealing pending: {type(exc).__name__}: {detail}", level="WARNING")
+            return {"status": "error", "error": type(exc).__name__, "detail": detail}
+        stats["status"] = "sealed" if stats["segments"] else "idle"
+        return stats
+
     def _maintain_history(
         self,
         identity: dict[str, Any],
@@ -632,6 +659,7 @@ class ClusterSyncWorker:
             "policy": policy,
             "checkpoint": active,
             "report_due": report_due,
+            "oplog_segments": self._seal_oplog_segments(),
         }
         if str(policy.get("mode") or "report_only") == "report_only":
             try:
@@ -756,7 +784,7 @@ class ClusterSyncWorker:
         )
 
         def prepare(node_id: str) -> dict[str, Any]:
-            response = self.peer_client.run(
+            response = self._peer_run(
                 nodes[node_id],
                 local_node_id,
                 "prepare-checkpoint",
@@ -788,7 +816,7 @@ class ClusterSyncWorker:
             )
 
             def commit(node_id: str) -> None:
-                self.peer_client.run(
+                self._peer_run(
                     nodes[node_id],
                     local_node_id,
                     "commit-checkpoint",
@@ -930,6 +958,13 @@ class ClusterSyncWorker:
         """Synchronize one peer and update its retry backoff."""
 
         backoff = self._peer_backoff.get(str(peer_id)) or {}
+        channel = _PeerChannel(
+            self.peer_client,
+            peer,
+            local_node_id,
+            use_session=str(peer_id) not in self._session_unsupported,
+        )
+        self._peer_channels.current = channel
         try:
             result = self._sync_peer(
                 peer,
@@ -941,6 +976,7 @@ class ClusterSyncWorker:
                 local_vector,
             )
             self._peer_backoff.pop(str(peer_id), None)
+            result["transport"] = channel.stats()
             return result
         except Exception as exc:
             failures = int(backoff.get("failures") or 0) + 1
@@ -953,7 +989,13 @@ class ClusterSyncWorker:
             _log(SERVICE, f"Peer sync failed for {peer.get('pbname') or peer_id}: {exc}", level="WARNING")
             result = _peer_result(str(peer_id), peer, ok=False, status="error", reason=str(exc))
             result["retry_delay"] = delay
+            result["transport"] = channel.stats()
             return result
+        finally:
+            self._peer_channels.current = None
+            channel.close()
+            if channel.session_unsupported:
+                self._session_unsupported.add(str(peer_id))
 
     def _sync_peer(
         self,
@@ -1160,7 +1202,7 @@ class ClusterSyncWorker:
         if local_id and remote_id and local_baseline == remote_baseline:
             raise ClusterSyncWorkerError("peer reports a different checkpoint for the same baseline")
         if remote_id and (not local_id or remote_dominates):
-            payload = self.peer_client.run(peer, local_node_id, "get-checkpoint-state")
+            payload = self._peer_run(peer, local_node_id, "get-checkpoint-state")
             bundle = payload.get("bundle") if isinstance(payload, dict) else None
             checkpoint = bundle.get("checkpoint") if isinstance(bundle, dict) else None
             proof = bundle.get("commit_proof") if isinstance(bundle, dict) else None
@@ -1184,7 +1226,7 @@ class ClusterSyncWorker:
                 sort_keys=True,
                 separators=(",", ":"),
             )
-            self.peer_client.run(peer, local_node_id, "install-checkpoint", payload=payload)
+            self._peer_run(peer, local_node_id, "install-checkpoint", payload=payload)
             return "remote_installed"
         raise ClusterSyncWorkerError("checkpoint negotiation could not select a safe direction")
 
@@ -1198,6 +1240,11 @@ class ClusterSyncWorker:
 
         refs = checkpoint.get("blob_refs") or {}
         paths = ClusterPaths.from_root(self.cluster_root)
+        self._prefetch_blob_pack(
+            peer,
+            local_node_id,
+            {kind: {str(blob_hash) for blob_hash in refs.get(kind) or []} for kind in ("config", "secret", "sealed")},
+        )
         for blob_hash in refs.get("config") or []:
             raw = self._ensure_remote_blob(peer, local_node_id, paths.config_blobs, str(blob_hash), secret=False)
             manifest_raw = raw if raw is not None else _read_local_blob(paths.config_blobs, str(blob_hash))
@@ -1234,13 +1281,13 @@ class ClusterSyncWorker:
             for blob_hash in sorted(config_hashes)
         ]
         for chunk in _chunk_config_blobs(config_blobs):
-            self.peer_client.run(peer, local_node_id, "put-blobs", payload=_blob_batch_payload(chunk))
+            self._peer_run(peer, local_node_id, "put-blobs", payload=_blob_batch_payload(chunk))
         for blob_hash in refs.get("secret") or []:
             raw = _read_local_blob(paths.secret_blobs, str(blob_hash))
-            self.peer_client.run(peer, local_node_id, f"put-secret-blob {shlex.quote(str(blob_hash))}", payload=raw)
+            self._peer_run(peer, local_node_id, f"put-secret-blob {shlex.quote(str(blob_hash))}", payload=raw)
         for blob_hash in refs.get("sealed") or []:
             raw = _read_local_blob(paths.sealed_blobs, str(blob_hash))
-            self.peer_client.run(peer, local_node_id, f"put-sealed-blob {shlex.quote(str(blob_hash))}", payload=raw)
+            self._peer_run(peer, local_node_id, f"put-sealed-blob {shlex.quote(str(blob_hash))}", payload=raw)
 
     def _sync_mailbox(
         self,
@@ -1253,7 +1300,7 @@ class ClusterSyncWorker:
 
         counts: dict[str, Any] = {"supported": False, "pulled": 0, "pushed": 0, "acked": 0}
         try:
-            remote_payload = self.peer_client.run(peer, local_node_id, "get-mailbox-index")
+            remote_payload = self._peer_run(peer, local_node_id, "get-mailbox-index")
         except Exception as exc:
             if _is_unsupported_command_error(exc, "get-mailbox-index"):
                 return counts
@@ -1271,7 +1318,7 @@ class ClusterSyncWorker:
 
         for message_id in sorted(remote_ids - local_ids):
             try:
-                payload = self.peer_client.run(
+                payload = self._peer_run(
                     peer,
                     local_node_id,
                     f"get-mailbox-message {shlex.quote(message_id)}",
@@ -1285,7 +1332,7 @@ class ClusterSyncWorker:
                 raise ClusterSyncWorkerError("peer returned invalid mailbox message")
             if mailbox.put(message):
                 counts["pulled"] += 1
-            self.peer_client.run(
+            self._peer_run(
                 peer,
                 local_node_id,
                 f"ack-mailbox-message {shlex.quote(message_id)}",
@@ -1298,7 +1345,7 @@ class ClusterSyncWorker:
                 continue
             try:
                 message = mailbox.get(message_id)
-                result = self.peer_client.run(
+                result = self._peer_run(
                     peer,
                     local_node_id,
                     "put-mailbox-message",
@@ -1318,13 +1365,12 @@ class ClusterSyncWorker:
         """Return peer hello metadata and state vector, using one SSH call when supported."""
 
         try:
-            payload = self.peer_client.run(peer, local_node_id, "handshake")
+            payload = self._peer_run(peer, local_node_id, "handshake")
             return payload, _as_state_vector(payload.get("state_vector") or {})
         except Exception as exc:
             if not _is_unsupported_command_error(exc, "handshake"):
                 raise
-        hello = self.peer_client.run(peer, local_node_id, "hello")
-        remote_vector_payload = self.peer_client.run(peer, local_node_id, "get-state-vector")
+        hello, remote_vector_payload = self._peer_run_pipelined(peer, local_node_id, ["hello", "get-state-vector"])
         return hello, _as_state_vector(remote_vector_payload.get("state_vector") or {})
 
     def _peer_handshake_with_gap_repair(
@@ -1363,7 +1409,7 @@ class ClusterSyncWorker:
                 )
                 if operation is None or _attempt >= MAX_PRE_HANDSHAKE_GAP_REPAIRS:
                     raise
-                self.peer_client.run(
+                self._peer_run(
                     peer,
                     local_node_id,
                     "repair-op-gap",
@@ -1412,17 +1458,17 @@ class ClusterSyncWorker:
 
         pulled = 0
         deferred_v2: list[dict[str, Any]] = []
+        ranges: list[tuple[str, int, int]] = []
         for actor in sorted(remote_vector):
             remote_seq = int(remote_vector.get(actor) or 0)
             local_seq = int(local_vector.get(actor) or 0)
-            if remote_seq <= local_seq:
-                continue
             start = local_seq + 1
             while start <= remote_seq:
                 end = min(remote_seq, start + MAX_GET_OPS - 1)
-                payload = self.peer_client.run(peer, local_node_id, f"get-ops {shlex.quote(actor)} {start} {end}")
-                operations = payload.get("operations") if isinstance(payload, dict) else []
-                operations = operations if isinstance(operations, list) else []
+                ranges.append((actor, start, end))
+                start = end + 1
+        for batch in _batch_operation_ranges(ranges):
+            for operations in self._read_remote_operation_ranges(peer, local_node_id, batch):
                 staged_trust = stage_membership_operations(
                     self.cluster_root,
                     operations,
@@ -1441,9 +1487,8 @@ class ClusterSyncWorker:
                         membership_trust=staged_trust,
                         network_input=True,
                     )
-                    op_path = ClusterPaths.from_root(self.cluster_root).oplog / str(operation["actor"]) / f"{int(operation['seq']):08d}.json"
                     with self._local_state_lock:
-                        existed = op_path.exists()
+                        existed = operation_exists(self.cluster_root, str(operation["actor"]), int(operation["seq"]))
                         write_operation(
                             self.cluster_root,
                             operation,
@@ -1452,7 +1497,6 @@ class ClusterSyncWorker:
                         )
                     if not existed:
                         pulled += 1
-                start = end + 1
         for operation in deferred_v2:
             self._pull_blobs_for_operations(peer, local_node_id, [operation])
             validate_operation(
@@ -1461,18 +1505,80 @@ class ClusterSyncWorker:
                 cluster_root=self.cluster_root,
                 network_input=True,
             )
-            op_path = (
-                ClusterPaths.from_root(self.cluster_root).oplog
-                / str(operation["actor"])
-                / f"{int(operation['seq']):08d}.json"
-            )
             with self._local_state_lock:
-                existed = op_path.exists()
+                existed = operation_exists(self.cluster_root, str(operation["actor"]), int(operation["seq"]))
                 write_operation(self.cluster_root, operation, network_input=True)
             if not existed:
                 pulled += 1
         return pulled
 
+    def _read_remote_operation_ranges(
+        self,
+        peer: dict[str, Any],
+        local_node_id: str,
+        ranges: list[tuple[str, int, int]],
+    ) -> list[list[dict[str, Any]]]:
+        """Return the peer's operations for each range, batched into one request when supported."""
+
+        peer_id = str(peer.get("node_id") or "")
+        if len(ranges) > 1 and peer_id not in self._op_ranges_unsupported:
+            request = json.dumps({"ranges": [list(item) for item in ranges]}, separators=(",", ":"))
+            try:
+                payload = self._peer_run(peer, local_node_id, "get-op-ranges", payload=request)
+            except Exception as exc:
+                if not _is_unsupported_command_error(exc, "get-op-ranges"):
+                    raise
+                self._op_ranges_unsupported.add(peer_id)
+            else:
+                entries = payload.get("ranges") if isinstance(payload, dict) else None
+                if not isinstance(entries, list) or len(entries) != len(ranges):
+                    raise ClusterSyncWorkerError("peer returned invalid operation ranges")
+                results: list[list[dict[str, Any]]] = []
+                for (actor, start, end), entry in zip(ranges, entries):
+                    if (
+                        not isinstance(entry, dict)
+                        or str(entry.get("actor") or "") != actor
+                        or entry.get("from_seq") != start
+                        or entry.get("to_seq") != end
+                    ):
+                        raise ClusterSyncWorkerError("peer returned invalid operation ranges")
+                    operations = entry.get("operations")
+                    results.append(operations if isinstance(operations, list) else [])
+                return results
+        results = []
+        for actor, start, end in ranges:
+            payload = self._peer_run(peer, local_node_id, f"get-ops {shlex.quote(actor)} {start} {end}")
+            operations = payload.get("operations") if isinstance(payload, dict) else []
+            results.append(operations if isinstance(operations, list) else [])
+        return results
+
+    def _peer_run(
+        self,
+        peer: dict[str, Any],
+        local_node_id: str,
+        command_text: str,
+        payload: str | bytes | None = None,
+    ) -> dict[str, Any]:
+        """Run one peer command over the current peer channel, if any."""
+
+        channel = getattr(self._peer_channels, "current", None)
+        if channel is not None and channel.peer_id == str(peer.get("node_id") or ""):
+            return channel.run(command_text, payload)
+        return self.peer_client.run(peer, local_node_id, command_text, payload=payload)
+
+    def _peer_run_pipelined(
+        self,
+        peer: dict[str, Any],
+        local_node_id: str,
+        commands: list[str],
+    ) -> list[dict[str, Any]]:
+        """Run payload-free peer commands back to back, stopping at the first failure."""
+
+        channel = getattr(self._peer_channels, "current", None)
+        if channel is not None and channel.peer_id == str(peer.get("node_id") or ""):
+            return channel.run_pipelined([(command, None) for command in commands])
+        return [self.peer_client.run(peer, local_node_id, command) for command in commands]
+
     def _pull_blobs_for_operations(self, peer: dict[str, Any], local_node_id: str, operations: list[dict[str, Any]]) -> dict[str, int]:
         """Pull required config and secret blobs for received operations."""
 
@@ -1487,6 +1593,16 @@ class ClusterSyncWorker:
             if str(operation.get("op") or "") == "CREDENTIAL_CUTOFF"
             for blob_hash in operation.get("obsolete_secret_blob_hashes") or []
         )
+        wants: dict[str, set[str]] = {"config": set(), "secret": set(), "sealed": set()}
+        for operation in operations:
+            refs = _operation_hash_refs(operation)
+            wants["config"].update(refs["config"])
+            wants["config"].update(refs["api_payload"])
+            wants["secret"].update(blob_hash for blob_hash in refs["secret"] if blob_hash not in obsolete_secret_hashes)
+            wants["sealed"].update(refs["sealed"])
+        prefetched = self._prefetch_blob_pack(peer, local_node_id, wants)
+        for kind, count in (prefetched or {}).items():
+            counts[kind] += count
         for operation in operations:
             refs = _operation_hash_refs(operation)
             for manifest_hash in refs["config"]:
@@ -1516,6 +1632,92 @@ class ClusterSyncWorker:
                     counts["sealed"] += 1
         return counts
 
+    def _prefetch_blob_pack(
+        self,
+        peer: dict[str, Any],
+        local_node_id: str,
+        wants: Mapping[str, set[str]],
+    ) -> dict[str, int] | None:
+        """Pull every locally missing wanted blob through ``get-blob-pack`` packs.
+
+        Config manifests are expanded by the peer, so a checkpoint or operation
+        batch normally needs one round trip.  Returns per-kind counts of stored
+        blobs, or None when the peer predates packs; callers then keep using
+        per-blob pulls, which also cover anything the peer could not pack.
+        """
+
+        peer_id = str(peer.get("node_id") or "")
+        if peer_id in self._blob_pack_unsupported:
+            return None
+        paths = ClusterPaths.from_root(self.cluster_root)
+        roots = {"config": paths.config_blobs, "secret": paths.secret_blobs, "sealed": paths.sealed_blobs}
+        limits = {"config": MAX_CONFIG_BLOB_BYTES, "secret": MAX_SECRET_BLOB_BYTES, "sealed": MAX_SEALED_BLOB_BYTES}
+        pending = {
+            kind: sorted(
+                _validate_hash(blob_hash)
+                for blob_hash in wants.get(kind) or set()
+                if not _local_blob_exists(roots[kind], blob_hash)
+            )
+            for kind in roots
+        }
+        counts = {kind: 0 for kind in roots}
+        while any(pending.values()):
+            request: dict[str, list[str]] = {kind: [] for kind in roots}
+            budget = MAX_BLOB_COVERAGE_HASHES
+            for kind in roots:
+                request[kind] = pending[kind][:budget]
+                pending[kind] = pending[kind][budget:]
+                budget -= len(request[kind])
+            try:
+                response = self._peer_run(
+                    peer,
+                    local_node_id,
+                    "get-blob-pack",
+                    payload=json.dumps({"want": request, "expand_manifests": True}, sort_keys=True, separators=(",", ":")),
+                )
+            except Exception as exc:
+                if _is_unsupported_command_error(exc, "get-blob-pack"):
+                    self._blob_pack_unsupported.add(peer_id)
+                    return None
+                raise
+            try:
+                entries = decode_pack(
+                    base64.b64decode(str(response.get("pack_b64") or ""), validate=True),
+                    max_bytes=MAX_BLOB_PACK_BYTES,
+                )
+            except (binascii.Error, ClusterBlobPackError) as exc:
+                raise ClusterSyncWorkerError(f"peer returned an invalid blob pack: {exc}") from exc
+            requested = {(kind, blob_hash) for kind, hashes in request.items() for blob_hash in hashes}
+            manifest_children: set[str] = set()
+            for kind, blob_hash, raw in entries:
+                if (kind, blob_hash) not in requested and not (kind == "config" and blob_hash in manifest_children):
+                    raise ClusterSyncWorkerError("peer blob pack contains an unrequested blob")
+                if len(raw) > limits[kind]:
+                    raise ClusterSyncWorkerError("peer blob exceeds type size limit")
+                if kind == "config":
+                    try:
+                        manifest_children.update(_manifest_file_hashes(raw))
+                    except ClusterSyncWorkerError:
+                        pass
+                if _local_blob_exists(roots[kind], blob_hash):
+                    continue
+                if kind == "sealed":
+                    _validate_sealed_blob_payload(self.cluster_root, raw)
+                _write_local_blob(roots[kind], blob_hash, raw, secret=kind != "config")
+                counts[kind] += 1
+            deferred = response.get("deferred") if isinstance(response.get("deferred"), dict) else {}
+            progressed = bool(entries)
+            for kind in roots:
+                retry = {
+                    _validate_hash(blob_hash)
+                    for blob_hash in deferred.get(kind) or []
+                    if (kind, blob_hash) in requested
+                }
+                pending[kind] = sorted(set(pending[kind]) | retry)
+            if not progressed and any(pending.values()):
+                break
+        return counts
+
     def _ensure_remote_blob(
         self,
         peer: dict[str, Any],
@@ -1533,7 +1735,7 @@ class ClusterSyncWorker:
             return None
         expected_hash = _validate_hash(blob_hash)
         verb = "get-sealed-blob" if sealed else "get-secret-blob" if secret else "get-blob"
-        payload = self.peer_client.run(peer, local_node_id, f"{verb} {shlex.quote(expected_hash)}")
+        payload = self._peer_run(peer, local_node_id, f"{verb} {shlex.quote(expected_hash)}")
         if not isinstance(payload.get("hash"), str):
             raise ClusterSyncWorkerError("peer returned invalid blob hash type")
         reported_hash = _validate_hash(payload["hash"])
@@ -1572,15 +1774,15 @@ class ClusterSyncWorker:
         pushed_config = 0
         for chunk in _chunk_config_blobs(config_blobs):
             payload = _blob_batch_payload(chunk)
-            result = self.peer_client.run(peer, local_node_id, "put-blobs", payload=payload)
+            result = self._peer_run(peer, local_node_id, "put-blobs", payload=payload)
             pushed_config += int(result.get("count") or len(chunk))
         pushed_secret = 0
         for blob in secret_blobs:
-            self.peer_client.run(peer, local_node_id, f"put-secret-blob {shlex.quote(str(blob['hash']))}", payload=blob["raw"])
+            self._peer_run(peer, local_node_id, f"put-secret-blob {shlex.quote(str(blob['hash']))}", payload=blob["raw"])
             pushed_secret += 1
         pushed_sealed = 0
         for blob in sealed_blobs:
-            self.peer_client.run(peer, local_node_id, f"put-sealed-blob {shlex.quote(str(blob['hash']))}", payload=blob["raw"])
+            self._peer_run(peer, local_node_id, f"put-sealed-blob {shlex.quote(str(blob['hash']))}", payload=blob["raw"])
             pushed_sealed += 1
         return pushed_config, pushed_secret, pushed_sealed
 
@@ -1629,7 +1831,7 @@ class ClusterSyncWorker:
         def probe(kind: str, requested: list[str], target: dict[str, set[str]]) -> None:
             request = {name: requested if name == kind else [] for name in expected_kinds}
             try:
-                response = self.peer_client.run(
+                response = self._peer_run(
                     peer,
                     local_node_id,
                     "missing-blobs",
@@ -1739,14 +1941,14 @@ class ClusterSyncWorker:
             if kind == "config":
                 config_blobs.append({"hash": blob_hash, "raw": raw})
             elif kind == "secret":
-                self.peer_client.run(peer, local_node_id, f"put-secret-blob {shlex.quote(blob_hash)}", payload=raw)
+                self._peer_run(peer, local_node_id, f"put-secret-blob {shlex.quote(blob_hash)}", payload=raw)
                 pushed_secret += 1
             else:
-                self.peer_client.run(peer, local_node_id, f"put-sealed-blob {shlex.quote(blob_hash)}", payload=raw)
+                self._peer_run(peer, local_node_id, f"put-sealed-blob {shlex.quote(blob_hash)}", payload=raw)
                 pushed_sealed += 1
             processed += 1
         for chunk in _chunk_config_blobs(config_blobs):
-            self.peer_client.run(peer, local_node_id, "put-blobs", payload=_blob_batch_payload(chunk))
+            self._peer_run(peer, local_node_id, "put-blobs", payload=_blob_batch_payload(chunk))
         self._blob_coverage_cursors[peer_id] = (start + processed) % len(all_refs)
         if unavailable:
             _log(SERVICE, f"Skipped {unavailable} locally unavailable blob repairs for {peer.get('pbname') or peer.get('node_id')}", level="WARNING")
@@ -1758,7 +1960,7 @@ class ClusterSyncWorker:
         if not operations:
             return 0
         payload = json.dumps({"operations": operations}, sort_keys=True, separators=(",", ":"))
-        result = self.peer_client.run(peer, local_node_id, "put-ops", payload=payload)
+        result = self._peer_run(peer, local_node_id, "put-ops", payload=payload)
         return int(result.get("count") or len(operations))
 
     def _apply_operations_bundle(self, peer: dict[str, Any], local_node_id: str, operations: list[dict[str, Any]]) -> dict[str, Any] | None:
@@ -1771,7 +1973,7 @@ class ClusterSyncWorker:
         if len(payload.encode("utf-8")) > APPLY_BUNDLE_TARGET_BYTES:
             return None
         try:
-            return self.peer_client.run(peer, local_node_id, "apply-bundle", payload=payload)
+            return self._peer_run(peer, local_node_id, "apply-bundle", payload=payload)
         except Exception as exc:
             if _is_unsupported_command_error(exc, "apply-bundle"):
                 return None
@@ -1786,20 +1988,22 @@ class ClusterSyncWorker:
     ) -> None:
         """Rebuild and materialize local files on a peer after a successful push."""
 
-        self.peer_client.run(peer, local_node_id, "rebuild")
-        self.peer_client.run(peer, local_node_id, "materialize-v7")
-        api_preview = self.peer_client.run(peer, local_node_id, "materialize-api-keys-preview")
+        _rebuilt, _materialized, api_preview = self._peer_run_pipelined(
+            peer,
+            local_node_id,
+            ["rebuild", "materialize-v7", "materialize-api-keys-preview"],
+        )
         api_result = api_preview
         if api_preview.get("can_apply"):
-            api_result = self.peer_client.run(peer, local_node_id, "materialize-api-keys")
-        credential_preview = self.peer_client.run(peer, local_node_id, "materialize-credentials-preview")
+            api_result = self._peer_run(peer, local_node_id, "materialize-api-keys")
+        credential_preview = self._peer_run(peer, local_node_id, "materialize-credentials-preview")
         credential_result = credential_preview
         if credential_preview.get("can_apply"):
-            credential_result = self.peer_client.run(peer, local_node_id, "materialize-credentials")
+            credential_result = self._peer_run(peer, local_node_id, "materialize-credentials")
         if include_pb8 and not _pb8_projection_blockers(api_result, credential_result):
-            pb8_preview = self.peer_client.run(peer, local_node_id, "materialize-v8-preview")
+            pb8_preview = self._peer_run(peer, local_node_id, "materialize-v8-preview")
             if pb8_preview.get("can_apply"):
-                self.peer_client.run(peer, local_node_id, "materialize-v8")
+                self._peer_run(peer, local_node_id, "materialize-v8")
 
 
 class ClusterSyncWorkerError(RuntimeError):
@@ -1843,6 +2047,11 @@ class SshClusterPeerClient:
         except (IndexError, json.JSONDecodeError) as exc:
             raise ClusterSyncWorkerError("peer returned invalid JSON") from exc
 
+    def open_session(self, peer: dict[str, Any], local_node_id: str) -> "SshClusterPeerSession":
+        """Open one persistent framed command channel to *peer*."""
+
+        return SshClusterPeerSession(self._ssh_command(peer, local_node_id, SESSION_VERB), timeout=self.timeout)
+
     def _ssh_command(self, peer: dict[str, Any], local_node_id: str, command_text: str) -> list[str]:
         """Build an ssh command for one peer."""
 
@@ -1873,6 +2082,200 @@ class SshClusterPeerClient:
         ]
 
 
+class SshClusterPeerSession:
+    """One SSH channel that carries framed Cluster Sync commands in order.
+
+    Several commands may be written before their responses are read; a reader
+    thread drains stdout so large pipelined exchanges cannot deadlock on pipe
+    buffers. Failed commands raise the same ``{"error": ..., "ok": false}``
+    text a separate SSH call would have printed.
+    """
+
+    def __init__(self, command: list[str], *, timeout: int = DEFAULT_SSH_TIMEOUT) -> None:
+        """Start the remote ``session`` command."""
+
+        self.timeout = int(timeout)
+        self.round_trips = 0
+        self.requests = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self._next_id = 0
+        self._closed = False
+        self._responses: queue.Queue = queue.Queue()
+        self._stderr = bytearray()
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        threading.Thread(target=self._read_responses, name="pbcluster-session", daemon=True).start()
+        self._stderr_thread = threading.Thread(target=self._drain_stderr, name="pbcluster-session-err", daemon=True)
+        self._stderr_thread.start()
+
+    def run(self, command_text: str, payload: str | bytes | None = None) -> dict[str, Any]:
+        """Run one command and return its JSON response."""
+
+        return self.run_pipelined([(command_text, payload)])[0]
+
+    def run_pipelined(self, commands: list[tuple[str, str | bytes | None]]) -> list[dict[str, Any]]:
+        """Send *commands* back to back and return their responses in order.
+
+        Later commands are chained: the peer skips them once one fails, and the
+        first failure is raised after all responses have been read.
+        """
+
+        if self._closed:
+            raise ClusterSyncWorkerError("peer session is closed")
+        request_ids: list[int] = []
+        try:
+            for index, (command_text, payload) in enumerate(commands):
+                body = payload if isinstance(payload, bytes) else str(payload or "").encode("utf-8")
+                self._next_id += 1
+                request_ids.append(self._next_id)
+                header = {"id": self._next_id, "command": str(command_text), "chain": index > 0}
+                self.bytes_sent += write_session_frame(self._process.stdin, header, body)
+        except (OSError, ValueError) as exc:
+            raise self._transport_error() from exc
+        self.round_trips += 1
+        self.requests += len(commands)
+        results: list[dict[str, Any]] = []
+        error = ""
+        for request_id in request_ids:
+            header, body, size = self._next_response()
+            self.bytes_received += size
+            if header.get("id") != request_id:
+                self.close()
+                raise ClusterSyncWorkerError("peer session answered out of order")
+            if not header.get("ok"):
+                error = error or json.dumps({"error": str(header.get("error") or "peer command failed"), "ok": False}, sort_keys=True)
+                continue
+            try:
+                results.append(json.loads(body))
+            except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+                raise ClusterSyncWorkerError("peer returned invalid JSON") from exc
+        if error:
+            raise ClusterSyncWorkerError(error)
+        return results
+
+    def close(self) -> None:
+        """End the session and reap the SSH process."""
+
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self._process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+            self._process.wait()
+
+    def _next_response(self) -> tuple[dict[str, Any], bytes, int]:
+        try:
+            item = self._responses.get(timeout=self.timeout)
+        except queue.Empty:
+            self._process.kill()
+            self.close()
+            raise ClusterSyncWorkerError("peer session timed out") from None
+        if item is None:
+            raise self._transport_error()
+        return item
+
+    def _transport_error(self) -> ClusterSyncWorkerError:
+        self.close()
+        # The stderr text (e.g. "unsupported command: session") identifies old
+        # peers; wait until the drain thread has read it after the exit.
+        self._stderr_thread.join(timeout=5)
+        stderr = bytes(self._stderr).decode("utf-8", errors="replace").strip()
+        return ClusterSyncWorkerError(stderr or f"peer session exited with {self._process.returncode}")
+
+    def _read_responses(self) -> None:
+        try:
+            while True:
+                frame = read_session_frame(self._process.stdout)
+                if frame is None:
+                    break
+                self._responses.put(frame)
+        except (OSError, ValueError, ClusterSyncCommandError):
+            pass
+        self._responses.put(None)
+
+    def _drain_stderr(self) -> None:
+        for chunk in iter(lambda: self._process.stderr.read(4096), b""):
+            self._stderr.extend(chunk)
+            del self._stderr[:-65536]
+
+
+class _PeerChannel:
+    """Transport for one peer sync pass: a pipelined session or one SSH call per command."""
+
+    def __init__(self, client: Any, peer: dict[str, Any], local_node_id: str, *, use_session: bool) -> None:
+        """Prepare a channel; the session itself is opened on first use."""
+
+        self.client = client
+        self.peer = peer
+        self.local_node_id = local_node_id
+        self.peer_id = str(peer.get("node_id") or "")
+        self.use_session = bool(use_session) and callable(getattr(client, "open_session", None))
+        self.session: Any | None = None
+        self.session_unsupported = False
+        self.transport = "exec"
+        self._exec = {"round_trips": 0, "requests": 0, "bytes_sent": 0, "bytes_received": 0}
+        self._closed_session: dict[str, int] = {"round_trips": 0, "requests": 0, "bytes_sent": 0, "bytes_received": 0}
+
+    def run(self, command_text: str, payload: str | bytes | None = None) -> dict[str, Any]:
+        """Run one command on the peer."""
+
+        return self.run_pipelined([(command_text, payload)])[0]
+
+    def run_pipelined(self, commands: list[tuple[str, str | bytes | None]]) -> list[dict[str, Any]]:
+        """Run *commands* in order, in one round trip when a session is open."""
+
+        if self.use_session and self.session is None:
+            self.session = self.client.open_session(self.peer, self.local_node_id)
+        if self.session is not None:
+            first_round_trip = self.session.round_trips == 0
+            try:
+                results = self.session.run_pipelined(commands)
+            except Exception as exc:
+                if not (first_round_trip and _is_unsupported_command_error(exc, SESSION_VERB)):
+                    raise
+                self.session_unsupported = True
+                self.use_session = False
+                self.close()
+            else:
+                self.transport = "session"
+                return results
+        results = []
+        for command_text, payload in commands:
+            result = self.client.run(self.peer, self.local_node_id, command_text, payload=payload)
+            sent = payload if isinstance(payload, bytes) else str(payload or "").encode("utf-8")
+            self._exec["round_trips"] += 1
+            self._exec["requests"] += 1
+            self._exec["bytes_sent"] += len(command_text.encode("utf-8")) + len(sent)
+            self._exec["bytes_received"] += len(json.dumps(result, sort_keys=True))
+            results.append(result)
+        return results
+
+    def close(self) -> None:
+        """Close the session, keeping its counters."""
+
+        if self.session is None:
+            return
+        for key in self._closed_session:
+            self._closed_session[key] += int(getattr(self.session, key, 0) or 0)
+        self.session.close()
+        self.session = None
+
+    def stats(self) -> dict[str, Any]:
+        """Return round trips and bytes exchanged with the peer so far."""
+
+        totals = {key: self._exec[key] + self._closed_session[key] for key in self._exec}
+        if self.session is not None:
+            for key in totals:
+                totals[key] += int(getattr(self.session, key, 0) or 0)
+        return {"mode": self.transport, **totals}
+
+
 def _compact_materialization(payload: dict[str, Any]) -> dict[str, Any]:
     """Return small status details for one materialization result."""
 
@@ -2091,6 +2494,24 @@ def _bounded_operation_batch(operations: list[dict[str, Any]]) -> tuple[list[dic
     return operations[:APPLY_BUNDLE_MAX_OPERATIONS], max(len(operations) - APPLY_BUNDLE_MAX_OPERATIONS, 0)
 
 
+def _batch_operation_ranges(ranges: list[tuple[str, int, int]]) -> list[list[tuple[str, int, int]]]:
+    """Group operation ranges into ``get-op-ranges`` requests within the peer limits."""
+
+    batches: list[list[tuple[str, int, int]]] = []
+    current: list[tuple[str, int, int]] = []
+    size = 0
+    for actor, start, end in ranges:
+        count = end - start + 1
+        if current and (size + count > MAX_GET_OPS or len(current) >= MAX_GET_OP_RANGES):
+            batches.append(current)
+            current, size = [], 0
+        current.append((actor, start, end))
+        size += count
+    if current:
+        batches.append(current)
+    return batches
+
+
 def _compact_retention_cleanup(value: Any) -> dict[str, Any]:
     """Normalize one peer's bounded automatic retention result."""
 
@@ -2259,20 +2680,10 @@ def _checkpoint_tail_stats(cluster_root: Path, baseline: Mapping[str, int]) -> d
     """Return operation count and bytes strictly above one checkpoint baseline."""
 
     oplog = ClusterPaths.from_root(cluster_root).oplog
-    operations = 0
-    size = 0
-    if not oplog.exists():
-        return {"operations": 0, "bytes": 0}
-    for actor_dir in (path for path in oplog.iterdir() if path.is_dir()):
-        actor_baseline = int(baseline.get(str(actor_dir.name), 0))
-        for path in actor_dir.glob("*.json"):
-            try:
-                if int(path.stem) <= actor_baseline:
-                    continue
-                size += int(path.stat().st_size)
-            except (OSError, ValueError) as exc:
-                raise ClusterSyncWorkerError("checkpoint tail contains an invalid operation file") from exc
-            operations += 1
+    try:
+        operations, size = oplog_totals(oplog, baseline=baseline)
+    except (OSError, ValueError) as exc:
+        raise ClusterSyncWorkerError("checkpoint tail contains an invalid operation file") from exc
     return {"operations": operations, "bytes": size}
 
 
@@ -14,6 +14,7 @@ from pathlib import Path
 
 from file_lock import advisory_file_lock
 from master_update_lock import MasterUpdateBusyError, acquire_master_runtime_lock
+import pb8_helper_pool
 from pbgui_purefunc import pb8_runtime_status
 from pbgui_purefunc import PBGDIR
 
@@ -155,31 +156,36 @@ def _call_helper(operation: str, **payload) -> dict:
             "pb8_dir": status["pb8dir"],
             **payload,
         }
-        proc = subprocess.run(
-            [status["pb8venv"], str(helper)],
-            cwd=status["pb8dir"],
-            input=json.dumps(request),
-            text=True,
-            capture_output=True,
-            check=False,
-            timeout=120,
-        )
+        if pb8_helper_pool.enabled():
+            response, _size = pb8_helper_pool.call("config", request, runtime=status, timeout=120)
+            proc = None
+        else:
+            proc = subprocess.run(
+                [status["pb8venv"], str(helper)],
+                cwd=status["pb8dir"],
+                input=json.dumps(request),
+                text=True,
+                capture_output=True,
+                check=False,
+                timeout=120,
+            )
     except MasterUpdateBusyError as exc:
         raise PB8RuntimeBusyError(
             "PB8 is being installed or updated. Retry this configuration operation when the update finishes."
         ) from exc
-    except (OSError, subprocess.TimeoutExpired) as exc:
+    except (OSError, subprocess.TimeoutExpired, pb8_helper_pool.HelperPoolError) as exc:
         raise PB8ConfigurationError(f"PB8 config helper failed: {exc}") from exc
     finally:
         if runtime_lease is not None:
             runtime_lease.release()
-    try:
-        response = json.loads(proc.stdout)
-    except json.JSONDecodeError as exc:
-        detail = (proc.stderr or proc.stdout or "empty helper response").strip()[-2000:]
-        raise PB8ConfigurationError(f"Invalid PB8 config helper response: {detail}") from exc
-    if proc.returncode != 0 or not response.get("ok"):
-        detail = str(response.get("detail") or proc.stderr or "PB8 config operation failed").strip()
+    if proc is not None:
+        try:
+            response = json.loads(proc.stdout)
+        except json.JSONDecodeError as exc:
+            detail = (proc.stderr or proc.stdout or "empty helper response").strip()[-2000:]
+            raise PB8ConfigurationError(f"Invalid PB8 config helper response: {detail}") from exc
+    if (proc is not None and proc.returncode != 0) or not response.get("ok"):
+        detail = str(response.get("detail") or (proc.stderr if proc is not None else "") or "PB8 config operation failed").strip()
         raise PB8ConfigurationError(detail[-2000:])
     result = response.get("result")
     if not isinstance(result, dict):
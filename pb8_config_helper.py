@@ -666,19 +666,28 @@ def handle(payload: dict) -> dict:
     raise ValueError(f"Unsupported operation: {operation}")
 
 
-def main() -> int:
-    """Read one request from stdin and write one response to stdout."""
+def respond(payload: object) -> dict:
+    """Answer one decoded request; shared by ``main`` and the warm helper worker."""
     try:
-        payload = json.load(sys.stdin)
         if not isinstance(payload, dict):
             raise TypeError("request must be an object")
-        response = {"ok": True, "result": handle(payload)}
+        return {"ok": True, "result": handle(payload)}
     except Exception as exc:
-        response = {
+        return {
             "ok": False,
             "error": type(exc).__name__,
             "detail": str(exc),
         }
+
+
+def main() -> int:
+    """Read one request from stdin and write one response to stdout."""
+    try:
+        payload = json.load(sys.stdin)
+    except Exception as exc:
+        response = {"ok": False, "error": type(exc).__name__, "detail": str(exc)}
+    else:
+        response = respond(payload)
     json.dump(response, sys.stdout, separators=(",", ":"))
     sys.stdout.write("\n")
     return 0 if response["ok"] else 1
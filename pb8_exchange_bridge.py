@@ -11,6 +11,7 @@ import time
 from pathlib import Path
 
 from master_update_lock import MasterUpdateBusyError, acquire_master_runtime_lock
+import pb8_helper_pool
 from pbgui_purefunc import PBGDIR, pb8_runtime_status
 
 
@@ -61,6 +62,11 @@ class PB8ExchangeInstance:
             }
             helper = Path(__file__).resolve().with_name("pb8_exchange_helper.py")
             request_text = json.dumps(request, separators=(",", ":"), allow_nan=False)
+            if pb8_helper_pool.enabled():
+                response, _size = pb8_helper_pool.call(
+                    "exchange", request, runtime=runtime, timeout=90, max_response_bytes=self._MAX_RESPONSE_BYTES
+                )
+                return self._result(response, 0)
             with tempfile.TemporaryFile(mode="w+b") as output:
                 proc = subprocess.Popen(
                     [runtime["pb8venv"], str(helper)],
@@ -85,7 +91,11 @@ class PB8ExchangeInstance:
             returncode = proc.returncode
         except MasterUpdateBusyError as exc:
             raise PB8ExchangeError("PB8 is being updated; retry later") from exc
-        except OSError as exc:
+        except pb8_helper_pool.HelperTimeout as exc:
+            raise PB8ExchangeError("PB8 exchange request timed out") from exc
+        except pb8_helper_pool.HelperResponseTooLarge as exc:
+            raise PB8ExchangeError("PB8 exchange helper response exceeded the size limit") from exc
+        except (OSError, pb8_helper_pool.HelperPoolError) as exc:
             raise PB8ExchangeError("PB8 exchange request failed") from exc
         finally:
             if lease is not None:
@@ -94,6 +104,9 @@ class PB8ExchangeInstance:
             response = json.loads(stdout)
         except json.JSONDecodeError as exc:
             raise PB8ExchangeError("PB8 exchange helper returned an invalid response") from exc
+        return self._result(response, returncode)
+
+    def _result(self, response: dict, returncode: int) -> dict:
         if returncode != 0 or not response.get("ok"):
             raise PB8ExchangeError(self._redact(response.get("detail") or "PB8 exchange request failed"))
         result = response.get("result")
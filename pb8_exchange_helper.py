@@ -179,18 +179,27 @@ async def _dispatch(payload: dict) -> dict:
         await client.close()
 
 
+def respond(payload: object) -> dict:
+    """Answer one decoded request; shared by ``main`` and the warm helper worker."""
+    try:
+        if not isinstance(payload, dict):
+            raise TypeError("request must be an object")
+        with redirect_stdout(sys.stderr):
+            return {"ok": True, "result": asyncio.run(_dispatch(payload))}
+    except Exception as exc:
+        return {"ok": False, "error": type(exc).__name__, "detail": str(exc)[:1000]}
+
+
 def main() -> int:
     try:
         raw = sys.stdin.buffer.read(MAX_REQUEST_BYTES + 1)
         if len(raw) > MAX_REQUEST_BYTES:
             raise ValueError("request is too large")
         payload = json.loads(raw.decode("utf-8"))
-        if not isinstance(payload, dict):
-            raise TypeError("request must be an object")
-        with redirect_stdout(sys.stderr):
-            response = {"ok": True, "result": asyncio.run(_dispatch(payload))}
     except Exception as exc:
         response = {"ok": False, "error": type(exc).__name__, "detail": str(exc)[:1000]}
+    else:
+        response = respond(payload)
     serialized = json.dumps(response, separators=(",", ":"), allow_nan=False)
     if len(serialized.encode("utf-8")) > MAX_RESPONSE_BYTES:
         serialized = json.dumps({"ok": False, "error": "ResponseTooLarge", "detail": "helper response exceeds maximum size"}, separators=(",", ":"))
@@ -0,0 +1,422 @@
+"""Warm, persistent PB8 helper workers shared by the PB8 client modules.
+
+``pb8_strategy_explorer``, ``pb8_config`` and ``pb8_exchange_bridge`` used to
+start a fresh PB8-venv interpreter per request and pay interpreter start plus
+PB8/Rust-extension imports every time.  This module keeps up to N
+``pb8_helper_worker.py`` processes alive and hands each request to an idle
+one over length-prefixed JSON frames on stdio.
+
+- Workers are recycled when the PB8 runtime fingerprint (venv, directory,
+  git HEAD, helper sources) changes, and after ``max_requests`` requests.
+- A worker that times out, crashes, sends an oversized frame or is
+  cancelled is killed and never reused.
+- ``cancel(key)`` kills the worker running that request; callers can also
+  get the worker process via ``on_worker`` to register it in their own
+  cancellation bookkeeping.
+
+The pool is opt-in: it is sized from ``PBGUI_PB8_HELPER_POOL`` or ``[pb8]
+helper_pool_workers`` in pbgui.ini, and the default ``0`` keeps the clients
+on one interpreter per call.  Workers are started on first use.  Every
+pooled request holds a shared master runtime lease (like a one-shot helper
+launch), so a local PB8 update waits until running requests finish and the
+next request recycles workers started from the old runtime.
+"""
+
+from __future__ import annotations
+
+import atexit
+import collections
+import json
+import os
+import select
+import struct
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+
+from master_update_lock import MasterUpdateBusyError, acquire_master_runtime_lock
+from pbgui_purefunc import PBGDIR, load_ini
+
+DEFAULT_WORKERS = 0
+DEFAULT_MAX_REQUESTS = 200
+READY_TIMEOUT_SECONDS = 60.0
+MAX_REQUEST_BYTES = 8 * 1024 * 1024
+_HEADER = struct.Struct(">I")
+_WORKER = Path(__file__).resolve().with_name("pb8_helper_worker.py")
+_HELPER_SOURCES = (
+    _WORKER,
+    _WORKER.with_name("pb8_strategy_explorer_helper.py"),
+    _WORKER.with_name("pb8_config_helper.py"),
+    _WORKER.with_name("pb8_exchange_helper.py"),
+)
+
+
+class HelperPoolError(RuntimeError):
+    """Raised when a pooled PB8 helper request fails."""
+
+
+class HelperTimeout(HelperPoolError):
+    """Raised when no worker was free or the request ran past its timeout."""
+
+
+class HelperCancelled(HelperPoolError):
+    """Raised when the request was cancelled through :meth:`HelperPool.cancel`."""
+
+
+class HelperCrashed(HelperPoolError):
+    """Raised when the worker exited or broke the frame protocol."""
+
+
+class HelperResponseTooLarge(HelperPoolError):
+    """Raised when a response frame exceeds the caller's size limit."""
+
+
+def pool_size() -> int:
+    """Return the configured worker count (0, the default, disables the pool)."""
+    raw = os.environ.get("PBGUI_PB8_HELPER_POOL")
+    if raw is None:
+        raw = load_ini("pb8", "helper_pool_workers")
+    try:
+        return max(0, int(str(raw).strip()))
+    except (TypeError, ValueError):
+        return DEFAULT_WORKERS
+
+
+def runtime_fingerprint(runtime: dict) -> tuple:
+    """Identify the PB8 interpreter/source tree and helper sources a worker was started with."""
+    pb8_dir = Path(str(runtime.get("pb8dir") or "")).resolve(strict=False)
+    git_head = ""
+    try:
+        head = (pb8_dir / ".git" / "HEAD").read_text(encoding="utf-8").strip()
+        git_head = (pb8_dir / ".git" / head[5:].strip()).read_text(encoding="utf-8").strip() if head.startswith("ref: ") else head
+    except OSError:
+        pass
+    sources = []
+    for path in _HELPER_SOURCES:
+        try:
+            stat = path.stat()
+            sources.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            sources.append((0, 0))
+    return (str(runtime.get("pb8venv") or ""), str(pb8_dir), git_head, tuple(sources))
+
+
+@dataclass(eq=False)
+class _Worker:
+    proc: subprocess.Popen
+    fingerprint: tuple
+    requests: int = 0
+    key: str | None = None
+    cancelled: bool = False
+    stderr_tail: collections.deque = field(default_factory=lambda: collections.deque(maxlen=64))
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def diagnostic(self) -> str:
+        return "".join(self.stderr_tail)[-2000:]
+
+
+def _drain_stderr(worker: _Worker) -> None:
+    stream = worker.proc.stderr
+    try:
+        for line in iter(stream.readline, b""):
+            worker.stderr_tail.append(line.decode("utf-8", errors="replace"))
+    except (OSError, ValueError):
+        pass
+
+
+def _stop(worker: _Worker) -> None:
+    proc = worker.proc
+    if proc.poll() is None:
+        try:
+            proc.kill()
+            proc.wait(timeout=2)
+        except (ProcessLookupError, subprocess.TimeoutExpired):
+            pass
+    for stream in (proc.stdin, proc.stdout):
+        try:
+            if stream is not None:
+                stream.close()
+        except OSError:
+            pass
+
+
+def _read_exact(worker: _Worker, size: int, deadline: float) -> bytes:
+    fd = worker.proc.stdout.fileno()
+    chunks = []
+    remaining = size
+    while remaining:
+        timeout = deadline - time.monotonic()
+        if timeout <= 0:
+            raise HelperTimeout("PB8 helper did not answer in time")
+        ready, _w, _x = select.select([fd], [], [], timeout)
+        if not ready:
+            continue
+        chunk = os.read(fd, min(remaining, 1024 * 1024))
+        if not chunk:
+            raise HelperCrashed(worker.diagnostic() or "PB8 helper worker exited")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def _read_frame(worker: _Worker, deadline: float, max_bytes: int) -> tuple[dict, int]:
+    (size,) = _HEADER.unpack(_read_exact(worker, _HEADER.size, deadline))
+    if size > max_bytes:
+        raise HelperResponseTooLarge(f"PB8 helper response of {size} bytes exceeds the {max_bytes} byte limit")
+    body = _read_exact(worker, size, deadline)
+    try:
+        message = json.loads(body.decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise HelperCrashed(f"invalid PB8 helper frame: {exc}") from exc
+    if not isinstance(message, dict):
+        raise HelperCrashed("PB8 helper returned a non-object frame")
+    return message, size
+
+
+class HelperPool:
+    """Bounded set of warm PB8 helper workers."""
+
+    def __init__(
+        self,
+        max_workers: int = 1,
+        max_requests: int = DEFAULT_MAX_REQUESTS,
+        spawn: Callable | None = None,
+        runtime_lease: Callable[[], Any] | None = None,
+    ):
+        self.max_workers = max(1, int(max_workers))
+        self.max_requests = max(1, int(max_requests))
+        self._spawn_process = spawn or self._popen
+        # Returns an object with release(), held for the whole request.
+        self._runtime_lease = runtime_lease
+        self._cond = threading.Condition()
+        self._idle: list[_Worker] = []
+        self._busy: set[_Worker] = set()
+        self._starting = 0
+        self._closed = False
+        self.counters = {"spawned": 0, "recycled": 0, "requests": 0, "warm_hits": 0, "failed": 0}
+
+    @staticmethod
+    def _popen(runtime: dict) -> subprocess.Popen:
+        return subprocess.Popen(
+            [str(runtime["pb8venv"]), str(_WORKER)],
+            cwd=str(runtime["pb8dir"]),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            close_fds=True,
+            shell=False,
+        )
+
+    def _start_worker(self, runtime: dict, fingerprint: tuple, deadline: float) -> _Worker:
+        try:
+            proc = self._spawn_process(runtime)
+        except OSError as exc:
+            raise HelperPoolError(f"could not start PB8 helper worker: {exc}") from exc
+        worker = _Worker(proc=proc, fingerprint=fingerprint)
+        threading.Thread(target=_drain_stderr, args=(worker,), name="pb8-helper-stderr", daemon=True).start()
+        try:
+            ready, _size = _read_frame(worker, min(deadline, time.monotonic() + READY_TIMEOUT_SECONDS), 4096)
+            if not ready.get("ready"):
+                raise HelperCrashed("PB8 helper worker did not report ready")
+        except HelperPoolError:
+            _stop(worker)
+            raise
+        self.counters["spawned"] += 1
+        return worker
+
+    def _acquire(self, runtime: dict, deadline: float) -> tuple[_Worker, bool]:
+        fingerprint = runtime_fingerprint(runtime)
+        stale = []
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise HelperPoolError("PB8 helper pool is shut down")
+                while self._idle:
+                    worker = self._idle.pop()
+                    if worker.fingerprint == fingerprint and worker.alive():
+                        self._busy.add(worker)
+                        break
+                    stale.append(worker)
+                else:
+                    worker = None
+                if worker is not None:
+                    break
+                if len(self._busy) + self._starting < self.max_workers:
+                    self._starting += 1
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise HelperTimeout("all PB8 helper workers are busy")
+                self._cond.wait(remaining)
+            self.counters["recycled"] += len(stale)
+        for old in stale:
+            _stop(old)
+        if worker is not None:
+            return worker, True
+        try:
+            worker = self._start_worker(runtime, fingerprint, deadline)
+        except BaseException:
+            with self._cond:
+                self._starting -= 1
+                self._cond.notify()
+            raise
+        with self._cond:
+            self._starting -= 1
+            self._busy.add(worker)
+        return worker, False
+
+    def _release(self, worker: _Worker, reusable: bool) -> None:
+        recycle = not reusable or worker.requests >= self.max_requests or not worker.alive()
+        with self._cond:
+            self._busy.discard(worker)
+            worker.key = None
+            if recycle:
+                if reusable:
+                    self.counters["recycled"] += 1
+            elif self._closed:
+                recycle = True
+            else:
+                self._idle.append(worker)
+            self._cond.notify()
+        if recycle:
+            _stop(worker)
+
+    def call(
+        self,
+        helper: str,
+        request: dict,
+        *,
+        runtime: dict,
+        timeout: float,
+        max_response_bytes: int = 32 * 1024 * 1024,
+        key: str | None = None,
+        on_worker: Callable[[subprocess.Popen], None] | None = None,
+    ) -> tuple[dict, int]:
+        """Run one helper request on a warm worker; return (response, response_bytes)."""
+        body = json.dumps({"helper": helper, "request": request}, separators=(",", ":"), allow_nan=False).encode("utf-8")
+        if len(body) > MAX_REQUEST_BYTES:
+            raise HelperPoolError("PB8 helper request exceeds the size limit")
+        deadline = time.monotonic() + max(0.1, float(timeout))
+        lease = None
+        if self._runtime_lease is not None:
+            try:
+                lease = self._runtime_lease()
+            except MasterUpdateBusyError as exc:
+                raise HelperPoolError(str(exc)) from exc
+        try:
+            return self._call(body, runtime, deadline, max_response_bytes, key, on_worker)
+        finally:
+            if lease is not None:
+                lease.release()
+
+    def _call(
+        self,
+        body: bytes,
+        runtime: dict,
+        deadline: float,
+        max_response_bytes: int,
+        key: str | None,
+        on_worker: Callable[[subprocess.Popen], None] | None,
+    ) -> tuple[dict, int]:
+        worker, warm = self._acquire(runtime, deadline)
+        reusable = False
+        try:
+            with self._cond:
+                worker.key = key
+            if on_worker is not None:
+                on_worker(worker.proc)
+            try:
+                worker.proc.stdin.write(_HEADER.pack(len(body)) + body)
+                worker.proc.stdin.flush()
+                response = _read_frame(worker, deadline, int(max_response_bytes))
+            except (OSError, ValueError, HelperCrashed) as exc:
+                if worker.cancelled:
+                    raise HelperCancelled("PB8 helper request was cancelled") from exc
+                raise HelperCrashed(worker.diagnostic() or str(exc) or "PB8 helper worker exited") from exc
+            worker.requests += 1
+            reusable = True
+            with self._cond:
+                self.counters["requests"] += 1
+                self.counters["warm_hits"] += 1 if warm else 0
+            return response
+        except BaseException:
+            with self._cond:
+                self.counters["failed"] += 1
+            raise
+        finally:
+            self._release(worker, reusable)
+
+    def cancel(self, key: str) -> bool:
+        """Kill the worker currently running the request registered under ``key``."""
+        with self._cond:
+            targets = [worker for worker in self._busy if key and worker.key == key]
+            for worker in targets:
+                worker.cancelled = True
+        # Only kill here; the thread blocked on the worker's pipes sees EOF
+        # and closes them when it releases the worker.
+        for worker in targets:
+            try:
+                worker.proc.kill()
+            except ProcessLookupError:
+                pass
+        return bool(targets)
+
+    def stats(self) -> dict[str, Any]:
+        """Return worker counts and request counters."""
+        with self._cond:
+            return {
+                "max_workers": self.max_workers,
+                "idle": len(self._idle),
+                "busy": len(self._busy),
+                **self.counters,
+            }
+
+    def shutdown(self) -> None:
+        """Stop all workers; busy requests fail with :class:`HelperCrashed`."""
+        with self._cond:
+            self._closed = True
+            workers = list(self._idle) + list(self._busy)
+            self._idle.clear()
+            self._cond.notify_all()
+        for worker in workers:
+            _stop(worker)
+
+
+_POOL: HelperPool | None = None
+_POOL_LOCK = threading.Lock()
+
+
+def enabled() -> bool:
+    """Return whether PB8 clients should use the pool."""
+    return pool_size() > 0
+
+
+def get_pool() -> HelperPool:
+    """Return the process-wide pool, creating it on first use."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None or _POOL._closed:
+            _POOL = HelperPool(max_workers=pool_size(), runtime_lease=lambda: acquire_master_runtime_lock(Path(PBGDIR)))
+        return _POOL
+
+
+def call(helper: str, request: dict, **kwargs) -> tuple[dict, int]:
+    """Shortcut for ``get_pool().call(...)``."""
+    return get_pool().call(helper, request, **kwargs)
+
+
+def shutdown() -> None:
+    """Stop the process-wide pool; a later call starts a fresh one."""
+    global _POOL
+    with _POOL_LOCK:
+        pool, _POOL = _POOL, None
+    if pool is not None:
+        pool.shutdown()
+
+
+atexit.register(shutdown)
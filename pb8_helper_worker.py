@@ -0,0 +1,94 @@
+"""Long-lived PB8-venv worker serving PBGui helper requests over stdio.
+
+Started by ``pb8_helper_pool`` with PB8's interpreter and PB8 as working
+directory.  Frames in both directions are a 4-byte big-endian length
+followed by UTF-8 JSON.  A request is ``{"helper": <name>, "request": {...}}``
+and the answer is the helper's usual ``{"ok": ..., "result"/"detail": ...}``
+object.  PB8, its Rust extension and the helper modules stay imported
+between requests, so only the first request pays the import cost.
+
+The worker exits on EOF of stdin; the parent recycles it on PB8 runtime
+changes, after a number of requests, or kills it to cancel a request.
+"""
+
+from __future__ import annotations
+
+import importlib
+import json
+import os
+import struct
+import sys
+
+HELPERS = {
+    "strategy_explorer": "pb8_strategy_explorer_helper",
+    "config": "pb8_config_helper",
+    "exchange": "pb8_exchange_helper",
+}
+MAX_FRAME_BYTES = 64 * 1024 * 1024
+_HEADER = struct.Struct(">I")
+
+
+def _read_exact(stream, size: int) -> bytes | None:
+    """Read exactly ``size`` bytes; None on clean EOF before the first byte."""
+    chunks = []
+    remaining = size
+    while remaining:
+        chunk = stream.read(remaining)
+        if not chunk:
+            if remaining == size:
+                return None
+            raise EOFError("truncated frame")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(chunks)
+
+
+def _write_frame(stream, message: dict) -> None:
+    body = json.dumps(message, separators=(",", ":"), allow_nan=False).encode("utf-8")
+    if len(body) > MAX_FRAME_BYTES:
+        body = json.dumps({"ok": False, "detail": "helper response exceeds maximum size"}).encode("utf-8")
+    stream.write(_HEADER.pack(len(body)) + body)
+    stream.flush()
+
+
+def handle(message: dict) -> dict:
+    """Route one framed request to the helper module's ``respond`` function."""
+    name = str(message.get("helper") or "")
+    if name not in HELPERS:
+        return {"ok": False, "detail": f"unknown PB8 helper: {name}"}
+    request = message.get("request")
+    if not isinstance(request, dict):
+        return {"ok": False, "detail": "request must be an object"}
+    module = importlib.import_module(HELPERS[name])
+    return module.respond(request)
+
+
+def main() -> int:
+    """Serve framed requests until stdin closes."""
+    proto_in = sys.stdin.buffer
+    # Keep the protocol stream private: stray prints (Python or native code)
+    # must not corrupt frames, so fd 1 is pointed at stderr.
+    proto_out = os.fdopen(os.dup(1), "wb")
+    os.dup2(2, 1)
+    sys.stdout = sys.stderr
+    _write_frame(proto_out, {"ok": True, "ready": True, "pid": os.getpid()})
+    while True:
+        header = _read_exact(proto_in, _HEADER.size)
+        if header is None:
+            return 0
+        (size,) = _HEADER.unpack(header)
+        if size > MAX_FRAME_BYTES:
+            return 1
+        body = _read_exact(proto_in, size)
+        try:
+            message = json.loads(body.decode("utf-8"))
+            if not isinstance(message, dict):
+                raise ValueError("frame must be an object")
+            response = handle(message)
+        except Exception as exc:
+            response = {"ok": False, "detail": str(exc)[-2000:]}
+        _write_frame(proto_out, response)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -10,6 +10,7 @@ from pathlib import Path
 from typing import Any
 
 from master_update_lock import MasterUpdateBusyError, acquire_master_runtime_lock
+import pb8_helper_pool
 from pbgui_purefunc import PBGDIR, pb8_runtime_status
 
 
@@ -164,6 +165,8 @@ def _call_helper(
         with _PROCESS_LOCK:
             if _SHUTTING_DOWN or op_id in _CANCELLED:
                 raise PB8StrategyExplorerCancelledError("Strategy Explorer operation was cancelled")
+        if pb8_helper_pool.enabled():
+            return _call_pooled(operation, request, status, op_id, timeout_value)
         try:
             proc = subprocess.Popen(
                 [str(status["pb8venv"]), str(helper)],
@@ -218,6 +221,51 @@ def _call_helper(
         _HELPER_SLOTS.release()
 
 
+def _call_pooled(operation: str, request: dict[str, Any], status: dict[str, Any], op_id: str, timeout_value: float) -> dict[str, Any]:
+    """Run one request on a warm pooled helper; cancel() kills the worker it runs on."""
+
+    def register(proc: subprocess.Popen) -> None:
+        with _PROCESS_LOCK:
+            cancelled = _SHUTTING_DOWN or op_id in _CANCELLED
+            if not cancelled:
+                _PROCESSES[op_id] = proc
+        if cancelled:
+            _stop_process(proc)
+
+    try:
+        try:
+            response, _size = pb8_helper_pool.call(
+                "strategy_explorer",
+                request,
+                runtime=status,
+                timeout=timeout_value,
+                max_response_bytes=_MAX_RESPONSE_BYTES,
+                key=op_id,
+                on_worker=register,
+            )
+        except pb8_helper_pool.HelperPoolError as exc:
+            with _PROCESS_LOCK:
+                was_cancelled = op_id in _CANCELLED
+            if was_cancelled or isinstance(exc, pb8_helper_pool.HelperCancelled):
+                raise PB8StrategyExplorerCancelledError("PB8 Strategy Explorer operation was cancelled") from exc
+            if isinstance(exc, pb8_helper_pool.HelperTimeout):
+                raise PB8StrategyExplorerError(
+                    f"PB8 Strategy Explorer {operation} timed out after {timeout_value:g} seconds"
+                ) from exc
+            if isinstance(exc, pb8_helper_pool.HelperResponseTooLarge):
+                raise PB8StrategyExplorerError("PB8 Strategy Explorer response exceeds the 32 MiB limit") from exc
+            raise PB8StrategyExplorerError(f"PB8 Strategy Explorer helper failed: {_detail(exc)}") from exc
+    finally:
+        with _PROCESS_LOCK:
+            _PROCESSES.pop(op_id, None)
+    if not response.get("ok"):
+        raise PB8StrategyExplorerError(_detail(response.get("detail")) or "PB8 Strategy Explorer operation failed")
+    result = response.get("result")
+    if not isinstance(result, dict):
+        raise PB8StrategyExplorerError("PB8 Strategy Explorer helper returned no result")
+    return result
+
+
 def capabilities(config: dict | None = None, *, operation_id: str | None = None) -> dict[str, Any]:
     """Return PB8 Strategy Explorer capabilities and dynamic strategy metadata."""
     payload = {"config": config} if isinstance(config, dict) else {}
@@ -1459,6 +1459,19 @@ def dispatch(request: dict[str, Any], modules: dict[str, Any]) -> dict[str, Any]
     return handlers[operation](request, modules)
 
 
+def respond(request: Any) -> dict[str, Any]:
+    """Answer one decoded request; shared by ``main`` and the warm helper worker."""
+    try:
+        if not isinstance(request, dict):
+            raise ValueError("request must be an object")
+        with redirect_stdout(sys.stderr):
+            modules = _load_pb8(str(request.get("pb8_dir") or ""))
+            result = dispatch(request, modules)
+        return {"ok": True, "result": _json_safe(result)}
+    except Exception as exc:
+        return {"ok": False, "detail": str(exc)[-2000:]}
+
+
 def main() -> int:
     """Read one bounded stdin request and write one strict JSON response."""
     raw = sys.stdin.buffer.read(MAX_REQUEST_BYTES + 1)
@@ -1468,18 +1481,12 @@ def main() -> int:
         return 1
     try:
         request = json.loads(raw.decode("utf-8"))
-        if not isinstance(request, dict):
-            raise ValueError("request must be an object")
-        with redirect_stdout(sys.stderr):
-            modules = _load_pb8(str(request.get("pb8_dir") or ""))
-            result = dispatch(request, modules)
-        response = {"ok": True, "result": _json_safe(result)}
-        return_code = 0
     except Exception as exc:
         response = {"ok": False, "detail": str(exc)[-2000:]}
-        return_code = 1
+    else:
+        response = respond(request)
     sys.stdout.write(json.dumps(response, separators=(",", ":"), allow_nan=False))
-    return return_code
+    return 0 if response["ok"] else 1
 
 
 if __name__ == "__main__":
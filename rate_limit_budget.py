@@ -15,10 +15,27 @@ Usage::
     if await budget.acquire(weight=20):
         # make the API call
         ...
+
+PBData, PBCoinData, task_worker jobs and API-triggered fetches run in
+separate processes but share the host's IP limits.  :class:`SharedRateLimitBudget`
+keeps the same bucket in a small SQLite table keyed by exchange and IP, so
+all processes draw from one budget::
+
+    budget = SharedRateLimitBudget('hyperliquid', **EXCHANGE_RATE_LIMITS['hyperliquid'])
+
+:class:`AdaptiveRateController` tunes a budget from the used-weight headers
+the exchange returns (and from 429s), so the static weights only need to be
+roughly right.
 """
 
 import asyncio
+import sqlite3
+import threading
 import time
+from pathlib import Path
+
+DEFAULT_SHARED_BUDGET_PATH = Path(__file__).resolve().parent / "data" / "rate_limits" / "budgets.db"
+MIN_BUDGET_SCALE = 0.05
 
 
 class RateLimitBudget:
@@ -36,6 +53,7 @@ class RateLimitBudget:
 
     __slots__ = (
         'weight_per_minute', 'burst_capacity', 'refill_per_second',
+        'base_burst_capacity', 'base_refill_per_second', 'scale',
         'tokens', '_last_refill', '_lock',
         'total_consumed', 'total_waited_ms', 'waits_count', 'requests_count',
         '_per_op',
@@ -45,6 +63,10 @@ class RateLimitBudget:
         self.weight_per_minute = weight_per_minute
         self.burst_capacity = burst_capacity
         self.refill_per_second = max(0.1, (weight_per_minute - burst_capacity) / 60.0)
+        # Configured maxima; tune() scales the effective values below them.
+        self.base_burst_capacity = burst_capacity
+        self.base_refill_per_second = self.refill_per_second
+        self.scale = 1.0
         self.tokens = float(burst_capacity)
         self._last_refill = time.monotonic()
         self._lock = asyncio.Lock()
@@ -82,6 +104,9 @@ class RateLimitBudget:
         while True:
             async with self._lock:
                 self._refill()
+                if self.burst_capacity < weight <= self.base_burst_capacity:
+                    # A scaled-down burst must still fit the largest request.
+                    self.burst_capacity = weight
                 if self.tokens >= weight:
                     self.tokens -= weight
                     self.total_consumed += weight
@@ -109,6 +134,19 @@ class RateLimitBudget:
             local_waits += 1
             local_wait_ms += elapsed_ms
 
+    def tune(self, scale: float, max_tokens: float | None = None):
+        """Scale refill rate and burst to *scale* × configured values.
+
+        *max_tokens* caps the tokens currently available, e.g. to the
+        headroom the exchange reported for this IP.
+        """
+        self._refill()
+        self.scale, self.refill_per_second, self.burst_capacity = _scaled_rates(
+            scale, self.base_refill_per_second, self.base_burst_capacity)
+        self.tokens = min(self.tokens, float(self.burst_capacity))
+        if max_tokens is not None:
+            self.tokens = min(self.tokens, max(0.0, float(max_tokens)))
+
     def peek(self) -> dict:
         """Return current budget state for metrics/GUI (read-only estimate)."""
         now = time.monotonic()
@@ -122,12 +160,432 @@ class RateLimitBudget:
             'capacity': self.burst_capacity,
             'weight_per_minute': self.weight_per_minute,
             'refill_per_second': round(self.refill_per_second, 1),
+            'scale': round(self.scale, 3),
+            'total_consumed': self.total_consumed,
+            'total_waited_ms': self.total_waited_ms,
+            'waits_count': self.waits_count,
+            'requests_count': self.requests_count,
+            'per_operation': dict(self._per_op),
+        }
+
+
+def _scaled_rates(scale: float, base_refill: float, base_burst) -> tuple[float, float, float]:
+    """Return ``(scale, refill_per_second, burst_capacity)`` for a clamped scale."""
+    scale = min(1.0, max(MIN_BUDGET_SCALE, float(scale)))
+    return scale, max(0.1, base_refill * scale), max(1.0, base_burst * scale)
+
+
+class SharedRateLimitBudget:
+    """Token bucket for one exchange/IP shared by every process on this host.
+
+    Same ``acquire``/``peek`` API as :class:`RateLimitBudget`.  The bucket
+    row lives in ``data/rate_limits/budgets.db`` (WAL); each take is one
+    ``BEGIN IMMEDIATE`` transaction that refills by wall-clock time since the
+    last update and consumes the weight if enough tokens are available, so
+    concurrent processes can never spend more than the configured budget.
+    Waiting happens outside the transaction.  If the database cannot be
+    used, the bucket falls back to an in-process :class:`RateLimitBudget`
+    and ``peek()`` reports ``backend='local'``.
+
+    *ip* distinguishes egress addresses when a host routes requests through
+    more than one; processes on one address leave it empty.
+    """
+
+    def __init__(
+        self,
+        exchange: str,
+        weight_per_minute: int = 1200,
+        burst_capacity: int = 120,
+        *,
+        ip: str = '',
+        path: Path | str | None = None,
+        clock=time.time,
+    ):
+        self.exchange = str(exchange)
+        self.ip = str(ip or '')
+        self.weight_per_minute = weight_per_minute
+        self.burst_capacity = burst_capacity
+        self.refill_per_second = max(0.1, (weight_per_minute - burst_capacity) / 60.0)
+        self.base_burst_capacity = burst_capacity
+        self.base_refill_per_second = self.refill_per_second
+        self.scale = 1.0
+        self.path = Path(path) if path is not None else DEFAULT_SHARED_BUDGET_PATH
+        self._clock = clock
+        self._init_lock = threading.Lock()
+        self._initialized = False
+        self._local = RateLimitBudget(weight_per_minute, burst_capacity)
+        self.last_error = ''
+        # Cumulative metrics of this process (since creation)
+        self.total_consumed = 0
+        self.total_waited_ms = 0
+        self.waits_count = 0
+        self.requests_count = 0
+        self._per_op: dict = {}
+
+    # ── internal ────────────────────────────────────────────
+
+    def _connect(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), timeout=5, isolation_level=None)
+        try:
+            with self._init_lock:
+                if not self._initialized:
+                    conn.execute("PRAGMA journal_mode=WAL")
+                    conn.execute(
+                        """
+                        CREATE TABLE IF NOT EXISTS buckets (
+                            exchange TEXT NOT NULL,
+                            ip TEXT NOT NULL,
+                            tokens REAL NOT NULL,
+                            updated_at REAL NOT NULL,
+                            scale REAL NOT NULL DEFAULT 1.0,
+                            total_consumed INTEGER NOT NULL DEFAULT 0,
+                            requests_count INTEGER NOT NULL DEFAULT 0,
+                            PRIMARY KEY (exchange, ip)
+                        ) WITHOUT ROWID
+                        """
+                    )
+                    self._initialized = True
+        except Exception:
+            conn.close()
+            raise
+        return conn
+
+    def _refilled(self, tokens: float, updated_at: float, now: float, weight: float = 0) -> float:
+        # A wall clock that stepped backwards refills nothing.
+        elapsed = max(0.0, now - updated_at)
+        burst = max(float(self.burst_capacity), min(float(weight), float(self.base_burst_capacity)))
+        return min(burst, tokens + elapsed * self.refill_per_second)
+
+    def _apply_scale(self, scale: float):
+        self.scale, self.refill_per_second, self.burst_capacity = _scaled_rates(
+            scale, self.base_refill_per_second, self.base_burst_capacity)
+
+    def _update(self, change) -> float:
+        """Run *change(tokens, now)* -> (tokens, scale, consumed) on the bucket row atomically."""
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = float(self._clock())
+                row = conn.execute(
+                    "SELECT tokens, updated_at, scale FROM buckets WHERE exchange = ? AND ip = ?",
+                    (self.exchange, self.ip),
+                ).fetchone()
+                if row is None:
+                    self._apply_scale(1.0)
+                    tokens = float(self.burst_capacity)
+                else:
+                    self._apply_scale(float(row[2]))
+                    tokens = float(row[0])
+                tokens, scale, consumed = change(tokens, float(row[1]) if row else now, now)
+                conn.execute(
+                    """
+                    INSERT INTO buckets (exchange, ip, tokens, updated_at, scale, total_consumed, requests_count)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (exchange, ip) DO UPDATE SET
+                        tokens = excluded.tokens,
+                        updated_at = excluded.updated_at,
+                        scale = excluded.scale,
+                        total_consumed = total_consumed + excluded.total_consumed,
+                        requests_count = requests_count + excluded.requests_count
+                    """,
+                    (self.exchange, self.ip, tokens, now, scale, consumed, 1 if consumed else 0),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        finally:
+            conn.close()
+        return tokens
+
+    def _take(self, weight: int) -> float:
+        """Consume *weight* tokens atomically; return 0 or the seconds to wait."""
+        taken = []
+
+        def change(tokens, updated_at, now):
+            tokens = self._refilled(tokens, updated_at, now, weight)
+            if tokens >= weight:
+                taken.append(True)
+                return tokens - weight, self.scale, weight
+            return tokens, self.scale, 0
+
+        tokens = self._update(change)
+        return 0.0 if taken else (weight - tokens) / self.refill_per_second
+
+    def _record(self, weight: int, tag: str, local_waits: int, local_wait_ms: int):
+        self.total_consumed += weight
+        self.requests_count += 1
+        if tag:
+            op = self._per_op.setdefault(tag, {'consumed': 0, 'requests': 0, 'waits': 0, 'wait_ms': 0})
+            op['consumed'] += weight
+            op['requests'] += 1
+            op['waits'] += local_waits
+            op['wait_ms'] += local_wait_ms
+
+    # ── public API ──────────────────────────────────────────
+
+    def tune(self, scale: float, max_tokens: float | None = None):
+        """Scale the shared bucket's refill rate and burst for every process; see :meth:`RateLimitBudget.tune`."""
+        def change(tokens, updated_at, now):
+            tokens = self._refilled(tokens, updated_at, now)
+            self._apply_scale(scale)
+            tokens = min(tokens, float(self.burst_capacity))
+            if max_tokens is not None:
+                tokens = min(tokens, max(0.0, float(max_tokens)))
+            return tokens, self.scale, 0
+
+        try:
+            self._update(change)
+            self.last_error = ''
+        except (sqlite3.Error, OSError) as exc:
+            self.last_error = f"{type(exc).__name__}: {exc}"[:240]
+            self._local.tune(scale, max_tokens)
+
+    async def acquire(self, weight: int = 1, timeout: float = 60.0, tag: str = '') -> bool:
+        """Wait until *weight* tokens are available in the shared bucket, then consume them.
+
+        Returns ``True`` if tokens were consumed, ``False`` on timeout.
+        """
+        deadline = time.monotonic() + timeout
+        local_waits = 0
+        local_wait_ms = 0
+        while True:
+            try:
+                wait = await asyncio.to_thread(self._take, weight)
+                self.last_error = ''
+            except (sqlite3.Error, OSError) as exc:
+                self.last_error = f"{type(exc).__name__}: {exc}"[:240]
+                remaining = max(0.0, deadline - time.monotonic())
+                if not await self._local.acquire(weight=weight, timeout=remaining, tag=tag):
+                    return False
+                self._record(weight, tag, local_waits, local_wait_ms)
+                return True
+            if wait <= 0:
+                self._record(weight, tag, local_waits, local_wait_ms)
+                return True
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            sleep_time = min(wait + 0.02, remaining)
+            t0 = time.monotonic()
+            await asyncio.sleep(sleep_time)
+            elapsed_ms = int((time.monotonic() - t0) * 1000)
+            self.total_waited_ms += elapsed_ms
+            self.waits_count += 1
+            local_waits += 1
+            local_wait_ms += elapsed_ms
+
+    def peek(self) -> dict:
+        """Return shared budget state plus this process's metrics (read-only estimate)."""
+        result = {
+            'tokens': None,
+            'capacity': self.burst_capacity,
+            'weight_per_minute': self.weight_per_minute,
+            'refill_per_second': round(self.refill_per_second, 1),
             'total_consumed': self.total_consumed,
             'total_waited_ms': self.total_waited_ms,
             'waits_count': self.waits_count,
             'requests_count': self.requests_count,
             'per_operation': dict(self._per_op),
+            'backend': 'shared',
+            'key': f"{self.exchange}@{self.ip}" if self.ip else self.exchange,
+            'shared_total_consumed': None,
+            'shared_requests_count': None,
         }
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT tokens, updated_at, total_consumed, requests_count, scale FROM buckets WHERE exchange = ? AND ip = ?",
+                    (self.exchange, self.ip),
+                ).fetchone()
+            finally:
+                conn.close()
+        except (sqlite3.Error, OSError) as exc:
+            self.last_error = f"{type(exc).__name__}: {exc}"[:240]
+            row = None
+        if self.last_error:
+            local = self._local.peek()
+            result.update({'backend': 'local', 'tokens': local['tokens'], 'error': self.last_error})
+        elif row is None:
+            result['tokens'] = float(self.burst_capacity)
+        else:
+            self._apply_scale(float(row[4]))
+            result.update({
+                'tokens': round(self._refilled(float(row[0]), float(row[1]), float(self._clock())), 1),
+                'capacity': round(self.burst_capacity, 1),
+                'refill_per_second': round(self.refill_per_second, 1),
+                'shared_total_consumed': int(row[2]),
+                'shared_requests_count': int(row[3]),
+            })
+        result['scale'] = round(self.scale, 3)
+        return result
+
+
+def parse_rate_limit_headers(exchange: str, headers) -> dict | None:
+    """Return ``{'used', 'limit', 'window_s'}`` from an exchange response, or ``None``.
+
+    Binance reports the IP's used weight of the current minute
+    (``X-MBX-USED-WEIGHT-1M``); Bybit reports the per-endpoint limit and the
+    remaining requests of the current second (``X-Bapi-Limit`` /
+    ``X-Bapi-Limit-Status``).  Other exchanges send no usable headers.
+    """
+    if not headers:
+        return None
+    try:
+        lowered = {str(key).lower(): value for key, value in dict(headers).items()}
+    except (TypeError, ValueError):
+        return None
+    spec = RATE_LIMIT_HEADERS.get(exchange)
+    if spec is None:
+        return None
+    try:
+        if 'used' in spec:
+            if spec['used'] not in lowered:
+                return None
+            used = int(float(lowered[spec['used']]))
+            limit = int(spec['limit'])
+        else:
+            if spec['remaining'] not in lowered or spec['limit'] not in lowered:
+                return None
+            limit = int(float(lowered[spec['limit']]))
+            used = limit - int(float(lowered[spec['remaining']]))
+    except (TypeError, ValueError):
+        return None
+    if limit <= 0:
+        return None
+    return {'used': max(0, used), 'limit': limit, 'window_s': float(spec['window_s'])}
+
+
+class AdaptiveRateController:
+    """Adjust one exchange's budget from the usage the exchange reports.
+
+    After each response, :meth:`observe_headers` reads the IP's used weight.
+    Above *high_water* of the exchange limit the budget's refill rate and
+    burst shrink by *decrease*; below *low_water* they grow back by
+    *increase* per sample up to the configured values.  Available tokens are
+    capped at the reported headroom, so requests made by other clients on
+    the same IP are accounted for.  :meth:`on_rate_limited` halves the rate
+    and empties the bucket after a 429.  Without new usage reports the rate
+    grows back by *increase* every *recovery_interval_s*, so a throttle never
+    outlives the condition that caused it.
+
+    Only exchanges listed in :data:`RATE_LIMIT_HEADERS` are scaled; for the
+    others a 429 just empties the bucket and the configured rate is kept
+    (resetting a scale persisted by an older process).  *budget* may be
+    ``None`` to only track the reported usage for metrics.
+    """
+
+    def __init__(
+        self,
+        exchange: str,
+        budget=None,
+        *,
+        high_water: float = 0.8,
+        low_water: float = 0.5,
+        decrease: float = 0.7,
+        increase: float = 0.05,
+        recovery_interval_s: float = 30.0,
+        clock=time.time,
+    ):
+        self.exchange = exchange
+        self.budget = budget
+        self.high_water = high_water
+        self.low_water = low_water
+        self.decrease = decrease
+        self.increase = increase
+        self.recovery_interval_s = recovery_interval_s
+        self._clock = clock
+        self._lock = threading.Lock()
+        self.adaptive = exchange in RATE_LIMIT_HEADERS
+        self.scale = 1.0
+        self.last = None
+        self.last_ts = 0.0
+        self.samples = 0
+        self.rate_limited = 0
+        self._seen_headers = None
+        self._changed_at = float(clock())
+        if budget is not None and not self.adaptive and float(getattr(budget, 'scale', 1.0)) < 1.0:
+            budget.tune(1.0)
+
+    def _current_scale(self) -> float:
+        # A shared budget may have been tuned by another process meanwhile.
+        return float(getattr(self.budget, 'scale', self.scale))
+
+    def _apply(self, scale: float, max_tokens: float | None):
+        if not self.adaptive:
+            scale = 1.0
+        self.scale = min(1.0, max(MIN_BUDGET_SCALE, scale))
+        self._changed_at = float(self._clock())
+        if self.budget is not None:
+            self.budget.tune(self.scale, max_tokens)
+
+    def recover(self) -> float:
+        """Grow a reduced scale by *increase* per elapsed *recovery_interval_s*; returns the scale."""
+        with self._lock:
+            scale = self._current_scale()
+            steps = int((float(self._clock()) - self._changed_at) // self.recovery_interval_s)
+            if scale < 1.0 and steps > 0:
+                self._apply(scale + self.increase * steps, None)
+            return self.scale
+
+    def observe_headers(self, headers) -> dict | None:
+        """Adapt to one response's rate-limit headers; returns the parsed usage.
+
+        The same headers object is only counted once, so callers may pass
+        the client's last response headers without tracking which response
+        they already reported.
+        """
+        with self._lock:
+            if headers is not None and headers is self._seen_headers:
+                return None
+            self._seen_headers = headers
+        usage = parse_rate_limit_headers(self.exchange, headers)
+        if usage is None:
+            self.recover()
+            return None
+        with self._lock:
+            ratio = usage['used'] / usage['limit']
+            scale = self._current_scale()
+            if ratio >= self.high_water:
+                scale *= self.decrease
+            elif ratio <= self.low_water:
+                scale += self.increase
+            self.last = usage
+            self.last_ts = self._clock()
+            self.samples += 1
+            self._apply(scale, usage['limit'] - usage['used'])
+        return usage
+
+    def on_rate_limited(self):
+        """Back off after the exchange rejected a request with 429."""
+        with self._lock:
+            self.rate_limited += 1
+            self._apply(self._current_scale() * 0.5, 0)
+
+    def metrics(self) -> dict:
+        """Return effective rate and reported headroom for the poller metrics."""
+        with self._lock:
+            last = dict(self.last) if self.last else None
+            result = {
+                'scale': round(self.scale, 3),
+                'samples': self.samples,
+                'rate_limited': self.rate_limited,
+                'last_ts': int(self.last_ts),
+                'used': last['used'] if last else None,
+                'limit': last['limit'] if last else None,
+                'window_s': last['window_s'] if last else None,
+                'headroom': max(0, last['limit'] - last['used']) if last else None,
+                'usage_pct': round(last['used'] / last['limit'] * 100, 1) if last else None,
+                'effective_weight_per_minute': None,
+            }
+        if self.budget is not None:
+            result['effective_weight_per_minute'] = round(
+                self.budget.refill_per_second * 60 + self.budget.burst_capacity, 1)
+        return result
 
 
 # ── Per-exchange rate limit configurations ───────────────────
@@ -151,6 +609,34 @@ EXCHANGE_RATE_LIMITS: dict[str, dict] = {
     # 'bybit': {'weight_per_minute': 600, 'burst_capacity': 60},
 }
 
+# Response headers reporting per-IP usage (see AdaptiveRateController).
+# Binance USDⓈ-M futures allow 2400 request weight per minute and IP.
+RATE_LIMIT_HEADERS: dict[str, dict] = {
+    'binance': {'used': 'x-mbx-used-weight-1m', 'limit': 2400, 'window_s': 60},
+    'bybit': {'remaining': 'x-bapi-limit-status', 'limit': 'x-bapi-limit', 'window_s': 1},
+}
+
+# Budgets for windowed income-history backfills (history_fetch) on exchanges
+# without a shared PBData budget above.  They stay well below the exchanges'
+# per-IP limits so live pollers on the same host keep their headroom:
+# - Bybit: transaction-log endpoints allow ~30 req/s; we use 20/s.
+# - Binance: /fapi/v1/income costs 30 of 2400 weight/min; we use half.
+# - OKX: bills-archive allows 5 req / 2 s; we use 2 req/s.
+HISTORY_BACKFILL_RATE_LIMITS: dict[str, dict] = {
+    'bybit': {
+        'weight_per_minute': 1200,
+        'burst_capacity': 40,
+    },
+    'binance': {
+        'weight_per_minute': 1200,
+        'burst_capacity': 120,
+    },
+    'okx': {
+        'weight_per_minute': 120,
+        'burst_capacity': 10,
+    },
+}
+
 
 # ── Per-operation weight estimates ───────────────────────────
 #
@@ -171,6 +657,10 @@ OPERATION_WEIGHTS: dict[tuple[str, str], int] = {
     ('hyperliquid', 'candle_snapshot'):     44,     # one candleSnapshot call: 20 base + ceil(1440/60)=24 for a full day of 1m candles
     ('hyperliquid', 'all_mids'):            2,      # allMids
     ('hyperliquid', 'meta'):                20,     # meta
+    # Windowed history backfill (weight per REST page)
+    ('bybit', 'fetch_history_window'):      1,      # v5 account transaction-log
+    ('binance', 'fetch_history_window'):    30,     # /fapi/v1/income
+    ('okx', 'fetch_history_window'):        1,      # account/bills-archive
 }
 
 DEFAULT_WEIGHT = 20
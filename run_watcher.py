@@ -0,0 +1,218 @@
+"""
+RunStateWatcher — inotify watcher for PBRun's run_v7/run_v8 state.
+
+PBRun reconciles bots whenever an instance config, the Cluster Sync desired
+state or pbgui.ini changes.  Instead of re-walking those trees every second,
+this watcher registers Linux inotify watches on them and records which
+*tag* changed:
+
+    watcher = RunStateWatcher(
+        dirs={"v7": run_v7, "v8": run_v8, "cluster": cluster_root},
+        files={"ini": pbgdir / "pbgui.ini"},
+    )
+    if watcher.start():          # False → inotify unavailable, keep polling
+        while running:
+            watcher.changed.wait(timeout=5)
+            for tag in watcher.consume():
+                ...
+
+``dirs`` are watched together with their immediate subdirectories (one
+level = one instance).  ``files`` are watched through their parent
+directory so atomic replaces are seen.  A root that does not exist yet is
+picked up as soon as it is created.  Queue overflows report every tag.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+from pathlib import Path
+
+from logging_helpers import human_log as _log
+
+SERVICE = "PBRun"
+
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_NONBLOCK = 0o4000
+# No IN_MODIFY: bot stderr logs inside instance dirs are appended continuously.
+_WATCH_MASK = (
+    _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+    | _IN_DELETE_SELF | _IN_MOVE_SELF | _IN_ATTRIB
+)
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class RunStateWatcher:
+    """Report which watched run-state trees changed, via inotify."""
+
+    def __init__(self, dirs: dict[str, Path], files: dict[str, Path] | None = None):
+        self._dirs = {tag: Path(path) for tag, path in dirs.items()}
+        self._files = {tag: Path(path) for tag, path in (files or {}).items()}
+        self.changed = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._pending: set[str] = set()
+        # wd -> [(tag, dir, name filter, is ancestor of a missing root)]; one
+        # directory can serve several tags and inotify returns the same wd.
+        self._watches: dict[int, list[tuple[str, Path, str | None, bool]]] = {}
+        self._fd = -1
+        self._libc = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def active(self) -> bool:
+        """True while the inotify reader thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def watch_count(self) -> int:
+        return len(self._watches)
+
+    def start(self) -> bool:
+        """Start watching; returns False when inotify is unavailable."""
+        if self.active:
+            return True
+        try:
+            libc_name = ctypes.util.find_library("c")
+            self._libc = ctypes.CDLL(libc_name, use_errno=True)
+            fd = self._libc.inotify_init1(_IN_NONBLOCK)
+        except (OSError, AttributeError) as exc:
+            _log(SERVICE, f"inotify unavailable, falling back to polling: {exc}", level="WARNING")
+            return False
+        if fd < 0:
+            _log(SERVICE, "inotify_init1 failed, falling back to polling", level="WARNING")
+            return False
+        self._fd = fd
+        self._stop = threading.Event()
+        self._setup_watches()
+        self._thread = threading.Thread(target=self._read_loop, daemon=True, name="pbrun-run-watcher")
+        self._thread.start()
+        return True
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """Stop the reader thread and release the inotify descriptor."""
+        self._stop.set()
+        self.changed.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=max(0.0, timeout))
+        self._thread = None
+        if self._fd >= 0:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+            self._fd = -1
+        self._watches.clear()
+
+    def consume(self) -> set[str]:
+        """Return and clear the tags changed since the previous call."""
+        with self._lock:
+            pending, self._pending = self._pending, set()
+            self.changed.clear()
+        return pending
+
+    # ── Internal ──
+
+    def _mark(self, tags) -> None:
+        with self._lock:
+            self._pending.update(tags)
+            self.changed.set()
+
+    def _add_watch(self, path: Path, tag: str, name: str | None, ancestor: bool = False) -> bool:
+        wd = self._libc.inotify_add_watch(self._fd, str(path).encode(), _WATCH_MASK)
+        if wd < 0:
+            return False
+        self._watches.setdefault(wd, []).append((tag, path, name, ancestor))
+        return True
+
+    def _watch_existing_ancestor(self, path: Path, tag: str) -> None:
+        """Watch the nearest existing parent so a missing root is noticed on creation."""
+        for parent in path.parents:
+            if parent.is_dir():
+                self._add_watch(parent, tag, path.relative_to(parent).parts[0], ancestor=True)
+                return
+
+    def _setup_watches(self) -> None:
+        for wd in list(self._watches):
+            self._libc.inotify_rm_watch(self._fd, wd)
+        self._watches.clear()
+        for tag, root in self._dirs.items():
+            if not root.is_dir():
+                self._watch_existing_ancestor(root, tag)
+                continue
+            self._add_watch(root, tag, None)
+            try:
+                children = [child for child in root.iterdir() if child.is_dir()]
+            except OSError:
+                children = []
+            for child in children:
+                self._add_watch(child, tag, None)
+        for tag, file_path in self._files.items():
+            if file_path.parent.is_dir():
+                self._add_watch(file_path.parent, tag, file_path.name)
+            else:
+                self._watch_existing_ancestor(file_path.parent, tag)
+
+    def _read_loop(self) -> None:
+        while not self._stop.is_set():
+            try:
+                readable, _, _ = select.select([self._fd], [], [], 0.5)
+            except (OSError, ValueError):
+                return
+            if not readable:
+                continue
+            try:
+                raw = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                continue
+            except OSError:
+                return
+            try:
+                self._handle(raw)
+            except Exception as exc:
+                _log(SERVICE, f"Run-state watcher error: {exc}", level="WARNING")
+                self._mark(set(self._dirs) | set(self._files))
+
+    def _handle(self, raw: bytes) -> None:
+        tags: set[str] = set()
+        rescan = False
+        pos = 0
+        while pos + _EVENT.size <= len(raw):
+            wd, mask, _cookie, name_len = _EVENT.unpack_from(raw, pos)
+            name = raw[pos + _EVENT.size:pos + _EVENT.size + name_len].rstrip(b"\0").decode(errors="replace")
+            pos += _EVENT.size + name_len
+            if mask & _IN_Q_OVERFLOW:
+                tags.update(self._dirs)
+                tags.update(self._files)
+                rescan = True
+                continue
+            if mask & _IN_IGNORED:
+                specs = self._watches.pop(wd, [])
+                rescan = rescan or any(path == self._dirs.get(tag) for tag, path, _name, _anc in specs)
+                continue
+            for tag, path, wanted, ancestor in list(self._watches.get(wd, ())):
+                if wanted is not None and name != wanted:
+                    continue
+                tags.add(tag)
+                if ancestor or mask & (_IN_DELETE_SELF | _IN_MOVE_SELF):
+                    # A missing root appeared, or a watched root went away.
+                    rescan = True
+                elif mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO) and path == self._dirs.get(tag):
+                    self._add_watch(path / name, tag, None)
+        if rescan:
+            self._setup_watches()
+        if tags:
+            self._mark(tags)
@@ -0,0 +1,96 @@
+"""
+bench_pb8_helper_pool.py - Cold vs warm latency of PB8 helper calls.
+
+Runs the PB8 config helper's ``status`` operation N times with one fresh
+PB8-venv interpreter per call, then N times through the warm helper pool,
+and prints min/median/p95/max latency for both.  Needs a configured PB8
+runtime (``[pb8] pb8dir`` / ``pb8venv`` in pbgui.ini).
+
+Run manually:
+    /home/mani/software/venv_pbgui/bin/python scripts/bench_pb8_helper_pool.py [N]
+"""
+
+from __future__ import annotations
+
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+import pb8_helper_pool  # noqa: E402
+from pbgui_purefunc import pb8_runtime_status  # noqa: E402
+
+HELPER = ROOT / "pb8_config_helper.py"
+
+
+def _cold(runtime: dict, request: dict) -> None:
+    proc = subprocess.run(
+        [str(runtime["pb8venv"]), str(HELPER)],
+        cwd=str(runtime["pb8dir"]),
+        input=json.dumps(request),
+        text=True,
+        capture_output=True,
+        check=False,
+        timeout=120,
+    )
+    if proc.returncode != 0 or not json.loads(proc.stdout).get("ok"):
+        raise RuntimeError(proc.stderr.strip()[-500:] or "cold helper call failed")
+
+
+def _warm(pool: pb8_helper_pool.HelperPool, runtime: dict, request: dict) -> None:
+    response, _size = pool.call("config", request, runtime=runtime, timeout=120)
+    if not response.get("ok"):
+        raise RuntimeError(str(response.get("detail") or "warm helper call failed"))
+
+
+def _report(label: str, samples: list[float]) -> None:
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    print(
+        f"{label:<5} n={len(ordered):<4} min={ordered[0] * 1000:8.1f} ms  "
+        f"median={statistics.median(ordered) * 1000:8.1f} ms  "
+        f"p95={p95 * 1000:8.1f} ms  max={ordered[-1] * 1000:8.1f} ms"
+    )
+
+
+def main() -> int:
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    runtime = pb8_runtime_status()
+    if not runtime.get("ready"):
+        print(f"PB8 runtime not ready: {runtime.get('detail') or runtime}")
+        return 1
+    request = {"operation": "status", "pb8_dir": str(runtime["pb8dir"])}
+
+    cold = []
+    for _ in range(count):
+        started = time.perf_counter()
+        _cold(runtime, request)
+        cold.append(time.perf_counter() - started)
+
+    pool = pb8_helper_pool.HelperPool(max_workers=1, max_requests=count + 1)
+    try:
+        started = time.perf_counter()
+        _warm(pool, runtime, request)
+        first = time.perf_counter() - started
+        warm = []
+        for _ in range(count):
+            started = time.perf_counter()
+            _warm(pool, runtime, request)
+            warm.append(time.perf_counter() - started)
+    finally:
+        pool.shutdown()
+
+    _report("cold", cold)
+    print(f"spawn first warm worker: {first * 1000:.1f} ms")
+    _report("warm", warm)
+    print(f"median speedup: {statistics.median(cold) / statistics.median(warm):.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
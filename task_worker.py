@@ -73,6 +73,7 @@ from market_data_integrity import (
     SUPPORTED_EXCHANGES,
     catalog_operation_lock,
     bybit_storage_market_status,
+    catalog_file_checksums,
     catalog_summary,
     compare_catalogs_readonly,
     create_gzip_snapshot,
@@ -107,6 +108,7 @@ from task_queue import (
     write_worker_pid,
     enqueue_job,
 )
+import ohlcv_pack_copy
 from inventory_cache import refresh_coin as _refresh_inventory_coin, sweep_cache_mtimes as _sweep_cache_mtimes
 
 
@@ -426,6 +428,51 @@ def _run_db_sync(job_path: Path, payload: dict[str, Any]) -> None:
     )
 
 
+def _run_executions_backfill(job_path: Path, payload: dict[str, Any]) -> None:
+    """Backfill the trades DB executions table with per-unit cursors.
+
+    Payload: users (names, empty = all), initial_lookback_days, compress_raw,
+    batch_size.  ``started_ms`` is stamped on the first run so a requeued or
+    retried job skips units already completed by an earlier attempt.
+    """
+    from Database import Database
+    from User import Users
+    from executions_backfill import DEFAULT_BATCH_SIZE, run_backfill
+
+    started_ms = int(payload.get("started_ms") or 0)
+    if started_ms <= 0:
+        started_ms = int(time.time() * 1000)
+        update_job_file(job_path, mutate=lambda o: o.setdefault("payload", {}).update({"started_ms": started_ms}))
+    wanted = {str(name) for name in (payload.get("users") or []) if str(name or "").strip()}
+    users = [user for user in Users() if not wanted or user.name in wanted]
+    lookback = payload.get("initial_lookback_days")
+
+    def publish(progress: dict[str, Any]) -> None:
+        update_job_file(job_path, mutate=lambda obj: obj.update({"progress": progress}))
+
+    db = Database()
+    try:
+        summary = run_backfill(
+            db,
+            users,
+            started_ms=started_ms,
+            initial_lookback_days=int(lookback) if lookback not in (None, "") else None,
+            compress_raw=bool(payload.get("compress_raw")),
+            batch_size=int(payload.get("batch_size") or DEFAULT_BATCH_SIZE),
+            publish=publish,
+            stop_check=lambda: bool(_STOP or _is_cancel_requested(job_path)),
+        )
+    finally:
+        db.close_thread_connections()
+    _append_to_job_log(
+        job_path.stem,
+        f"executions backfill: units={summary['completed']} skipped={summary['skipped']} rows={summary['rows']} "
+        f"inserted={summary['inserted']} rows_per_sec={summary['rows_per_sec']}",
+    )
+    if summary["errors"]:
+        raise RuntimeError(f"{len(summary['errors'])} backfill units failed; retry resumes from the last cursor: {summary['errors'][0]}")
+
+
 def _run_job(job_path: Path) -> None:
     obj = _load_job(job_path)
     if not obj:
@@ -469,6 +516,8 @@ def _run_job(job_path: Path) -> None:
             _run_ohlcv_copy(job_path, payload, dry_run=True)
         elif jtype == "db_sync":
             _run_db_sync(job_path, payload)
+        elif jtype == "executions_backfill":
+            _run_executions_backfill(job_path, payload)
         elif jtype == "ohlcv_integrity_scan":
             with integrity_job_lock():
                 _run_ohlcv_integrity_scan(job_path, payload)
@@ -1416,6 +1465,15 @@ def _parse_ohlcv_copy_ssh_args(ssh_command: Any) -> list[str]:
     return normalized
 
 
+def _normalize_ohlcv_copy_transport(transport: Any) -> str:
+    """Return the copy transport; payloads without one keep using rsync."""
+
+    text = str(transport or "").strip().lower() or ohlcv_pack_copy.RSYNC_TRANSPORT
+    if text not in ohlcv_pack_copy.TRANSPORTS:
+        raise ValueError(f"Unsupported OHLCV copy transport: {text}")
+    return text
+
+
 def _remote_ohlcv_copy_dir(destination_root: str, storage_name: str) -> str:
     """Build a POSIX target path for one exchange directory."""
 
@@ -1680,6 +1738,16 @@ def _run_ohlcv_copy(job_path: Path, payload: dict[str, Any], *, dry_run: bool =
         raise ValueError("SSH command must not include the target host")
     mode = OHLCV_COPY_MODE
     exchanges = _normalize_ohlcv_copy_exchanges(payload.get("exchanges"))
+    if _normalize_ohlcv_copy_transport(payload.get("transport")) == ohlcv_pack_copy.PACK_TRANSPORT:
+        _run_ohlcv_pack_copy(
+            job_path,
+            target=target,
+            destination_root=destination_root,
+            ssh_args=ssh_args,
+            exchanges=exchanges,
+            dry_run=dry_run,
+        )
+        return
     if shutil.which("rsync") is None:
         raise RuntimeError("rsync is not installed or not available in PATH")
 
@@ -1805,6 +1873,225 @@ def _run_ohlcv_copy(job_path: Path, payload: dict[str, Any], *, dry_run: bool =
     _append_to_job_log(job_id, f"job finished  {'dry_run_exchanges' if dry_run else 'copied'}={len(copied)}  skipped={len(skipped)}  duration={int(time.time()-started_ts)}s")
 
 
+def _run_ohlcv_copy_capture(job_path: Path, cmd: list[str], label: str) -> str:
+    """Run one read-only SSH command and return its stdout, honoring cancellation."""
+
+    proc = subprocess.Popen(
+        cmd,
+        cwd=str(Path(__file__).resolve().parent),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        start_new_session=True,
+    )
+    try:
+        while True:
+            if _STOP or _is_cancel_requested(job_path):
+                _terminate_ohlcv_copy_process(proc)
+                raise RuntimeError("cancelled")
+            try:
+                stdout, stderr = proc.communicate(timeout=0.5)
+                break
+            except subprocess.TimeoutExpired:
+                continue
+        if proc.returncode != 0:
+            detail = str(stderr or "").strip().splitlines()[-1:] or [f"exit code {proc.returncode}"]
+            raise RuntimeError(f"{label} failed: {detail[0]}")
+        return str(stdout or "")
+    finally:
+        if proc.poll() is None:
+            _terminate_ohlcv_copy_process(proc)
+
+
+def _run_ohlcv_pack_copy(
+    job_path: Path,
+    *,
+    target: str,
+    destination_root: str,
+    ssh_args: list[str],
+    exchanges: list[str],
+    dry_run: bool,
+) -> None:
+    """Copy missing or changed OHLCV files as one tar stream planned from manifests."""
+
+    started_ts = time.time()
+    job_id = job_path.stem
+    source_root = get_market_data_root_dir()
+    transport = ohlcv_pack_copy.PACK_TRANSPORT
+    copied: list[str] = []
+    skipped: list[str] = []
+    storages: list[str] = []
+    for exchange in exchanges:
+        meta = OHLCV_COPY_EXCHANGES[exchange]
+        if meta["storage"] in storages:
+            continue
+        if (source_root / meta["storage"]).is_dir():
+            copied.append(exchange)
+            storages.append(meta["storage"])
+        else:
+            skipped.append(exchange)
+
+    _init_job_log(job_id)
+    _append_to_job_log(
+        job_id,
+        f"job started  target={target}  destination_root={destination_root}  exchanges={exchanges}  transport={transport}  dry_run={1 if dry_run else 0}",
+    )
+    _append_to_job_log(job_id, "safety  delete=disabled  update_changed=1  writes=" + ("0" if dry_run else "1"))
+
+    def update_progress(**kw: Any) -> None:
+        def mut(o: dict[str, Any]) -> None:
+            pr = o.get("progress")
+            pr = pr if isinstance(pr, dict) else {}
+            pr.update(kw)
+            pr["mode"] = "ohlcv_copy_dry_run" if dry_run else "ohlcv_copy"
+            pr["transport"] = transport
+            o["progress"] = pr
+        update_job_file(job_path, mutate=mut)
+
+    update_progress(stage="starting", target=target, destination_root=destination_root, copied_exchanges=[], skipped_exchanges=list(skipped))
+    for exchange in skipped:
+        _append_to_job_log(job_id, f"{OHLCV_COPY_EXCHANGES[exchange]['label']} skipped  missing_source={source_root / OHLCV_COPY_EXCHANGES[exchange]['storage']}")
+    if not copied:
+        raise RuntimeError("No selected source exchange directories exist")
+
+    update_progress(stage="manifest")
+    manifest_cmd = ohlcv_pack_copy.build_manifest_command(
+        target=target, ssh_args=ssh_args, destination_root=destination_root, storages=storages,
+    )
+    try:
+        remote = ohlcv_pack_copy.decode_manifest(_run_ohlcv_copy_capture(job_path, manifest_cmd, "remote manifest"))
+    except (ValueError, TypeError) as exc:
+        raise RuntimeError(f"remote manifest is unreadable: {exc}") from exc
+
+    entries: list[tuple[str, str]] = []
+    exchange_stats: list[dict[str, Any]] = []
+    for exchange in copied:
+        meta = OHLCV_COPY_EXCHANGES[exchange]
+        storage = meta["storage"]
+        try:
+            checksums = catalog_file_checksums(storage)
+        except ValueError:
+            checksums = {}
+        local = ohlcv_pack_copy.local_manifest(source_root / storage, checksums)
+        plan = ohlcv_pack_copy.plan_pack(local, remote.get(storage) or {})
+        entries.extend((storage, rel) for rel, _size in plan)
+        remote_dir = _remote_ohlcv_copy_dir(destination_root, storage)
+        exchange_stats.append(
+            {
+                "exchange": exchange,
+                "label": meta["label"],
+                "remote_path": f"{target}:{remote_dir}/",
+                "files_total": len(local),
+                "files_transferred": len(plan),
+                "total_size_bytes": sum(item[0] for item in local.values()),
+                "transfer_size_bytes": sum(size for _rel, size in plan),
+                "bytes_sent": 0,
+                "bytes_received": 0,
+            }
+        )
+        _append_to_job_log(
+            job_id,
+            f"{meta['label']} plan  files={len(plan)}/{len(local)}  size={_fmt_bytes_short(exchange_stats[-1]['transfer_size_bytes'])}  checksummed={len(checksums)}",
+        )
+
+    totals: dict[str, Any] = {"remote_paths": [item["remote_path"] for item in exchange_stats], "exchange_stats": exchange_stats}
+    for key in ("files_total", "files_transferred", "total_size_bytes", "transfer_size_bytes", "bytes_sent", "bytes_received"):
+        totals[key] = sum(int(item[key]) for item in exchange_stats)
+    files_planned = int(totals["files_transferred"])
+    bytes_planned = int(totals["transfer_size_bytes"])
+
+    if dry_run:
+        last_result = _build_ohlcv_copy_dry_run_result(
+            totals, copied=copied, skipped=skipped, duration_s=int(max(0, time.time() - started_ts)),
+        )
+        last_result["transport"] = transport
+        update_progress(stage="done", copied_exchanges=list(copied), skipped_exchanges=list(skipped), last_result=last_result)
+        append_exchange_download_log("ohlcv", f"[ohlcv_copy_dry_run] pack plan for {target}:{destination_root}/ files={files_planned} size={_fmt_bytes_short(bytes_planned)}")
+        _append_to_job_log(job_id, f"job finished  dry_run_exchanges={len(copied)}  skipped={len(skipped)}  duration={int(time.time()-started_ts)}s")
+        return
+
+    update_progress(stage="pack", files_planned=files_planned, bytes_planned=bytes_planned, **ohlcv_pack_copy.pack_rates(0, 0, 0))
+    stats = ohlcv_pack_copy.pack_rates(0, 0, 0)
+    if entries:
+        apply_cmd = ohlcv_pack_copy.build_apply_command(
+            target=target, ssh_args=ssh_args, destination_root=destination_root, storages=storages,
+        )
+        _append_to_job_log(job_id, f"  pack stream starting  files={files_planned}  size={_fmt_bytes_short(bytes_planned)}")
+        next_cancel_check = 0.0
+
+        def stop_check() -> bool:
+            nonlocal next_cancel_check
+            if _STOP:
+                return True
+            now = time.monotonic()
+            if now < next_cancel_check:
+                return False
+            next_cancel_check = now + 0.5
+            return _is_cancel_requested(job_path)
+
+        def on_progress(rates: dict[str, Any]) -> None:
+            update_progress(stage="pack", files_planned=files_planned, bytes_planned=bytes_planned, **rates)
+
+        proc = subprocess.Popen(
+            apply_cmd,
+            cwd=str(Path(__file__).resolve().parent),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            start_new_session=True,
+        )
+        try:
+            try:
+                stats = ohlcv_pack_copy.write_pack(proc.stdin, source_root, entries, progress_cb=on_progress, stop_check=stop_check)
+                proc.stdin.close()
+            except BrokenPipeError:
+                pass
+            except RuntimeError:
+                _terminate_ohlcv_copy_process(proc)
+                raise
+            output = proc.stdout.read().decode("utf-8", errors="replace") if proc.stdout else ""
+            proc.wait()
+            lines = [line.strip() for line in output.splitlines() if line.strip()]
+            for line in lines[:-1]:
+                _append_to_job_log(job_id, f"    {line}")
+            if proc.returncode != 0:
+                raise RuntimeError(f"pack stream failed with exit code {proc.returncode}: {lines[-1] if lines else 'no output'}")
+            try:
+                applied = json.loads(lines[-1]) if lines else {}
+            except ValueError:
+                applied = {}
+            if int(applied.get("files") or 0) != int(stats.get("files_sent") or 0):
+                raise RuntimeError(f"pack stream incomplete: sent={stats.get('files_sent')} applied={applied.get('files')}")
+        finally:
+            if proc.poll() is None:
+                _terminate_ohlcv_copy_process(proc)
+        _append_to_job_log(
+            job_id,
+            f"  pack stream done  files={stats['files_sent']}  size={_fmt_bytes_short(stats['bytes_sent'])}  "
+            f"rate={_fmt_bytes_short(stats['throughput_bps'])}/s  files_per_s={stats['files_per_s']}  vanished={stats.get('files_missing', 0)}",
+        )
+
+    duration_s = int(max(0, time.time() - started_ts))
+    last_result = {
+        "copied": len(copied),
+        "skipped": len(skipped),
+        "duration_s": duration_s,
+        "transport": transport,
+        "files_planned": files_planned,
+        "bytes_planned": bytes_planned,
+        "files_sent": int(stats["files_sent"]),
+        "bytes_sent": int(stats["bytes_sent"]),
+        "throughput_bps": int(stats["throughput_bps"]),
+        "files_per_s": stats["files_per_s"],
+    }
+    update_progress(stage="done", copied_exchanges=list(copied), skipped_exchanges=list(skipped), last_result=last_result)
+    append_exchange_download_log(
+        "ohlcv",
+        f"[ohlcv_copy] pack copied {stats['files_sent']} files ({_fmt_bytes_short(stats['bytes_sent'])}) to {target}:{destination_root}/",
+    )
+    _append_to_job_log(job_id, f"job finished  copied={len(copied)}  skipped={len(skipped)}  files={stats['files_sent']}  duration={duration_s}s")
+
+
 def _run_hl_aws_l2book_auto(job_path: Path, payload: dict[str, Any]) -> None:
     job_id = job_path.stem
     profile = str(payload.get("profile") or "pbgui-hyperliquid").strip() or "pbgui-hyperliquid"
@@ -75,9 +75,11 @@ LOG_SAMPLE = """2026-03-30T12:10:14Z INFO Selected optimizer backend: pymoo
 """
 
 
-def test_optimize_log_parser_extracts_live_progress_fields():
+def test_optimize_log_parser_extracts_live_progress_fields(tmp_path):
     """Parse real optimize log lines into dashboard-ready progress fields."""
-    summary = optimize_v7._parse_optimize_log_summary(LOG_SAMPLE)
+    log_path = tmp_path / "job.log"
+    log_path.write_text(LOG_SAMPLE, encoding="utf-8")
+    summary = optimize_v7._log_progress.summary(log_path)
 
     assert summary["phase"] == "optimizing"
     assert summary["backend"] == "pymoo"
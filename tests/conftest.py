@@ -32,6 +32,15 @@ def isolate_test_logs(tmp_path, monkeypatch):
     monkeypatch.setattr(logging_helpers, "LOG_ROOT", tmp_path / "logs")
 
 
+@pytest.fixture(autouse=True)
+def isolate_shared_rate_budgets(tmp_path, monkeypatch):
+    """Keep cross-process rate-limit buckets out of the production runtime tree."""
+
+    import rate_limit_budget
+
+    monkeypatch.setattr(rate_limit_budget, "DEFAULT_SHARED_BUDGET_PATH", tmp_path / "rate_limits" / "budgets.db")
+
+
 @pytest.fixture(autouse=True)
 def skip_production_startup_migrations(monkeypatch):
     """Prevent ordinary lifespan tests from touching runtime migration state."""
@@ -45,6 +54,12 @@ def skip_production_startup_migrations(monkeypatch):
         )
 
 
+@pytest.fixture(autouse=True)
+def cold_pb8_helpers(monkeypatch):
+    """Keep PB8 client tests on the one-interpreter-per-call path by default."""
+    monkeypatch.setenv("PBGUI_PB8_HELPER_POOL", "0")
+
+
 def _mock_normalize_symbol(symbol, symbol_mappings=None):
     """Return a lightweight normalized symbol for fallback test mocks."""
     base = str(symbol or "").strip().upper()
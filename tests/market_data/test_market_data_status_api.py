@@ -244,6 +244,17 @@ def test_copy_data_queue_payload_updates_changed_files() -> None:
     assert payload["exchanges"] == ["binance", "bybit"]
     assert payload["exchange_storage"]["binance"] == "binanceusdm"
     assert payload["destination_root"].endswith("/data/ohlcv")
+    assert payload["transport"] == "rsync"
+
+
+def test_copy_data_queue_payload_accepts_pack_transport() -> None:
+    """Copy Data payloads carry the pack transport and reject unknown ones."""
+
+    request = {"target": "optimizer", "ssh_command": "ssh", "exchanges": ["bybit"], "transport": "Pack"}
+    assert market_data_api._build_copy_data_queue_payload(request)["transport"] == "pack"
+
+    with pytest.raises(ValueError, match="transport"):
+        market_data_api._build_copy_data_queue_payload({**request, "transport": "scp"})
 
 
 def test_copy_data_queue_payload_rejects_target_inside_ssh_command() -> None:
@@ -2,7 +2,14 @@
 
 import asyncio
 
-from rate_limit_budget import EXCHANGE_RATE_LIMITS, RateLimitBudget, get_weight
+from rate_limit_budget import (
+    EXCHANGE_RATE_LIMITS,
+    AdaptiveRateController,
+    RateLimitBudget,
+    SharedRateLimitBudget,
+    get_weight,
+    parse_rate_limit_headers,
+)
 
 
 def test_hyperliquid_burst_capacity_covers_four_day_candle_snapshot() -> None:
@@ -19,4 +26,132 @@ def test_hyperliquid_budget_can_acquire_four_day_candle_snapshot_immediately() -
 
     acquired = asyncio.run(budget.acquire(weight=required_weight, timeout=0.01, tag="candle_snapshot_4d"))
 
-    assert acquired is True
\ No newline at end of file
+    assert acquired is True
+
+def test_shared_budget_is_one_bucket_across_instances(tmp_path) -> None:
+    path = tmp_path / "budgets.db"
+    now = [1000.0]
+    first = SharedRateLimitBudget("bybit", weight_per_minute=120, burst_capacity=60, path=path, clock=lambda: now[0])
+    second = SharedRateLimitBudget("bybit", weight_per_minute=120, burst_capacity=60, path=path, clock=lambda: now[0])
+
+    assert asyncio.run(first.acquire(weight=40, timeout=0.01, tag="a")) is True
+    assert asyncio.run(second.acquire(weight=40, timeout=0.01, tag="b")) is False
+    assert second.peek()["tokens"] == 20.0
+
+    now[0] += 20.0  # refill 1/s for (120 - 60) / 60
+    assert asyncio.run(second.acquire(weight=40, timeout=0.01, tag="b")) is True
+
+    state = first.peek()
+    assert state["backend"] == "shared"
+    assert state["total_consumed"] == 40
+    assert state["shared_total_consumed"] == 80
+    assert state["shared_requests_count"] == 2
+
+
+def test_shared_budget_keys_by_exchange_and_ip(tmp_path) -> None:
+    path = tmp_path / "budgets.db"
+    drained = SharedRateLimitBudget("binance", weight_per_minute=120, burst_capacity=30, path=path, clock=lambda: 1000.0)
+    assert asyncio.run(drained.acquire(weight=30, timeout=0.01)) is True
+
+    for other in (
+        SharedRateLimitBudget("okx", weight_per_minute=120, burst_capacity=30, path=path, clock=lambda: 1000.0),
+        SharedRateLimitBudget("binance", weight_per_minute=120, burst_capacity=30, ip="10.0.0.2", path=path, clock=lambda: 1000.0),
+    ):
+        assert asyncio.run(other.acquire(weight=30, timeout=0.01)) is True
+
+
+def test_shared_budget_falls_back_to_local_bucket_when_database_is_unusable(tmp_path) -> None:
+    blocker = tmp_path / "not-a-directory"
+    blocker.write_text("x")
+    budget = SharedRateLimitBudget("bybit", weight_per_minute=120, burst_capacity=60, path=blocker / "budgets.db")
+
+    assert asyncio.run(budget.acquire(weight=10, timeout=0.01)) is True
+    assert budget.peek()["backend"] == "local"
+
+
+def test_parse_rate_limit_headers_for_binance_and_bybit() -> None:
+    assert parse_rate_limit_headers("binance", {"X-MBX-USED-WEIGHT-1M": "1800"}) == {
+        "used": 1800, "limit": 2400, "window_s": 60.0,
+    }
+    assert parse_rate_limit_headers("bybit", {"X-Bapi-Limit": "50", "X-Bapi-Limit-Status": "45"}) == {
+        "used": 5, "limit": 50, "window_s": 1.0,
+    }
+    assert parse_rate_limit_headers("okx", {"X-MBX-USED-WEIGHT-1M": "1"}) is None
+    assert parse_rate_limit_headers("binance", {"Content-Type": "application/json"}) is None
+
+
+def test_adaptive_controller_shrinks_on_high_usage_and_recovers() -> None:
+    budget = RateLimitBudget(weight_per_minute=1200, burst_capacity=120)
+    controller = AdaptiveRateController("binance", budget)
+
+    controller.observe_headers({"x-mbx-used-weight-1m": "2300"})
+
+    assert budget.scale == 0.7
+    assert budget.refill_per_second == 0.7 * 18
+    assert budget.tokens == 84  # burst shrinks with the rate; headroom 100 is above it
+    controller.observe_headers({"x-mbx-used-weight-1m": "2390"})
+    assert budget.tokens == 10  # only the reported headroom is left
+
+    for _ in range(20):
+        controller.observe_headers({"x-mbx-used-weight-1m": "100"})
+    assert budget.scale == 1.0
+    assert budget.refill_per_second == 18
+
+    metrics = controller.metrics()
+    assert metrics["headroom"] == 2300
+    assert metrics["usage_pct"] == 4.2
+    assert metrics["effective_weight_per_minute"] == 1200
+
+
+def test_adaptive_controller_backs_off_shared_budget_for_all_processes(tmp_path) -> None:
+    path = tmp_path / "budgets.db"
+    now = [1000.0]
+    budget = SharedRateLimitBudget("bybit", weight_per_minute=1200, burst_capacity=40, path=path, clock=lambda: now[0])
+    other = SharedRateLimitBudget("bybit", weight_per_minute=1200, burst_capacity=40, path=path, clock=lambda: now[0])
+
+    AdaptiveRateController("bybit", budget).on_rate_limited()
+
+    state = other.peek()
+    assert state["scale"] == 0.5
+    assert state["tokens"] == 0
+    assert state["refill_per_second"] == round((1200 - 40) / 60 * 0.5, 1)
+    assert asyncio.run(other.acquire(weight=1, timeout=0.01)) is False
+
+
+def test_adaptive_controller_recovers_over_time_and_counts_headers_once() -> None:
+    now = [1000.0]
+    budget = RateLimitBudget(weight_per_minute=1200, burst_capacity=120)
+    controller = AdaptiveRateController("binance", budget, recovery_interval_s=30, clock=lambda: now[0])
+    headers = {"x-mbx-used-weight-1m": "2000"}
+
+    for _ in range(6):
+        controller.observe_headers(headers)
+    assert budget.scale == 0.7
+    assert controller.samples == 1
+
+    controller.on_rate_limited()
+    assert budget.scale == 0.35
+    now[0] += 29
+    controller.observe_headers(None)
+    assert budget.scale == 0.35
+    now[0] += 31 * 20
+    controller.observe_headers(None)
+    assert budget.scale == 1.0
+
+
+def test_rate_limited_exchange_without_usage_headers_keeps_configured_rate(tmp_path) -> None:
+    path = tmp_path / "budgets.db"
+    now = [1000.0]
+    budget = SharedRateLimitBudget("hyperliquid", weight_per_minute=1200, burst_capacity=240, path=path, clock=lambda: now[0])
+    budget.tune(0.125)  # persisted by an earlier release
+    budget.peek()
+
+    controller = AdaptiveRateController("hyperliquid", budget)
+    for _ in range(3):
+        controller.on_rate_limited()
+
+    state = SharedRateLimitBudget("hyperliquid", weight_per_minute=1200, burst_capacity=240, path=path, clock=lambda: now[0]).peek()
+    assert state["scale"] == 1.0
+    assert state["tokens"] == 0
+    assert state["refill_per_second"] == 16
+    assert controller.metrics()["rate_limited"] == 3
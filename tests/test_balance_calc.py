@@ -1,5 +1,7 @@
 """Regression tests for shared PB7/PB8 balance calculation."""
 
+import json
+import os
 from pathlib import Path
 
 from fastapi import HTTPException
@@ -313,3 +315,96 @@ def test_balance_calculator_errors_when_all_eligible_rows_lack_usable_numbers(mo
     result = balance_calc._calculate(config, "binance")
 
     assert "No eligible approved coins" in result["error"]
+
+
+def _config(approved, n_positions=2, twel=1.0, pct=0.1) -> dict:
+    return {
+        "live": {"strategy_kind": "grid", "approved_coins": approved},
+        "bot": {
+            "long": {
+                "risk": {"n_positions": n_positions, "total_wallet_exposure_limit": twel},
+                "strategy": {"grid": {"entry": {"initial_qty_pct": pct}}},
+            },
+            "short": {},
+        },
+    }
+
+
+def test_min_cost_table_is_reused_until_mapping_changes(tmp_path, monkeypatch) -> None:
+    """Repeated calculations share one parsed mapping and min-cost table per exchange."""
+    mapping_path = tmp_path / "binance" / "mapping.json"
+    mapping_path.parent.mkdir()
+    rows = [
+        {"coin": "BTC", "quote": "USDT", "active": True, "swap": True, "linear": True, "price_last": 100, "min_amount": 0.01},
+        {"coin": "ETH", "quote": "USDT", "active": True, "swap": True, "linear": True, "price_last": 10, "min_cost": 5},
+    ]
+    mapping_path.write_text(json.dumps(rows), encoding="utf-8")
+    monkeypatch.setattr(balance_calc, "COINDATA_DIR", tmp_path)
+    monkeypatch.setattr(balance_calc, "_MAPPING_CACHE", {})
+    monkeypatch.setattr(balance_calc, "_MIN_COST_TABLES", {})
+    builds = []
+    build = balance_calc._build_min_cost_table
+    monkeypatch.setattr(balance_calc, "_build_min_cost_table", lambda *args: builds.append(1) or build(*args))
+
+    first = balance_calc._calculate(_config("all"), "binance")
+    second = balance_calc._calculate(_config(["ETH"]), "binance")
+    assert len(builds) == 1
+    assert [item["coin"] for item in first["balance_long"]] == ["ETH", "BTC"]
+    assert second["balance_long"] == [{"coin": "ETH", "balance": 100.0}]
+
+    rows[1]["min_cost"] = 20
+    mapping_path.write_text(json.dumps(rows), encoding="utf-8")
+    os.utime(mapping_path, ns=(1, 1))
+    assert balance_calc._calculate(_config(["ETH"]), "binance")["balance_long"] == [{"coin": "ETH", "balance": 400.0}]
+    assert len(builds) == 2
+
+
+def test_calculate_many_matches_single_config_results(monkeypatch) -> None:
+    """The batched array path returns exactly what per-config calls return."""
+    rows = [
+        {"coin": f"C{i}", "quote": "USDT", "active": True, "swap": True, "linear": True, "price_last": 1 + i * 0.37, "min_amount": 3, "min_cost": i % 4}
+        for i in range(40)
+    ]
+    monkeypatch.setattr(balance_calc, "_load_mapping", lambda _exchange: rows)
+    configs = [_config("all"), _config(["C3", "C7", "MISSING"], 5, 2.0, 0.02), _config(["MISSING"]), _config("all", 0)]
+
+    batched = balance_calc._calculate_many(configs, "binance")
+
+    assert batched == [balance_calc._calculate(config, "binance") for config in configs]
+    assert "No eligible approved coins" in batched[2]["error"]
+    assert batched[3]["balance_long"] == [] and batched[3]["recommendation"] is None
+
+
+def test_calculate_instances_groups_configs_per_exchange(tmp_path, monkeypatch) -> None:
+    """All-instances calculation resolves each exchange and reports per-instance failures."""
+    run_v7 = tmp_path / "run_v7"
+    for name in ("a", "b"):
+        _write_instance(run_v7, name)
+    monkeypatch.setattr(balance_calc, "RUN_V7_DIR", run_v7)
+    monkeypatch.setattr(balance_calc, "RUN_V8_DIR", tmp_path / "run_v8")
+    config = _config(["BTC"])
+    config["live"]["user"] = "bybit_main"
+    monkeypatch.setattr(balance_calc, "load_pb7_config", lambda *_args, **_kwargs: config)
+
+    class FakeUsers:
+        def find_exchange(self, _user):
+            return "bybit"
+
+    monkeypatch.setattr(balance_calc, "Users", FakeUsers)
+    calls = []
+
+    def fake_many(configs, exchange):
+        calls.append((len(configs), exchange))
+        return [{"exchange": exchange, "recommendation": None} for _ in configs]
+
+    monkeypatch.setattr(balance_calc, "_calculate_many", fake_many)
+
+    result = balance_calc.calculate_instances({"instances": [
+        {"name": "a", "version": "v7"},
+        {"name": "b", "version": "v7", "exchange": "okx"},
+        {"name": "missing", "version": "v7"},
+    ]}, session=None)
+
+    assert calls == [(1, "bybit"), (1, "okx")]
+    assert [item.get("exchange") for item in result["results"]] == ["bybit", "okx", None]
+    assert "not found" in result["results"][2]["error"]
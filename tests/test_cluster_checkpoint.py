@@ -31,6 +31,7 @@ from master.cluster_checkpoint import (
     retention_preview,
     verify_shadow_checkpoint,
 )
+from master.cluster_oplog import actor_sequences, seal_actor_segments
 from master.cluster_state import (
     ClusterStateError,
     append_operation,
@@ -806,6 +807,61 @@ def test_prune_uses_cluster_seal_and_reconstructs_from_checkpoint(
     assert rebuild_materialized_state(root, write=False) == checkpoint["materialized"]
 
 
+def test_prune_unlinks_only_fully_eligible_oplog_segments(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """Sealed history is pruned segment by segment and stays replayable from the checkpoint."""
+
+    root = _cluster(tmp_path)
+    monkeypatch.setattr(
+        checkpoint_module,
+        "build_migration_seal",
+        lambda materialized: {
+            "schema_version": 1,
+            "status": "sealed",
+            "cluster_id": materialized["cluster_nodes"]["cluster_id"],
+            "active_node_ids": [NODE_ID],
+            "blockers": [],
+        },
+    )
+    append_operation(root, "STOP_INSTANCE", {"instance": "bot-a"}, created_at=NOW - DEFAULT_HISTORY_SECONDS - 50)
+    append_operation(root, "START_INSTANCE", {"instance": "bot-a"}, created_at=NOW - DEFAULT_HISTORY_SECONDS - 40)
+    append_operation(
+        root,
+        "SET_RETENTION_POLICY",
+        {
+            "generation": 1,
+            "parent_generation": 0,
+            "mode": "oplog",
+            "history_days": 7,
+        },
+        created_at=NOW - 60,
+    )
+    checkpoint = build_shadow_checkpoint(root, created_at=NOW - 30)
+    proposal = create_checkpoint_proposal(root, checkpoint, created_at=NOW - 200, expires_at=NOW + 200)
+    ack = create_checkpoint_ack(root, checkpoint, proposal, created_at=NOW - 190)
+    proof = create_checkpoint_commit_proof(root, checkpoint, proposal, [ack], created_at=NOW - 180)
+    activate_checkpoint(root, checkpoint, commit_proof=proof, activated_at=NOW - 10)
+    old_mtime = NOW - 8 * 24 * 60 * 60
+    for path in (root / "oplog").glob("*/*.json"):
+        os.utime(path, (old_mtime, old_mtime))
+    actor_dir = root / "oplog" / NODE_ID
+    seal_actor_segments(actor_dir, min_records=2, max_records=2)
+    seal_actor_segments(actor_dir, min_records=2, max_records=2)
+    assert sorted(path.name for path in actor_dir.iterdir()) == ["00000001-00000002.seg", "00000003-00000004.seg"]
+    assert actor_sequences(actor_dir) == {1, 2, 3, 4}
+
+    report = prune_operation_history(root, now=NOW)
+
+    assert report["status"] == "complete"
+    assert report["deleted_operations"] == 2
+    assert report["retained_operations"] == 2
+    assert sorted(path.name for path in actor_dir.iterdir()) == ["00000003-00000004.seg"]
+    assert actor_sequences(actor_dir) == {3, 4}
+    assert rebuild_materialized_state(root, write=False) == checkpoint["materialized"]
+
+
 def test_blob_gc_runs_automatically_without_a_stability_delay(
     monkeypatch: pytest.MonkeyPatch,
     tmp_path: Path,
@@ -877,6 +933,12 @@ def test_blob_gc_runs_automatically_without_a_stability_delay(
     assert third["deleted_blobs"] == 1
     assert not orphan.exists()
     assert not fresh.exists()
+    from master.cluster_blob_pack import decode_pack, reachable_pack_path
+
+    assert first["repack"]["status"] == "complete"
+    packed = decode_pack(reachable_pack_path(root / "config_blobs").read_bytes(), max_bytes=1024 * 1024)
+    assert f"sha256:{orphan_digest}" not in {blob_hash for _kind, blob_hash, _raw in packed}
+    assert len(packed) == third["reachable"]["config"]
 
 
 def test_retention_preview_projects_blob_gc_before_checkpoint_commit(tmp_path: Path) -> None:
@@ -0,0 +1,144 @@
+"""Tests for segmented PBCluster oplog storage."""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+from master import cluster_oplog
+from master.cluster_oplog import (
+    OplogError,
+    actor_sequences,
+    iter_actor_records,
+    max_sequence,
+    oplog_totals,
+    operation_location,
+    read_operation_range,
+    seal_actor_segments,
+    segment_paths,
+    write_segment,
+)
+
+
+ACTOR = "pbgui-node-00000000-0000-4000-8000-00000000000a"
+
+
+def _loose(actor_dir: Path, seq: int, *, mtime: int = 1_000) -> Path:
+    """Write one loose operation file with a deterministic receipt time."""
+
+    actor_dir.mkdir(parents=True, exist_ok=True)
+    path = actor_dir / f"{seq:08d}.json"
+    path.write_bytes(b'{"seq": %d}\n' % seq)
+    os.utime(path, (mtime + seq, mtime + seq))
+    return path
+
+
+def test_seal_folds_contiguous_run_and_keeps_records_readable(tmp_path: Path) -> None:
+    """Sealed records keep their bytes and receipt time; the gap tail stays loose."""
+
+    actor_dir = tmp_path / "oplog" / ACTOR
+    for seq in (1, 2, 3, 4, 5, 7):
+        _loose(actor_dir, seq)
+    before = [(record.seq, record.raw, record.first_seen_at) for record in iter_actor_records(actor_dir)]
+
+    stats = seal_actor_segments(actor_dir, min_records=3, max_records=3)
+
+    assert stats == {"segments": 1, "operations": 3, "bytes": stats["bytes"], "stale_files": 0}
+    assert [path.name for path in segment_paths(actor_dir)] == ["00000001-00000003.seg"]
+    assert sorted(path.name for path in actor_dir.glob("*.json")) == ["00000004.json", "00000005.json", "00000007.json"]
+    assert [(record.seq, record.raw, record.first_seen_at) for record in iter_actor_records(actor_dir)] == before
+    assert actor_sequences(actor_dir) == {1, 2, 3, 4, 5, 7}
+    assert max_sequence(actor_dir) == 7
+    assert operation_location(actor_dir, 2) == actor_dir / "00000001-00000003.seg"
+    assert operation_location(actor_dir, 6) is None
+    assert oplog_totals(tmp_path / "oplog", baseline={ACTOR: 2}) == (4, sum(len(raw) for seq, raw, _ in before if seq > 2))
+
+
+def test_range_read_merges_segment_and_loose_records(tmp_path: Path) -> None:
+    """Range reads span segment and loose storage and report absent sequences by omission."""
+
+    actor_dir = tmp_path / "oplog" / ACTOR
+    for seq in range(1, 6):
+        _loose(actor_dir, seq)
+    seal_actor_segments(actor_dir, min_records=3, max_records=3)
+    _loose(actor_dir, 7)
+
+    records = read_operation_range(actor_dir, 2, 8)
+
+    assert sorted(records) == [2, 3, 4, 5, 7]
+    assert records[3].in_segment and not records[4].in_segment
+    assert records[3].raw == b'{"seq": 3}\n'
+    assert [record.seq for record in iter_actor_records(actor_dir, after_seq=3)] == [4, 5, 7]
+
+
+def _seal_before_first_loose_read(monkeypatch, actor_dir: Path) -> None:
+    """Run a seal right after a reader has listed the actor directory."""
+
+    original = cluster_oplog._read_loose_record
+    sealed = []
+
+    def read(actor, seq, path):
+        if not sealed:
+            sealed.append(seal_actor_segments(actor_dir, min_records=3, max_records=3))
+        return original(actor, seq, path)
+
+    monkeypatch.setattr(cluster_oplog, "_read_loose_record", read)
+
+
+def test_range_read_finds_operations_sealed_during_the_read(tmp_path: Path, monkeypatch) -> None:
+    """A seal between listing segments and reading loose files does not report operations missing."""
+
+    actor_dir = tmp_path / "oplog" / ACTOR
+    for seq in range(1, 6):
+        _loose(actor_dir, seq)
+    _seal_before_first_loose_read(monkeypatch, actor_dir)
+
+    records = read_operation_range(actor_dir, 1, 6)
+
+    assert sorted(records) == [1, 2, 3, 4, 5]
+    assert records[1].in_segment and not records[4].in_segment
+
+
+def test_iteration_continues_from_segment_sealed_during_the_read(tmp_path: Path, monkeypatch) -> None:
+    """A seal after the directory listing does not raise or skip operations."""
+
+    actor_dir = tmp_path / "oplog" / ACTOR
+    for seq in range(1, 6):
+        _loose(actor_dir, seq)
+    _seal_before_first_loose_read(monkeypatch, actor_dir)
+
+    records = list(iter_actor_records(actor_dir))
+
+    assert [record.seq for record in records] == [1, 2, 3, 4, 5]
+    assert [record.in_segment for record in records] == [True, True, True, False, False]
+
+
+def test_interrupted_seal_leftovers_are_ignored_then_removed(tmp_path: Path) -> None:
+    """Loose copies covered by a segment do not duplicate records and are cleaned up."""
+
+    actor_dir = tmp_path / "oplog" / ACTOR
+    paths = [_loose(actor_dir, seq) for seq in (1, 2)]
+    write_segment(actor_dir, [(seq, path.read_bytes(), 0) for seq, path in zip((1, 2), paths)])
+
+    assert [record.seq for record in iter_actor_records(actor_dir)] == [1, 2]
+    assert all(record.in_segment for record in iter_actor_records(actor_dir))
+
+    stats = seal_actor_segments(actor_dir, min_records=2)
+
+    assert stats["stale_files"] == 2
+    assert list(actor_dir.glob("*.json")) == []
+
+
+def test_corrupt_segment_record_is_rejected(tmp_path: Path) -> None:
+    """Record checksums detect damaged segment bytes."""
+
+    actor_dir = tmp_path / "oplog" / ACTOR
+    segment = write_segment(actor_dir, [(1, b'{"seq": 1}\n', 0), (2, b'{"seq": 2}\n', 0)])
+    data = bytearray(segment.read_bytes())
+    data[14] ^= 0xFF
+    segment.write_bytes(bytes(data))
+
+    with pytest.raises(OplogError):
+        list(iter_actor_records(actor_dir))
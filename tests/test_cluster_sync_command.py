@@ -4,6 +4,7 @@ from __future__ import annotations
 
 import base64
 import hashlib
+import io
 import json
 import stat
 import sys
@@ -733,6 +734,60 @@ def test_get_ops_returns_bounded_operation_range(tmp_path: Path) -> None:
     assert payload["missing"] == [2]
 
 
+def test_get_op_ranges_reads_several_actor_ranges_in_one_request(tmp_path: Path) -> None:
+    """get-op-ranges answers every requested actor range in request order."""
+
+    root = _init_cluster(tmp_path)
+    op1 = _operation()
+    op3 = dict(op1)
+    op3.update({"op_id": f"{NODE_B}:00000003", "seq": 3, "node_id": NODE_A})
+    run_command(root, NODE_B, "put-ops", json.dumps({"operations": [op1, op3]}).encode("utf-8"))
+    request = {"ranges": [[NODE_B, 1, 1], [NODE_B, 2, 3]]}
+
+    payload = run_command(root, NODE_B, "get-op-ranges", json.dumps(request).encode("utf-8"))
+
+    assert [(item["from_seq"], item["status"]) for item in payload["ranges"]] == [(1, "ok"), (2, "ok")]
+    assert [item["seq"] for item in payload["ranges"][0]["operations"]] == [1]
+    assert [item["seq"] for item in payload["ranges"][1]["operations"]] == [3]
+    assert payload["ranges"][1]["missing"] == [2]
+    too_large = {"ranges": [[NODE_B, 1, 600], [NODE_A, 1, 600]]}
+    with pytest.raises(ClusterSyncCommandError, match="cannot exceed"):
+        run_command(root, NODE_B, "get-op-ranges", json.dumps(too_large).encode("utf-8"))
+
+
+def test_session_answers_pipelined_frames_in_order(tmp_path: Path) -> None:
+    """A session serves framed commands and skips chained commands after a failure."""
+
+    root = _init_cluster(tmp_path)
+    requests = io.BytesIO()
+    frames = [
+        ({"id": 1, "command": "get-state-vector"}, b""),
+        ({"id": 2, "command": "put-ops", "chain": True}, b"not json"),
+        ({"id": 3, "command": "get-state-vector", "chain": True}, b""),
+        ({"id": 4, "command": "session"}, b""),
+        ({"id": 5, "command": "put-ops"}, json.dumps({"operations": [_operation()]}).encode("utf-8")),
+    ]
+    for header, body in frames:
+        cluster_sync_command.write_session_frame(requests, header, body)
+    requests.seek(0)
+    responses = io.BytesIO()
+
+    handled = cluster_sync_command.serve_session(root, NODE_B, requests, responses)
+
+    responses.seek(0)
+    answers = []
+    while (frame := cluster_sync_command.read_session_frame(responses)) is not None:
+        answers.append(frame)
+    assert handled == 5
+    assert [header["id"] for header, _body, _size in answers] == [1, 2, 3, 4, 5]
+    assert [header["ok"] for header, _body, _size in answers] == [True, False, False, False, True]
+    assert json.loads(answers[0][1])["state_vector"][NODE_A] == 1
+    assert "skipped" in answers[2][0]["error"]
+    assert "nested" in answers[3][0]["error"]
+    assert json.loads(answers[4][1])["count"] == 1
+    assert load_operations(root, expected_cluster_id=CLUSTER_ID)[-1]["actor"] == NODE_B
+
+
 def test_put_op_rejects_foreign_cluster(tmp_path: Path) -> None:
     """put-op rejects operations from another cluster before writing."""
 
@@ -833,6 +888,75 @@ def test_missing_blobs_returns_only_absent_hashes_without_content(tmp_path: Path
     assert corrupted["missing"]["config"] == sorted([present, absent])
 
 
+def test_get_blob_pack_serves_wanted_blobs_and_manifest_files_in_one_pack(
+    monkeypatch: pytest.MonkeyPatch,
+    tmp_path: Path,
+) -> None:
+    """One have/want request returns manifests with their file blobs and defers overflow."""
+
+    from master.cluster_blob_pack import decode_pack, reachable_pack_path, write_reachable_pack
+
+    root = _init_cluster(tmp_path)
+    files = {"config.json": b'{"bot":1}', "override.json": b'{"coin":"BTC"}'}
+    file_hashes = {name: "sha256:" + hashlib.sha256(raw).hexdigest() for name, raw in files.items()}
+    manifest = json.dumps(
+        {"files": {name: {"sha256": blob_hash.removeprefix("sha256:"), "size": len(files[name])} for name, blob_hash in file_hashes.items()}},
+        sort_keys=True,
+    ).encode("utf-8")
+    manifest_hash = "sha256:" + hashlib.sha256(manifest).hexdigest()
+    for blob_hash, raw in [(manifest_hash, manifest), *((file_hashes[name], raw) for name, raw in files.items())]:
+        run_command(root, NODE_B, f"put-blob {blob_hash}", raw)
+    absent = "sha256:" + "f" * 64
+    request = {"want": {"config": sorted([manifest_hash, absent]), "secret": [], "sealed": []}, "expand_manifests": True}
+
+    payload = run_command(root, NODE_B, "get-blob-pack", json.dumps(request).encode("utf-8"))
+    entries = decode_pack(base64.b64decode(payload["pack_b64"]), max_bytes=1024 * 1024)
+
+    assert [blob_hash for _kind, blob_hash, _raw in entries][0] == manifest_hash
+    assert {blob_hash for _kind, blob_hash, _raw in entries} == {manifest_hash, *file_hashes.values()}
+    assert payload["missing"] == {"config": [absent], "secret": [], "sealed": []}
+    assert payload["deferred"] == {"config": [], "secret": [], "sealed": []}
+
+    # Served from the GC repack even after the loose file disappears.
+    write_reachable_pack(root / "config_blobs", [(manifest_hash, manifest)])
+    digest = manifest_hash.removeprefix("sha256:")
+    (root / "config_blobs" / "sha256" / digest[:2] / f"{digest}.json").unlink()
+    monkeypatch.setattr(cluster_sync_command, "MAX_BLOB_PACK_BYTES", len(manifest))
+    small = run_command(
+        root,
+        NODE_B,
+        "get-blob-pack",
+        json.dumps({"want": {"config": sorted([manifest_hash, *file_hashes.values()]), "secret": [], "sealed": []}}).encode("utf-8"),
+    )
+
+    assert reachable_pack_path(root / "config_blobs").is_file()
+    assert small["count"] == 1
+    assert sum(len(values) for values in small["deferred"].values()) == 2
+
+
+def test_reachable_pack_reads_and_verifies_only_wanted_blobs(tmp_path: Path) -> None:
+    """Served blobs are seeked through the offset index; other entries are never inflated."""
+
+    from master.cluster_blob_pack import decode_pack, read_reachable_pack, reachable_pack_path, write_reachable_pack
+
+    config_blobs = tmp_path / "config_blobs"
+    blobs = {("sha256:" + hashlib.sha256(raw).hexdigest()): raw for raw in (b'{"a":1}' * 50, b'{"b":2}' * 50, b'{"c":3}' * 50)}
+    write_reachable_pack(config_blobs, blobs.items())
+    first, second, third = sorted(blobs)
+    pack = reachable_pack_path(config_blobs)
+
+    assert [blob_hash for _kind, blob_hash, _raw in decode_pack(pack.read_bytes(), max_bytes=1024 * 1024)] == [first, second, third]
+    assert read_reachable_pack(config_blobs, [second, "sha256:" + "f" * 64]) == {second: blobs[second]}
+
+    # Damage the last blob's compressed bytes: only a request for it notices.
+    data = bytearray(pack.read_bytes())
+    data[-12] ^= 0xFF
+    pack.write_bytes(bytes(data))
+
+    assert read_reachable_pack(config_blobs, [first, second]) == {first: blobs[first], second: blobs[second]}
+    assert read_reachable_pack(config_blobs, [third]) == {}
+
+
 def test_missing_blobs_rejects_oversized_probe(tmp_path: Path) -> None:
     """Coverage probes have a strict per-command work bound."""
 
@@ -0,0 +1,169 @@
+"""Tests for CMC request coalescing and the persistent /info store."""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from cmc_coalescing import LOCK_STRIPES, CmcInfoStore, CmcRequestCoalescer, request_key
+
+
+def _payload(credits=1):
+    return {"status": {"error_code": 0, "credit_count": credits}, "data": [{"id": 1}]}
+
+
+def test_request_key_ignores_param_order_and_separates_endpoints() -> None:
+    assert request_key("listings", {"limit": 10, "start": 1}) == request_key("listings", {"start": 1, "limit": 10})
+    assert request_key("listings", {"limit": 10}) != request_key("metadata", {"limit": 10})
+    assert request_key("listings", {"limit": 10}) != request_key("listings", {"limit": 11})
+
+
+def test_reuse_window_coalesces_and_accounts_saved_credits(tmp_path) -> None:
+    now = [1000.0]
+    coalescer = CmcRequestCoalescer(tmp_path, clock=lambda: now[0])
+    calls = []
+
+    def fetcher():
+        calls.append(1)
+        return _payload(credits=25), 200, 1, None
+
+    assert coalescer.fetch("listings", {"limit": 5000}, fetcher, estimated_credits=25) == (_payload(25), 200, 1, None)
+    now[0] += 60
+    assert coalescer.fetch("listings", {"limit": 5000}, fetcher, estimated_credits=25) == (_payload(25), 200, 0, None)
+    now[0] += 61
+    coalescer.fetch("listings", {"limit": 5000}, fetcher, estimated_credits=25)
+
+    stats = coalescer.stats()
+    assert len(calls) == 2
+    assert (stats["upstream_calls"], stats["coalesced_calls"]) == (2, 1)
+    assert (stats["credits_spent"], stats["credits_saved"]) == (50.0, 25.0)
+    assert stats["endpoints"]["listings"]["credits_saved"] == 25.0
+
+
+def test_failed_or_invalid_responses_are_not_shared(tmp_path) -> None:
+    coalescer = CmcRequestCoalescer(tmp_path)
+    results = iter([(None, 429, 3, "rate limited"), (_payload(), 200, 1, None)])
+
+    assert coalescer.fetch("status", None, lambda: next(results), estimated_credits=0)[3] == "rate limited"
+    assert coalescer.fetch("status", None, lambda: next(results), estimated_credits=0)[2] == 1
+    refetched = coalescer.fetch("status", None, lambda: (_payload(2), 200, 1, None), estimated_credits=0, is_valid=lambda p: False)
+    assert refetched[0]["status"]["credit_count"] == 2
+
+
+def test_distinct_requests_share_a_fixed_set_of_lock_files(tmp_path) -> None:
+    coalescer = CmcRequestCoalescer(tmp_path)
+
+    for start in range(3 * LOCK_STRIPES):
+        coalescer.fetch("metadata", {"id": f"{start},{start + 1}"}, lambda: (_payload(), 200, 1, None), estimated_credits=1)
+
+    assert len(list((tmp_path / ".locks").iterdir())) <= LOCK_STRIPES
+
+
+def test_concurrent_identical_requests_make_one_upstream_call(tmp_path) -> None:
+    entered = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def fetcher():
+        calls.append(1)
+        entered.set()
+        assert release.wait(timeout=5)
+        return _payload(), 200, 1, None
+
+    # Separate instances sharing the cache dir join the same in-process flight.
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(CmcRequestCoalescer(tmp_path).fetch("metadata", {"id": "1"}, fetcher, estimated_credits=1, reuse_seconds=0)))
+        for _ in range(3)
+    ]
+    threads[0].start()
+    assert entered.wait(timeout=5)
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert len(calls) == 1
+    assert sorted(result[2] for result in results) == [0, 0, 1]
+    assert CmcRequestCoalescer(tmp_path).stats()["credits_saved"] == 2.0
+
+
+def test_upstream_call_does_not_block_other_requests_on_the_same_stripe(tmp_path) -> None:
+    stripe = lambda params: int(request_key("metadata", params)[:8], 16) % LOCK_STRIPES
+    first = {"id": "1"}
+    second = next({"id": str(i)} for i in range(2, 10_000) if stripe({"id": str(i)}) == stripe(first))
+    entered = threading.Event()
+    release = threading.Event()
+
+    def slow_fetcher():
+        entered.set()
+        assert release.wait(timeout=5)
+        return _payload(), 200, 1, None
+
+    coalescer = CmcRequestCoalescer(tmp_path)
+    slow = threading.Thread(target=lambda: coalescer.fetch("metadata", first, slow_fetcher, estimated_credits=1))
+    slow.start()
+    try:
+        assert entered.wait(timeout=5)
+        results = []
+        other = threading.Thread(
+            target=lambda: results.append(coalescer.fetch("metadata", second, lambda: (_payload(), 200, 1, None), estimated_credits=1))
+        )
+        other.start()
+        other.join(timeout=2)
+        assert [result[2] for result in results] == [1]
+        assert slow.is_alive()
+    finally:
+        release.set()
+        slow.join(timeout=5)
+
+
+def test_flight_owned_by_another_live_process_is_joined(tmp_path) -> None:
+    params = {"id": "1"}
+    key = request_key("metadata", params)
+    marker = tmp_path / "flights" / f"{key}.json"
+    marker.parent.mkdir(parents=True)
+    marker.write_text(json.dumps({"pid": os.getppid(), "token": "other"}), encoding="utf-8")
+    owner = CmcRequestCoalescer(tmp_path)
+
+    def finish_other_flight():
+        time.sleep(0.2)
+        owner._write_response(key, "metadata", _payload())
+        marker.unlink()
+
+    other = threading.Thread(target=finish_other_flight)
+    other.start()
+    calls = []
+    result = CmcRequestCoalescer(tmp_path).fetch(
+        "metadata", params, lambda: calls.append(1) or (_payload(), 200, 1, None), estimated_credits=1, reuse_seconds=0
+    )
+    other.join(timeout=5)
+
+    assert calls == [] and result[2] == 0
+
+
+def test_flight_marker_of_a_dead_process_is_taken_over(tmp_path) -> None:
+    dead = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True, check=True)
+    params = {"id": "1"}
+    marker = tmp_path / "flights" / f"{request_key('metadata', params)}.json"
+    marker.parent.mkdir(parents=True)
+    marker.write_text(json.dumps({"pid": int(dead.stdout), "token": "crashed"}), encoding="utf-8")
+
+    result = CmcRequestCoalescer(tmp_path).fetch("metadata", params, lambda: (_payload(), 200, 1, None), estimated_credits=1)
+
+    assert result[2] == 1
+    assert not marker.exists()
+
+
+def test_info_store_keeps_fresh_info_per_id(tmp_path) -> None:
+    store = CmcInfoStore(tmp_path / "info.db")
+
+    assert store.record_info({"1": {"notice": None}, "bad": {}}, now=1000) == 1
+    store.record_info({"2": {"notice": "x"}}, now=5000)
+    found, missing = store.info_records([1, 2, 3], max_age=3600, now=5500)
+    assert found == {"2": {"notice": "x"}}
+    assert missing == [1, 3]
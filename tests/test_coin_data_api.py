@@ -99,6 +99,23 @@ def test_state_contains_secret_free_pool_readiness(monkeypatch, tmp_path: Path)
     assert "secret" not in serialized
 
 
+def test_state_lists_mapping_refresh_durations_slowest_first(monkeypatch, tmp_path: Path) -> None:
+    """Per-exchange refresh durations from PBCoinData reach the page state."""
+    coindata_dir = tmp_path / "coindata"
+    coindata_dir.mkdir()
+    (coindata_dir / "mapping_refresh.json").write_text(json.dumps({
+        "binance": {"elapsed": 4.2, "ok": True, "timed_out": False, "finished_ts": 1.0},
+        "okx": {"elapsed": 900.5, "ok": False, "timed_out": True, "error": "deadline", "finished_ts": 1.0},
+    }), encoding="utf-8")
+    monkeypatch.setattr(coin_data_api, "COINDATA_DIR", coindata_dir)
+    monkeypatch.setattr(coin_data_api, "_new_coindata", lambda **kwargs: _FakeCoinData(True))
+
+    rows = coin_data_api._build_state()["meta"]["exchange_refresh"]
+
+    assert [(row["exchange"], row["state"]) for row in rows] == [("okx", "timeout"), ("binance", "ok")]
+    assert rows[1]["label"].startswith("binance: 4.2s ok")
+
+
 def test_services_key_status_uses_pool_without_legacy_api_key(monkeypatch) -> None:
     """Services status no longer blocks a pool-backed request on an empty compatibility property."""
     monkeypatch.setattr(
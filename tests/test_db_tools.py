@@ -3,7 +3,9 @@
 from __future__ import annotations
 
 import asyncio
+import base64
 import json
+import os
 import sqlite3
 import subprocess
 import sys
@@ -14,6 +16,7 @@ from pathlib import Path
 import pytest
 
 import Database as database_mod
+import db_changelog
 from PBData import PBData
 from api import db_tools
 from master import async_pool as async_pool_mod
@@ -166,6 +169,124 @@ def test_incremental_sync_helpers_copy_append_rows_and_replace_state(tmp_path: P
         assert conn.execute("SELECT COUNT(*) FROM executions WHERE user='alice'").fetchone()[0] == 2
 
 
+
+def _state_rows(paths: dict[str, Path], user: str) -> dict[str, list]:
+    with sqlite3.connect(paths[db_tools.MAIN_DB_NAME]) as conn:
+        return {
+            table: sorted(
+                conn.execute(f'SELECT {", ".join(db_changelog._columns(conn, table))} FROM "{table}" WHERE user = ?', (user,)).fetchall(),
+                key=repr,
+            )
+            for table in db_changelog.CHANGE_KEYS
+        }
+
+
+def test_state_tables_stream_change_log_batches_after_initial_sync(tmp_path: Path, monkeypatch) -> None:
+    """State tables are copied once, then only changed keys are shipped from the change log."""
+
+    source = _bundle(tmp_path, "cdc-source")
+    target = _bundle(tmp_path, "cdc-target")
+    with sqlite3.connect(source[db_tools.MAIN_DB_NAME]) as conn:
+        db_changelog.ensure_changelog(conn)
+    _insert_sample(source, "alice", "a1", 1000)
+    _insert_sample(source, "bob", "b1", 1000)
+
+    async def read(_target, users, after):
+        return db_tools._cdc_read_from_paths(source, users, after)
+
+    async def cursor(_target, source_log, scope):
+        return True, db_tools._cdc_cursor_from_paths(target, source_log, scope)
+
+    async def apply(_target, batch, scope, _temp_dir):
+        return db_tools._cdc_apply_to_paths(target, batch, scope)
+
+    monkeypatch.setattr(db_tools, "_cdc_read_for_target", read)
+    monkeypatch.setattr(db_tools, "_cdc_cursor_for_target", cursor)
+    monkeypatch.setattr(db_tools, "_cdc_apply_for_target", apply)
+    replicate = lambda: asyncio.run(db_tools._replicate_state_changes("local", "target", ["alice"], tmp_path))
+
+    first = replicate()
+    assert first["mode"] == "full"
+    for spec in db_tools.TABLE_SPECS:
+        if (spec.db_name, spec.table) in db_tools.CDC_SYNC_TABLES:
+            payload = db_tools._fetch_sync_rows_from_paths(source, spec, ["alice"], "state")
+            db_tools._apply_sync_rows_to_paths(target, spec, ["alice"], "state", payload)
+    db_tools._cdc_apply_to_paths(target, {"log_id": first["log_id"], "through": first["through"], "tables": {}}, first["scope"])
+
+    with sqlite3.connect(source[db_tools.MAIN_DB_NAME]) as conn:
+        for price in (101.0, 102.0, 103.0):
+            conn.execute("UPDATE prices SET price = ?, timestamp = timestamp + 1 WHERE user = 'alice'", (price,))
+        conn.execute("UPDATE position SET psize = 0.2, timestamp = 2000 WHERE user = 'alice'")
+        conn.execute("DELETE FROM orders WHERE user = 'alice'")
+        conn.execute("UPDATE prices SET price = 5.0 WHERE user = 'bob'")
+        conn.commit()
+
+    second = replicate()
+    assert second["mode"] == "cdc"
+    assert second["tables"]["prices"]["changes"] == 1
+    assert second["tables"]["orders"] == {"changes": 1, "fetched": 0, "inserted": 0, "skipped": 0, "deleted": 1}
+    assert "balances" not in second["tables"]
+    assert _state_rows(target, "alice") == _state_rows(source, "alice")
+    assert _state_rows(target, "bob")["prices"] == []
+
+    third = replicate()
+    assert (third["mode"], third["tables"], third["through"]) == ("cdc", {}, second["through"])
+
+    # Once a delete tombstone is pruned, a cursor behind it needs a full resync.
+    with sqlite3.connect(source[db_tools.MAIN_DB_NAME]) as conn:
+        conn.execute("INSERT INTO orders(symbol,timestamp,amount,price,side,uniqueid,user) VALUES('ETHUSDT',1,1,1,'buy','tmp','alice')")
+        conn.execute("DELETE FROM orders WHERE uniqueid = 'tmp'")
+        conn.commit()
+        assert db_changelog.prune(conn, retain_seconds=-1) == 2
+    assert replicate()["mode"] == "full"
+
+
+def test_change_batches_read_and_replace_rows_by_key_columns() -> None:
+    """Batches join changed keys column by column; NULL key parts still match on apply."""
+
+    schema = 'CREATE TABLE position (id INTEGER PRIMARY KEY, user TEXT, symbol TEXT, side TEXT, psize REAL)'
+    source = sqlite3.connect(":memory:")
+    target = sqlite3.connect(":memory:")
+    for conn in (source, target):
+        conn.execute(schema)
+        conn.execute('CREATE INDEX idx_position_key ON position(user, symbol, side)')
+        conn.executemany(
+            "INSERT INTO position(user, symbol, side, psize) VALUES (?, ?, ?, ?)",
+            [("alice", f"C{i}USDT", "long", 1.0) for i in range(50)] + [("alice", "XUSDT", None, 1.0)],
+        )
+    db_changelog.ensure_changelog(source)
+    after = db_changelog.log_state(source)["seq"]
+    source.execute("UPDATE position SET psize = 2.0 WHERE symbol = 'C7USDT'")
+    source.execute("DELETE FROM position WHERE symbol = 'XUSDT'")
+    source.commit()
+
+    batch = db_changelog.read_changes(source, ["alice"], after)
+    changes = {key: rows for key, _user, rows in batch["tables"]["position"]["changes"]}
+
+    assert changes == {'["alice","C7USDT","long"]': [["alice", "C7USDT", "long", 2.0]], '["alice","XUSDT",null]': []}
+    stats = db_changelog.apply_batch(target, batch, "scope")
+    assert stats["position"]["deleted"] == 2 and stats["position"]["inserted"] == 1
+    assert target.execute("SELECT COUNT(*), SUM(psize) FROM position").fetchone() == (50, 51.0)
+
+
+def test_change_log_logs_old_update_key_only_when_key_columns_change() -> None:
+    """A value-only update costs one log write; a key change also logs the old key as a delete."""
+
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE prices (id INTEGER PRIMARY KEY, symbol TEXT, timestamp INTEGER, price REAL, user TEXT)")
+    db_changelog.ensure_changelog(conn)
+    conn.execute("INSERT INTO prices(symbol, timestamp, price, user) VALUES ('BTCUSDT', 1, 1.0, 'alice')")
+    after = db_changelog.log_state(conn)["seq"]
+
+    conn.execute("UPDATE prices SET price = 2.0, timestamp = 2")
+    assert db_changelog.log_state(conn)["seq"] == after + 1
+
+    conn.execute("UPDATE prices SET symbol = 'ETHUSDT'")
+    assert db_changelog.log_state(conn)["seq"] == after + 3
+    changes = {key: rows for key, _user, rows in db_changelog.read_changes(conn, ["alice"], after)["tables"]["prices"]["changes"]}
+    assert changes == {'["alice","BTCUSDT"]': [], '["alice","ETHUSDT"]': [["ETHUSDT", 2, 2.0, "alice"]]}
+
+
 def test_write_json_item_honors_add_missing_and_replace_modes(tmp_path: Path, monkeypatch) -> None:
     """Dashboard/template writes skip existing files unless overwrite is requested."""
 
@@ -668,6 +789,88 @@ def test_remote_sync_scripts_fetch_apply_and_verify(tmp_path: Path) -> None:
     assert stats_payload["tables"]["pbgui.db:history"]["max_timestamp"] == 3000
 
 
+
+def test_execution_raw_blobs_sync_and_are_cleaned_up_with_the_user(tmp_path: Path) -> None:
+    """Compressed raw_json rows travel through the JSON sync payload and are deleted per user."""
+
+    blob = bytes(range(256))
+    roots = {}
+    for name in ("source", "target"):
+        (tmp_path / name / "data").mkdir(parents=True)
+        roots[name] = {db_name: tmp_path / name / "data" / db_name for db_name in db_tools.DB_FILE_NAMES}
+        for db_name, path in roots[name].items():
+            db_tools._ensure_schema(path, db_name)
+    with sqlite3.connect(roots["source"][db_tools.TRADES_DB_NAME]) as conn:
+        conn.execute(
+            "INSERT INTO execution_raw(user,exchange,trade_id,codec,data,timestamp) VALUES(?,?,?,?,?,?)",
+            ("alice", "bybit", "t1", "zlib", blob, 2000),
+        )
+    spec = next(spec for spec in db_tools.TABLE_SPECS if spec.table == "execution_raw")
+    assert db_tools._sync_table_mode(spec) == "append"
+
+    fetched = subprocess.run(
+        [
+            sys.executable, "-c", db_tools._REMOTE_SYNC_FETCH_SCRIPT, db_tools.TRADES_DB_NAME, "execution_raw",
+            "user", "timestamp", "append", json.dumps(["alice"]), json.dumps({"alice": 0}),
+        ],
+        cwd=tmp_path / "source", text=True, capture_output=True, check=True,
+    )
+    payload = json.loads(fetched.stdout.strip().splitlines()[-1])
+    assert payload == json.loads(json.dumps(db_tools._fetch_sync_rows_from_paths(roots["source"], spec, ["alice"], "append", {"alice": 0})))
+    payload_file = tmp_path / "target" / "payload.json"
+    payload_file.write_text(json.dumps(payload), encoding="utf-8")
+    applied = subprocess.run(
+        [
+            sys.executable, "-c", db_tools._REMOTE_SYNC_APPLY_SCRIPT, db_tools.TRADES_DB_NAME, "execution_raw",
+            "user", "append", json.dumps(["alice"]), str(payload_file),
+        ],
+        cwd=tmp_path / "target", text=True, capture_output=True, check=True,
+    )
+    assert json.loads(applied.stdout.strip().splitlines()[-1])["inserted"] == 1
+    assert db_tools._apply_sync_rows_to_paths(roots["target"], spec, ["alice"], "append", payload)["skipped"] == 1
+    with sqlite3.connect(roots["target"][db_tools.TRADES_DB_NAME]) as conn:
+        assert conn.execute("SELECT data FROM execution_raw WHERE trade_id = 't1'").fetchone()[0] == blob
+
+    result = db_tools.delete_user_rows(roots["target"], ["alice"])
+    assert result["tables"]["pbgui_trades.db:execution_raw"] == 1
+
+
+def test_remote_change_log_scripts_read_apply_and_acknowledge(tmp_path: Path) -> None:
+    """Remote CDC helpers ship a compressed batch and store the cursor with the rows."""
+
+    env = {**os.environ, "PYTHONPATH": str(Path(db_changelog.__file__).resolve().parent)}
+    source_dir = tmp_path / "source"
+    target_dir = tmp_path / "target"
+    bundles = {}
+    for root in (source_dir, target_dir):
+        (root / "data").mkdir(parents=True)
+        bundles[root] = {name: root / "data" / name for name in db_tools.DB_FILE_NAMES}
+        for db_name, path in bundles[root].items():
+            db_tools._ensure_schema(path, db_name)
+    with sqlite3.connect(bundles[source_dir][db_tools.MAIN_DB_NAME]) as conn:
+        db_changelog.ensure_changelog(conn)
+    _insert_sample(bundles[source_dir], "alice", "a1", 1000)
+
+    def run(cwd: Path, script: str, *args: str) -> dict:
+        result = subprocess.run([sys.executable, "-c", script, *args], cwd=cwd, env=env, text=True, capture_output=True, check=True)
+        return json.loads(result.stdout.strip().splitlines()[-1])
+
+    read = run(source_dir, db_tools._REMOTE_CDC_READ_SCRIPT, "0", json.dumps(["alice"]), "100")
+    assert read["supported"] is True
+    batch = db_changelog.decode_batch(base64.b64decode(read["batch"]))
+    assert set(batch["tables"]) == set(db_changelog.CHANGE_KEYS)
+    (target_dir / "batch.json.z").write_bytes(db_changelog.encode_batch(batch))
+
+    applied = run(target_dir, db_tools._REMOTE_CDC_APPLY_SCRIPT, "scope-a", "batch.json.z")
+    assert applied["tables"]["orders"]["inserted"] == 1
+    cursor = run(target_dir, db_tools._REMOTE_CDC_CURSOR_SCRIPT, batch["log_id"], "scope-a")
+    assert cursor == {"supported": True, "seq": read["state"]["seq"]}
+    assert _state_rows(bundles[target_dir], "alice") == _state_rows(bundles[source_dir], "alice")
+
+    # Targets without a migrated pbgui.db (no change log) report it instead of failing.
+    assert run(target_dir, db_tools._REMOTE_CDC_READ_SCRIPT, "-1", "[]", "100") == {"supported": False}
+
+
 def test_remote_read_helpers_use_remote_python(monkeypatch) -> None:
     """Remote read helpers invoke the remote SQL scripts and normalize their JSON output."""
 
@@ -578,6 +578,63 @@ class TestFetchExecutions:
         ]
 
 
+# ============================================================================
+# fetch_history_window() Tests
+# ============================================================================
+
+class TestFetchHistoryWindow:
+    """Test per-window income history fetching."""
+
+    def test_bybit_window_follows_cursor_and_paces_each_page(self):
+        """Bybit windows page through the cursor once per page, calling pace first."""
+        user = MagicMock()
+        user.key = "test_key"
+        user.name = "alice"
+        ex = Exchange("bybit", user=user)
+
+        class FakeBybitInstance:
+            def __init__(self):
+                self.calls = []
+
+            def is_unified_enabled(self):
+                return [False, True]
+
+            def iso8601(self, ts):
+                return str(ts)
+
+            def privateGetV5AccountTransactionLog(self, params=None):
+                self.calls.append(dict(params))
+                if params["cursor"] is None:
+                    rows = [{"type": "TRADE", "symbol": "BTCUSDT", "transactionTime": "1500", "change": "1.5", "id": "a"}]
+                    return {"result": {"nextPageCursor": "next", "list": rows}}
+                rows = [{"type": "SETTLEMENT", "symbol": "ETHUSDT", "transactionTime": "1600", "change": "-0.5", "id": "b"}]
+                return {"result": {"nextPageCursor": "", "list": rows}}
+
+        ex.instance = FakeBybitInstance()
+        paced = []
+
+        rows = ex.fetch_history_window(1000, 2000, pace=lambda: paced.append(1))
+
+        assert [call["cursor"] for call in ex.instance.calls] == [None, "next"]
+        assert all(call["startTime"] == 1000 and call["endTime"] == 2000 for call in ex.instance.calls)
+        assert len(paced) == 2
+        assert [row["uniqueid"] for row in rows] == ["a", "b"]
+
+    def test_history_lookback_clamps_to_exchange_maximum(self):
+        """Lookback is clamped to HISTORY_WINDOWS' maximum for the exchange."""
+        user = MagicMock()
+        user.key = "test_key"
+        ex = Exchange("binance", user=user)
+        ex.instance = MagicMock()
+        ex.instance.milliseconds.return_value = 10 ** 12
+        max_lookback = ExchangeModule.HISTORY_WINDOWS["binance"][0]
+
+        assert ex.history_lookback(None) == (10 ** 12 - max_lookback, 10 ** 12)
+        assert ex.history_lookback(1) == (10 ** 12 - max_lookback, 10 ** 12)
+        assert ex.history_lookback(10 ** 12 - 5) == (10 ** 12 - 5, 10 ** 12)
+        assert ex.supports_windowed_history()
+
+
 # ============================================================================
 # load_market() Tests
 # ============================================================================
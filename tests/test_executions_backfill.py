@@ -0,0 +1,166 @@
+"""Tests for the checkpointed executions backfill job."""
+
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import Database as database_mod
+import executions_backfill
+from api import jobs
+from executions_backfill import compress_raw_json, decompress_raw_json, run_backfill
+
+
+def _database(tmp_path, monkeypatch):
+    monkeypatch.setattr(database_mod, "_human_log", lambda *_args, **_kwargs: None)
+    monkeypatch.setattr(executions_backfill, "_log", lambda *_args, **_kwargs: None)
+    database = database_mod.Database.__new__(database_mod.Database)
+    database.db = tmp_path / "pbgui.db"
+    database.trades_db = tmp_path / "pbgui_trades.db"
+    database._write_lock = threading.Lock()
+    database._local = threading.local()
+    database.create_tables()
+    database.create_trades_tables()
+    return database
+
+
+def _execution(trade_id, ts, symbol="BTC/USDT:USDT"):
+    raw = {"id": trade_id, "timestamp": ts, "info": {"note": "x" * 200}}
+    return {
+        "symbol": symbol, "timestamp": ts, "side": "buy", "price": 1.0, "qty": 2.0, "fee": 0.01,
+        "realized_pnl": None, "order_id": f"o-{trade_id}", "trade_id": trade_id,
+        "raw_json": json.dumps(raw),
+    }
+
+
+class FakeExchange:
+    calls = []
+    fail_users = set()
+
+    def __init__(self, exchange, user):
+        self.user = user
+
+    def fetch_executions(self, since, symbols=None):
+        FakeExchange.calls.append((self.user.name, since, symbols))
+        if self.user.name in FakeExchange.fail_users:
+            raise RuntimeError("exchange down")
+        prefix = f"{self.user.name}-{(symbols or ['all'])[0]}"
+        return [_execution(f"{prefix}-{i}", 1_000 + i) for i in range(7)]
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def _reset_fake():
+    FakeExchange.calls = []
+    FakeExchange.fail_users = set()
+
+
+def test_raw_json_compression_round_trips() -> None:
+    text = json.dumps({"info": ["fill"] * 100})
+    codec, data = compress_raw_json(text)
+    assert codec == "zlib"
+    assert len(data) < len(text)
+    assert decompress_raw_json(codec, data) == text
+    with pytest.raises(ValueError):
+        decompress_raw_json("lzma", data)
+
+
+def test_store_executions_batches_and_moves_raw_json_to_blob_table(tmp_path, monkeypatch) -> None:
+    database = _database(tmp_path, monkeypatch)
+    batches = []
+    executions = [_execution(f"t{i}", 1_000 + i) for i in range(5)] + [{"trade_id": None}]
+
+    stored = database.store_executions(
+        "alice", "bybit", executions, batch_size=2, compress_raw=True,
+        on_batch=lambda prepared, inserted: batches.append((prepared, inserted)),
+    )
+
+    assert stored["prepared"] == 5 and stored["inserted"] == 5
+    assert batches == [(2, 2), (2, 2), (1, 1)]
+    conn = database._connect_trades()
+    assert conn.execute("SELECT COUNT(*) FROM executions WHERE raw_json IS NOT NULL").fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM execution_raw").fetchone()[0] == 5
+    assert json.loads(database.fetch_execution_raw_json("alice", "bybit", "t3"))["id"] == "t3"
+
+    again = database.store_executions("alice", "bybit", executions, batch_size=2)
+    assert again["inserted"] == 0
+
+
+def test_backfill_checkpoints_units_and_resumes_after_failure(tmp_path, monkeypatch) -> None:
+    database = _database(tmp_path, monkeypatch)
+    monkeypatch.setattr(database, "list_income_symbols", lambda *_args: ["BTCUSDT", "ETHUSDT"])
+    users = [
+        SimpleNamespace(name="alice", exchange="bybit"),
+        SimpleNamespace(name="bob", exchange="binance"),
+        SimpleNamespace(name="carol", exchange="unsupported"),
+    ]
+    FakeExchange.fail_users = {"alice"}
+    published = []
+    started_ms = int(time.time() * 1000) - 1
+
+    summary = run_backfill(
+        database, users, started_ms=started_ms, batch_size=3,
+        publish=published.append, exchange_factory=FakeExchange,
+    )
+
+    # bob/binance is split per income symbol; carol's exchange has no executions support.
+    assert [call[2] for call in FakeExchange.calls] == [None, ["BTCUSDT"], ["ETHUSDT"]]
+    assert summary["total"] == 3 and summary["completed"] == 3
+    assert summary["rows"] == 14 and summary["inserted"] == 14
+    assert len(summary["errors"]) == 1 and "alice/bybit" in summary["errors"][0]
+    assert summary["rows_per_sec"] >= 0
+    assert published[-1]["stage"].startswith("done")
+    assert database.get_execution_cursor("alice", "bybit") is None
+    assert database.get_execution_cursor("bob", "binance", "BTCUSDT")["rows"] == 7
+
+    # Retry of the same job: only the failed unit runs again.
+    FakeExchange.calls = []
+    FakeExchange.fail_users = set()
+    summary = run_backfill(database, users, started_ms=started_ms, exchange_factory=FakeExchange)
+    assert [call[0] for call in FakeExchange.calls] == ["alice"]
+    assert summary["skipped"] == 2 and not summary["errors"]
+
+    # A later job continues from the cursor (with overlap) instead of the full lookback.
+    FakeExchange.calls = []
+    cursor = database.get_execution_cursor("alice", "bybit")
+    run_backfill(database, users[:1], started_ms=int(time.time() * 1000) + 1, exchange_factory=FakeExchange)
+    assert FakeExchange.calls[0][1] == cursor["cursor_ts"] - executions_backfill.CURSOR_OVERLAP_MS
+
+
+def test_backfill_stops_between_units_when_cancelled(tmp_path, monkeypatch) -> None:
+    database = _database(tmp_path, monkeypatch)
+    users = [SimpleNamespace(name="alice", exchange="bybit"), SimpleNamespace(name="bob", exchange="bybit")]
+
+    with pytest.raises(executions_backfill.BackfillCancelled):
+        run_backfill(
+            database, users, started_ms=int(time.time() * 1000) - 1, exchange_factory=FakeExchange,
+            stop_check=lambda: bool(FakeExchange.calls),
+        )
+
+    # The cancel raised from the batch callback is not swallowed as a unit error.
+    assert [call[0] for call in FakeExchange.calls] == ["alice"]
+    assert database.get_execution_cursor("bob", "bybit") is None
+
+
+def test_backfill_endpoint_enqueues_one_active_job(monkeypatch) -> None:
+    captured = {}
+
+    def fake_enqueue(**kwargs):
+        captured.update(kwargs)
+        return SimpleNamespace(job_id="job-1", path="/tmp/job-1.json", created=True)
+
+    monkeypatch.setattr(jobs, "enqueue_unique_job", fake_enqueue)
+    result = jobs.enqueue_executions_backfill(
+        jobs.ExecutionsBackfillRequest(users=["alice", ""], compress_raw=True, batch_size=0), session=None,
+    )
+
+    assert result == {"success": True, "job_id": "job-1", "created": True}
+    assert captured["job_type"] == "executions_backfill"
+    assert captured["dedupe_key"] == "executions_backfill"
+    assert captured["payload"]["users"] == ["alice"]
+    assert captured["payload"]["compress_raw"] is True
+    assert captured["payload"]["batch_size"] == 500
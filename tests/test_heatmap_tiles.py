@@ -0,0 +1,128 @@
+"""Tests for the compact minute heatmap tiles."""
+
+import base64
+import struct
+import zlib
+from datetime import date
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import market_data
+from api import heatmap
+from api.auth import require_auth
+from api.heatmap_tiles import (
+    STATUS_HOLIDAY,
+    STATUS_MISSING,
+    STATUS_OUT_OF_SESSION,
+    build_status_matrix,
+    downsample,
+    encode_png,
+    minute_details,
+)
+
+DAY = date(2024, 3, 4)
+PRESENCE = {"20240304": {"00": {0: "api", 1: "best", 2: "other_exchange"}, "23": {59: "l2Book_mid"}}}
+
+
+def _png_rows(data: bytes) -> tuple[int, int, bytes, bytes]:
+    """Return (width, height, palette, pixel bytes) of a palette PNG."""
+    assert data[:8] == b"\x89PNG\r\n\x1a\n"
+    pos, chunks = 8, {}
+    while pos < len(data):
+        (length,) = struct.unpack(">I", data[pos:pos + 4])
+        kind = data[pos + 4:pos + 8]
+        body = data[pos + 8:pos + 8 + length]
+        assert struct.unpack(">I", data[pos + 8 + length:pos + 12 + length])[0] == zlib.crc32(kind + body)
+        chunks[kind] = body
+        pos += 12 + length
+    width, height, depth, color_type = struct.unpack(">IIBB", chunks[b"IHDR"][:10])
+    assert (depth, color_type) == (8, 3)
+    return width, height, chunks[b"PLTE"], zlib.decompress(chunks[b"IDAT"])
+
+
+def test_status_matrix_maps_sources_and_expected_gaps() -> None:
+    def day_gaps(day):
+        return {100, 101}, set(range(0, 600))
+
+    matrix = build_status_matrix(PRESENCE, [DAY, date(2024, 3, 5)], day_gaps)
+
+    assert matrix.shape == (2, 1440) and matrix.dtype == np.uint8
+    assert matrix[0, :4].tolist() == [1, 2, 3, STATUS_MISSING]
+    assert matrix[0, 1439] == 4
+    assert matrix[0, 100] == STATUS_HOLIDAY
+    assert matrix[0, 700] == STATUS_OUT_OF_SESSION
+    assert matrix[1, 0] == STATUS_MISSING
+
+
+def test_downsample_keeps_most_severe_status() -> None:
+    matrix = build_status_matrix(PRESENCE, [DAY])
+    matrix[0, 5:10] = 2
+    matrix[0, 7] = 3
+
+    assert downsample(matrix, 0) is matrix
+    fives = downsample(matrix, 1)
+    assert fives.shape == (1, 288)
+    assert fives[0, 0] == STATUS_MISSING  # one gap minute outweighs api/best
+    assert fives[0, 1] == 3
+    assert downsample(matrix, 3).shape == (1, 24)
+
+
+def test_png_round_trips_status_codes() -> None:
+    matrix = downsample(build_status_matrix(PRESENCE, [DAY, DAY]), 2)
+
+    width, height, palette, raw = _png_rows(encode_png(matrix))
+
+    assert (width, height) == (96, 2)
+    assert palette[:3] == bytes.fromhex("b23b3b")
+    rows = np.frombuffer(raw, dtype=np.uint8).reshape(height, width + 1)
+    assert rows[:, 0].tolist() == [0, 0]
+    assert np.array_equal(rows[:, 1:], matrix)
+
+
+def test_minute_details_report_source_and_status() -> None:
+    rows = minute_details(PRESENCE, DAY, 0, 4, lambda day: (set(), {0, 1, 2}))
+
+    assert rows == [
+        {"time": "00:00", "status": "api", "source": "api"},
+        {"time": "00:01", "status": "best", "source": "best"},
+        {"time": "00:02", "status": "other_exchange", "source": "other_exchange"},
+        {"time": "00:03", "status": "expected out-of-session gap", "source": None},
+    ]
+
+
+def test_tiles_endpoint_returns_range_matrix(monkeypatch) -> None:
+    calls = []
+
+    def presence(exchange, dataset, coin, start_day, end_day):
+        calls.append((start_day, end_day))
+        return {"days": {"20240301": {"00": {0: "api"}}, "20240402": {"00": {0: "best"}}}}
+
+    monkeypatch.setattr(market_data, "get_minute_presence_for_dataset", presence)
+    app = FastAPI()
+    app.include_router(heatmap.router, prefix="/heatmap")
+    app.dependency_overrides[require_auth] = lambda: None
+    client = TestClient(app)
+
+    body = client.get("/heatmap/minutes-tiles", params={
+        "exchange": "binance", "dataset": "1m", "coin": "BTC",
+        "start": "2024-03", "end": "2024-04", "zoom": 3, "encoding": "raw",
+    }).json()
+
+    assert calls == [("20240301", "20240430")]
+    assert body["error"] is None
+    assert len(body["days"]) == 33 and body["days"][0] == "20240301" and body["days"][-1] == "20240402"
+    assert (body["columns"], body["bucket_minutes"]) == (24, 60)
+    matrix = np.frombuffer(base64.b64decode(body["data"]), dtype=np.uint8).reshape(33, 24)
+    assert matrix[0, 0] == STATUS_MISSING and matrix[-1, 1] == STATUS_MISSING
+
+    detail = client.get("/heatmap/minutes-detail", params={
+        "exchange": "binance", "dataset": "1m", "coin": "BTC", "day": "20240402", "minutes": 2,
+    }).json()
+    assert detail["counts"] == {"best": 1, "missing": 1}
+
+    too_long = client.get("/heatmap/minutes-tiles", params={
+        "exchange": "binance", "dataset": "1m", "coin": "BTC", "start": "2020-01", "end": "2024-04",
+    }).json()
+    assert too_long["data"] is None and "36 months" in too_long["error"]
@@ -0,0 +1,217 @@
+"""Tests for the parallel windowed income-history fetcher and its checkpointing."""
+
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import Database as database_mod
+import history_fetch
+from history_fetch import HistoryWindowFetcher, merge_incomes, split_windows
+from rate_limit_budget import RateLimitBudget
+
+WEEK = 7 * 24 * 60 * 60 * 1000
+
+
+class FakeExchange:
+    """Window-capable exchange stub recording calls and peak concurrency."""
+
+    id = "bybit"
+
+    def __init__(self, fail_windows=(), delay=0.02):
+        self.instance = object()
+        self.user = SimpleNamespace(name="alice", exchange="bybit", key="k")
+        self.calls = []
+        self.paced = 0
+        self.fail_windows = set(fail_windows)
+        self.delay = delay
+        self._active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def fetch_history_window(self, start, end, pace=None):
+        if pace:
+            pace()
+        with self._lock:
+            self.paced += 1 if pace else 0
+            self.calls.append((start, end))
+            self._active += 1
+            self.peak = max(self.peak, self._active)
+        try:
+            time.sleep(self.delay)
+            if (start, end) in self.fail_windows:
+                raise RuntimeError("exchange down")
+            # Boundary row shared with the next window → must be deduplicated.
+            return [
+                {"symbol": "BTCUSDT", "timestamp": start + 1, "income": 1.0, "uniqueid": f"in-{start}"},
+                {"symbol": "BTCUSDT", "timestamp": end, "income": 2.0, "uniqueid": f"edge-{end}"},
+                {"symbol": "BTCUSDT", "timestamp": start, "income": 2.0, "uniqueid": f"edge-{start}"},
+            ]
+        finally:
+            with self._lock:
+                self._active -= 1
+
+
+def test_split_windows_is_anchored_at_since() -> None:
+    assert split_windows(0, 25, 10) == [(0, 10), (10, 20), (20, 30)]
+    assert split_windows(5, 5, 10) == [(5, 15)]
+    assert split_windows(10, 5, 10) == []
+    with pytest.raises(ValueError):
+        split_windows(0, 10, 0)
+
+
+def test_merge_incomes_dedupes_by_uniqueid_and_sorts() -> None:
+    rows = merge_incomes([
+        [{"uniqueid": "b", "timestamp": 2}, {"uniqueid": "a", "timestamp": 1}],
+        [{"uniqueid": 1, "timestamp": 3}, {"uniqueid": "b", "timestamp": 2}],
+        None,
+    ])
+    assert [row["uniqueid"] for row in rows] == ["a", "b", 1]
+
+
+def test_fetcher_runs_windows_concurrently_under_budget() -> None:
+    exchange = FakeExchange()
+    budget = RateLimitBudget(weight_per_minute=6000, burst_capacity=100)
+    seen = []
+
+    fetcher = HistoryWindowFetcher(
+        exchange,
+        window_ms=WEEK,
+        workers=4,
+        budget=budget,
+        on_window=lambda start, end, rows: seen.append((start, len(rows))),
+    )
+    rows = fetcher.run(0, 8 * WEEK - 1)
+
+    assert len(exchange.calls) == 8
+    assert exchange.peak > 1
+    assert exchange.paced == 8
+    assert budget.requests_count == 8
+    assert sorted(start for start, _ in seen) == [i * WEEK for i in range(8)]
+    # 8 interior rows + 9 distinct window edges
+    assert len(rows) == 17
+    assert [row["timestamp"] for row in rows] == sorted(row["timestamp"] for row in rows)
+
+
+def test_fetcher_skips_checkpointed_windows_and_reports_first_error() -> None:
+    exchange = FakeExchange(fail_windows={(2 * WEEK, 3 * WEEK)})
+    seen = []
+    fetcher = HistoryWindowFetcher(
+        exchange,
+        window_ms=WEEK,
+        skip={(0, WEEK)},
+        on_window=lambda start, end, rows: seen.append(start),
+    )
+
+    with pytest.raises(RuntimeError, match="exchange down"):
+        fetcher.run(0, 4 * WEEK - 1)
+
+    assert (0, WEEK) not in exchange.calls
+    # Every other window still completed and was checkpointed.
+    assert sorted(seen) == [WEEK, 3 * WEEK]
+
+
+def test_budget_timeout_aborts_window(monkeypatch) -> None:
+    monkeypatch.setattr(history_fetch, "BUDGET_TIMEOUT_S", 0.01)
+    exchange = FakeExchange()
+    budget = RateLimitBudget(weight_per_minute=61, burst_capacity=1)
+    budget.tokens = 0
+    fetcher = HistoryWindowFetcher(exchange, window_ms=WEEK, budget=budget)
+
+    with pytest.raises(history_fetch.HistoryBudgetTimeout):
+        fetcher.run(0, 0)
+    assert exchange.calls == []
+
+
+def _database(tmp_path, monkeypatch):
+    monkeypatch.setattr(database_mod, "_human_log", lambda *_args, **_kwargs: None)
+    database = database_mod.Database.__new__(database_mod.Database)
+    database.db = tmp_path / "pbgui.db"
+    database._write_lock = threading.Lock()
+    database._local = threading.local()
+    database.create_tables()
+    return database
+
+
+def test_update_history_resumes_windowed_fetch_after_failure(tmp_path, monkeypatch) -> None:
+    database = _database(tmp_path, monkeypatch)
+    now = 10 * WEEK
+    user = SimpleNamespace(name="alice", exchange="bybit", key="k")
+
+    class WindowExchange(FakeExchange):
+        def __init__(self, *_args, **_kwargs):
+            super().__init__(fail_windows=failing, delay=0)
+            created.append(self)
+
+        def supports_windowed_history(self):
+            return True
+
+        def history_lookback(self, since=None):
+            return (since or now - 4 * WEEK), now
+
+        def close(self):
+            pass
+
+    created = []
+    failing = {(7 * WEEK, 8 * WEEK)}
+    monkeypatch.setattr(database_mod, "Exchange", WindowExchange)
+    monkeypatch.setattr(database, "find_last_timestamp", lambda _user: 0)
+
+    database.update_history(user)
+
+    first = created[-1]
+    assert len(first.calls) == 5
+    plan_since, done = database.get_history_fetch_progress("alice", "bybit")
+    assert plan_since == now - 4 * WEEK
+    assert len(done) == 4
+    assert database.get_last_scan_ts("alice", "bybit") is None
+    stored = database._connect().execute("SELECT COUNT(*) FROM history").fetchone()[0]
+    assert stored > 0
+
+    # Resume: only the failed window is fetched again, then progress is cleared.
+    failing.clear()
+    database.update_history(user)
+
+    assert created[-1].calls == [(7 * WEEK, 8 * WEEK)]
+    assert database.get_history_fetch_progress("alice", "bybit") == (None, set())
+    assert database.get_last_scan_ts("alice", "bybit") is not None
+    uniqueids = [row[0] for row in database._connect().execute("SELECT uniqueid FROM history")]
+    assert len(uniqueids) == len(set(uniqueids)) == 5 + 6
+
+
+def test_resume_keeps_plan_when_lookback_clamps_and_clock_moves(tmp_path, monkeypatch) -> None:
+    database = _database(tmp_path, monkeypatch)
+    clock = {"now": 10 * WEEK}
+    user = SimpleNamespace(name="alice", exchange="bybit", key="k")
+
+    class ClampingExchange(FakeExchange):
+        def __init__(self, *_args, **_kwargs):
+            super().__init__(fail_windows=failing, delay=0)
+            created.append(self)
+
+        def supports_windowed_history(self):
+            return True
+
+        def history_lookback(self, since=None):
+            now = clock["now"]
+            return max(int(since or 0), now - 4 * WEEK), now
+
+        def close(self):
+            pass
+
+    created = []
+    failing = {(7 * WEEK, 8 * WEEK)}
+    monkeypatch.setattr(database_mod, "Exchange", ClampingExchange)
+    monkeypatch.setattr(database, "find_last_timestamp", lambda _user: 0)
+
+    database.update_history(user)
+    assert database.get_history_fetch_progress("alice", "bybit")[0] == 6 * WEEK
+
+    # The resumed run sees a later clock; the plan must not move with it.
+    failing.clear()
+    clock["now"] += 2 * 24 * 60 * 60 * 1000
+    database.update_history(user)
+
+    assert created[-1].calls == [(7 * WEEK, 8 * WEEK)]
+    assert database.get_history_fetch_progress("alice", "bybit") == (None, set())
@@ -0,0 +1,162 @@
+"""Tests for monthly income-history partitions, retention and incremental backups."""
+
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+import Database as database_mod
+import history_partitions
+from api import db_tools
+
+
+def _ms(year, month, day=1):
+    return int(datetime(year, month, day, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+NOW = _ms(2024, 5, 15)
+
+
+def _database(tmp_path, monkeypatch):
+    monkeypatch.setattr(database_mod, "_human_log", lambda *_args, **_kwargs: None)
+    monkeypatch.setattr(database_mod, "PBGDIR", tmp_path)
+    database = database_mod.Database.__new__(database_mod.Database)
+    (tmp_path / "data").mkdir(exist_ok=True)
+    database.db = tmp_path / "data" / "pbgui.db"
+    database._write_lock = threading.Lock()
+    database._local = threading.local()
+    database.create_tables()
+    return database
+
+
+def _add(database, user, ts, uniqueid, income=1.0):
+    database.add_history(database._connect(), ["BTCUSDT", ts, income, uniqueid, user])
+
+
+def _seed(database):
+    # Jan..May 2024; rows before April are archived with the default two hot months.
+    for month in range(1, 6):
+        for day in (2, 20):
+            _add(database, "alice", _ms(2024, month, day), f"a-{month}-{day}")
+        _add(database, "bob", _ms(2024, month, 10), f"b-{month}")
+
+
+def _count(database, sql="SELECT COUNT(*) FROM history", params=()):
+    return database._connect().execute(sql, params).fetchone()[0]
+
+
+def test_existing_history_table_is_migrated_into_view(tmp_path, monkeypatch) -> None:
+    path = tmp_path / "data" / "pbgui.db"
+    path.parent.mkdir()
+    with sqlite3.connect(path) as conn:
+        conn.execute(history_partitions._table_sql("history"))
+        conn.execute("INSERT INTO history VALUES (41, 'BTCUSDT', 1000, 1.5, 'u1', 'alice')")
+
+    database = _database(tmp_path, monkeypatch)
+    conn = database._connect()
+
+    kinds = dict(conn.execute("SELECT name, type FROM sqlite_master WHERE name IN ('history', 'history_live')"))
+    assert kinds == {"history": "view", "history_live": "table"}
+    assert conn.execute("SELECT id, income FROM history").fetchall() == [(41, 1.5)]
+    _add(database, "alice", 2000, "u2")
+    assert conn.execute("SELECT MAX(id) FROM history").fetchone()[0] == 42
+
+    # Restarting does not rebuild or duplicate anything.
+    database.create_tables()
+    assert _count(database) == 2
+
+
+def test_rotate_moves_closed_months_and_keeps_keys_unique(tmp_path, monkeypatch) -> None:
+    database = _database(tmp_path, monkeypatch)
+    _seed(database)
+    before = database._connect().execute("SELECT id, uniqueid FROM history ORDER BY id").fetchall()
+
+    moved = database.rotate_history_partitions(NOW)
+
+    assert moved == {"history_p202401": 3, "history_p202402": 3, "history_p202403": 3}
+    assert [p["name"] for p in database.list_history_partitions()] == list(moved)
+    assert _count(database, "SELECT COUNT(*) FROM history_live") == 6
+    assert database._connect().execute("SELECT id, uniqueid FROM history ORDER BY id").fetchall() == before
+    assert database.sum_income("alice", _ms(2024, 1), _ms(2024, 3, 31)) == 6.0
+
+    # Re-inserting an archived uniqueid is ignored; new ids continue after every partition.
+    _add(database, "alice", _ms(2024, 1, 2), "a-1-2")
+    _add(database, "alice", _ms(2024, 1, 25), "late")
+    assert _count(database) == 16
+    assert _count(database, "SELECT id FROM history WHERE uniqueid = 'late'") == max(i for i, _u in before) + 1
+
+    # A late row for an archived month is moved on the next rotation.
+    assert database.rotate_history_partitions(NOW) == {"history_p202401": 1}
+    assert database.rotate_history_partitions(NOW) == {}
+
+
+def test_retention_drops_whole_partitions_and_deletes_by_id(tmp_path, monkeypatch) -> None:
+    database = _database(tmp_path, monkeypatch)
+    _seed(database)
+    database.rotate_history_partitions(NOW)
+
+    # Feb is split by the cutoff; January is dropped as a whole partition.
+    assert database.delete_income_older_than(["ALL"], _ms(2024, 2, 15)) == 5
+    assert [p["name"] for p in database.list_history_partitions()] == ["history_p202402", "history_p202403"]
+    assert _count(database) == 10
+
+    # Per-user retention deletes only that user's rows; emptied partitions are dropped.
+    assert database.delete_income_older_than_user("bob", _ms(2024, 3, 31)) == 1
+    assert database.delete_income_older_than(["alice"], _ms(2024, 2, 28)) == 1
+    assert [p["name"] for p in database.list_history_partitions()] == ["history_p202403"]
+
+    ids = [row[0] for row in database._connect().execute(
+        "SELECT id FROM history WHERE uniqueid IN ('a-3-2', 'a-5-20')")]
+    assert database.delete_income_by_ids(ids) == 2
+    assert _count(database, "SELECT COUNT(*) FROM history WHERE uniqueid IN ('a-3-2', 'a-5-20')") == 0
+
+
+def test_incremental_backup_reuses_unchanged_partitions_and_restores(tmp_path, monkeypatch) -> None:
+    database = _database(tmp_path, monkeypatch)
+    _seed(database)
+    database.rotate_history_partitions(NOW)
+    partitions_dir = tmp_path / "data" / "backup" / "db" / "partitions"
+
+    first = database.backup_full_db()
+    assert len(list(partitions_dir.glob("history_p*.db"))) == 3
+    # The base only holds hot rows.
+    with sqlite3.connect(first) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM history").fetchone()[0] == 6
+
+    _add(database, "alice", _ms(2024, 2, 25), "late-feb")
+    database.rotate_history_partitions(NOW)
+    # Same-second backups share a name; keep the first one under an older name.
+    Path(first).rename(Path(first).with_name("pbgui-00000000-000000.db"))
+    second = database.backup_full_db(keep_last=1)
+    # Only February changed; the old February version is no longer referenced.
+    files = sorted(p.name.split("-")[0] for p in partitions_dir.glob("history_p*.db"))
+    assert files == ["history_p202401", "history_p202402", "history_p202403"]
+
+    database.delete_income_older_than(["ALL"], _ms(2025, 1))
+    assert _count(database) == 0
+    assert database.restore_db_from(second) is True
+
+    assert _count(database) == 16
+    assert _count(database, "SELECT COUNT(*) FROM history WHERE uniqueid = 'late-feb'") == 1
+    assert _count(database, "SELECT COUNT(*) FROM sqlite_master WHERE name = 'backup_partitions'") == 0
+
+
+def test_db_tools_cleanup_and_copy_work_on_partitioned_history(tmp_path, monkeypatch) -> None:
+    database = _database(tmp_path, monkeypatch)
+    _seed(database)
+    database.rotate_history_partitions(NOW)
+    source = {db_tools.MAIN_DB_NAME: database.db, db_tools.TRADES_DB_NAME: tmp_path / "src-trades.db"}
+    db_tools._ensure_schema(source[db_tools.TRADES_DB_NAME], db_tools.TRADES_DB_NAME)
+    target = {
+        db_tools.MAIN_DB_NAME: tmp_path / "dst-pbgui.db",
+        db_tools.TRADES_DB_NAME: tmp_path / "dst-trades.db",
+    }
+    for db_name, path in target.items():
+        db_tools._ensure_schema(path, db_name)
+
+    copied = db_tools.copy_user_rows(source, target, ["alice"], "add_missing")
+    assert copied["inserted"] == 10
+
+    result = db_tools.delete_user_rows(source, ["alice"], cutoff_ms=_ms(2024, 3, 31))
+    assert result["tables"]["pbgui.db:history"] == 6
+    assert db_tools.count_user_rows(source, ["alice"])["tables"]["pbgui.db:history"] == 4
@@ -0,0 +1,172 @@
+"""Tests for lazy PBApiServer router mounting and import-time reports."""
+
+import asyncio
+import json
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api import lazy_routers
+from api.lazy_routers import LazyRouterMiddleware, LazyRouterRegistry
+
+
+def _write_module(tmp_path: Path, monkeypatch, name: str, body: str) -> None:
+    (tmp_path / f"{name}.py").write_text(textwrap.dedent(body), encoding="utf-8")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, name, raising=False)
+
+
+def _app(registry: LazyRouterRegistry) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(LazyRouterMiddleware, registry=registry)
+    registry.bind(app)
+
+    @app.get("/api/eager")
+    def eager():
+        return {"eager": True}
+
+    return app
+
+
+def test_router_is_imported_and_mounted_on_first_request(tmp_path, monkeypatch) -> None:
+    _write_module(tmp_path, monkeypatch, "lazy_fake_router", """
+        from fastapi import APIRouter
+        router = APIRouter()
+        STARTED = []
+
+        @router.get("/items/{item}")
+        def item(item: str):
+            return {"item": item, "started": len(STARTED)}
+
+        def startup():
+            STARTED.append(1)
+    """)
+    registry = LazyRouterRegistry()
+    registry.register("fake", "lazy_fake_router", "/api/fake")
+    startup = registry.startup_hook("fake")
+    startup()  # lifespan runs before the module is loaded; the hook waits for the load
+    client = TestClient(_app(registry))
+
+    assert client.get("/api/eager").json() == {"eager": True}
+    assert "lazy_fake_router" not in sys.modules
+    assert client.get("/api/fake/items/a").json() == {"item": "a", "started": 1}
+    assert client.get("/api/fake/items/b").json() == {"item": "b", "started": 1}
+    # Prefix matching is per path segment.
+    assert client.get("/api/fakeish").status_code == 404
+
+    report = registry.report()["routers"][0]
+    assert report["status"] == "loaded"
+    assert report["trigger"] == "request"
+    assert registry.loaded_module("fake") is sys.modules["lazy_fake_router"]
+    assert any(route.path == "/api/fake/items/{item}" for route in client.app.routes)
+
+
+def test_failed_import_returns_503_and_is_retried(tmp_path, monkeypatch) -> None:
+    _write_module(tmp_path, monkeypatch, "lazy_broken_router", "raise ImportError('missing optional dependency')\n")
+    registry = LazyRouterRegistry()
+    registry.register("broken", "lazy_broken_router", "/api/broken")
+    client = TestClient(_app(registry))
+
+    response = client.get("/api/broken/x")
+    assert response.status_code == 503
+    assert "missing optional dependency" in response.json()["detail"]
+    assert registry.report()["routers"][0]["status"] == "failed"
+
+    _write_module(tmp_path, monkeypatch, "lazy_broken_router", """
+        from fastapi import APIRouter
+        router = APIRouter()
+
+        @router.get("/x")
+        def x():
+            return {"ok": True}
+    """)
+    assert client.get("/api/broken/x").json() == {"ok": True}
+
+
+def test_warmup_loads_only_warm_routers_and_shutdown_skips_unloaded(tmp_path, monkeypatch) -> None:
+    for name in ("lazy_warm_router", "lazy_cold_router"):
+        _write_module(tmp_path, monkeypatch, name, """
+            from fastapi import APIRouter
+            router = APIRouter()
+            STOPPED = []
+
+            async def shutdown():
+                STOPPED.append(1)
+        """)
+    registry = LazyRouterRegistry()
+    registry.register("warm", "lazy_warm_router", "/api/warm", warm=True)
+    registry.register("cold", "lazy_cold_router", "/api/cold")
+
+    async def scenario() -> None:
+        await registry.warm(delay=0)
+        await registry.shutdown_hook("warm")()
+        await registry.shutdown_hook("cold")()
+
+    asyncio.run(scenario())
+
+    assert sys.modules["lazy_warm_router"].STOPPED == [1]
+    assert "lazy_cold_router" not in sys.modules
+    assert [entry["trigger"] for entry in registry.report()["routers"]] == ["warmup", ""]
+
+
+IMPORTTIME_SAMPLE = """\
+import time: self [us] | cumulative | imported package
+import time:    100000 |     100000 |     numpy.core
+import time:    400000 |     500000 |   numpy
+import time:    200000 |     700000 | heavy_page
+import time:     50000 |      50000 |   small_helper
+import time:   1000000 |    1050000 | PBApiServer
+"""
+
+
+def test_importtime_profile_reports_chains_for_heavy_modules() -> None:
+    rows = lazy_routers.parse_importtime(IMPORTTIME_SAMPLE)
+    summary = lazy_routers.summarize_importtime(rows, ["PBApiServer", "heavy_page"])
+
+    assert summary["startup_ms"] == 1050.0
+    assert summary["roots"] == [
+        {"module": "PBApiServer", "cumulative_ms": 1050.0},
+        {"module": "heavy_page", "cumulative_ms": 700.0},
+    ]
+    assert summary["top_direct"] == [{"module": "small_helper", "cumulative_ms": 50.0}]
+    assert summary["heavy_modules"] == {"numpy": {"cumulative_ms": 500.0, "via": "heavy_page > numpy"}}
+    assert summary["top_self"][0]["module"] == "PBApiServer"
+
+
+def test_profile_history_is_bounded(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(lazy_routers, "PROFILE_HISTORY", 2)
+    monkeypatch.setattr(
+        lazy_routers.subprocess,
+        "run",
+        lambda *_args, **_kwargs: subprocess.CompletedProcess([], 0, "", IMPORTTIME_SAMPLE),
+    )
+
+    for version in ("a", "b", "c"):
+        lazy_routers.profile_imports(tmp_path, ["heavy_page"], version=version)
+
+    history = json.loads((tmp_path / "data" / "logs" / "api_import_profile.json").read_text(encoding="utf-8"))
+    assert [item["version"] for item in history] == ["b", "c"]
+    assert lazy_routers.load_profile_history(tmp_path)[-1]["startup_ms"] == 1050.0
+
+
+def test_api_server_import_leaves_heavy_routers_unloaded() -> None:
+    """Restarts must not pay for pandas-backed pages before serving."""
+    code = (
+        "import sys, PBApiServer\n"
+        "lazy = [e['module'] for e in PBApiServer._lazy_routers.report()['routers']]\n"
+        "print([m for m in lazy + ['pandas', 'passivbot_rust'] if m in sys.modules])\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=str(Path(__file__).resolve().parents[1]),
+        capture_output=True,
+        text=True,
+        timeout=240,
+    )
+
+    assert result.returncode == 0, result.stderr[-2000:]
+    assert result.stdout.strip().splitlines()[-1] == "[]"
@@ -22,6 +22,7 @@ PRINT_ALLOWLIST = {
     "task_worker.py": "Worker stdout is a machine-readable parent-process protocol.",
     "scripts/audit_hip3_missing_minutes.py": "Read-only data coverage audit CLI.",
     "scripts/bench_aws_l2book.py": "Download benchmark CLI.",
+    "scripts/bench_pb8_helper_pool.py": "PB8 helper latency benchmark CLI.",
     "scripts/compare_candle_sizes.py": "Storage comparison CLI.",
     "scripts/migrate_jsonl_to_npz.py": "Explicit candle migration CLI.",
     "scripts/probe_bybit_data.py": "Public market-data probe CLI.",
@@ -0,0 +1,164 @@
+"""Tests for the shared memory-mapped market metadata index."""
+
+import json
+import os
+
+import pytest
+
+import market_index
+from market_index import MarketEntry
+
+MARKETS = {
+    "BTC/USDT:USDT": {
+        "id": "BTCUSDT",
+        "lowercaseId": "btcusdt",
+        "symbol": "BTC/USDT:USDT",
+        "base": "BTC",
+        "quote": "USDT",
+        "swap": True,
+        "linear": True,
+        "active": True,
+        "contractSize": 1.0,
+        "created": 1569398400000,
+        "maker": 0.0002,
+        "taker": 0.0005,
+        "limits": {"amount": {"min": 0.001}, "cost": {"min": 5.0}},
+        "precision": {"amount": 0.001, "price": 0.1},
+    },
+    "1000PEPE/USDT:USDT": {
+        "id": "1000PEPEUSDT",
+        "symbol": "1000PEPE/USDT:USDT",
+        "base": "1000PEPE",
+        "quote": "USDT",
+        "swap": True,
+        "active": False,
+        "precision": {"amount": "1", "price": None},
+        "limits": {},
+    },
+    "broken": "not a market",
+}
+
+
+def _write(tmp_path, **kwargs):
+    path = tmp_path / "markets.idx"
+    entries = market_index.entries_from_ccxt_markets(MARKETS, {"1000PEPEUSDT": "PEPE"})
+    market_index.write_index(path, entries, **kwargs)
+    return path
+
+
+def test_lookups_by_every_identifier(tmp_path) -> None:
+    index = market_index.MarketIndex(_write(tmp_path))
+
+    assert len(index) == 2
+    btc = index.market("BTCUSDT")
+    assert btc == index.market("btcusdt") == index.market("BTC/USDT:USDT")
+    assert (btc.price_step, btc.qty_step, btc.min_qty, btc.min_cost) == (0.1, 0.001, 0.001, 5.0)
+    assert (btc.maker, btc.taker, btc.maker_fee, btc.inception_ms) == (0.0002, 0.0005, None, 1569398400000)
+    pepe = index.market("1000PEPE/USDT:USDT")
+    assert pepe == MarketEntry(
+        symbol="1000PEPEUSDT", ccxt_symbol="1000PEPE/USDT:USDT", coin="PEPE", base="1000PEPE", quote="USDT",
+        qty_step=1.0, swap=True, active=False,
+    )
+    assert index.market("ETHUSDT") is None
+    assert index.market("") is None
+
+
+def test_coin_symbols_resolve_with_and_without_market_rows(tmp_path) -> None:
+    path = _write(tmp_path, coin_symbols={"PEPE": "1000PEPEUSDT", "CAT": "CATUSDT"})
+    index = market_index.MarketIndex(path)
+
+    assert index.symbol_for_coin("pepe") == "1000PEPEUSDT"
+    # Mapping rows without a ccxt market get a bare record.
+    assert index.symbol_for_coin("CAT") == "CATUSDT"
+    assert index.market("CATUSDT") is None
+    assert index.symbol_for_coin("BTC") is None
+
+
+def test_open_index_follows_replacements_and_rejects_foreign_files(tmp_path) -> None:
+    source = tmp_path / "ccxt_markets.json"
+    source.write_text("{}", encoding="utf-8")
+    signature = market_index.source_signature(source)
+    path = _write(tmp_path, signature=signature)
+    first = market_index.open_index(path)
+
+    assert market_index.open_index(path) is first
+    assert first.matches(signature)
+    source.write_text("{} ", encoding="utf-8")
+    assert not first.matches(market_index.source_signature(source))
+
+    market_index.write_index(path, [(MarketEntry(symbol="ETHUSDT"), ["ETHUSDT"])])
+    second = market_index.open_index(path)
+    assert second is not first and second.market("ETHUSDT") is not None
+    # Readers holding the old mapping keep working after the replace.
+    assert first.market("BTCUSDT") is not None
+
+    path.write_bytes(b"JUNK" + bytes(100))
+    assert market_index.open_index(path) is None
+    with pytest.raises(market_index.MarketIndexError):
+        market_index.MarketIndex(path)
+
+
+def test_ensure_index_builds_once_per_source_version(tmp_path, monkeypatch) -> None:
+    source = tmp_path / "markets.json"
+    source.write_text(json.dumps(MARKETS), encoding="utf-8")
+    target = tmp_path / "index" / "pb7_binance.idx"
+    builds = []
+    write_index = market_index.write_index
+    monkeypatch.setattr(market_index, "write_index", lambda *a, **k: builds.append(1) or write_index(*a, **k))
+
+    assert market_index.ensure_index(source, target).market("BTCUSDT").min_cost == 5.0
+    assert market_index.ensure_index(source, target).market("BTCUSDT").min_cost == 5.0
+    assert len(builds) == 1
+
+    changed = dict(MARKETS)
+    changed["BTC/USDT:USDT"] = {**MARKETS["BTC/USDT:USDT"], "limits": {"cost": {"min": 100.0}}}
+    source.write_text(json.dumps(changed), encoding="utf-8")
+    os.utime(source, ns=(1, 1))
+    assert market_index.ensure_index(source, target).market("BTCUSDT").min_cost == 100.0
+    assert len(builds) == 2
+    assert market_index.ensure_index(tmp_path / "missing.json", target) is None
+
+
+def test_strategy_explorer_lookups_match_json_index(tmp_path, monkeypatch) -> None:
+    from api import strategy_explorer_core as core
+
+    caches = tmp_path / "pb7" / "caches" / "binanceusdm"
+    caches.mkdir(parents=True)
+    (caches / "markets.json").write_text(json.dumps(MARKETS), encoding="utf-8")
+    monkeypatch.setattr(core, "pb7dir", lambda: str(tmp_path / "pb7"))
+    monkeypatch.setattr(core, "PBGDIR", tmp_path)
+
+    json_index = {}
+    for key, market in MARKETS.items():
+        if isinstance(market, dict):
+            for k in [key] + [market[k] for k in ("id", "lowercaseId", "symbol") if market.get(k)]:
+                json_index[k] = market
+    for symbol in ("BTC", "BTCUSDT", "BTC/USDT:USDT", "btcusdt", "1000PEPEUSDT", "DOGE"):
+        json_key = next((k for k in core._market_lookup_keys(symbol) if k in json_index), None)
+        entry, key = core._match_market_key(core._market_metadata_index("binanceusdm"), symbol)
+        assert key == json_key, symbol
+        assert (entry is None) == (json_key is None), symbol
+    params = core._derive_exchange_params_from_market("binanceusdm", "BTC")
+    assert params == {"price_step": 0.1, "qty_step": 0.001, "min_qty": 0.001, "min_cost": 5.0, "c_mult": 1.0}
+    assert core._derive_exchange_fees_from_market("binanceusdm", "BTCUSDT") == {"maker_fee": 0.0002, "taker_fee": 0.0005}
+    assert (tmp_path / "data" / "market_index" / "pb7_binanceusdm.idx").exists()
+
+
+def test_fee_lookups_keep_their_key_precedence(tmp_path, monkeypatch) -> None:
+    from api import strategy_explorer_core as core
+
+    caches = tmp_path / "pb7" / "caches" / "binanceusdm"
+    caches.mkdir(parents=True)
+    markets = {"BTC/USDT:USDT": {**MARKETS["BTC/USDT:USDT"], "maker_fee": 0.0001, "taker_fee": 0.0004}}
+    (caches / "markets.json").write_text(json.dumps(markets), encoding="utf-8")
+    monkeypatch.setattr(core, "pb7dir", lambda: str(tmp_path / "pb7"))
+    monkeypatch.setattr(core, "PBGDIR", tmp_path)
+
+    # Simulation fees prefer ccxt's maker/taker, the explorer's fee params the explicit keys.
+    assert core._infer_maker_taker_fees("binanceusdm", "BTC") == (0.0002, 0.0005)
+    assert core._derive_exchange_fees_from_market("binanceusdm", "BTC") == {"maker_fee": 0.0001, "taker_fee": 0.0004}
+
+    debug = core._market_metadata_source_debug("binanceusdm", "BTC")
+    assert (debug["index_source"], debug["index_size"], debug["matched_key"]) == ("pb7", 1, "BTC/USDT:USDT")
+    assert debug["market_snapshot"]["fees"] == {"maker": 0.0002, "taker": 0.0005, "maker_fee": 0.0001, "taker_fee": 0.0004}
+    assert debug["derived"]["min_cost_from_limits.cost.min"] == 5.0
@@ -0,0 +1,101 @@
+"""Tests for the msgpack content negotiation used by high-volume endpoints."""
+
+from pathlib import Path
+from types import SimpleNamespace
+
+import msgpack
+import numpy as np
+
+from api import dashboard
+from api.msgpack_transport import (
+    COLUMNAR_MARKER,
+    MSGPACK_MEDIA_TYPE,
+    accepts_msgpack,
+    columnarize,
+    from_columnar,
+    negotiate,
+    pack_payload,
+)
+
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def _request(accept: str) -> SimpleNamespace:
+    return SimpleNamespace(headers={"accept": accept})
+
+
+def test_accepts_msgpack_parses_media_types_and_quality() -> None:
+    assert accepts_msgpack(_request("application/msgpack"))
+    assert accepts_msgpack(_request("application/msgpack, application/json;q=0.9"))
+    assert accepts_msgpack(_request("text/html, application/x-msgpack;q=0.5"))
+    assert not accepts_msgpack(_request("application/msgpack;q=0"))
+    assert not accepts_msgpack(_request("application/json"))
+    assert not accepts_msgpack(_request(""))
+    assert not accepts_msgpack(None)
+
+
+def test_columnarize_rewrites_homogeneous_record_lists_only() -> None:
+    rows = [{"id": i, "symbol": f"C{i}", "income": i * 0.5} for i in range(20)]
+    payload = {
+        "rows": rows,
+        "short": rows[:2],
+        "mixed": rows[:10] + [{"id": 99}],
+        "series": [1, 2, 3],
+    }
+
+    packed = columnarize(payload)
+
+    block = packed["rows"]
+    assert block[COLUMNAR_MARKER] == ["id", "symbol", "income"]
+    assert block["values"][0] == list(range(20))
+    assert from_columnar(block) == rows
+    assert packed["short"] == rows[:2]
+    assert isinstance(packed["mixed"], list)
+    assert packed["series"] == [1, 2, 3]
+
+
+def test_negotiate_returns_payload_for_json_clients_and_msgpack_otherwise() -> None:
+    payload = {"positions": [{"symbol": "BTC", "size": np.float64(1.5)} for _ in range(10)]}
+
+    assert negotiate(_request("application/json"), payload) is payload
+
+    response = negotiate(_request(MSGPACK_MEDIA_TYPE), payload)
+    assert response.media_type == MSGPACK_MEDIA_TYPE
+    assert response.headers["vary"] == "Accept"
+    decoded = msgpack.unpackb(response.body, raw=False)
+    assert from_columnar(decoded["positions"]) == [{"symbol": "BTC", "size": 1.5}] * 10
+
+
+def test_columnar_msgpack_is_smaller_than_row_msgpack() -> None:
+    rows = [{"id": i, "date_ms": 1_700_000_000_000 + i, "symbol": "BTCUSDT", "income": 0.1, "user": "u"} for i in range(500)]
+    assert len(pack_payload({"rows": rows})) < len(pack_payload({"rows": rows}, columnar=False))
+
+
+def test_income_table_mode_negotiates_msgpack(monkeypatch) -> None:
+    raw = [(i, 1_700_000_000_000 + i * 1000, "BTCUSDT", 1.0 + i, "alice") for i in range(12)]
+    monkeypatch.setattr(dashboard, "_get_db", lambda: SimpleNamespace(select_income_by_symbol_with_id=lambda *_: raw))
+
+    response = dashboard.get_income_data(
+        _request(MSGPACK_MEDIA_TYPE), users="ALL", period="ALL_TIME", last_n=5, filter_val=0.0, session=None,
+    )
+
+    decoded = msgpack.unpackb(response.body, raw=False)
+    assert decoded["mode"] == "table"
+    rows = from_columnar(decoded["rows"]) if isinstance(decoded["rows"], dict) else decoded["rows"]
+    assert [row["id"] for row in rows] == [11, 10, 9, 8, 7]
+
+    plain = dashboard.get_income_data(
+        _request("application/json"), users="ALL", period="ALL_TIME", last_n=5, filter_val=0.0, session=None,
+    )
+    assert plain["rows"] == rows
+
+
+def test_high_volume_pages_load_msgpack_decoder() -> None:
+    decoder = (ROOT / "frontend" / "js" / "pbgui_msgpack.js").read_text(encoding="utf-8")
+    assert "window.PBGuiMsgpack" in decoder
+    assert "__columnar__" in decoder
+    for page in ("dashboard_income.html", "dashboard_positions.html", "dashboard_editor.html", "v7_pareto_explorer.html"):
+        html = (ROOT / "frontend" / page).read_text(encoding="utf-8")
+        assert "/app/js/pbgui_msgpack.js" in html, page
+        assert "PBGuiMsgpack" in html, page
@@ -0,0 +1,97 @@
+"""Tests for the incremental optimize-log progress tracker."""
+
+from __future__ import annotations
+
+from api import optimize_v8
+from api.optimize_log_progress import OptimizeLogProgressTracker
+
+
+def _counting_tracker(seen: list[str], **kwargs) -> OptimizeLogProgressTracker:
+    def apply_line(summary: dict, line: str) -> None:
+        seen.append(line)
+        summary["lines"] += 1
+        summary["last"] = line
+
+    return OptimizeLogProgressTracker(lambda: {"lines": 0, "last": None}, apply_line, **kwargs)
+
+
+def test_only_appended_lines_are_parsed_and_offsets_survive_restarts(tmp_path) -> None:
+    log = tmp_path / "job.log"
+    log.write_text("one\ntwo\n", encoding="utf-8")
+    seen: list[str] = []
+    tracker = _counting_tracker(seen)
+
+    assert tracker.summary(log) == {"lines": 2, "last": "two"}
+    assert tracker.summary(log) == {"lines": 2, "last": "two"}
+    with log.open("a", encoding="utf-8") as handle:
+        handle.write("three\nfo")
+    # The unterminated line is shown but re-read once it is complete.
+    assert tracker.summary(log) == {"lines": 4, "last": "fo"}
+    with log.open("a", encoding="utf-8") as handle:
+        handle.write("ur\n")
+    assert tracker.summary(log) == {"lines": 4, "last": "four"}
+    assert seen == ["one", "two", "three", "fo", "four"]
+
+    restarted: list[str] = []
+    with log.open("a", encoding="utf-8") as handle:
+        handle.write("five\n")
+    assert _counting_tracker(restarted).summary(log) == {"lines": 5, "last": "five"}
+    assert restarted == ["five"]
+
+
+def test_replaced_or_truncated_logs_start_a_fresh_summary(tmp_path) -> None:
+    log = tmp_path / "job.log"
+    log.write_text("old-1\nold-2\nold-3\n", encoding="utf-8")
+    tracker = _counting_tracker([])
+    assert tracker.summary(log)["lines"] == 3
+
+    log.write_text("new-1\n", encoding="utf-8")
+    assert tracker.summary(log) == {"lines": 1, "last": "new-1"}
+
+    replacement = tmp_path / "job.log.new"
+    replacement.write_text("new-1\nother\n", encoding="utf-8")
+    replacement.replace(log)
+    assert tracker.summary(log) == {"lines": 2, "last": "other"}
+
+    tracker.forget(log)
+    assert not (tmp_path / ".progress" / "job.log.json").exists()
+    assert tracker.summary(tmp_path / "missing.log") == {"lines": 0, "last": None}
+
+
+def test_first_pass_over_a_large_log_reads_head_and_tail_only(tmp_path) -> None:
+    log = tmp_path / "job.log"
+    log.write_text("".join(f"line-{i:04d}\n" for i in range(1000)), encoding="utf-8")
+    seen: list[str] = []
+    tracker = _counting_tracker(seen, head_bytes=100, tail_bytes=100)
+
+    assert tracker.summary(log)["last"] == "line-0999"
+    assert seen[0] == "line-0000"
+    assert "line-0500" not in seen
+    assert len(seen) < 30
+
+
+def test_v8_status_tracker_follows_a_growing_log(tmp_path) -> None:
+    lines = [
+        "2026-03-30T12:10:14Z INFO Selected optimizer backend: pymoo",
+        "2026-03-30T12:10:14Z INFO Using pymoo nsga3 | n_obj=3 | ref_dirs=325 | n_partitions=24 (auto)",
+        "2026-03-30T12:10:16Z INFO Starting optimize...",
+        "2026-03-30T12:10:40Z INFO Iter: 4601 | Pareto ↑ | +1/-0 | size:26 | adg_usd:(0.00054554,0.005997)",
+        "2026-03-30T12:10:40Z INFO Pareto update | eval=4601 | front=26 | objectives=[adg_usd=0.0015244] | constraint=0.0",
+        "2026-03-30T12:11:00Z INFO Optimization complete",
+    ]
+    log = tmp_path / "job.log"
+    phases = []
+    for count in range(1, len(lines) + 1):
+        log.write_text("\n".join(lines[:count]) + "\n", encoding="utf-8")
+        summary = optimize_v8._log_progress.summary(log)
+        phases.append(summary["phase"])
+        assert summary["last_log_at"] == lines[count - 1][:20]
+
+    assert phases == ["queued", "optimizing", "optimizing", "optimizing", "optimizing", "complete"]
+    assert summary["backend"] == "pymoo"
+    assert summary["algorithm"] == "nsga3"
+    assert summary["objective_count"] == 3
+    assert summary["evaluations"] == 4601
+    assert summary["front"] == 26
+    assert summary["objectives"] == {"adg_usd": 0.0015244}
+    assert summary["ranges"]["adg_usd"] == {"min": 0.00054554, "max": 0.005997}
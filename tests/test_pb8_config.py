@@ -315,6 +315,41 @@ def test_call_helper_uses_pb8_venv_cwd_and_releases_update_lock(monkeypatch) ->
     assert released == [True]
 
 
+def test_call_helper_uses_warm_pool_when_enabled(monkeypatch) -> None:
+    """With the helper pool enabled, requests go to a warm worker instead of subprocess.run."""
+    calls = []
+
+    class Lease:
+        def release(self) -> None:
+            calls.append("released")
+
+    runtime = {"ready": True, "pb8dir": "/runtime/pb8", "pb8venv": "/runtime/venv/bin/python"}
+    monkeypatch.setenv("PBGUI_PB8_HELPER_POOL", "2")
+    monkeypatch.setattr(pb8_config, "acquire_master_runtime_lock", lambda _root: Lease())
+    monkeypatch.setattr(pb8_config, "pb8_runtime_status", lambda: runtime)
+    monkeypatch.setattr(
+        pb8_config.subprocess,
+        "run",
+        lambda *_args, **_kwargs: (_ for _ in ()).throw(AssertionError("subprocess started")),
+    )
+
+    def fake_call(helper, request, **kwargs):
+        calls.append((helper, request["operation"], request["pb8_dir"], kwargs["runtime"] is runtime))
+        return {"ok": True, "result": {"version": "v8"}}, 40
+
+    monkeypatch.setattr(pb8_config.pb8_helper_pool, "call", fake_call)
+
+    assert pb8_config._call_helper("status") == {"version": "v8"}
+    assert calls == [("config", "status", "/runtime/pb8", True), "released"]
+
+    def crashed(*_args, **_kwargs):
+        raise pb8_config.pb8_helper_pool.HelperCrashed("worker exited")
+
+    monkeypatch.setattr(pb8_config.pb8_helper_pool, "call", crashed)
+    with pytest.raises(pb8_config.PB8ConfigurationError, match="worker exited"):
+        pb8_config._call_helper("status")
+
+
 def test_call_helper_transforms_update_lock_busy_without_subprocess(monkeypatch) -> None:
     """A PB8 update remains distinguishable and never starts a helper process."""
     busy = MasterUpdateBusyError("update active")
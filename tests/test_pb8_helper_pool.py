@@ -0,0 +1,201 @@
+"""Tests for the warm PB8 helper worker pool."""
+
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+import pb8_helper_pool
+
+ROOT = Path(__file__).resolve().parents[1]
+
+FAKE_HELPER = '''
+import os
+import time
+
+
+def respond(request):
+    operation = request.get("operation")
+    if operation == "sleep":
+        time.sleep(float(request.get("seconds", 30)))
+    if operation == "big":
+        return {"ok": True, "result": {"blob": "x" * int(request["size"])}}
+    if operation == "crash":
+        os._exit(3)
+    if operation == "noisy":
+        print("stray output must not corrupt frames")
+    return {"ok": True, "result": {"pid": os.getpid(), "echo": request.get("value")}}
+'''
+
+
+def _fake_spawn(tmp_path):
+    (tmp_path / "pb8_config_helper.py").write_text(FAKE_HELPER, encoding="utf-8")
+    launcher = (
+        f"import sys; sys.path[:0] = [{str(tmp_path)!r}, {str(ROOT)!r}]; "
+        "import pb8_helper_worker; raise SystemExit(pb8_helper_worker.main())"
+    )
+
+    def spawn(runtime):
+        return subprocess.Popen(
+            [sys.executable, "-c", launcher],
+            cwd=str(runtime["pb8dir"]),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+
+    return spawn
+
+
+@pytest.fixture
+def pool(tmp_path):
+    helper_pool = pb8_helper_pool.HelperPool(max_workers=2, max_requests=3, spawn=_fake_spawn(tmp_path))
+    yield helper_pool
+    helper_pool.shutdown()
+
+
+@pytest.fixture
+def runtime(tmp_path):
+    pb8_dir = tmp_path / "pb8"
+    (pb8_dir / ".git").mkdir(parents=True)
+    (pb8_dir / ".git" / "HEAD").write_text("aaaa\n", encoding="utf-8")
+    return {"pb8venv": sys.executable, "pb8dir": str(pb8_dir)}
+
+
+def _call(pool, runtime, operation="echo", **kwargs):
+    timeout = kwargs.pop("timeout", 20)
+    request = {"operation": operation, **kwargs.pop("request", {})}
+    response, _size = pool.call("config", request, runtime=runtime, timeout=timeout, **kwargs)
+    return response
+
+
+def test_pool_reuses_warm_worker_and_recycles_after_max_requests(pool, runtime) -> None:
+    pids = [_call(pool, runtime, "noisy")["result"]["pid"] for _ in range(4)]
+
+    assert pids[0] == pids[1] == pids[2]
+    assert pids[3] != pids[0]
+    stats = pool.stats()
+    assert stats["spawned"] == 2
+    assert stats["warm_hits"] == 2
+    assert stats["recycled"] == 1
+    assert stats["requests"] == 4
+
+
+def test_pool_recycles_workers_when_runtime_fingerprint_changes(pool, runtime) -> None:
+    first = _call(pool, runtime)["result"]["pid"]
+    assert _call(pool, runtime)["result"]["pid"] == first
+
+    (Path(runtime["pb8dir"]) / ".git" / "HEAD").write_text("bbbb\n", encoding="utf-8")
+
+    assert _call(pool, runtime)["result"]["pid"] != first
+    assert pool.stats()["recycled"] == 1
+
+
+def test_pool_unknown_helper_and_crash_do_not_poison_later_requests(pool, runtime) -> None:
+    response, _size = pool.call("missing", {}, runtime=runtime, timeout=20)
+    assert response == {"ok": False, "detail": "unknown PB8 helper: missing"}
+
+    with pytest.raises(pb8_helper_pool.HelperCrashed):
+        _call(pool, runtime, "crash")
+
+    assert _call(pool, runtime, request={"value": 7})["result"]["echo"] == 7
+    assert pool.stats()["failed"] == 1
+
+
+def test_pool_timeout_and_oversized_response_kill_the_worker(pool, runtime) -> None:
+    first = _call(pool, runtime)["result"]["pid"]
+
+    with pytest.raises(pb8_helper_pool.HelperTimeout):
+        _call(pool, runtime, "sleep", timeout=0.5)
+    with pytest.raises(pb8_helper_pool.HelperResponseTooLarge):
+        _call(pool, runtime, "big", request={"size": 4096}, max_response_bytes=1024)
+
+    assert _call(pool, runtime)["result"]["pid"] != first
+    assert pool.stats()["idle"] == 1
+
+
+def test_pool_cancel_kills_only_the_keyed_request(pool, runtime) -> None:
+    errors = []
+    started = threading.Event()
+
+    def run():
+        try:
+            _call(pool, runtime, "sleep", key="op-1", on_worker=lambda _proc: started.set())
+        except Exception as exc:
+            errors.append(exc)
+
+    worker = threading.Thread(target=run)
+    worker.start()
+    assert started.wait(20)
+    time.sleep(0.2)
+    assert pool.cancel("other") is False
+    assert pool.cancel("op-1") is True
+    worker.join(20)
+
+    assert len(errors) == 1 and isinstance(errors[0], pb8_helper_pool.HelperCancelled)
+    assert _call(pool, runtime)["ok"] is True
+
+
+def test_pool_size_reads_environment(monkeypatch) -> None:
+    monkeypatch.setenv("PBGUI_PB8_HELPER_POOL", "5")
+    assert pb8_helper_pool.pool_size() == 5 and pb8_helper_pool.enabled()
+    monkeypatch.setenv("PBGUI_PB8_HELPER_POOL", "0")
+    assert not pb8_helper_pool.enabled()
+
+
+def test_pool_is_disabled_unless_configured(monkeypatch) -> None:
+    monkeypatch.delenv("PBGUI_PB8_HELPER_POOL", raising=False)
+    monkeypatch.setattr(pb8_helper_pool, "load_ini", lambda section, key: "")
+
+    assert pb8_helper_pool.pool_size() == 0
+    assert not pb8_helper_pool.enabled()
+
+
+class _CountingLease:
+    def __init__(self, events, name):
+        self.events = events
+        self.name = name
+        events.append(f"{name}:acquire")
+
+    def release(self):
+        self.events.append(f"{self.name}:release")
+
+
+def test_enabled_pool_serves_pb8_config_warm_and_holds_runtime_lease_per_call(monkeypatch, tmp_path, runtime) -> None:
+    import pb8_config
+
+    events = []
+    helper_pool = pb8_helper_pool.HelperPool(
+        max_workers=2,
+        spawn=_fake_spawn(tmp_path),
+        runtime_lease=lambda: _CountingLease(events, "pool"),
+    )
+    monkeypatch.setenv("PBGUI_PB8_HELPER_POOL", "2")
+    monkeypatch.setattr(pb8_helper_pool, "_POOL", helper_pool)
+    monkeypatch.setattr(pb8_config, "acquire_master_runtime_lock", lambda _path: _CountingLease(events, "client"))
+    monkeypatch.setattr(pb8_config, "pb8_runtime_status", lambda: {"ready": True, **runtime})
+    try:
+        first = pb8_config._call_helper("echo")
+        second = pb8_config._call_helper("echo")
+    finally:
+        helper_pool.shutdown()
+
+    assert first["pid"] == second["pid"]
+    assert helper_pool.stats()["warm_hits"] == 1
+    assert events == ["client:acquire", "pool:acquire", "pool:release", "client:release"] * 2
+
+
+def test_pool_reports_busy_runtime_lease_without_starting_a_worker(tmp_path, runtime) -> None:
+    def busy():
+        raise pb8_helper_pool.MasterUpdateBusyError("PB8 is being updated")
+
+    helper_pool = pb8_helper_pool.HelperPool(spawn=_fake_spawn(tmp_path), runtime_lease=busy)
+    try:
+        with pytest.raises(pb8_helper_pool.HelperPoolError, match="being updated"):
+            _call(helper_pool, runtime)
+        assert helper_pool.stats()["spawned"] == 0
+    finally:
+        helper_pool.shutdown()
@@ -4,6 +4,7 @@ import base64
 import json
 import hashlib
 import stat
+import sys
 import threading
 import time
 from pathlib import Path
@@ -13,6 +14,7 @@ import pytest
 import PBCluster as pbcluster_module
 from PBCluster import PBCluster
 from cluster_credentials import ensure_node_key_material
+import cluster_sync_command
 from cluster_sync_command import run_command
 from master.cluster_state import (
     append_operation as _append_operation,
@@ -1500,6 +1502,163 @@ def test_cluster_sync_worker_pulls_ops_and_blobs_from_peer(tmp_path: Path) -> No
     assert json.loads((root_a / "desired_state.json").read_text(encoding="utf-8"))["instances"]["bot-b"]["assigned_host"] == NODE_ID
 
 
+@pytest.mark.parametrize("pack_supported", [True, False])
+def test_cluster_sync_worker_pulls_operation_blobs_in_one_pack(tmp_path: Path, pack_supported: bool) -> None:
+    """Operation blobs arrive in one get-blob-pack round trip, with per-blob pulls for older peers."""
+
+    class PackAwarePeerClient(_LocalPeerClient):
+        def run(self, peer, local_node_id, command_text, payload=None):
+            if command_text == "get-blob-pack" and not pack_supported:
+                self.calls.append((str(peer["node_id"]), command_text))
+                raise RuntimeError("unsupported command: get-blob-pack")
+            return super().run(peer, local_node_id, command_text, payload)
+
+    root_a = default_cluster_root(tmp_path / "node-a")
+    root_b = default_cluster_root(tmp_path / "node-b")
+    ensure_local_identity(root_a, role="master", pbname="master-a", cluster_id=CLUSTER_ID, node_id=NODE_ID)
+    ensure_local_identity(root_b, role="vps", pbname="runner-b", cluster_id=CLUSTER_ID, node_id=NODE_B)
+    append_operation(root_a, "ADD_NODE", {"node_id": NODE_ID, "role": "master", "pbname": "master-a"}, created_at=100)
+    append_operation(root_a, "ADD_NODE", {"node_id": NODE_B, "role": "vps", "pbname": "runner-b", "ssh_host": "runner-b"}, created_at=101)
+    append_operation(root_b, "ADD_NODE", {"node_id": NODE_ID, "role": "master", "pbname": "master-a", "ssh_host": "master-a"}, created_at=100)
+    append_operation(root_b, "ADD_NODE", {"node_id": NODE_B, "role": "vps", "pbname": "runner-b"}, created_at=101)
+    for index, name in enumerate(("bot-b", "bot-c")):
+        instance_dir = tmp_path / "node-b" / "data" / "run_v7" / name
+        instance_dir.mkdir(parents=True)
+        (instance_dir / "config.json").write_text(json.dumps({"pbgui": {"version": 9}, "live": {"user": name}}), encoding="utf-8")
+        append_operation(
+            root_b,
+            "UPSERT_CONFIG",
+            {
+                "instance": name,
+                "version": "9",
+                "assigned_host": NODE_ID,
+                "desired_state": "running",
+                "config_manifest_hash": _write_config_blobs_for_instance(root_b, instance_dir),
+            },
+            created_at=102 + index,
+        )
+    client = PackAwarePeerClient({NODE_ID: root_a, NODE_B: root_b})
+    worker = ClusterSyncWorker(tmp_path / "node-a", peer_client=client)
+
+    status = worker.run_once(reason="test")
+
+    assert status["ok"] is True
+    for name in ("bot-b", "bot-c"):
+        local_config = tmp_path / "node-a" / "data" / "run_v7" / name / "config.json"
+        assert json.loads(local_config.read_text(encoding="utf-8"))["live"]["user"] == name
+    commands = [command for _node, command in client.calls]
+    per_blob = [command for command in commands if command.startswith("get-blob ")]
+    assert commands.count("get-blob-pack") == 1
+    assert (per_blob == []) is pack_supported
+    if not pack_supported:
+        assert len(per_blob) == 4
+        worker._prefetch_blob_pack({"node_id": NODE_B}, NODE_ID, {"config": {"sha256:" + "a" * 64}})
+        assert [command for _node, command in client.calls].count("get-blob-pack") == 1
+
+
+def _pipelined_sync_roots(tmp_path: Path) -> tuple[Path, Path]:
+    """Create a master and a peer whose log holds operations from two actors."""
+
+    root_a = default_cluster_root(tmp_path / "node-a")
+    root_b = default_cluster_root(tmp_path / "node-b")
+    ensure_local_identity(root_a, role="master", pbname="master-a", cluster_id=CLUSTER_ID, node_id=NODE_ID)
+    ensure_local_identity(root_b, role="vps", pbname="runner-b", cluster_id=CLUSTER_ID, node_id=NODE_B)
+    append_operation(root_a, "ADD_NODE", {"node_id": NODE_ID, "role": "master", "pbname": "master-a"}, created_at=100)
+    append_operation(root_a, "ADD_NODE", {"node_id": NODE_B, "role": "vps", "pbname": "runner-b", "ssh_host": "runner-b"}, created_at=101)
+    append_operation(root_b, "ADD_NODE", {"node_id": NODE_ID, "role": "master", "pbname": "master-a", "ssh_host": "master-a"}, created_at=100)
+    append_operation(root_b, "ADD_NODE", {"node_id": NODE_B, "role": "vps", "pbname": "runner-b"}, created_at=101)
+    for actor in (NODE_C, _node_id(13)):
+        for seq in (1, 2):
+            write_operation(root_b, {
+                "schema_version": 1,
+                "cluster_id": CLUSTER_ID,
+                "op_id": f"{actor}:{seq:08d}",
+                "actor": actor,
+                "seq": seq,
+                "op": "DELETE_INSTANCE",
+                "created_at": 200 + seq,
+                "instance": f"relay-{seq}",
+                "version": str(seq),
+            })
+    return root_a, root_b
+
+
+@pytest.mark.parametrize("session_supported", [True, False])
+def test_cluster_sync_worker_pipelines_peer_commands_over_one_session(tmp_path: Path, session_supported: bool) -> None:
+    """One framed session carries the peer pass; old peers fall back to one SSH call per command."""
+
+    root_a, root_b = _pipelined_sync_roots(tmp_path)
+    script = str(Path(cluster_sync_command.__file__).resolve())
+
+    class SessionPeerClient(_LocalPeerClient):
+        """Open real wrapper sessions against local cluster roots."""
+
+        def __init__(self, roots: dict[str, Path]) -> None:
+            super().__init__(roots)
+            self.sessions = 0
+
+        def open_session(self, peer: dict, local_node_id: str):
+            self.sessions += 1
+            if not session_supported:
+                legacy = "import sys; sys.stderr.write('{\"error\": \"unsupported command: session\", \"ok\": false}\\n'); sys.exit(1)"
+                return cluster_sync_worker.SshClusterPeerSession([sys.executable, "-c", legacy], timeout=30)
+            command = [
+                sys.executable, script,
+                "--cluster-root", str(self.roots[str(peer["node_id"])]),
+                "--remote-node", local_node_id,
+                "--allow-join",
+                "session",
+            ]
+            return cluster_sync_worker.SshClusterPeerSession(command, timeout=30)
+
+    client = SessionPeerClient({NODE_ID: root_a, NODE_B: root_b})
+    worker = ClusterSyncWorker(tmp_path / "node-a", peer_client=client)
+
+    status = worker.run_once(reason="test")
+
+    assert status["ok"] is True
+    assert status["state_vector"][NODE_C] == status["state_vector"][_node_id(13)] == 2
+    peer = next(item for item in status["peers"] if item["node_id"] == NODE_B)
+    transport = peer["transport"]
+    assert transport["requests"] >= transport["round_trips"] > 0
+    assert transport["bytes_sent"] > 0 and transport["bytes_received"] > 0
+    if session_supported:
+        assert transport["mode"] == "session"
+        assert client.calls == []
+        assert NODE_B not in worker._session_unsupported
+    else:
+        assert transport["mode"] == "exec"
+        assert "get-op-ranges" in [command for _node, command in client.calls]
+        assert NODE_B in worker._session_unsupported
+        worker.run_once(reason="test")
+        assert client.sessions == 1
+
+
+def test_peer_session_transport_error_reports_stderr_written_at_exit(tmp_path: Path) -> None:
+    """Errors wait for the stderr drain, so an old peer's "unsupported command" text is not lost."""
+
+    # Like ssh relaying the remote error, the text reaches stderr after the
+    # session process itself has already exited.
+    relay = tmp_path / "relay.py"
+    relay.write_text(
+        "import time, sys\n"
+        "time.sleep(0.3)\n"
+        "sys.stderr.write('{\"error\": \"unsupported command: session\", \"ok\": false}\\n')\n",
+        encoding="utf-8",
+    )
+    legacy = tmp_path / "legacy.py"
+    legacy.write_text(
+        "import subprocess, sys\n"
+        f"subprocess.Popen([sys.executable, {str(relay)!r}], stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL)\n"
+        "sys.exit(1)\n",
+        encoding="utf-8",
+    )
+    session = cluster_sync_worker.SshClusterPeerSession([sys.executable, str(legacy)], timeout=30)
+
+    with pytest.raises(ClusterSyncWorkerError, match="unsupported command: session"):
+        session.run("status")
+
+
 def test_cluster_sync_worker_repairs_actor_sequence_gap(tmp_path: Path) -> None:
     """A remote contiguous vector causes a local internal sequence gap to be fetched."""
 
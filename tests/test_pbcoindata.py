@@ -620,6 +620,34 @@ class TestGetSymbolForCoin:
         assert get_symbol_for_coin("1000CAT", "binance.swap", use_cache=False) == "1000CATUSDT"
         assert get_symbol_for_coin("CAT", "binance.swap", use_cache=False) == "CATUSDT"
 
+    def test_saved_mapping_is_served_from_market_index(self, coindata, tmp_workdir, sample_ccxt_markets, monkeypatch):
+        """PBCoinData writes markets.idx; lookups use it until the JSON changes."""
+        mapping = [
+            {"symbol": "1000CATUSDT", "base": "1000CAT", "coin": "CAT", "quote": "USDT", "swap": True, "linear": True},
+            {"symbol": "CATUSDT", "base": "CAT", "coin": "CAT", "quote": "USDT", "swap": True, "linear": True},
+            {"symbol": "BTCUSDT", "base": "BTC", "coin": "BTC", "quote": "USDT", "swap": True, "linear": True},
+        ]
+        coindata.save_ccxt_markets("binance", sample_ccxt_markets)
+        coindata.save_exchange_mapping("binance", mapping)
+        index_path = tmp_workdir / "data" / "coindata" / "binance" / "markets.idx"
+        assert index_path.exists()
+        assert PBCoinData_mod.market_index.open_index(index_path).market("BTC/USDT:USDT").min_cost == 5.0
+
+        PBCoinData_mod._COIN_TO_SYMBOL_CACHE.clear()
+        reads = []
+        read_json = PBCoinData_mod._read_json_with_retry
+        monkeypatch.setattr(PBCoinData_mod, "_read_json_with_retry", lambda *a, **k: reads.append(a[0]) or read_json(*a, **k))
+        assert get_symbol_for_coin("CAT", "binance.swap") == "CATUSDT"
+        assert get_symbol_for_coin("1000CAT", "binance.swap") == "1000CATUSDT"
+        assert get_symbol_for_coin("UNKNOWN", "binance.swap") == "UNKNOWNUSDT"
+        assert reads == []
+
+        # Another writer replaced mapping.json: the stale index is ignored.
+        mapping_path = tmp_workdir / "data" / "coindata" / "binance" / "mapping.json"
+        mapping_path.write_text(json.dumps(mapping[2:] + [dict(mapping[1], symbol="CAT2USDT")]), encoding="utf-8")
+        assert get_symbol_for_coin("CAT", "binance.swap") == "CAT2USDT"
+        assert reads == [mapping_path]
+
 
 # ============================================================================
 # CoinData Constructor Tests
@@ -1766,6 +1794,40 @@ class TestCMCNetworkAndValidation:
         assert len(calls) == 1
         assert other.metadata["data"]["1"]["notice"] is None
 
+    def test_metadata_refresh_requests_only_ids_without_stored_info(self, coindata, monkeypatch):
+        """Fresh per-id /info records are reused and reported as saved credits."""
+        coindata.cmc_pool.store.create_cmc("metadata-store-secret")
+        coindata.data = {"data": [{"id": 1, "symbol": "BTC"}, {"id": 2, "symbol": "ETH"}]}
+        coindata._symbols_all = ["BTC", "ETH"]
+        coindata.cmc_info.record_info({"1": {"notice": "stored"}})
+        requested = []
+
+        class FakeSession:
+            def __init__(self):
+                self.headers = {}
+
+            def get(self, url, params=None, timeout=30):
+                requested.append(params["id"])
+                return MagicMock(
+                    status_code=200,
+                    text='{"status": {"credit_count": 1}, "data": {"2": {"notice": null}}}',
+                    headers={},
+                )
+
+        monkeypatch.setattr(PBCoinData_mod, "Session", FakeSession)
+        monkeypatch.setattr(coindata, "fetch_api_status", lambda: True)
+
+        assert coindata._fetch_metadata_once() is True
+        assert requested == ["2"]
+        assert coindata.metadata["data"] == {"1": {"notice": "stored"}, "2": {"notice": None}}
+
+        assert coindata._fetch_metadata_once() is True
+        assert requested == ["2"]
+        coalescing = coindata.cmc_pool_status()["coalescing"]
+        assert coalescing["upstream_calls"] == 1
+        assert coalescing["coalesced_calls"] == 1
+        assert coalescing["credits_saved"] == 1.0
+
     def test_malformed_key_info_preserves_false_return_contract(self, coindata, monkeypatch):
         """Incomplete key-info HTTP 200 responses fail cleanly instead of raising."""
         coindata.cmc_pool.store.create_cmc("malformed-status-secret")
@@ -3783,6 +3845,39 @@ class TestUpdateMappings:
         assert len(processed) > 0
         assert "binance" not in processed
 
+    def test_slow_exchange_does_not_delay_others(self, coindata, tmp_workdir, monkeypatch):
+        """Exchanges refresh concurrently and an overrunning one is reported, not awaited."""
+        release = threading.Event()
+        finished = []
+        monkeypatch.setattr(PBCoinData_mod, "MAPPING_REFRESH_DEADLINE", 0.3)
+
+        def fake_refresh(exchange):
+            if exchange == "slow":
+                assert release.wait(timeout=10)
+            else:
+                time.sleep(0.2)
+            finished.append(exchange)
+            return {"exchange": exchange, "ok": True, "elapsed": 0.2}
+
+        monkeypatch.setattr(coindata, "refresh_exchange_mapping", fake_refresh)
+        started = time.monotonic()
+        results = coindata.refresh_exchange_mappings(["slow", "a", "b", "c"])
+        elapsed = time.monotonic() - started
+
+        try:
+            assert elapsed < 2.0
+            assert [r["exchange"] for r in results] == ["slow", "a", "b", "c"]
+            assert sorted(finished) == ["a", "b", "c"]
+            assert results[0]["timed_out"] and not results[0]["ok"]
+            # The abandoned run is not started a second time while it is still going.
+            again = coindata.refresh_exchange_mappings(["slow"])
+            assert again[0]["error"] == "previous refresh still running"
+            status = PBCoinData_mod.load_mapping_refresh_status()
+            assert status["a"]["ok"] and status["a"]["elapsed"] == 0.2
+            assert status["slow"]["timed_out"]
+        finally:
+            release.set()
+
     def test_mapping_interval_configurable(self, coindata, tmp_workdir):
         """mapping_interval property can be set and affects update timing."""
         coindata.mapping_interval = 48
@@ -89,6 +89,50 @@ def test_find_high_memory_bot_uses_run_v7_process_memory() -> None:
     assert run.find_high_memory_bot() is actual_high
 
 
+def test_shared_process_snapshot_walks_process_table_once_per_tick(monkeypatch) -> None:
+    """All runner lookups in one tick share a single process walk until a bot starts or stops."""
+    walks = []
+
+    class Process:
+        def __init__(self, cmdline):
+            self._cmdline = cmdline
+
+        def cmdline(self):
+            return self._cmdline
+
+        def create_time(self):
+            return 1.0
+
+        def memory_full_info(self):
+            return None
+
+        def cpu_percent(self):
+            return 0.0
+
+    processes = [Process(["python", "main.py", f"/run_v7/bot{i}/config_run.json"]) for i in range(3)]
+
+    def process_iter():
+        walks.append(1)
+        return iter(processes)
+
+    monkeypatch.setattr(PBRun_mod.psutil, "process_iter", process_iter)
+    runners = []
+    for i in range(4):
+        runner = PBRun_mod.RunV7()
+        runner.path = f"/run_v7/bot{i}"
+        runners.append(runner)
+
+    with PBRun_mod.shared_process_snapshot():
+        assert [runner.is_running() for runner in runners] == [True, True, True, False]
+        assert len(walks) == 1
+        PBRun_mod._invalidate_process_snapshot()
+        assert runners[0].is_running()
+        assert runners[1].is_running()
+        assert len(walks) == 3
+    assert runners[2].is_running()
+    assert len(walks) == 4
+
+
 def _write_v7_config(instance_dir: Path, *, enabled_on: str = "test-vps", version: int = 3) -> None:
     """Write a minimal PB7 config with PBGui metadata."""
 
@@ -0,0 +1,98 @@
+"""Tests for the shared single-query position snapshot service."""
+
+from __future__ import annotations
+
+import threading
+from types import SimpleNamespace
+
+import Database as database_module
+from api.positions_snapshot import PositionsSnapshotService, classify_position_orders
+
+
+def _database(tmp_path):
+    db = object.__new__(database_module.Database)
+    db.db = tmp_path / "pbgui.db"
+    db._write_lock = threading.Lock()
+    db._local = threading.local()
+    db.create_tables()
+    with db._connect() as conn:
+        conn.executemany(
+            "INSERT INTO position (symbol, timestamp, psize, upnl, entry, user, side) VALUES (?, 0, ?, ?, ?, ?, ?)",
+            [
+                ("ETHUSDT", 2.0, 1.123456789, 2000.0, "alice", "long"),
+                ("BTCUSDT", 0.5, -3.0, 60000.0, "alice", "long"),
+                ("BTCUSDT", 0.2, 1.0, 61000.0, "alice", "short"),
+                ("SOLUSDT", 4.0, 0.0, 100.0, "alice", "long"),
+                ("BTCUSDT", 1.0, 0.0, 59000.0, "bob", "long"),
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO orders (symbol, timestamp, amount, price, side, uniqueid, user) VALUES (?, 0, 1, ?, ?, ?, ?)",
+            [
+                ("BTCUSDT", 58000.0, "buy", "o1", "alice"),
+                ("BTCUSDT", 59000.0, "buy", "o2", "alice"),
+                ("BTCUSDT", 62000.0, "sell", "o3", "alice"),
+                ("ETHUSDT", 2100.0, "sell", "o4", "alice"),
+                ("BTCUSDT", 1.0, "buy", "o5", "bob"),
+            ],
+        )
+        conn.executemany(
+            "INSERT INTO prices (symbol, timestamp, price, user) VALUES (?, 0, ?, ?)",
+            [("BTCUSDT", 60500.0, "alice"), ("BTCUSDT", 60600.0, "alice"), ("ETHUSDT", 2050.0, "alice"), ("BTCUSDT", 1.0, "bob")],
+        )
+    return db
+
+
+def _n_plus_one_rows(db, user_name):
+    """The per-position query loop the snapshot replaces."""
+    user = SimpleNamespace(name=user_name)
+    prices = db.fetch_prices(user) or []
+    rows = []
+    for pos in db.fetch_positions(user) or []:
+        symbol, side = pos[1], pos[7]
+        price = 0.0
+        for p in prices:
+            if p[1] == symbol:
+                price = p[3]
+        dca, next_dca, next_tp = classify_position_orders(db.fetch_orders_by_symbol(user_name, symbol) or [], side)
+        rows.append({
+            "user": user_name, "symbol": symbol, "side": side,
+            "size": pos[3], "upnl": round(pos[4], 8), "entry": pos[5], "price": price,
+            "pos_value": round(pos[3] * price, 2),
+            "dca": dca, "next_dca": next_dca, "next_tp": next_tp,
+        })
+    rows.sort(key=lambda row: row["symbol"])
+    return rows
+
+
+def test_joined_snapshot_matches_per_position_queries(tmp_path) -> None:
+    db = _database(tmp_path)
+    snapshot = PositionsSnapshotService().get(db, "alice")
+
+    assert snapshot.rows() == _n_plus_one_rows(db, "alice")
+    assert snapshot.prices == {"BTCUSDT": 60600.0, "ETHUSDT": 2050.0, "SOLUSDT": 0.0}
+    assert snapshot.classify("BTCUSDT", "short") == (1, 62000.0, 59000.0)
+    assert snapshot.classify("DOGEUSDT", "long") is None
+
+
+def test_snapshot_is_reused_until_a_write_bumps_the_user_version(tmp_path) -> None:
+    db = _database(tmp_path)
+    service = PositionsSnapshotService()
+
+    first = service.get(db, "alice")
+    assert service.get(db, "alice") is first
+    service.get(db, "bob")
+    assert (service.queries, service.hits) == (2, 1)
+
+    # Writes for another user leave alice's snapshot untouched.
+    with db._connect() as conn:
+        conn.execute("UPDATE prices SET price = 2.0 WHERE user = 'bob'")
+    assert service.get(db, "alice") is first
+
+    with db._connect() as conn:
+        conn.execute("DELETE FROM orders WHERE uniqueid = 'o4'")
+    refreshed = service.get(db, "alice")
+    assert refreshed is not first
+    assert refreshed.version > first.version
+    assert refreshed.classify("ETHUSDT", "long") == (0, 0.0, 0.0)
+    assert service.queries == 3
@@ -0,0 +1,127 @@
+"""Tests for the ETag/If-None-Match response cache used by polling endpoints."""
+
+import os
+
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from api import jobs, response_cache
+from api.response_cache import CachedResponder, ConditionalCache, path_stamp, respond
+
+
+def _client(cache: ConditionalCache, build) -> TestClient:
+    app = FastAPI()
+
+    @app.get("/poll")
+    def poll(cache_handle: CachedResponder = Depends(cache)):
+        return respond(cache_handle, build)
+
+    return TestClient(app)
+
+
+def test_unchanged_version_returns_304_without_rebuilding() -> None:
+    calls = []
+    version = {"value": 1}
+
+    def build():
+        calls.append(1)
+        return {"value": version["value"], "rows": list(range(5))}
+
+    cache = ConditionalCache("test.unchanged", version=lambda: version["value"])
+    client = _client(cache, build)
+
+    first = client.get("/poll")
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "private, no-cache"
+
+    second = client.get("/poll", headers={"If-None-Match": etag})
+    assert second.status_code == 304
+    assert second.content == b""
+    assert len(calls) == 1
+
+    # A client without the ETag gets the cached body instead of a rebuild.
+    third = client.get("/poll")
+    assert third.status_code == 200
+    assert third.json() == first.json()
+    assert len(calls) == 1
+
+    version["value"] = 2
+    fourth = client.get("/poll", headers={"If-None-Match": etag})
+    assert fourth.status_code == 200
+    assert fourth.json()["value"] == 2
+    assert len(calls) == 2
+
+    stats = cache.snapshot()
+    assert stats["requests"] == 4
+    assert stats["not_modified"] == 1
+    assert stats["body_hits"] == 1
+    assert stats["misses"] == 2
+    assert stats["hit_ratio"] == 0.5
+
+
+def test_identical_rebuild_after_version_change_still_returns_304() -> None:
+    version = {"value": 1}
+    cache = ConditionalCache("test.identical", version=lambda: version["value"])
+    client = _client(cache, lambda: {"same": True})
+
+    etag = client.get("/poll").headers["etag"]
+    version["value"] = 2
+
+    response = client.get("/poll", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+
+
+def test_query_string_is_part_of_the_cache_key() -> None:
+    app = FastAPI()
+    cache = ConditionalCache("test.query", version=lambda: 1)
+
+    @app.get("/poll")
+    def poll(limit: int = 1, cache_handle: CachedResponder = Depends(cache)):
+        return respond(cache_handle, lambda: {"limit": limit})
+
+    client = TestClient(app)
+    assert client.get("/poll?limit=1").json() == {"limit": 1}
+    assert client.get("/poll?limit=2").json() == {"limit": 2}
+
+
+def test_respond_falls_back_to_plain_payload_for_direct_calls() -> None:
+    assert respond(Depends(lambda: None), lambda: {"ok": True}) == {"ok": True}
+
+
+def test_path_stamp_tracks_creation_and_rewrites(tmp_path) -> None:
+    state_dir = tmp_path / "pending"
+    before = path_stamp(state_dir)
+    state_dir.mkdir()
+    created = path_stamp(state_dir)
+    assert created != before
+
+    job = state_dir / "job.json"
+    job.write_text("{}", encoding="utf-8")
+    os.utime(state_dir, ns=(1, 1))
+    with_child = path_stamp(state_dir, children=True)
+    job.write_text('{"progress": 1}', encoding="utf-8")
+    os.utime(state_dir, ns=(1, 1))
+    assert path_stamp(state_dir, children=True) != with_child
+
+
+def test_jobs_endpoint_version_follows_task_queue_writes(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(jobs, "get_task_state_dir", lambda state: tmp_path / state)
+    monkeypatch.setattr(jobs, "read_worker_pid", lambda: None)
+    before = jobs._jobs_version()
+    (tmp_path / "running").mkdir()
+    assert jobs._jobs_version() != before
+
+
+def test_cache_stats_lists_registered_polling_routes() -> None:
+    from api import cluster, market_data, services, v7_instances  # noqa: F401
+
+    routes = {item["route"] for item in response_cache.cache_stats()}
+    assert {
+        "jobs.get_jobs",
+        "services.get_status",
+        "v7_instances.get_instances",
+        "market_data.get_market_data_status",
+        "cluster.get_status",
+    } <= routes
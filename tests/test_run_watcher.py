@@ -0,0 +1,66 @@
+"""Tests for the inotify-based PBRun run-state watcher."""
+
+import time
+
+import pytest
+
+from run_watcher import RunStateWatcher
+
+
+def _wait_for(watcher: RunStateWatcher, tag: str, timeout: float = 3.0) -> set[str]:
+    seen: set[str] = set()
+    deadline = time.monotonic() + timeout
+    while tag not in seen and time.monotonic() < deadline:
+        watcher.changed.wait(0.1)
+        seen |= watcher.consume()
+    return seen
+
+
+@pytest.fixture
+def watcher(tmp_path):
+    data = tmp_path / "data"
+    (data / "run_v7" / "bot_a").mkdir(parents=True)
+    watcher = RunStateWatcher(
+        dirs={"v7": data / "run_v7", "v8": data / "run_v8"},
+        files={"ini": tmp_path / "pbgui.ini"},
+    )
+    if not watcher.start():
+        pytest.skip("inotify is not available")
+    yield watcher
+    watcher.stop()
+
+
+def test_instance_and_ini_changes_are_tagged(tmp_path, watcher) -> None:
+    (tmp_path / "data" / "run_v7" / "bot_a" / "config.json").write_text("{}", encoding="utf-8")
+    assert _wait_for(watcher, "v7") == {"v7"}
+
+    (tmp_path / "unrelated.txt").write_text("x", encoding="utf-8")
+    (tmp_path / "pbgui.ini.tmp").write_text("[main]\n", encoding="utf-8")
+    (tmp_path / "pbgui.ini.tmp").replace(tmp_path / "pbgui.ini")
+    assert _wait_for(watcher, "ini") == {"ini"}
+
+
+def test_new_instances_and_missing_roots_are_picked_up(tmp_path, watcher) -> None:
+    new_instance = tmp_path / "data" / "run_v7" / "bot_b"
+    new_instance.mkdir()
+    assert "v7" in _wait_for(watcher, "v7")
+    (new_instance / "config.json").write_text("{}", encoding="utf-8")
+    assert "v7" in _wait_for(watcher, "v7")
+
+    run_v8 = tmp_path / "data" / "run_v8"
+    run_v8.mkdir()
+    assert "v8" in _wait_for(watcher, "v8")
+    (run_v8 / "bot_c").mkdir()
+    _wait_for(watcher, "v8")
+    (run_v8 / "bot_c" / "config.json").write_text("{}", encoding="utf-8")
+    assert "v8" in _wait_for(watcher, "v8")
+
+
+def test_open_log_appends_do_not_wake_the_reconciler(tmp_path, watcher) -> None:
+    log = tmp_path / "data" / "run_v7" / "bot_a" / "passivbot_err.log"
+    with log.open("a", encoding="utf-8") as handle:
+        _wait_for(watcher, "v7")
+        for _ in range(5):
+            handle.write("line\n")
+            handle.flush()
+        assert _wait_for(watcher, "v7", timeout=0.3) == set()
@@ -0,0 +1,95 @@
+"""Tests for the per-session Strategy Explorer candle/indicator cache."""
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+
+from api import strategy_explorer_candles as candles
+from api.strategy_explorer_core import calculate_v7_indicators
+
+
+def _frame(rows=3 * 1440 + 37):
+    rng = np.random.default_rng(7)
+    index = pd.date_range("2024-01-01 00:01", periods=rows, freq="1min")
+    close = 100.0 + np.cumsum(rng.normal(0.0, 0.2, rows))
+    spread = np.abs(rng.normal(0.0, 0.1, rows)) + 0.01
+    return pd.DataFrame(
+        {"open": close, "high": close + spread, "low": close - spread, "close": close, "volume": rng.random(rows)},
+        index=index,
+    )
+
+
+def _patch_loader(monkeypatch, tmp_path, frame):
+    loads = []
+
+    def fake_load(exchange, coin, source_dir=None, *, prefer_source_only=False):
+        loads.append((exchange, coin))
+        return frame.copy()
+
+    monkeypatch.setattr(candles, "load_historical_ohlcv_v7", fake_load)
+    monkeypatch.setattr(candles, "pb7dir", lambda: str(tmp_path))
+    shard_dir = tmp_path / "historical_data" / "ohlcvs_binance" / "BTC"
+    shard_dir.mkdir(parents=True)
+    np.save(shard_dir / "2024-01-01.npy", np.zeros((1, 6)))
+    return loads, shard_dir
+
+
+def test_frame_is_loaded_once_until_shards_change(monkeypatch, tmp_path) -> None:
+    loads, shard_dir = _patch_loader(monkeypatch, tmp_path, _frame())
+    cache = candles.CandleCache()
+
+    first = cache.frame("binance", "BTC")
+    assert cache.frame("binance", "BTC") is first
+    assert loads == [("binance", "BTC")]
+
+    np.save(shard_dir / "2024-01-02.npy", np.zeros((1, 6)))
+    assert cache.frame("binance", "BTC") is not first
+    assert len(loads) == 2
+    # The stale version is replaced rather than kept next to the new one.
+    assert len(cache._entries) == 1
+
+
+def test_indicators_match_calculate_v7_indicators_and_memoize_spans(monkeypatch, tmp_path) -> None:
+    frame = _frame()
+    _patch_loader(monkeypatch, tmp_path, frame)
+    cache = candles.CandleCache()
+
+    full = cache.indicators("binance", "BTC", 20.0, 300.0, 12.0)
+    pdt.assert_frame_equal(full, calculate_v7_indicators(frame, 20.0, 300.0, 12.0))
+    assert cache.stats["column_builds"] == 4
+
+    # Only ema_0 and the derived ema_2 span change; ema_1 and volatility are reused.
+    cache.indicators("binance", "BTC", 40.0, 300.0, 12.0)
+    assert cache.stats["column_builds"] == 6
+    assert cache.stats["column_hits"] == 2
+
+    start, end = frame.index[500], frame.index[2500]
+    window = cache.indicators("binance", "BTC", 40.0, 300.0, 12.0, start=start, end=end)
+    expected = calculate_v7_indicators(frame.loc[(frame.index >= start) & (frame.index <= end)], 40.0, 300.0, 12.0)
+    pdt.assert_frame_equal(window, expected)
+
+
+def test_full_history_columns_equal_prefix_recomputation(monkeypatch, tmp_path) -> None:
+    """Snapshots read one row of the cached columns instead of recomputing the prefix."""
+    frame = _frame()
+    _patch_loader(monkeypatch, tmp_path, frame)
+    full = candles.CandleCache().indicators("binance", "BTC", 15.0, 700.0, 6.0)
+
+    for grid_idx in (0, 59, 60, 61, 1439, 2000, len(frame) - 1):
+        prefix = calculate_v7_indicators(frame.iloc[: grid_idx + 1], 15.0, 700.0, 6.0).iloc[-1]
+        pdt.assert_series_equal(full.iloc[grid_idx], prefix)
+
+
+def test_session_caches_are_bounded_and_expire(monkeypatch) -> None:
+    candles.clear_sessions()
+    monkeypatch.setattr(candles, "MAX_SESSIONS", 2)
+    a = candles.session_cache("a")
+    assert candles.session_cache("a") is a
+    candles.session_cache("b")
+    candles.session_cache("c")
+    assert set(candles._SESSIONS) == {"b", "c"}
+
+    candles._SESSIONS["b"].touched -= candles.SESSION_IDLE_SECONDS + 1
+    candles.session_cache("c")
+    assert set(candles._SESSIONS) == {"c"}
+    candles.clear_sessions()
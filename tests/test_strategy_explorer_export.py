@@ -0,0 +1,81 @@
+"""Tests for parallel, order-preserving Movie Builder frame rendering."""
+
+import json
+
+import pytest
+
+pytest.importorskip("plotly")
+
+from api import strategy_explorer_export as export
+
+
+def _fake_render(fig, width, height, scale):
+    """Stand-in for kaleido: encode the cumulative figure state instead of a PNG."""
+    return json.dumps({"y": list(fig.data[0].y), "title": fig.layout.title.text, "size": [width, height, scale]}).encode()
+
+
+def _figure(frames=21):
+    base = {"data": [{"type": "scatter", "y": [0]}], "layout": {"title": {"text": "base"}}}
+    frame_list = [{"data": [{"y": [i]}], "traces": [0]} for i in range(1, frames + 1)]
+    # Only some frames carry layout, so later states depend on earlier frames.
+    frame_list[4]["layout"] = {"title": {"text": "five"}}
+    return base, frame_list
+
+
+def _expected(frames):
+    title = "base"
+    states = [{"y": [0], "title": "base"}]
+    for i, frame in enumerate(frames, start=1):
+        title = frame.get("layout", {}).get("title", {}).get("text", title)
+        states.append({"y": [i], "title": title})
+    return states
+
+
+def _render_all(monkeypatch, workers, frames=21):
+    monkeypatch.setattr(export, "RENDER_CHUNK_FRAMES", 4)
+    monkeypatch.setattr(export, "RENDER_WINDOW_FRAMES", 8)
+    base, frame_list = _figure(frames)
+    rendered = list(export._iter_rendered_frames(base, frame_list, (640, 360, 1), workers=workers, render=_fake_render))
+    return rendered, _expected(frame_list)
+
+
+def test_in_process_rendering_applies_frames_cumulatively(monkeypatch) -> None:
+    rendered, expected = _render_all(monkeypatch, workers=1)
+
+    assert [index for index, _png in rendered] == list(range(22))
+    states = [json.loads(png) for _index, png in rendered]
+    assert [{"y": s["y"], "title": s["title"]} for s in states] == expected
+    assert states[0]["size"] == [640, 360, 1]
+
+
+def test_process_pool_rendering_preserves_order_and_state(monkeypatch) -> None:
+    rendered, expected = _render_all(monkeypatch, workers=2)
+
+    assert [index for index, _png in rendered] == list(range(22))
+    assert [{"y": s["y"], "title": s["title"]} for s in map(json.loads, (png for _i, png in rendered))] == expected
+
+
+def test_process_pool_rendering_stops_on_cancel(monkeypatch) -> None:
+    monkeypatch.setattr(export, "RENDER_CHUNK_FRAMES", 4)
+    base, frame_list = _figure(40)
+    seen = []
+    frames = export._iter_rendered_frames(
+        base, frame_list, (640, 360, 1), workers=2, render=_fake_render, cancel_cb=lambda: len(seen) >= 6
+    )
+
+    with pytest.raises(RuntimeError, match="stopped"):
+        for index, _png in frames:
+            seen.append(index)
+
+    assert seen == list(range(6))
+
+
+def test_render_worker_count_is_bounded(monkeypatch) -> None:
+    monkeypatch.setattr(export.os, "cpu_count", lambda: 16)
+    assert export._render_worker_count(3) == 1
+    # Typical exports stay in process; the pool only starts for long ones.
+    assert export._render_worker_count(2 * export.MIN_FRAMES_PER_RENDER_WORKER - 1) == 1
+    assert export._render_worker_count(2 * export.MIN_FRAMES_PER_RENDER_WORKER) == 2
+    assert export._render_worker_count(2000) == export.MAX_RENDER_WORKERS
+    monkeypatch.setattr(export.os, "cpu_count", lambda: 1)
+    assert export._render_worker_count(2000) == 1
@@ -0,0 +1,112 @@
+"""Equivalence tests for incremental V7 indicator columns."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from api import strategy_explorer_candles as candles
+from api.strategy_explorer_core import calculate_v7_indicators
+from api.strategy_explorer_indicators import IncrementalEma, frame_extends, frame_mark
+
+COLUMNS = ("volatility", "ema_0", "ema_1", "ema_2")
+
+
+def _frame(rows=6000, seed=3, gap=(1500, 1800)):
+    rng = np.random.default_rng(seed)
+    index = pd.date_range("2024-03-01 00:17", periods=rows, freq="1min")
+    index = index.delete(np.arange(*gap))  # a download gap
+    close = 50.0 + np.cumsum(rng.normal(0.0, 0.1, len(index)))
+    spread = np.abs(rng.normal(0.0, 0.05, len(index))) + 0.01
+    frame = pd.DataFrame(
+        {"open": close, "high": close + spread, "low": close - spread, "close": close, "volume": 1.0},
+        index=index,
+    )
+    frame.iloc[70, frame.columns.get_loc("close")] = np.nan
+    return frame
+
+
+def _assert_close(actual, expected):
+    for column in COLUMNS:
+        np.testing.assert_allclose(actual[column].to_numpy(), expected[column].to_numpy(), rtol=1e-9, atol=1e-12)
+
+
+def _cache(monkeypatch, frame):
+    """Return a candle cache that loads *frame* and a setter for the next load."""
+    current = {"frame": frame, "version": 0}
+    monkeypatch.setattr(candles, "load_historical_ohlcv_v7", lambda *_args, **_kwargs: current["frame"].copy())
+    monkeypatch.setattr(candles, "ohlcv_data_signature", lambda *_args: (current["version"],))
+
+    def load(next_frame):
+        current["frame"] = next_frame
+        current["version"] += 1
+
+    return candles.CandleCache(), load
+
+
+@pytest.mark.parametrize("first", [1, 45, 60, 1499, 3001])
+def test_appended_candles_match_pandas_recompute(monkeypatch, first) -> None:
+    frame = _frame()
+    cache, load = _cache(monkeypatch, frame.iloc[:first])
+    cache.indicators("binance", "BTC", 30.0, 600.0, 8.0)
+    load(frame.iloc[: first + 733])
+    cache.indicators("binance", "BTC", 30.0, 600.0, 8.0)
+    load(frame)
+    result = cache.indicators("binance", "BTC", 30.0, 600.0, 8.0)
+
+    assert (cache.stats["column_builds"], cache.stats["column_extends"]) == (4, 8)
+    assert result.index.equals(frame.index)
+    _assert_close(result, calculate_v7_indicators(frame, 30.0, 600.0, 8.0))
+
+
+def test_single_candle_appends_match_pandas_recompute(monkeypatch) -> None:
+    frame = _frame(rows=400, gap=(250, 310))
+    cache, load = _cache(monkeypatch, frame.iloc[:200])
+    for end in range(200, len(frame) + 1):
+        load(frame.iloc[:end])
+        result = cache.indicators("binance", "BTC", 5.0, 90.0, 1.0)
+    _assert_close(result, calculate_v7_indicators(frame, 5.0, 90.0, 1.0))
+    assert cache.stats["column_builds"] == 4
+
+
+def test_edited_history_falls_back_to_full_recompute(monkeypatch) -> None:
+    frame = _frame()
+    cache, load = _cache(monkeypatch, frame.iloc[:4000])
+    cache.indicators("binance", "BTC", 30.0, 600.0, 8.0)
+
+    edited = frame.copy()
+    edited.iloc[3990, edited.columns.get_loc("close")] += 1.0
+    assert not frame_extends(frame_mark(frame.iloc[:4000]), edited)
+    load(edited)
+    result = cache.indicators("binance", "BTC", 30.0, 600.0, 8.0)
+
+    assert (cache.stats["column_builds"], cache.stats["column_extends"]) == (8, 0)
+    _assert_close(result, calculate_v7_indicators(edited, 30.0, 600.0, 8.0))
+    # A shorter frame is not an append either.
+    load(edited.iloc[:100])
+    cache.indicators("binance", "BTC", 30.0, 600.0, 8.0)
+    assert cache.stats["column_builds"] == 12
+
+
+def test_incremental_ema_matches_pandas_with_missing_values() -> None:
+    values = pd.Series([np.nan, 1.0, np.nan, 3.0, 4.0, np.nan, np.nan, 7.0])
+    ema = IncrementalEma(3.0)
+    head = ema.compute(values.iloc[:4])
+    tail = ema.extend_values(values.iloc[4:].to_numpy())
+    np.testing.assert_allclose(np.concatenate([head.to_numpy(), tail]), values.ewm(span=3.0, adjust=True).mean().to_numpy())
+
+
+def test_candle_cache_extends_full_history_columns_on_append(monkeypatch, tmp_path) -> None:
+    frame = _frame()
+    current = {"frame": frame.iloc[:4000], "version": 0}
+    monkeypatch.setattr(candles, "load_historical_ohlcv_v7", lambda *_args, **_kwargs: current["frame"].copy())
+    monkeypatch.setattr(candles, "ohlcv_data_signature", lambda *_args: (current["version"],))
+    cache = candles.CandleCache()
+    cache.indicators("binance", "BTC", 30.0, 600.0, 8.0)
+
+    current.update(frame=frame, version=1)
+    result = cache.indicators("binance", "BTC", 30.0, 600.0, 8.0)
+
+    assert cache.stats["frame_loads"] == 2
+    assert cache.stats["column_extends"] == 4
+    assert cache.stats["column_builds"] == 4
+    _assert_close(result, calculate_v7_indicators(frame, 30.0, 600.0, 8.0))
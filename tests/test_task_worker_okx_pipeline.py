@@ -2,11 +2,15 @@
 
 from __future__ import annotations
 
+import base64
 from contextlib import nullcontext
 import json
+import os
+import subprocess
 import sys
 import threading
 import time
+import zlib
 
 import pytest
 
@@ -938,3 +942,124 @@ def test_bitget_distributed_requeues_failed_ssh_segment_to_master(monkeypatch, t
     assert last_result["segments_done"] == 1
     assert last_result["host_results"][0]["status"] == "failed"
     assert last_result["host_results"][1]["host"] == "Master fallback"
+
+
+def test_ohlcv_pack_plan_prefers_catalog_checksums_over_mtime() -> None:
+    """Pack plans send missing, resized, or checksum-changed files and trust equal checksums."""
+
+    import ohlcv_pack_copy
+
+    local = {
+        "1m/BTC/2026-01-01.npz": (100, 10, "aaa"),
+        "1m/BTC/2026-01-02.npz": (100, 10, "bbb"),
+        "1m/BTC/2026-01-03.npz": (100, 10, ""),
+        "1m/BTC/2026-01-04.npz": (100, 10, ""),
+        "1m/BTC/2026-01-05.npz": (120, 10, "ccc"),
+        "1m/ETH/2026-01-01.npz": (50, 10, ""),
+    }
+    remote = {
+        "1m/BTC/2026-01-01.npz": (100, 99, "aaa"),
+        "1m/BTC/2026-01-02.npz": (100, 10, "old"),
+        "1m/BTC/2026-01-03.npz": (100, 10, "zzz"),
+        "1m/BTC/2026-01-04.npz": (100, 11, "zzz"),
+        "1m/BTC/2026-01-05.npz": (100, 10, "ccc"),
+    }
+
+    assert ohlcv_pack_copy.plan_pack(local, remote) == [
+        ("1m/BTC/2026-01-02.npz", 100),
+        ("1m/BTC/2026-01-04.npz", 100),
+        ("1m/BTC/2026-01-05.npz", 120),
+        ("1m/ETH/2026-01-01.npz", 50),
+    ]
+
+
+def test_ohlcv_pack_stream_round_trips_through_remote_scripts(tmp_path) -> None:
+    """The manifest and apply scripts plan and unpack one tar stream without touching extras."""
+
+    import ohlcv_pack_copy
+
+    source_root = tmp_path / "local"
+    dest_root = tmp_path / "remote"
+    for rel, body in {"1m/BTC/2026-01-01.npz": b"one", "1m/BTC/2026-01-02.npz": b"two", "1m/ETH/2026-01-01.npz": b"eth"}.items():
+        path = source_root / "bybit" / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(body)
+    (source_root / "bybit" / ".rsync-partial").mkdir()
+    (source_root / "bybit" / ".rsync-partial" / "junk").write_bytes(b"x")
+    (dest_root / "bybit" / "1m" / "BTC").mkdir(parents=True)
+    (dest_root / "bybit" / "1m" / "BTC" / "2026-01-01.npz").write_bytes(b"one")
+    source_stat = (source_root / "bybit" / "1m" / "BTC" / "2026-01-01.npz").stat()
+    os.utime(dest_root / "bybit" / "1m" / "BTC" / "2026-01-01.npz", ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+    (dest_root / "bybit" / "keep.txt").write_bytes(b"remote only")
+
+    def remote(cmd: list[str], **kwargs):
+        assert cmd[:2] == ["ssh", "optimizer"]
+        return subprocess.run(["sh", "-c", cmd[2]], capture_output=True, check=True, **kwargs)
+
+    manifest_cmd = ohlcv_pack_copy.build_manifest_command(
+        target="optimizer", ssh_args=["ssh"], destination_root=str(dest_root), storages=["bybit"],
+    )
+    manifest = ohlcv_pack_copy.decode_manifest(remote(manifest_cmd).stdout.decode())
+    local = ohlcv_pack_copy.local_manifest(source_root / "bybit")
+    plan = ohlcv_pack_copy.plan_pack(local, manifest["bybit"])
+    assert [rel for rel, _size in plan] == ["1m/BTC/2026-01-02.npz", "1m/ETH/2026-01-01.npz"]
+
+    apply_cmd = ohlcv_pack_copy.build_apply_command(
+        target="optimizer", ssh_args=["ssh"], destination_root=str(dest_root), storages=["bybit"],
+    )
+    proc = subprocess.Popen(["sh", "-c", apply_cmd[2]], stdin=subprocess.PIPE, stdout=subprocess.PIPE)
+    progress: list[dict] = []
+    stats = ohlcv_pack_copy.write_pack(proc.stdin, source_root, [("bybit", rel) for rel, _size in plan], progress_cb=progress.append)
+    proc.stdin.close()
+    applied = json.loads(proc.stdout.read())
+    assert proc.wait() == 0
+
+    assert applied == {"files": 2, "bytes": 6, "rejected": 0}
+    assert (stats["files_sent"], stats["bytes_sent"]) == (2, 6)
+    assert (dest_root / "bybit" / "1m" / "ETH" / "2026-01-01.npz").read_bytes() == b"eth"
+    assert (dest_root / "bybit" / "keep.txt").read_bytes() == b"remote only"
+    assert not list((dest_root / "bybit").rglob(".*"))
+    manifest = ohlcv_pack_copy.decode_manifest(remote(manifest_cmd).stdout.decode())
+    assert ohlcv_pack_copy.plan_pack(local, manifest["bybit"]) == []
+
+
+def test_ohlcv_copy_pack_dry_run_reports_planned_files(monkeypatch, tmp_path) -> None:
+    """Pack dry runs read one remote manifest and report the planned transfer without writing."""
+
+    import ohlcv_pack_copy
+
+    source_root = tmp_path / "ohlcv"
+    for rel in ("1m/BTC/2026-01-01.npz", "1m/BTC/2026-01-02.npz"):
+        (source_root / "bybit" / rel).parent.mkdir(parents=True, exist_ok=True)
+        (source_root / "bybit" / rel).write_bytes(b"12345")
+    job_path = tmp_path / "pack-dry-run.json"
+    job_obj = {"progress": {}, "status": "running"}
+    local = ohlcv_pack_copy.local_manifest(source_root / "bybit")
+    remote_manifest = {"bybit": {"1m/BTC/2026-01-01.npz": list(local["1m/BTC/2026-01-01.npz"])}}
+    captured: list[list[str]] = []
+
+    def fake_capture(_job_path, cmd, _label):
+        captured.append(cmd)
+        return base64.b64encode(zlib.compress(json.dumps(remote_manifest).encode())).decode()
+
+    monkeypatch.setattr(task_worker, "get_market_data_root_dir", lambda: source_root)
+    monkeypatch.setattr(task_worker, "catalog_file_checksums", lambda _storage: {})
+    monkeypatch.setattr(task_worker, "_init_job_log", lambda _job_id: None)
+    monkeypatch.setattr(task_worker, "_append_to_job_log", lambda *_args, **_kwargs: None)
+    monkeypatch.setattr(task_worker, "append_exchange_download_log", lambda *_args, **_kwargs: None)
+    monkeypatch.setattr(task_worker, "update_job_file", lambda _path, mutate: mutate(job_obj))
+    monkeypatch.setattr(task_worker, "_run_ohlcv_copy_capture", fake_capture)
+    monkeypatch.setattr(task_worker.subprocess, "Popen", lambda *_args, **_kwargs: pytest.fail("dry run must not stream"))
+
+    task_worker._run_ohlcv_copy(
+        job_path,
+        {"target": "optimizer", "ssh_command": "ssh", "destination_root": "/srv/ohlcv", "exchanges": ["bybit", "okx"], "transport": "pack"},
+        dry_run=True,
+    )
+
+    assert len(captured) == 1 and captured[0][:2] == ["ssh", "optimizer"]
+    result = job_obj["progress"]["last_result"]
+    assert job_obj["progress"]["transport"] == "pack"
+    assert result["transport"] == "pack"
+    assert result["skipped_exchanges"] == ["okx"]
+    assert (result["files_total"], result["files_transferred"], result["transfer_size_bytes"]) == (2, 1, 5)